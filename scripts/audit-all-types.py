@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Auditorias dos arquivos de tipos numa execução só
+==================================================
+Roda audit-types, validate-type-sync e audit-literal-types sobre um único
+carregamento dos arquivos de packages/shared/src/types: cada arquivo é lido e
+tokenizado uma vez (load_type_files) e o mesmo modelo é repassado às três
+verificações, em vez de cada ferramenta reler e recalcular o hash dos arquivos.
+
+Uso: python3 scripts/audit-all-types.py [--no-cache] [--jobs N]
+Retorna: 0 (sucesso) ou 1 (validate-type-sync ou audit-literal-types falharam;
+audit-types só gera o relatório, como quando roda sozinho)
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+
+from schema_audit.cache import open_cache
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.ts_declarations import load_type_files
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+TYPES_DIR = SCRIPTS_DIR.parent / 'packages' / 'shared' / 'src' / 'types'
+
+
+def load_script(name: str):
+    """Importa um script com hífen no nome (audit-types.py) como módulo"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="audit-types, validate-type-sync e audit-literal-types "
+                                                 "com uma única leitura dos arquivos de tipos")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
+
+def main(args) -> int:
+    profiler = current()
+    cache = open_cache(enabled=not args.no_cache)
+    forwarded = ['--jobs', str(args.jobs)] + (['--no-cache'] if args.no_cache else [])
+
+    # Modelo de todos os arquivos de tipos; cada verificação escolhe os seus (audit-types ignora index.ts,
+    # validate-type-sync os que começam com _)
+    ts_files = sorted(TYPES_DIR.glob('*.ts'))
+    with profiler.phase('load types'):
+        loaded = dict(zip((f.resolve() for f in ts_files), load_type_files(ts_files, cache, args.jobs)))
+    print(f"📂 {len(loaded)} arquivos de tipos carregados (cache de parse: {cache.hits} reaproveitados, "
+          f"{cache.misses} reprocessados)")
+    print()
+
+    at, vs, lt = (load_script(name) for name in ('audit-types', 'validate-type-sync', 'audit-literal-types'))
+
+    with profiler.phase('audit-types'):
+        at.main(at.parse_args(forwarded), loaded)
+    with profiler.phase('validate-type-sync'):
+        sync_status = vs.main(vs.parse_args(forwarded), loaded)
+    print()
+    with profiler.phase('audit-literal-types'):
+        literal_issues = lt.check_type_usage(cache, args.jobs, loaded)
+
+    print()
+    print("=" * 80)
+    print("📊 RESUMO DAS AUDITORIAS DE TIPOS")
+    print("=" * 80)
+    print(f"validate-type-sync: {'✅ passou' if sync_status == 0 else '❌ falhou'}")
+    print(f"audit-literal-types: {'✅ nenhum problema' if literal_issues == 0 else f'❌ {literal_issues} problemas'}")
+    return 0 if sync_status == 0 and literal_issues == 0 else 1
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with profiling(args, 'audit-all-types'):
+        status = main(args)
+    sys.exit(status)
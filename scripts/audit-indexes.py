@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Auditoria: Índices das migrations
+Monta o modelo de índices, chaves estrangeiras e políticas RLS das migrations e
+aponta colunas de FK e de predicados RLS sem índice que as cubra, com o
+CREATE INDEX sugerido, e índices redundantes (duplicados, cobertos pelo prefixo
+de outro índice ou implícitos em PRIMARY KEY/UNIQUE), com o custo por escrita.
+Confronta também as consultas PostgREST das Edge Functions com os índices
+"""
+
+import argparse
+from pathlib import Path
+
+from schema_audit.cache import NullCache, open_cache
+from schema_audit.indexes import IndexModel, missing_indexes, redundant_indexes
+from schema_audit.parallel import parse_files
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.query_sites import PARSER_VERSION as QUERY_PARSER_VERSION
+from schema_audit.query_sites import analyze_query_sites, parse_query_sites
+from schema_audit.replay import MigrationReplay
+
+# Raiz do projeto e migrations auditadas
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = PROJECT_DIR / 'supabase' / 'migrations'
+FUNCTIONS_DIR = PROJECT_DIR / 'supabase' / 'functions'
+
+
+def audit_indexes(cache=None, jobs=1):
+    """Lista FKs e colunas de políticas RLS sem índice, índices redundantes e consultas sem índice"""
+    if cache is None:
+        cache = NullCache()
+    profiler = current()
+
+    print("=" * 80)
+    print("🔍 AUDITORIA: Índices (FKs, Políticas RLS e Redundância)")
+    print("=" * 80)
+    print()
+
+    with profiler.phase('replay migrations'):
+        tables = MigrationReplay.from_directory(MIGRATIONS_DIR, cache, jobs).final.tables
+    with profiler.phase('index model'):
+        model = IndexModel.from_directory(MIGRATIONS_DIR, cache, jobs)
+
+    entries = [model.tables[name] for name in sorted(model.tables) if name in tables]
+    print(f"📚 MODELO: {len(entries)} tabelas, "
+          f"{sum(len(e.indexes) for e in entries)} índices, "
+          f"{sum(len(e.foreign_keys) for e in entries)} FKs, "
+          f"{sum(len(e.policies) for e in entries)} políticas")
+    print()
+
+    with profiler.phase('missing indexes'):
+        suggestions = missing_indexes(model, tables)
+
+    if suggestions:
+        print("=" * 80)
+        print(f"❌ COLUNAS SEM ÍNDICE ({len(suggestions)}):")
+        print("=" * 80)
+        print()
+
+        by_table = {}
+        for suggestion in suggestions:
+            by_table.setdefault(suggestion.table, []).append(suggestion)
+
+        for table_name, table_suggestions in sorted(by_table.items()):
+            print(f"📋 {table_name}")
+            for suggestion in table_suggestions:
+                print(f"   ({', '.join(suggestion.columns)}): {'; '.join(suggestion.reasons)}")
+                print(f"      {suggestion.statement}")
+            print()
+
+    with profiler.phase('redundant indexes'):
+        redundant = redundant_indexes(model, tables)
+
+    if redundant:
+        print("=" * 80)
+        print(f"♻️  ÍNDICES REDUNDANTES ({len(redundant)}):")
+        print("=" * 80)
+        print()
+
+        by_kind = {}
+        for entry in redundant:
+            by_kind.setdefault(entry.kind, []).append(entry)
+
+        for kind, kind_entries in sorted(by_kind.items()):
+            print(f"▶ {kind} ({len(kind_entries)}):")
+            for entry in kind_entries:
+                index, other = entry.index, entry.covered_by
+                print(f"   {index.table}.{index.name} ({', '.join(index.columns)}) "
+                      f"[{index.migration}:{index.line}]")
+                print(f"      coberto por {other.name} ({', '.join(other.columns)})")
+                print(f"      custo: ~{entry.entry_bytes} bytes + 1 descida de B-tree por INSERT "
+                      f"e por UPDATE não-HOT")
+                print(f"      {entry.statement}")
+            print()
+
+    # Consultas das Edge Functions (um parse por arquivo, cacheável)
+    function_files = sorted(FUNCTIONS_DIR.rglob('*.ts'))
+    scans = parse_files(function_files, 'query_sites', QUERY_PARSER_VERSION, parse_query_sites, cache, jobs)
+    sites_by_file = {str(path.relative_to(FUNCTIONS_DIR)): sites for path, sites in zip(function_files, scans)}
+    site_count = sum(len(sites) for sites in scans)
+    with profiler.phase('query sites'):
+        queries = analyze_query_sites(sites_by_file, model, tables)
+    profiler.count('query_sites', site_count)
+
+    print("=" * 80)
+    print(f"🛰️  CONSULTAS DAS EDGE FUNCTIONS ({site_count} em {len(function_files)} arquivos):")
+    print("=" * 80)
+    print()
+    if queries:
+        for finding in queries:
+            site = finding.site
+            filters = ', '.join(f"{method}({column})" for method, column in site.filters) or 'sem filtro'
+            order = f" order({', '.join(site.order)})" if site.order else ''
+            print(f"▶ {finding.kind} ×{finding.count}: {site.table}.{site.operation} {filters}{order}")
+            print(f"   {finding.detail}")
+            for location in finding.locations:
+                print(f"   - {location}")
+            print()
+    else:
+        print("✅ Todos os filtros e ordenações das consultas usam índices")
+        print()
+
+    print("=" * 80)
+    print("📊 RESUMO")
+    print("=" * 80)
+    fk_count = sum(1 for s in suggestions if any(r.startswith('FK') for r in s.reasons))
+    print(f"FKs sem índice: {fk_count}")
+    print(f"Colunas RLS sem índice: {len(suggestions) - fk_count}")
+    print(f"Índices redundantes: {len(redundant)} "
+          f"(~{sum(e.entry_bytes for e in redundant)} bytes por linha inserida nas tabelas afetadas)")
+    print(f"Consultas com problema: {len(queries)} formatos "
+          f"({sum(f.count for f in queries)} de {site_count} pontos de consulta)")
+    print()
+
+    if suggestions:
+        print("⚠️  AÇÃO NECESSÁRIA:")
+        print("   FKs sem índice tornam DELETE/UPDATE na tabela referenciada uma varredura completa")
+        print("   (ON DELETE CASCADE inclusive); colunas de políticas RLS sem índice são avaliadas")
+        print("   em toda consulta. Criar os índices sugeridos numa nova migration.")
+    if redundant:
+        print("⚠️  ÍNDICES REDUNDANTES:")
+        print("   Cada índice extra é atualizado em toda escrita e ocupa buffer cache sem")
+        print("   atender consultas novas. Remover numa nova migration com os DROP INDEX sugeridos.")
+    if queries:
+        print("⚠️  CONSULTAS SEM ÍNDICE:")
+        print("   Filtros sem índice viram varredura sequencial a cada chamada da função;")
+        print("   os formatos mais frequentes aparecem primeiro.")
+    if not suggestions and not redundant and not queries:
+        print("✅ Índices adequados para FKs, políticas RLS e consultas, sem redundância")
+
+    return len(suggestions) + len(redundant) + len(queries)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auditoria de índices: FKs, políticas RLS, redundância e consultas")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with profiling(args, 'audit-indexes'):
+        num_issues = audit_indexes(open_cache(enabled=not args.no_cache), args.jobs)
+    exit(0 if num_issues == 0 else 1)
@@ -1,107 +1,208 @@
 #!/usr/bin/env python3
 """
 Auditoria: Verifica tipos literais TypeScript vs ENUMs do PostgreSQL
-Identifica campos que usam tipo literal mas não têm ENUM no banco
+Monta o catálogo de ENUMs das migrations, compara os valores com database.types.ts
+e com as uniões de literais, e identifica campos que usam tipo literal sem ENUM no banco
 """
 
+import argparse
 import re
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-# Mapear tipos TypeScript para ENUMs do banco
-TYPE_TO_ENUM_MAP = {
-    # Core (20240101000001_create_enums.sql)
-    'tier_type': 'tier_type',
-    'user_role': 'user_role',
-    'user_status': 'user_status',
-    'tipo_residente': 'tipo_residente',
-    'unidade_tipo': 'unidade_tipo',
-    'ata_status': 'ata_status',
-    'comunicado_categoria': 'comunicado_categoria',
-    'prioridade': 'prioridade',
-
-    # Operational (20240101000006_operational_modules.sql)
-    'ComunicadoStatus': 'comunicado_status',
-    'ComunicadoCategoria': 'comunicado_categoria',
-    'OcorrenciaStatus': 'ocorrencia_status',
-    'OcorrenciaCategoria': 'ocorrencia_categoria',
-    'Prioridade': 'prioridade',
-    'ChamadoStatus': 'chamado_status',
-    'ChamadoCategoria': 'chamado_categoria',
-
-    # Financial (20240101000008_financial_module.sql)
-    'CategoriaTipo': 'categoria_tipo',
-    'LancamentoTipo': 'lancamento_tipo',
-    'LancamentoStatus': 'lancamento_status',
-    'PrestacaoStatus': 'prestacao_status',
-    'TaxaTipo': 'taxa_tipo',
-    'CobrancaStatus': 'cobranca_status',
-
-    # Assembleias (20240101000012_assembleias_module.sql)
-    'AssembleiaTipo': 'assembleia_tipo',
-    'AssembleiaStatus': 'assembleia_status',
-    'PautaTipoVotacao': 'pauta_tipo_votacao',
-    'PautaStatus': 'pauta_status',
-    'QuorumEspecial': 'quorum_especial',
-    'PresencaTipo': 'presenca_tipo',
-    'AssinaturaTipo': None,  # NÃO TEM ENUM NO BANCO!
-    'ComentarioTipo': None,  # NÃO TEM ENUM NO BANCO!
-
-    # Comunicação (20240101000014_comunicacao_module.sql)
-    'CanalNotificacao': 'canal_notificacao',
-    'PrioridadeComunicado': 'prioridade_comunicado',
-    'StatusEntrega': 'status_entrega',
-    'DigestFrequencia': None,  # NÃO TEM ENUM NO BANCO!
-    'TipoEmergencia': None,  # NÃO TEM ENUM NO BANCO!
-
-    # Integrações (20240101000016_integracoes_module.sql)
-    'IntegracaoTipo': 'integracao_tipo',
-    'IntegracaoStatus': 'integracao_status',
-    'ConectorTipo': 'conector_tipo',
-    'ExportacaoFormato': None,  # NÃO TEM ENUM NO BANCO!
-    'ExportacaoTipo': None,  # NÃO TEM ENUM NO BANCO!
-}
-
-def check_type_usage():
-    """Verifica uso de tipos literais sem ENUM no banco"""
+from schema_audit.cache import NullCache, open_cache
+from schema_audit.database_types import DatabaseTypes, load_database_types
+from schema_audit.enums import EnumCatalog
+from schema_audit.matcher import split_words
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.ts_declarations import TypeFile, load_type_files
 
+# Raiz do projeto e arquivos auditados
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = PROJECT_DIR / 'supabase' / 'migrations'
+DATABASE_TYPES_FILE = PROJECT_DIR / 'packages' / 'shared' / 'database.types.ts'
+
+# Sobreposição mínima de valores (Jaccard) para associar uma união de literais a um ENUM
+MIN_VALUE_OVERLAP = 0.5
+
+# Tipo de um campo que começa por um nome de tipo (Tipo, Tipo[], Tipo | null)
+_TYPE_NAME_RE = re.compile(r"[A-Za-z_$][\w$]*\b")
+
+# tipo_conta declarado como união de literais ('corrente' | ...)
+_RESTRICTED_LITERAL_RE = re.compile(r"""['"](\w+)['"]\s*\|""")
+
+# Lado direito de um alias: Enums['x'] ou união de literais string ('a' | 'b')
+_ENUM_ALIAS_RE = re.compile(r"""Enums\[\s*['"](\w+)['"]\s*\]""")
+_LITERAL_RE = r"""(?:'[^'\n]*'|"[^"\n]*")"""
+_LITERAL_UNION_RE = re.compile(rf"\|?\s*{_LITERAL_RE}(?:\s*\|\s*{_LITERAL_RE})*\s*(?:;|\n|$)")
+_LITERAL_VALUE_RE = re.compile(r"'([^'\n]*)'|\"([^\"\n]*)\"")
+
+def scan_type_file(type_file: TypeFile) -> Dict[str, List[Tuple]]:
+    """Declarações de tipos e usos de tipos em campos, a partir do modelo do arquivo
+
+    - aliases: (linha, nome, 'enum' | 'literal' | 'other', nome do enum ou valores literais)
+    - usages: (linha, campo, tipo)
+    """
+    aliases, usages = [], []
+
+    for decl in type_file.declarations:
+        if decl.kind != 'type' or not decl.exported or decl.generic:
+            continue
+        enum_match = _ENUM_ALIAS_RE.match(decl.value)
+        union_match = None if enum_match else _LITERAL_UNION_RE.match(decl.value)
+        if enum_match:
+            kind, target = 'enum', enum_match.group(1)
+        elif union_match:
+            kind = 'literal'
+            target = tuple(m.group(1) if m.group(1) is not None else m.group(2)
+                           for m in _LITERAL_VALUE_RE.finditer(union_match.group()))
+        else:
+            kind, target = 'other', None
+        aliases.append((decl.line, decl.name, kind, target))
+
+    for field in type_file.fields:
+        type_match = _TYPE_NAME_RE.match(field.type)
+        if type_match:
+            usages.append((field.line, field.name, type_match.group()))
+
+    return {'aliases': aliases, 'usages': usages}
+
+def enum_name_for(type_name: str) -> str:
+    """Nome de ENUM esperado para um tipo TypeScript (TipoEmergencia → tipo_emergencia)"""
+    return '_'.join(split_words(type_name))
+
+def resolve_literal_types(aliases: List[Tuple], catalog: EnumCatalog) -> Dict[str, Tuple[Optional[str], str]]:
+    """Associa cada união de literais a um ENUM do catálogo: {tipo: (enum ou None, critério)}
+
+    Critérios, em ordem: nome (snake_case do tipo), maior sobreposição de valores
+    (>= MIN_VALUE_OVERLAP); sem associação, o tipo é um literal sem ENUM no banco.
+    """
+    resolved = {}
+    for _, name, kind, values in aliases:
+        if kind != 'literal' or name in resolved:
+            continue
+        enum = enum_name_for(name)
+        if enum in catalog.enums:
+            resolved[name] = (enum, 'nome')
+            continue
+        closest = catalog.closest(values)
+        if closest is not None and closest[1] >= MIN_VALUE_OVERLAP:
+            resolved[name] = (closest[0], f"valores ({closest[1]:.0%})")
+        else:
+            resolved[name] = (None, 'sem ENUM no banco')
+    return resolved
+
+def enum_drift(catalog: EnumCatalog, generated: Optional[DatabaseTypes], aliases: List[Tuple],
+               resolved: Dict[str, Tuple[Optional[str], str]]) -> List[Tuple[str, str, str]]:
+    """Relatório completo de drift de ENUMs (tipo, local, descrição), calculado uma vez por execução"""
+    drift = []
+
+    def compare(location: str, enum: str, values) -> None:
+        result = catalog.compare(enum, values)
+        if result.missing_in_ts:
+            drift.append(('VALUES_MISSING_IN_TS', location,
+                          f"ENUM {enum} tem valores ausentes: {', '.join(result.missing_in_ts)}"))
+        if result.missing_in_db:
+            drift.append(('VALUES_MISSING_IN_DB', location,
+                          f"Valores fora do ENUM {enum}: {', '.join(result.missing_in_db)}"))
+
+    # database.types.ts × migrations
+    if generated is not None:
+        for enum in sorted(catalog.enums.keys() | generated.enums.keys()):
+            location = f"database.types.ts: Enums['{enum}']"
+            if enum not in generated.enums:
+                drift.append(('MISSING_IN_GENERATED', location,
+                              f"ENUM criado em {catalog.origin[enum]} não está nos tipos gerados"))
+            elif enum not in catalog.enums:
+                drift.append(('MISSING_IN_MIGRATIONS', location, "ENUM não existe nas migrations"))
+            else:
+                compare(location, enum, generated.enums[enum])
+
+    # Aliases Enums['x'] e uniões de literais dos tipos customizados × migrations
+    for _, name, kind, target in aliases:
+        if kind == 'enum' and target not in catalog.enums:
+            drift.append(('MISSING_IN_MIGRATIONS', name, f"Enums['{target}'] não existe nas migrations"))
+        elif kind == 'literal' and resolved[name][0] is not None:
+            compare(name, resolved[name][0], target)
+
+    return drift
+
+def print_enum_drift(resolved: Dict[str, Tuple[Optional[str], str]], drift: List[Tuple[str, str, str]]) -> None:
+    """Exibe as associações união de literais → ENUM e o drift agrupado por tipo"""
     print("=" * 80)
-    print("🔍 AUDITORIA: Tipos Literais sem ENUM no Banco")
+    print(f"🔀 DRIFT DE ENUMS ({len(drift)}):")
     print("=" * 80)
     print()
+    for type_name, (enum, how) in resolved.items():
+        if enum is not None:
+            print(f"  {type_name} → {enum} (por {how})")
+    if drift:
+        by_type = {}
+        for drift_type, location, description in drift:
+            by_type.setdefault(drift_type, []).append((location, description))
+        for drift_type, entries in sorted(by_type.items()):
+            print(f"▶ {drift_type} ({len(entries)}):")
+            for location, description in entries:
+                print(f"   {location}: {description}")
+    else:
+        print("✅ Valores dos ENUMs idênticos em migrations, database.types.ts e tipos customizados")
+    print()
 
-    # Tipos sem ENUM
-    no_enum_types = [k for k, v in TYPE_TO_ENUM_MAP.items() if v is None]
+def check_type_usage(cache=None, jobs=1, loaded=None):
+    """Verifica uso de tipos literais sem ENUM no banco; `loaded`: ver load_type_files"""
+    if cache is None:
+        cache = NullCache()
+    profiler = current()
 
-    print(f"❌ TIPOS SEM ENUM NO BANCO ({len(no_enum_types)}):")
+    print("=" * 80)
+    print("🔍 AUDITORIA: Tipos Literais sem ENUM no Banco")
+    print("=" * 80)
     print()
-    for type_name in no_enum_types:
-        print(f"  - {type_name}")
+
+    # Catálogo de ENUMs (migrations) e Enums do database.types.ts
+    with profiler.phase('enum catalog'):
+        catalog = EnumCatalog.from_directory(MIGRATIONS_DIR, cache, jobs)
+    with profiler.phase('load database.types'):
+        generated = load_database_types(DATABASE_TYPES_FILE) if DATABASE_TYPES_FILE.exists() else None
+    print(f"📚 CATÁLOGO: {len(catalog.enums)} ENUMs em {len(set(catalog.origin.values()))} migrations")
     print()
 
-    # Buscar onde esses tipos são usados em interfaces
-    types_dir = Path('/workspaces/versix-norma/packages/shared/src/types')
+    # Uma leitura por arquivo (modelo cacheável, compartilhado com as outras auditorias de tipos)
+    types_dir = PROJECT_DIR / 'packages' / 'shared' / 'src' / 'types'
+    ts_files = sorted(types_dir.glob('*.ts'))
+    type_files = load_type_files(ts_files, cache, jobs, loaded)
+    scans = [scan_type_file(type_file) for type_file in type_files]
+    aliases = [alias for scan in scans for alias in scan['aliases']]
 
-    issues = []
+    with profiler.phase('compare'):
+        resolved = resolve_literal_types(aliases, catalog)
+        drift = enum_drift(catalog, generated, aliases, resolved)
+    profiler.count('issues', len(drift))
 
-    for ts_file in types_dir.glob('*.ts'):
-        content = ts_file.read_text()
+    with profiler.phase('report'):
+        print_enum_drift(resolved, drift)
 
-        # Procurar campos que usam esses tipos
-        for type_name in no_enum_types:
-            # Padrão: campo: TipoSemEnum
-            pattern = rf'(\w+)\s*:\s*{type_name}\b'
-            matches = re.finditer(pattern, content)
+    # Uniões de literais sem ENUM correspondente no catálogo
+    targets = {name: how for name, (enum, how) in resolved.items() if enum is None}
 
-            for match in matches:
-                field_name = match.group(1)
-                line_num = content[:match.start()].count('\n') + 1
+    print(f"❌ TIPOS SEM ENUM NO BANCO ({len(targets)}):")
+    print()
+    for type_name in targets:
+        print(f"  - {type_name}")
+    print()
 
-                issues.append({
-                    'file': ts_file.name,
-                    'line': line_num,
-                    'field': field_name,
-                    'type': type_name
-                })
+    issues = []
+
+    for ts_file, scan in zip(ts_files, scans):
+        for line_num, field_name, type_name in scan['usages']:
+            if type_name not in targets:
+                continue
+            issues.append({
+                'file': ts_file.name,
+                'line': line_num,
+                'field': field_name,
+                'type': type_name
+            })
 
     if issues:
         print("=" * 80)
@@ -127,19 +228,16 @@ def check_type_usage():
     print("=" * 80)
     print()
 
-    financial_file = types_dir / 'financial.ts'
-    if financial_file.exists():
-        content = financial_file.read_text()
-
+    financial = next((tf for ts_file, tf in zip(ts_files, type_files) if ts_file.name == 'financial.ts'), None)
+    if financial is not None:
         # Buscar uso de tipo_conta com tipo literal
-        pattern = r"tipo_conta\??\s*:\s*['\"](\w+)['\"]\s*\|"
-        matches = list(re.finditer(pattern, content))
+        matches = [field for field in financial.fields
+                   if field.name == 'tipo_conta' and _RESTRICTED_LITERAL_RE.match(field.type)]
 
         if matches:
             print("❌ ENCONTRADO: tipo_conta com tipo literal restrito")
-            for match in matches:
-                line_num = content[:match.start()].count('\n') + 1
-                print(f"   Linha {line_num}: tipo_conta com tipo literal")
+            for field in matches:
+                print(f"   Linha {field.line}: tipo_conta com tipo literal")
             print()
             print("   RECOMENDAÇÃO: Alterar para 'string' (não há ENUM no banco)")
         else:
@@ -149,21 +247,37 @@ def check_type_usage():
     print("=" * 80)
     print("📊 RESUMO")
     print("=" * 80)
-    print(f"Tipos sem ENUM: {len(no_enum_types)}")
+    print(f"ENUMs no catálogo: {len(catalog.enums)}")
+    print(f"Divergências de ENUM: {len(drift)}")
+    print(f"Tipos sem ENUM: {len(targets)}")
     print(f"Campos afetados: {len(issues)}")
     print()
 
+    if drift:
+        print("⚠️  ENUMS DIVERGENTES:")
+        print("   Regenerar database.types.ts ou alinhar as uniões de literais com as migrations.")
     if issues:
         print("⚠️  AÇÃO NECESSÁRIA:")
         print("   Esses tipos precisam ser verificados no banco de dados.")
         print("   Se não existir ENUM, considerar:")
         print("   1. Criar ENUM no banco (requer migration)")
         print("   2. Alterar TypeScript para string (mais seguro)")
-    else:
+    if not drift and not issues:
         print("✅ Nenhum problema encontrado")
 
-    return len(issues)
+    return len(issues) + len(drift)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Auditoria de tipos literais TypeScript vs ENUMs do PostgreSQL")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args(argv)
 
 if __name__ == '__main__':
-    num_issues = check_type_usage()
+    args = parse_args()
+    with profiling(args, 'audit-literal-types'):
+        num_issues = check_type_usage(open_cache(enabled=not args.no_cache), args.jobs)
     exit(0 if num_issues == 0 else 1)
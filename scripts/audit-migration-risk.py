@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Auditoria: Risco de lock e reescrita das migrations
+Classifica cada comando de supabase/migrations/ pelo lock adquirido e por
+reescrever/varrer a tabela, e emite um relatório por migration. Com --base, só
+as migrations novas em relação à referência git entram no gate (uso em CI)
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from schema_audit.cache import NullCache, open_cache
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.migration_risk import LOW, RISK_LEVELS, analyze_migrations, risk_level
+
+PROJECT_ROOT = Path(__file__).parent.parent
+MIGRATIONS_SUBDIR = "supabase/migrations"
+MIGRATIONS_DIR = PROJECT_ROOT / MIGRATIONS_SUBDIR
+
+RISK_ICONS = ('🟢', '🟡', '🔴')
+
+
+def changed_migrations(base: str):
+    """Migrations adicionadas ou alteradas desde `base` (git diff base...HEAD)"""
+    output = subprocess.run(
+        ['git', 'diff', '--name-only', '--diff-filter=AM', f"{base}...HEAD", '--', MIGRATIONS_SUBDIR],
+        cwd=PROJECT_ROOT, stdout=subprocess.PIPE, check=True, text=True).stdout
+    return {Path(line).name for line in output.splitlines() if line.endswith('.sql')}
+
+
+def audit_migration_risk(fail_on='high', base=None, show_all=False, cache=None, jobs=1):
+    """Relatório de risco por migration; retorna quantos comandos atingem o nível de falha"""
+    if cache is None:
+        cache = NullCache()
+    profiler = current()
+
+    print("=" * 80)
+    print("🔍 AUDITORIA: Risco de Lock e Reescrita das Migrations")
+    print("=" * 80)
+    print()
+
+    with profiler.phase('analyze migrations'):
+        report = analyze_migrations(MIGRATIONS_DIR, cache, jobs)
+    with profiler.phase('changed migrations'):
+        gated = changed_migrations(base) if base else {m.migration for m in report}
+    threshold = risk_level(fail_on) if fail_on != 'never' else len(RISK_LEVELS)
+
+    if base:
+        print(f"📌 Gate: {len(gated)} migration(s) alteradas desde {base}")
+        print()
+
+    failures = 0
+    for migration in report:
+        if base and migration.migration not in gated:
+            continue
+        shown = [s for s in migration.statements if show_all or s.risk > LOW]
+        print(f"{RISK_ICONS[migration.risk]} {migration.migration}: {migration.level} "
+              f"({len(migration.statements)} comandos)")
+        for statement in shown:
+            rewrite = ", reescreve/varre a tabela" if statement.rewrite else ""
+            table = f"{statement.table}: " if statement.table else ""
+            print(f"   Linha {statement.line:4d} [{statement.level}] {table}{statement.action} "
+                  f"— lock {statement.lock}{rewrite}")
+            if statement.advice:
+                print(f"      ↳ {statement.advice}")
+        if migration.risk > LOW and not migration.lock_timeout:
+            print("      ↳ Definir SET lock_timeout no início para não enfileirar o tráfego atrás do lock")
+        failures += sum(1 for s in migration.statements if s.risk >= threshold)
+        if shown:
+            print()
+
+    considered = [m for m in report if m.migration in gated]
+    print()
+    print("=" * 80)
+    print("📊 RESUMO")
+    print("=" * 80)
+    for level, name in enumerate(RISK_LEVELS):
+        count = sum(1 for m in considered for s in m.statements if s.risk == level)
+        print(f"{RISK_ICONS[level]} {name}: {count} comandos")
+    print(f"Migrations avaliadas: {len(considered)}")
+    print()
+
+    if failures:
+        print(f"❌ {failures} comando(s) com risco {fail_on.upper()} ou maior")
+        print("   Reescrever a migration seguindo as recomendações acima antes do deploy.")
+    else:
+        print("✅ Nenhum comando acima do limite de risco")
+
+    return failures
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auditoria de risco de lock e reescrita das migrations")
+    parser.add_argument('--fail-on', choices=['low', 'medium', 'high', 'never'], default='high',
+                        help="Nível de risco que faz o script falhar (padrão: high)")
+    parser.add_argument('--base', metavar='REF',
+                        help="Avalia só as migrations alteradas desde REF (ex.: origin/main)")
+    parser.add_argument('--all', action='store_true', dest='show_all',
+                        help="Lista também os comandos de risco LOW")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with profiling(args, 'audit-migration-risk'):
+        num_failures = audit_migration_risk(args.fail_on, args.base, args.show_all,
+                                            open_cache(enabled=not args.no_cache), args.jobs)
+    sys.exit(0 if num_failures == 0 else 1)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Auditoria: Largura de linha e alinhamento das tabelas
+Estima, a partir do schema das migrations, o tamanho de cada tupla em disco, o
+padding de alinhamento entre colunas, a ordem de colunas que o minimiza e as
+colunas que provavelmente vão para a TOAST (JSONB, TEXT, vector)
+"""
+
+import argparse
+from pathlib import Path
+
+from schema_audit.cache import NullCache, open_cache
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.replay import MigrationReplay
+from schema_audit.storage import analyze_storage
+
+# Raiz do projeto e migrations auditadas
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = PROJECT_DIR / 'supabase' / 'migrations'
+
+DEFAULT_ROWS = 1_000_000
+
+
+def _megabytes(num_bytes: float) -> str:
+    return f"{num_bytes / (1024 * 1024):,.1f} MB"
+
+
+def audit_storage(rows=DEFAULT_ROWS, cache=None, jobs=1):
+    """Lista tabelas com padding evitável e colunas candidatas a TOAST"""
+    if cache is None:
+        cache = NullCache()
+    profiler = current()
+
+    print("=" * 80)
+    print("🔍 AUDITORIA: Largura de Linha e Alinhamento de Colunas")
+    print("=" * 80)
+    print()
+
+    with profiler.phase('replay migrations'):
+        tables = MigrationReplay.from_directory(MIGRATIONS_DIR, cache, jobs).final.tables
+    with profiler.phase('analyze storage'):
+        layouts = analyze_storage(tables)
+    improvable = [layout for layout in layouts if layout.saved > 0]
+
+    print(f"📚 SCHEMA: {len(layouts)} tabelas, estimativa com todas as colunas preenchidas")
+    print()
+
+    if improvable:
+        print("=" * 80)
+        print(f"📐 TABELAS COM PADDING EVITÁVEL ({len(improvable)}):")
+        print("=" * 80)
+        print()
+        for layout in improvable:
+            print(f"📋 {layout.table}: {layout.row_bytes} → {layout.optimal_row_bytes} bytes por linha "
+                  f"(-{layout.saved}, {layout.padding} de padding; "
+                  f"{_megabytes(layout.saved * rows)} a cada {rows:,} linhas)")
+            print(f"   Ordem sugerida: {', '.join(layout.optimal_columns)}")
+            print()
+
+    toast = [layout for layout in layouts if layout.toast]
+    if toast:
+        print("=" * 80)
+        print(f"📦 COLUNAS CANDIDATAS A TOAST ({sum(len(l.toast) for l in toast)} em {len(toast)} tabelas):")
+        print("=" * 80)
+        print()
+        for layout in sorted(toast, key=lambda l: l.table):
+            print(f"📋 {layout.table}")
+            for column, reason in layout.toast:
+                print(f"   {column:30s} {reason}")
+        print()
+
+    print("=" * 80)
+    print("📊 RESUMO")
+    print("=" * 80)
+    print(f"Tabelas analisadas: {len(layouts)}")
+    print(f"Tabelas com padding evitável: {len(improvable)}")
+    print(f"Economia por linha (soma): {sum(l.saved for l in improvable)} bytes")
+    print(f"Colunas candidatas a TOAST: {sum(len(l.toast) for l in toast)}")
+    print()
+
+    if improvable:
+        print("💡 RECOMENDAÇÃO:")
+        print("   Reordenar colunas exige recriar a tabela; aplicar a ordem sugerida nas tabelas")
+        print("   novas e nas que forem reescritas por outro motivo.")
+
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auditoria de largura de linha e alinhamento de colunas")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help=f"Linhas por tabela para estimar a economia total (padrão: {DEFAULT_ROWS:,})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with profiling(args, 'audit-storage'):
+        audit_storage(args.rows, open_cache(enabled=not args.no_cache), args.jobs)
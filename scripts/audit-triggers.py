@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Auditoria: Fan-out de triggers por tabela
+Monta o grafo de triggers das migrations (BEFORE/AFTER, ROW/STATEMENT, função
+chamada e tabelas que ela escreve, mais cascatas de FK) e mostra, para INSERT,
+UPDATE e DELETE de uma linha em cada tabela, quantos triggers disparam e quantas
+escritas aninhadas acontecem, destacando os pontos de amplificação de escrita
+"""
+
+import argparse
+from pathlib import Path
+
+from schema_audit.cache import NullCache, open_cache
+from schema_audit.indexes import IndexModel
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.triggers import TriggerGraph
+
+# Raiz do projeto e migrations auditadas
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = PROJECT_DIR / 'supabase' / 'migrations'
+
+# Triggers + escritas aninhadas a partir das quais uma escrita é considerada hotspot
+DEFAULT_THRESHOLD = 5
+MAX_TREE_LINES = 25
+
+
+def audit_triggers(threshold=DEFAULT_THRESHOLD, cache=None, jobs=1):
+    """Lista o fan-out de escrita por tabela; retorna o número de hotspots"""
+    if cache is None:
+        cache = NullCache()
+    profiler = current()
+
+    print("=" * 80)
+    print("🔍 AUDITORIA: Fan-out de Triggers e Amplificação de Escrita")
+    print("=" * 80)
+    print()
+
+    with profiler.phase('index model'):
+        index_model = IndexModel.from_directory(MIGRATIONS_DIR, cache, jobs)
+    with profiler.phase('trigger graph'):
+        graph = TriggerGraph.from_directory(MIGRATIONS_DIR, cache, jobs, index_model)
+
+    triggers = [t for table_triggers in graph.triggers.values() for t in table_triggers.values()]
+    print(f"📚 GRAFO: {len(triggers)} triggers em {sum(1 for t in graph.triggers.values() if t)} tabelas, "
+          f"{len(graph.functions)} funções, "
+          f"{sum(len(c) for c in graph.cascades.values())} FKs com ON DELETE CASCADE/SET NULL")
+    print(f"   BEFORE: {sum(1 for t in triggers if t.timing == 'before')}  "
+          f"AFTER: {sum(1 for t in triggers if t.timing == 'after')}  "
+          f"ROW: {sum(1 for t in triggers if t.level == 'row')}  "
+          f"STATEMENT: {sum(1 for t in triggers if t.level == 'statement')}")
+    print()
+
+    missing = sorted({t.function for t in triggers if t.function not in graph.functions})
+    if missing:
+        print(f"⚠️  Funções de trigger não encontradas nas migrations: {', '.join(missing)}")
+        print()
+
+    report = graph.report(sorted(graph.triggers.keys() | graph.cascades.keys()))
+    hotspots = [r for r in report if r.triggers + r.nested_writes >= threshold or r.cycles]
+
+    print("=" * 80)
+    print(f"📈 FAN-OUT POR ESCRITA DE UMA LINHA ({len(report)} combinações tabela/evento):")
+    print("=" * 80)
+    print()
+    print(f"   {'tabela':38s} {'evento':7s} {'triggers':>8s} {'escritas':>8s} {'prof.':>5s} {'tabelas':>7s}")
+    for fan_out in report:
+        marker = '🔥' if fan_out in hotspots else '  '
+        print(f"{marker} {fan_out.table:38s} {fan_out.event.upper():7s} {fan_out.triggers:8d} "
+              f"{fan_out.nested_writes:8d} {fan_out.depth:5d} {len(fan_out.tables):7d}")
+    print()
+
+    if hotspots:
+        print("=" * 80)
+        print(f"🔥 HOTSPOTS (triggers + escritas >= {threshold}): {len(hotspots)}")
+        print("=" * 80)
+        print()
+        for fan_out in hotspots:
+            print(f"📋 {fan_out.event.upper()} em {fan_out.table}")
+            for trigger in graph.firing(fan_out.table, fan_out.event):
+                when = ' WHEN (...)' if trigger.conditional else ''
+                print(f"   {trigger.timing.upper()} {trigger.level.upper()} {trigger.name} → "
+                      f"{trigger.function}(){when}")
+            for step in fan_out.steps[:MAX_TREE_LINES]:
+                print(f"   {'  ' * step.depth}↳ {step.event.upper()} {step.table}  [{step.via}]")
+            if len(fan_out.steps) > MAX_TREE_LINES:
+                print(f"   ... (+{len(fan_out.steps) - MAX_TREE_LINES} escritas)")
+            for cycle in fan_out.cycles:
+                print(f"   🔁 Ciclo: {cycle}")
+            if fan_out.dynamic:
+                print(f"   ⚠️  SQL dinâmico não resolvido em: {', '.join(fan_out.dynamic)}")
+            print()
+
+    print("=" * 80)
+    print("📊 RESUMO")
+    print("=" * 80)
+    print(f"Triggers: {len(triggers)}")
+    print(f"Escritas com fan-out: {len(report)}")
+    print(f"Hotspots: {len(hotspots)}")
+    print(f"Ciclos: {sum(len(r.cycles) for r in report)}")
+    print()
+
+    if hotspots:
+        print("⚠️  AMPLIFICAÇÃO DE ESCRITA:")
+        print("   Cada escrita nessas tabelas dispara vários triggers e escritas aninhadas na")
+        print("   mesma transação. Considerar triggers FOR EACH STATEMENT, condições WHEN ou")
+        print("   mover auditoria/notificação para processamento assíncrono.")
+    else:
+        print("✅ Nenhuma tabela acima do limite de fan-out")
+
+    return len(hotspots)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auditoria de fan-out de triggers e amplificação de escrita")
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f"Triggers + escritas aninhadas para marcar um hotspot (padrão: {DEFAULT_THRESHOLD})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with profiling(args, 'audit-triggers'):
+        num_hotspots = audit_triggers(args.threshold, open_cache(enabled=not args.no_cache), args.jobs)
+    exit(0 if num_hotspots == 0 else 1)
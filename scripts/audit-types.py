@@ -4,11 +4,28 @@ Auditoria de Tipos TypeScript vs Schema do Banco de Dados
 Compara tipos definidos em packages/shared/src/types/ com tabelas em supabase/migrations/
 """
 
-import re
+import argparse
 import os
+import re
+import subprocess
+import sys
+import time
 from pathlib import Path
-from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from schema_audit.cache import open_cache
+from schema_audit.database_types import map_pg_to_ts_type
+from schema_audit.incremental import (AuditGraph, build_commit_graph, build_graph, git_toplevel, head_commit,
+                                      read_staged, staged_changes, update_graph)
+from schema_audit.matcher import match_tables
+from schema_audit.model import Property, Tables, column_line
+from schema_audit.parallel import parse_files
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.replay import PARSER_VERSION as MIGRATION_PARSER_VERSION
+from schema_audit.replay import MigrationReplay, diff_snapshots, migration_index, parse_migration
+from schema_audit.reporting import (Finding, JsonLinesSink, MarkdownSink, ReportStream, SarifSink, SummarySink,
+                                    open_output)
+from schema_audit.ts_declarations import TypeFile, load_type_files, parse_type_file
 
 # Cores para output
 RED = '\033[91m'
@@ -17,114 +34,75 @@ YELLOW = '\033[93m'
 BLUE = '\033[94m'
 RESET = '\033[0m'
 
-def extract_tables_from_sql(migrations_dir: Path) -> Dict[str, Dict[str, str]]:
-    """Extrai schemas de tabelas das migrations SQL"""
-    tables = {}
-
-    for sql_file in sorted(migrations_dir.glob("*.sql")):
-        content = sql_file.read_text()
-
-        # Regex para encontrar CREATE TABLE
-        table_pattern = r'CREATE TABLE\s+(?:public\.)?(\w+)\s*\((.*?)\);'
-        matches = re.finditer(table_pattern, content, re.DOTALL | re.IGNORECASE)
-
-        for match in matches:
-            table_name = match.group(1)
-            table_def = match.group(2)
-
-            # Extrair colunas
-            columns = {}
-            for line in table_def.split('\n'):
-                line = line.strip()
-                if not line or line.startswith('--') or 'CONSTRAINT' in line.upper():
-                    continue
-
-                # Parse column definition
-                col_match = re.match(r'(\w+)\s+([A-Z][A-Z0-9_().,\[\]]+)', line, re.IGNORECASE)
-                if col_match:
-                    col_name = col_match.group(1)
-                    col_type = col_match.group(2).strip().rstrip(',')
-
-                    # Normalizar tipo
-                    col_type = col_type.split()[0]  # Pegar apenas o tipo base
-
-                    # Verificar se é nullable
-                    is_nullable = 'NOT NULL' not in line.upper()
-
-                    columns[col_name] = {
-                        'type': col_type,
-                        'nullable': is_nullable,
-                        'full_def': line
-                    }
-
-            if columns:
-                tables[table_name] = columns
-
-    return tables
-
-def extract_typescript_interfaces(types_dir: Path) -> Dict[str, Dict[str, str]]:
-    """Extrai interfaces TypeScript"""
+# Incrementar quando parse_typescript_interfaces mudar (invalida o cache de parse)
+TS_PARSER_VERSION = 3
+
+# Incrementar quando compare_table mudar (invalida o grafo da auditoria incremental)
+COMPARE_VERSION = 2
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+MIGRATIONS_SUBDIR = "supabase/migrations"
+TYPES_SUBDIR = "packages/shared/src/types"
+REPORT_FILE = "RELATORIO_AUDITORIA_TIPOS.md"
+
+# Tipos de inconsistência (regras do SARIF)
+ISSUE_RULES = {
+    'AMBIGUOUS_MATCH': "Tabela corresponde a várias interfaces",
+    'ENUM_DRIFT': "Valores do ENUM diferem entre migrations e banco (--dump)",
+    'MISSING_IN_DATABASE': "Tabela, coluna ou ENUM das migrations não existe no banco (--dump)",
+    'MISSING_IN_DB': "Campo existe em TypeScript mas não na tabela",
+    'MISSING_IN_MIGRATIONS': "Tabela, coluna ou ENUM do banco não vem de nenhuma migration (--dump)",
+    'MISSING_IN_TS': "Campo existe no banco mas não na interface",
+    'NULLABLE_DRIFT': "Nulabilidade da coluna difere entre migrations e banco (--dump)",
+    'NULLABLE_MISMATCH': "Campo nullable no banco e obrigatório em TypeScript",
+    'TYPE_DRIFT': "Tipo da coluna difere entre migrations e banco (--dump)",
+    'TYPE_MISMATCH': "Tipo da coluna incompatível com o tipo TypeScript",
+}
+
+def extract_tables_from_sql(migrations_dir: Path, as_of=None, cache=None, jobs=1) -> Tables:
+    """Extrai schemas de tabelas replicando as migrations SQL em ordem (CREATE/ALTER/DROP)"""
+    replay = MigrationReplay.from_directory(migrations_dir, cache, jobs)
+    snapshot = replay.final if as_of is None else replay.snapshot(as_of)
+
+    return {name: columns for name, columns in snapshot.tables.items() if columns}
+
+def typescript_interfaces(type_file: TypeFile) -> Dict[str, Dict[str, Property]]:
+    """Interfaces e aliases objeto exportados de um arquivo, com as propriedades do primeiro nível
+
+    Interfaces com `extends` ou parâmetros de tipo ficam de fora: os campos herdados
+    vêm do database.types (validate-type-sync verifica essas extensões).
+    """
     interfaces = {}
-
-    for ts_file in types_dir.glob("*.ts"):
-        if ts_file.name == 'index.ts':
+    for decl in type_file.declarations:
+        if not decl.exported or decl.generic or decl.extends or not decl.members:
             continue
+        interfaces[decl.name] = {m.name: Property(m.type, m.optional) for m in decl.members}
+    return interfaces
 
-        content = ts_file.read_text()
-
-        # Regex para encontrar interfaces
-        interface_pattern = r'export\s+(?:interface|type)\s+(\w+)\s*(?:=\s*)?{([^}]+)}'
-        matches = re.finditer(interface_pattern, content, re.DOTALL)
-
-        for match in matches:
-            interface_name = match.group(1)
-            interface_body = match.group(2)
+def parse_typescript_interfaces(content: str) -> Dict[str, Dict[str, Property]]:
+    """Extrai interfaces TypeScript do conteúdo de um arquivo"""
+    return typescript_interfaces(parse_type_file(content))
 
-            # Extrair propriedades
-            properties = {}
-            for line in interface_body.split('\n'):
-                line = line.strip()
-                if not line or line.startswith('//'):
-                    continue
+def list_typescript_files(types_dir: Path) -> List[Path]:
+    return sorted(f for f in types_dir.glob("*.ts") if f.name != 'index.ts')
 
-                # Parse property
-                prop_match = re.match(r'(\w+)(\?)?:\s*([^;]+)', line)
-                if prop_match:
-                    prop_name = prop_match.group(1)
-                    is_optional = prop_match.group(2) == '?'
-                    prop_type = prop_match.group(3).strip().rstrip(';')
+def extract_typescript_sources(types_dir: Path, cache=None, jobs=1,
+                               loaded=None) -> Tuple[Dict[str, Dict[str, Property]], Dict[str, Path]]:
+    """Extrai interfaces TypeScript e o arquivo de cada interface (`loaded`: ver load_type_files)"""
+    interfaces, sources = {}, {}
 
-                    properties[prop_name] = {
-                        'type': prop_type,
-                        'optional': is_optional
-                    }
+    ts_files = list_typescript_files(types_dir)
 
-            if properties:
-                interfaces[interface_name] = properties
+    for ts_file, type_file in zip(ts_files, load_type_files(ts_files, cache, jobs, loaded)):
+        file_interfaces = typescript_interfaces(type_file)
+        interfaces.update(file_interfaces)
+        sources.update(dict.fromkeys(file_interfaces, ts_file))
 
-    return interfaces
+    return interfaces, sources
 
-def map_pg_to_ts_type(pg_type: str) -> str:
-    """Mapeia tipos PostgreSQL para TypeScript"""
-    type_map = {
-        'UUID': 'string',
-        'VARCHAR': 'string',
-        'TEXT': 'string',
-        'BOOLEAN': 'boolean',
-        'INTEGER': 'number',
-        'BIGINT': 'number',
-        'DECIMAL': 'number',
-        'NUMERIC': 'number',
-        'TIMESTAMPTZ': 'string',
-        'TIMESTAMP': 'string',
-        'DATE': 'string',
-        'TIME': 'string',
-        'JSONB': 'any',
-        'JSON': 'any',
-    }
-
-    pg_type_upper = pg_type.upper().split('(')[0]
-    return type_map.get(pg_type_upper, 'unknown')
+def extract_typescript_interfaces(types_dir: Path, cache=None, jobs=1) -> Dict[str, Dict[str, Property]]:
+    """Extrai interfaces TypeScript"""
+    return extract_typescript_sources(types_dir, cache, jobs)[0]
 
 def normalize_ts_type(ts_type: str) -> str:
     """Normaliza tipo TypeScript para comparação"""
@@ -139,90 +117,392 @@ def normalize_ts_type(ts_type: str) -> str:
 
     return ts_type
 
-def compare_schemas(tables: Dict, interfaces: Dict) -> List[Tuple[str, str, str]]:
-    """Compara schemas e retorna lista de discrepâncias"""
+def compare_table(table_name: str, match, table_cols: Dict, interfaces: Dict) -> List[Tuple[str, str, str]]:
+    """Compara uma tabela com a interface resolvida pelo índice de nomes"""
     issues = []
 
-    # Mapear nomes de tabelas para interfaces (tentar plural/singular)
-    table_to_interface = {}
-
-    for table_name in tables.keys():
-        # Tentar encontrar interface correspondente
-        possible_names = [
-            table_name,  # usuarios
-            table_name.rstrip('s'),  # usuario
-            table_name.title().replace('_', ''),  # Usuarios
-            ''.join(word.title() for word in table_name.split('_')),  # UsuariosCanaisPreferencias
-        ]
-
-        for possible_name in possible_names:
-            for interface_name in interfaces.keys():
-                if possible_name.lower() in interface_name.lower() or \
-                   interface_name.lower() in possible_name.lower():
-                    table_to_interface[table_name] = interface_name
-                    break
-            if table_name in table_to_interface:
-                break
-
-    # Comparar cada par tabela-interface
-    for table_name, interface_name in table_to_interface.items():
-        table_cols = tables[table_name]
-        interface_props = interfaces[interface_name]
-
-        # Verificar campos na tabela que não estão na interface
-        for col_name, col_info in table_cols.items():
-            if col_name not in interface_props:
-                issues.append((
-                    'MISSING_IN_TS',
-                    f"{table_name}.{col_name}",
-                    f"Campo existe no banco mas não em {interface_name}"
-                ))
-
-        # Verificar campos na interface que não estão na tabela
-        for prop_name, prop_info in interface_props.items():
-            if prop_name not in table_cols and not prop_name.endswith('?'):
-                # Ignorar campos computed
-                if prop_name in ['children', 'total_orcado', 'total_realizado']:
-                    continue
-
-                issues.append((
-                    'MISSING_IN_DB',
-                    f"{interface_name}.{prop_name}",
-                    f"Campo existe em TypeScript mas não na tabela {table_name}"
-                ))
-
-        # Verificar tipos incompatíveis
-        for col_name in set(table_cols.keys()) & set(interface_props.keys()):
-            col_info = table_cols[col_name]
-            prop_info = interface_props[col_name]
-
-            expected_ts_type = map_pg_to_ts_type(col_info['type'])
-            actual_ts_type = normalize_ts_type(prop_info['type'])
-
-            # Verificar nullable
-            is_nullable = col_info['nullable']
-            has_null = '| null' in prop_info['type'] or prop_info['optional']
-
-            if expected_ts_type not in actual_ts_type and 'any' not in actual_ts_type:
-                issues.append((
-                    'TYPE_MISMATCH',
-                    f"{table_name}.{col_name}",
-                    f"Tipo no banco: {col_info['type']} → esperado TS: {expected_ts_type}, atual: {actual_ts_type}"
-                ))
-
-            if is_nullable and not has_null:
-                issues.append((
-                    'NULLABLE_MISMATCH',
-                    f"{table_name}.{col_name}",
-                    f"Campo é nullable no banco mas não em TypeScript"
-                ))
+    # Prefixos só valem quando há um único candidato
+    if match.via == 'ambiguous':
+        return [(
+            'AMBIGUOUS_MATCH',
+            table_name,
+            f"Tabela corresponde a várias interfaces ({', '.join(match.candidates)}); nenhuma foi comparada"
+        )]
+    if match.interface is None:
+        return issues
+
+    interface_name = match.interface
+    interface_props = interfaces[interface_name]
+
+    # Verificar campos na tabela que não estão na interface
+    for col_name, col_info in table_cols.items():
+        if col_name not in interface_props:
+            issues.append((
+                'MISSING_IN_TS',
+                f"{table_name}.{col_name}",
+                f"Campo existe no banco mas não em {interface_name}"
+            ))
+
+    # Verificar campos na interface que não estão na tabela
+    for prop_name, prop_info in interface_props.items():
+        if prop_name not in table_cols and not prop_name.endswith('?'):
+            # Ignorar campos computed
+            if prop_name in ['children', 'total_orcado', 'total_realizado']:
+                continue
+
+            issues.append((
+                'MISSING_IN_DB',
+                f"{interface_name}.{prop_name}",
+                f"Campo existe em TypeScript mas não na tabela {table_name}"
+            ))
+
+    # Verificar tipos incompatíveis
+    # Ordem das colunas na tabela (e não de um set), para um relatório determinístico
+    for col_name in (c for c in table_cols if c in interface_props):
+        col_info = table_cols[col_name]
+        prop_info = interface_props[col_name]
+
+        expected_ts_type = map_pg_to_ts_type(col_info.type)
+        actual_ts_type = normalize_ts_type(prop_info.type)
+
+        # Verificar nullable
+        is_nullable = col_info.nullable
+        has_null = '| null' in prop_info.type or prop_info.optional
+
+        if expected_ts_type not in actual_ts_type and 'any' not in actual_ts_type:
+            issues.append((
+                'TYPE_MISMATCH',
+                f"{table_name}.{col_name}",
+                f"Tipo no banco: {col_info.type} → esperado TS: {expected_ts_type}, atual: {actual_ts_type}"
+            ))
+
+        if is_nullable and not has_null:
+            issues.append((
+                'NULLABLE_MISMATCH',
+                f"{table_name}.{col_name}",
+                f"Campo é nullable no banco mas não em TypeScript"
+            ))
 
     return issues
 
-def main():
-    root_dir = Path("/workspaces/versix-norma")
+def iter_issues(tables: Dict, interfaces: Dict) -> Iterator[Tuple[str, str, str]]:
+    """Gera as discrepâncias tabela a tabela, à medida que são encontradas"""
+    # Mapear nomes de tabelas para interfaces pelo índice de nomes normalizados (snake/camel/plural)
+    for table_name, match in match_tables(sorted(tables.keys()), interfaces.keys()).items():
+        yield from compare_table(table_name, match, tables[table_name], interfaces)
+
+def compare_schemas(tables: Dict, interfaces: Dict) -> List[Tuple[str, str, str]]:
+    """Compara schemas e retorna lista de discrepâncias"""
+    return list(iter_issues(tables, interfaces))
+
+def locate_issue(issue: Tuple[str, str, str], tables: Dict, interface_sources: Dict[str, Path],
+                 root_dir: Path) -> Finding:
+    """Inconsistência com o arquivo/linha para anotação: coluna na migration ou arquivo da interface"""
+    issue_type, location, description = issue
+    owner, _, member = location.partition('.')
+    path, line = '', 0
+    if issue_type == 'MISSING_IN_DB':
+        source = interface_sources.get(owner)
+        if source is not None:
+            path = os.path.relpath(source, root_dir)
+    else:
+        # Sem coluna (AMBIGUOUS_MATCH): primeira coluna da tabela, onde ela foi criada
+        columns = tables.get(owner, {})
+        column = columns.get(member) if member else next(iter(columns.values()), None)
+        if column is not None and column.source:
+            path, line = os.path.relpath(column.source, root_dir), column_line(column)
+    return Finding(issue_type, location, description, path.replace(os.sep, '/'), line)
+
+def markdown_sink(report_path: Path, tables: Dict, interfaces: Dict, dump_path: Optional[Path] = None) -> MarkdownSink:
+    """Relatório markdown da auditoria completa"""
+    summary = [f"Tabelas analisadas: {len(tables)}", f"Interfaces TypeScript: {len(interfaces)}"]
+    if dump_path is not None:
+        summary.append(f"Schema do banco: dump `{dump_path}` (comparado também com as migrations)")
+    return MarkdownSink(report_path, "Relatório de Auditoria: Tipos TypeScript vs Schema do Banco", summary)
+
+def write_report(report_path: Path, tables: Dict, interfaces: Dict, issues: List[Tuple[str, str, str]]) -> None:
+    """Grava o relatório markdown a partir de uma lista de discrepâncias já calculada"""
+    with ReportStream([markdown_sink(report_path, tables, interfaces)]) as stream:
+        for issue in issues:
+            stream.emit(Finding(*issue))
+
+def print_migration_diff(migrations_dir: Path, old_ref: str, new_ref: str, cache=None, jobs=1) -> None:
+    """Exibe o diff de schema entre duas migrations"""
+    replay = MigrationReplay.from_directory(migrations_dir, cache, jobs)
+    old, new = replay.snapshot(old_ref), replay.snapshot(new_ref)
+
+    print(f"{BLUE}🔀 Diff de schema: {old.migration or '(vazio)'} → {new.migration}{RESET}")
+    changes = diff_snapshots(old, new)
+    if not changes:
+        print(f"{GREEN}✅ Nenhuma diferença{RESET}")
+    for change_type, location, description in changes:
+        print(f"  {change_type:15s} {location}  {description}")
+
+def write_migrations_dump(migrations_dir: Path, dump_path: Path, cache=None, jobs=1) -> None:
+    """Grava o schema das migrations no formato do pg_dump (dump de teste sem um Postgres local)"""
+    from schema_audit.enums import EnumCatalog
+    from schema_audit.pg_dump import write_dump
+
+    tables = extract_tables_from_sql(migrations_dir, None, cache, jobs)
+    enums = EnumCatalog.from_directory(migrations_dir, cache, jobs)
+    with open(dump_path, 'w', encoding='utf-8') as out:
+        write_dump(out, tables, enums)
+    print(f"{GREEN}📄 Dump gravado em: {dump_path} ({len(tables)} tabelas, {len(enums.enums)} ENUMs){RESET}")
+
+def graph_versions() -> Tuple:
+    return (MIGRATION_PARSER_VERSION, TS_PARSER_VERSION, COMPARE_VERSION)
+
+def is_audited_migration(path: str) -> bool:
+    """Caminho relativo à raiz do repositório é uma migration auditada"""
+    parent, _, name = path.rpartition('/')
+    return parent == MIGRATIONS_SUBDIR and name.endswith('.sql')
+
+def is_audited_file(path: str) -> bool:
+    """Caminho relativo à raiz do repositório entra na auditoria (mesmos filtros da execução completa)"""
+    parent, _, name = path.rpartition('/')
+    if parent == TYPES_SUBDIR:
+        return name.endswith('.ts') and name != 'index.ts'
+    return is_audited_migration(path)
+
+# Parsers por tipo de arquivo, para atualizações incrementais do grafo
+GRAPH_PARSERS = {
+    'migration': ('migration_ops', MIGRATION_PARSER_VERSION, parse_migration),
+    'ts': ('ts_interfaces', TS_PARSER_VERSION, parse_typescript_interfaces),
+}
+
+def build_audit_graph(root_dir: Path, cache=None, jobs=1) -> AuditGraph:
+    """Grafo de dependências da árvore de trabalho, para o modo --watch (reaproveita o cache de parse)"""
+    sql_files = sorted((root_dir / MIGRATIONS_SUBDIR).glob("*.sql"))
+    ts_files = list_typescript_files(root_dir / TYPES_SUBDIR)
+    ops = parse_files(sql_files, 'migration_ops', MIGRATION_PARSER_VERSION, parse_migration, cache, jobs)
+    interfaces = [typescript_interfaces(type_file) for type_file in load_type_files(ts_files, cache, jobs)]
+    return build_graph(root_dir, sql_files, ops, ts_files, interfaces, graph_versions(), compare_table)
+
+def record_audit_graph(root_dir: Path, cache=None, jobs=1) -> AuditGraph:
+    """Grava o grafo de dependências do commit HEAD usado pelo modo --staged
+
+    O grafo vem dos objetos do git: a árvore de trabalho já contém as alterações
+    em staging, e um grafo montado a partir dela aprovaria essas alterações.
+    """
+    graph = build_commit_graph(root_dir, head_commit(root_dir), [MIGRATIONS_SUBDIR, TYPES_SUBDIR],
+                               is_audited_migration, is_audited_file, GRAPH_PARSERS, graph_versions(),
+                               compare_table, cache, jobs)
+    graph.save()
+    return graph
+
+def print_delta(delta) -> None:
+    """Exibe as inconsistências resolvidas (-) e novas (+) de uma atualização incremental"""
+    for issue_type, location, description in delta.removed:
+        print(f"  {GREEN}- {issue_type:18s} {location}{RESET}")
+    for issue_type, location, description in delta.added:
+        print(f"  {RED}+ {issue_type:18s} {location}{RESET}")
+        print(f"    {description}")
+
+def run_staged(cache=None, jobs=1) -> int:
+    """Auditoria incremental dos arquivos na área de staging (pre-commit)
+
+    Retorna 1 se as alterações introduzem inconsistências novas.
+    """
+    root_dir = git_toplevel()
+    graph = AuditGraph.load(graph_versions())
+    if graph is None or graph.base != head_commit(root_dir):
+        print(f"{YELLOW}📊 Grafo da auditoria ausente ou de outro commit: montando o grafo do HEAD...{RESET}")
+        graph = record_audit_graph(root_dir, cache, jobs)
+
+    changes = staged_changes(root_dir, graph, is_audited_file)
+    if not changes:
+        print(f"{GREEN}✅ Nenhuma migration ou tipo alterado{RESET}")
+        return 0
+
+    delta = update_graph(graph, read_staged(root_dir, changes), is_audited_migration,
+                         GRAPH_PARSERS, compare_table, cache)
+
+    print(f"{BLUE}🔍 Auditoria incremental: {len(delta.changed_files)} arquivos, "
+          f"{len(delta.tables)} tabelas recomparadas{RESET}")
+    print_delta(delta)
+
+    # Um commit rejeitado não vira a nova referência: o grafo só é gravado sem inconsistências novas
+    if delta.added:
+        print(f"{RED}❌ {len(delta.added)} inconsistências novas{RESET}")
+        return 1
+    graph.save()
+    print(f"{GREEN}✅ Nenhuma inconsistência nova{RESET}")
+    return 0
+
+def run_watch(root_dir: Path, cache=None, jobs=1, interval: float = 0.1) -> None:
+    """Mantém o grafo em memória e reaudita a cada mudança em migrations/tipos (Ctrl+C encerra)"""
+    from schema_audit.watch import PollingWatcher
+
+    started = time.perf_counter()
+    graph = build_audit_graph(root_dir, cache, jobs)
+    total = sum(len(issues) for issues in graph.issues.values())
+    print(f"{BLUE}👀 Observando {MIGRATIONS_SUBDIR}/ e {TYPES_SUBDIR}/ "
+          f"({len(graph.tables)} tabelas, {total} inconsistências, "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms){RESET}")
+
+    watcher = PollingWatcher(root_dir, [MIGRATIONS_SUBDIR, TYPES_SUBDIR], is_audited_file)
+    try:
+        for changes in watcher.watch(interval):
+            started = time.perf_counter()
+            delta = update_graph(graph, changes, is_audited_migration, GRAPH_PARSERS, compare_table, cache)
+            elapsed = (time.perf_counter() - started) * 1000
+            total = sum(len(issues) for issues in graph.issues.values())
+
+            print(f"{YELLOW}[{time.strftime('%H:%M:%S')}] {', '.join(changes)}: "
+                  f"{len(delta.tables)} tabelas recomparadas em {elapsed:.0f} ms, "
+                  f"{total} inconsistências{RESET}")
+            if not delta.added and not delta.removed:
+                print(f"  {GREEN}sem mudanças nas inconsistências{RESET}")
+            print_delta(delta)
+    except KeyboardInterrupt:
+        print()
+
+def print_issue(sign: str, issue: Tuple[str, str, str], color: str) -> None:
+    issue_type, location, description = issue
+    print(f"  {color}{sign} {issue_type:18s} {location}{RESET}")
+    print(f"    {description}")
+
+def run_revisions(rev_range: str, bad_location=None, cache=None, jobs=1) -> int:
+    """Audita cada commit do intervalo a partir dos objetos do git: linha do tempo ou primeiro commit ruim
+
+    Com `bad_location` (texto contido na localização, '' = todas), retorna 1 se
+    alguma inconsistência selecionada está presente no último commit.
+    """
+    from schema_audit.revisions import audit_revisions, first_bad, load_revisions, timeline
+
+    profiler = current()
+    root_dir = git_toplevel()
+    with profiler.phase('list revisions'):
+        revisions = load_revisions(root_dir, rev_range, is_audited_migration, is_audited_file,
+                                   [MIGRATIONS_SUBDIR, TYPES_SUBDIR])
+    if not revisions:
+        print(f"{YELLOW}Nenhum commit em {rev_range} altera {MIGRATIONS_SUBDIR}/ ou {TYPES_SUBDIR}/{RESET}")
+        return 0
+
+    started = time.perf_counter()
+    audits = audit_revisions(revisions, root_dir, GRAPH_PARSERS, compare_table, cache, jobs)
+    print(f"{BLUE}🕰️  {len(audits)} commits auditados em {rev_range} "
+          f"({time.perf_counter() - started:.1f}s, cache de parse: {cache.hits} reaproveitados, "
+          f"{cache.misses} reprocessados){RESET}")
+    print()
+
+    if bad_location is None:
+        for k, entry in enumerate(timeline(audits)):
+            label = "estado inicial" if k == 0 else f"+{len(entry.added)} -{len(entry.removed)}"
+            print(f"{YELLOW}{entry.commit[:10]} {entry.subject}{RESET}  ({label})")
+            for issue in entry.added:
+                print_issue('+', issue, RED)
+            for issue in entry.removed:
+                print_issue('-', issue, GREEN)
+            print()
+        print(f"Inconsistências no último commit: {len(audits[-1].issues)}")
+        return 0
+
+    culprits = first_bad(audits, lambda issue: bad_location in issue[1])
+    if not culprits:
+        print(f"{GREEN}✅ Nenhuma inconsistência{' em ' + bad_location if bad_location else ''} "
+              f"no último commit do intervalo{RESET}")
+        return 0
+    for audit, issues in culprits:
+        if audit is audits[0]:
+            # O intervalo não alcança a origem delas
+            print(f"{YELLOW}⚠️  {len(issues)} inconsistências já presentes em {audit.commit[:10]} {audit.subject} "
+                  f"(início do intervalo: ampliar para achar a origem){RESET}")
+            print()
+            continue
+        print(f"{RED}🔎 Primeiro commit ruim: {audit.commit} {audit.subject}{RESET}")
+        for issue in issues:
+            print_issue('+', issue, RED)
+        print()
+    return 1
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Auditoria de tipos TypeScript vs schema do banco")
+    parser.add_argument('--as-of', metavar='MIGRATION',
+                        help="Audita o schema como estava após a migration (posição ou versão)")
+    parser.add_argument('--diff', nargs=2, metavar=('DE', 'PARA'),
+                        help="Exibe o diff de schema entre duas migrations e sai")
+    parser.add_argument('--revisions', metavar='INTERVALO',
+                        help="Audita cada commit do intervalo (ex.: origin/main~50..HEAD) a partir dos objetos "
+                             "do git e mostra quando cada inconsistência apareceu")
+    parser.add_argument('--first-bad', nargs='?', const='', metavar='LOCAL',
+                        help="Com --revisions: commit que introduziu cada inconsistência do último commit "
+                             "(só as cuja localização contém LOCAL, se informado)")
+    parser.add_argument('--dump', type=Path, metavar='ARQUIVO',
+                        help="Audita o schema real de um dump `pg_dump --schema-only`: diferenças entre "
+                             "migrations e banco, e tipos TypeScript comparados com o banco")
+    parser.add_argument('--write-dump', type=Path, metavar='ARQUIVO',
+                        help="Grava o schema das migrations no formato do pg_dump e sai (dump de teste)")
+    parser.add_argument('--staged', action='store_true',
+                        help="Audita só os arquivos alterados na área de staging (pre-commit)")
+    parser.add_argument('--watch', action='store_true',
+                        help="Mantém o modelo em memória e reaudita a cada mudança em migrations/tipos")
+    parser.add_argument('--report', type=Path, metavar='ARQUIVO',
+                        help=f"Relatório markdown (padrão: {REPORT_FILE} na raiz do projeto)")
+    parser.add_argument('--jsonl', type=Path, metavar='ARQUIVO',
+                        help="Grava cada inconsistência como uma linha JSON, à medida que é encontrada")
+    parser.add_argument('--sarif', type=Path, metavar='ARQUIVO',
+                        help="Grava as inconsistências em SARIF 2.1.0 (anotações de PR no code scanning)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    args = parser.parse_args(argv)
+
+    refs = [('--as-of', args.as_of)] if args.as_of is not None else []
+    refs += [('--diff', ref) for ref in args.diff or ()]
+    if refs:
+        migrations = [f.name for f in sorted((PROJECT_ROOT / MIGRATIONS_SUBDIR).glob("*.sql"))]
+        for option, ref in refs:
+            try:
+                migration_index(migrations, ref)
+            except KeyError as e:
+                valid = '\n'.join(f"  {k:4d}  {name}" for k, name in enumerate(migrations, 1))
+                parser.error(f"{option}: {e.args[0]}\nUse uma posição (0 = schema vazio) ou versão/nome "
+                             f"de migration:\n{valid}")
+
+    if args.revisions:
+        from schema_audit.revisions import unknown_revisions
+        try:
+            unknown = unknown_revisions(git_toplevel(), args.revisions)
+        except subprocess.CalledProcessError:
+            parser.error(f"--revisions: {PROJECT_ROOT} não está num repositório git")
+        if unknown:
+            parser.error(f"--revisions: revisão desconhecida em {args.revisions}: {', '.join(unknown)}")
+
+    if args.dump is not None:
+        if not args.dump.is_file():
+            parser.error(f"--dump: arquivo não encontrado: {args.dump}")
+        if not os.access(args.dump, os.R_OK):
+            parser.error(f"--dump: sem permissão de leitura: {args.dump}")
+    return args
+
+def main(args, loaded=None):
+    """Auditoria pedida nas opções; `loaded`: modelos dos arquivos de tipos já carregados (audit-all-types)"""
+    profiler = current()
+    root_dir = PROJECT_ROOT
     migrations_dir = root_dir / "supabase" / "migrations"
     types_dir = root_dir / "packages" / "shared" / "src" / "types"
+    cache = open_cache(enabled=not args.no_cache)
+
+    if args.diff:
+        print_migration_diff(migrations_dir, *args.diff, cache=cache, jobs=args.jobs)
+        return
+
+    if args.write_dump:
+        write_migrations_dump(migrations_dir, args.write_dump, cache, args.jobs)
+        return
+
+    if args.revisions:
+        sys.exit(run_revisions(args.revisions, args.first_bad, cache, args.jobs))
+
+    if args.staged:
+        sys.exit(run_staged(cache, args.jobs))
+
+    if args.watch:
+        run_watch(root_dir, cache, args.jobs)
+        return
 
     print(f"{BLUE}╔══════════════════════════════════════════════════════════════╗{RESET}")
     print(f"{BLUE}║  AUDITORIA COMPLETA: TIPOS TYPESCRIPT VS SCHEMA DO BANCO    ║{RESET}")
@@ -230,24 +510,56 @@ def main():
     print()
 
     print(f"{YELLOW}📊 Extraindo schemas do banco de dados...{RESET}")
-    tables = extract_tables_from_sql(migrations_dir)
+    with profiler.phase('extract sql'):
+        tables = extract_tables_from_sql(migrations_dir, args.as_of, cache, args.jobs)
     print(f"   ✓ {len(tables)} tabelas encontradas")
 
+    # Com --dump, os tipos são comparados com o banco real; as migrations ficam para o diff e para localizar as colunas
+    migration_tables, drift = tables, []
+    if args.dump:
+        print(f"{YELLOW}🗄️  Importando dump do banco...{RESET}")
+        from schema_audit.enums import EnumCatalog
+        from schema_audit.pg_dump import diff_enums, diff_schema, load_pg_dump
+
+        with profiler.phase('import dump'):
+            dump = load_pg_dump(args.dump)
+            migration_enums = EnumCatalog.from_directory(migrations_dir, cache, args.jobs)
+            drift = diff_schema(migration_tables, dump.tables) + diff_enums(migration_enums, dump.enums)
+        tables = dump.tables
+        print(f"   ✓ {len(tables)} tabelas e {len(dump.enums.enums)} ENUMs em {dump.statements} comandos")
+        print(f"   ✓ {len(drift)} diferenças entre migrations e banco")
+
     print(f"{YELLOW}📝 Extraindo interfaces TypeScript...{RESET}")
-    interfaces = extract_typescript_interfaces(types_dir)
+    with profiler.phase('extract ts'):
+        interfaces, interface_sources = extract_typescript_sources(types_dir, cache, args.jobs, loaded)
     print(f"   ✓ {len(interfaces)} interfaces encontradas")
+    print(f"   ✓ cache de parse: {cache.hits} reaproveitados, {cache.misses} reprocessados")
 
+    # Cada inconsistência vai para o resumo do terminal, o markdown e as saídas pedidas assim que é encontrada
     print(f"{YELLOW}🔍 Comparando schemas...{RESET}")
-    issues = compare_schemas(tables, interfaces)
+    report_path = args.report or root_dir / REPORT_FILE
+    summary = SummarySink()
+    with open_output(args.jsonl) as jsonl_out, open_output(args.sarif) as sarif_out:
+        sinks = [summary, markdown_sink(report_path, tables, interfaces, args.dump)]
+        if jsonl_out is not None:
+            sinks.append(JsonLinesSink(jsonl_out, 'audit-types'))
+        if sarif_out is not None:
+            sinks.append(SarifSink(sarif_out, 'audit-types', ISSUE_RULES))
+        stream = ReportStream(sinks)
+        try:
+            with profiler.phase('compare'):
+                for issue in drift:
+                    stream.emit(locate_issue(issue, migration_tables, interface_sources, root_dir))
+                for issue in iter_issues(tables, interfaces):
+                    stream.emit(locate_issue(issue, migration_tables, interface_sources, root_dir))
+        finally:
+            with profiler.phase('report'):
+                stream.close()
+    profiler.count('issues', stream.total)
     print()
 
-    # Agrupar por tipo de problema
-    issues_by_type = defaultdict(list)
-    for issue_type, location, description in issues:
-        issues_by_type[issue_type].append((location, description))
-
     # Exibir resultados
-    total_issues = len(issues)
+    total_issues = stream.total
 
     if total_issues == 0:
         print(f"{GREEN}✅ NENHUMA INCONSISTÊNCIA ENCONTRADA!{RESET}")
@@ -255,13 +567,13 @@ def main():
         print(f"{RED}❌ {total_issues} INCONSISTÊNCIAS ENCONTRADAS:{RESET}")
         print()
 
-        for issue_type, items in sorted(issues_by_type.items()):
-            print(f"{YELLOW}▶ {issue_type} ({len(items)} ocorrências):{RESET}")
-            for location, description in items[:10]:  # Limitar a 10 por tipo
-                print(f"  • {location}")
-                print(f"    {description}")
-            if len(items) > 10:
-                print(f"  ... e mais {len(items) - 10} ocorrências")
+        for issue_type, count, first in summary.by_type():
+            print(f"{YELLOW}▶ {issue_type} ({count} ocorrências):{RESET}")
+            for finding in first:  # Limitar a 10 por tipo
+                print(f"  • {finding.location}")
+                print(f"    {finding.description}")
+            if count > len(first):
+                print(f"  ... e mais {count - len(first)} ocorrências")
             print()
 
     # Estatísticas
@@ -270,29 +582,17 @@ def main():
     print(f"{BLUE}╚══════════════════════════════════════════════════════════════╝{RESET}")
     print(f"Tabelas no banco: {len(tables)}")
     print(f"Interfaces TypeScript: {len(interfaces)}")
+    if args.dump:
+        print(f"Diferenças migrations × banco: {len(drift)}")
     print(f"Inconsistências: {total_issues}")
     print()
 
-    # Salvar relatório
-    report_path = root_dir / "RELATORIO_AUDITORIA_TIPOS.md"
-    with open(report_path, 'w') as f:
-        f.write("# Relatório de Auditoria: Tipos TypeScript vs Schema do Banco\n\n")
-        f.write(f"**Data:** {os.popen('date').read().strip()}\n\n")
-        f.write(f"## Resumo\n\n")
-        f.write(f"- Tabelas analisadas: {len(tables)}\n")
-        f.write(f"- Interfaces TypeScript: {len(interfaces)}\n")
-        f.write(f"- **Inconsistências encontradas: {total_issues}**\n\n")
-
-        if total_issues > 0:
-            f.write("## Inconsistências Detalhadas\n\n")
-            for issue_type, items in sorted(issues_by_type.items()):
-                f.write(f"### {issue_type} ({len(items)} ocorrências)\n\n")
-                for location, description in items:
-                    f.write(f"- **{location}**\n")
-                    f.write(f"  - {description}\n")
-                f.write("\n")
-
     print(f"{GREEN}📄 Relatório salvo em: {report_path}{RESET}")
+    for path in (args.jsonl, args.sarif):
+        if path is not None:
+            print(f"{GREEN}📄 Inconsistências gravadas em: {path}{RESET}")
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    with profiling(args, 'audit-types'):
+        main(args)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Auditoria: Colunas pgvector e dimensionamento da busca por similaridade
+Verifica se cada coluna vector/halfvec usada em buscas (ex.: search_document_chunks,
+chamada pela Edge Function ask-norma) tem índice ivfflat/hnsw com a classe de
+operadores do operador de distância, e estima heap, TOAST, índice e
+maintenance_work_mem para um número de linhas
+"""
+
+import argparse
+from pathlib import Path
+
+from schema_audit.cache import NullCache, open_cache
+from schema_audit.indexes import IndexModel
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.replay import MigrationReplay
+from schema_audit.vectors import DISTANCE_OPERATORS, load_vector_searches, plan_vectors
+
+# Raiz do projeto e migrations auditadas
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = PROJECT_DIR / 'supabase' / 'migrations'
+
+DEFAULT_ROWS = 1_000_000
+DEFAULT_MAINTENANCE_WORK_MEM_MB = 64        # padrão do PostgreSQL
+
+
+def _size(num_bytes: float) -> str:
+    if num_bytes >= 1024 ** 3:
+        return f"{num_bytes / 1024 ** 3:,.1f} GB"
+    return f"{num_bytes / (1024 * 1024):,.1f} MB"
+
+
+def audit_vectors(rows=DEFAULT_ROWS, maintenance_work_mem_mb=DEFAULT_MAINTENANCE_WORK_MEM_MB, cache=None, jobs=1):
+    """Lista colunas vetoriais com índice/busca inconsistentes; retorna o número de problemas"""
+    if cache is None:
+        cache = NullCache()
+    profiler = current()
+
+    print("=" * 80)
+    print("🔍 AUDITORIA: Colunas pgvector, Índices ANN e Dimensionamento")
+    print("=" * 80)
+    print()
+
+    with profiler.phase('replay migrations'):
+        tables = MigrationReplay.from_directory(MIGRATIONS_DIR, cache, jobs).final.tables
+    with profiler.phase('index model'):
+        model = IndexModel.from_directory(MIGRATIONS_DIR, cache, jobs)
+    with profiler.phase('vector searches'):
+        searches = load_vector_searches(MIGRATIONS_DIR, cache, jobs)
+    with profiler.phase('plan vectors'):
+        plans = plan_vectors(tables, model, searches, rows)
+    work_mem = maintenance_work_mem_mb * 1024 * 1024
+
+    print(f"📚 SCHEMA: {len(plans)} colunas vetoriais, {len(searches)} funções com busca por distância")
+    print(f"   Estimativas para {rows:,} linhas, maintenance_work_mem = {maintenance_work_mem_mb} MB")
+    print()
+
+    for plan in plans:
+        print("=" * 80)
+        print(f"📋 {plan.table}.{plan.column} {plan.base}({plan.dimensions}) — {plan.value_bytes:,} bytes por valor")
+        print("=" * 80)
+        shapes = sorted({(s.function, s.operator, s.ordered, s.migration, s.line) for s in plan.searches})
+        for function, operator, ordered, migration, line in shapes:
+            usage = 'ORDER BY' if ordered else 'expressão'
+            print(f"   🔎 {function}() {operator} ({DISTANCE_OPERATORS[operator]}, {usage})  [{migration}:{line}]")
+        if not plan.searches:
+            print("   🔎 Nenhuma função das migrations busca por esta coluna")
+        print()
+
+        print(f"   Heap da tabela:  {_size(plan.heap_bytes):>10s}")
+        print(f"   TOAST da coluna: {_size(plan.toast_bytes):>10s}")
+        for estimate in plan.estimates:
+            options = ', '.join(f"{k} = {v}" for k, v in estimate.options)
+            label = estimate.name if estimate.existing else f"{estimate.name} (sugestão)"
+            build_flag = '⚠️ ' if estimate.build_bytes > work_mem else ''
+            print(f"   Índice {estimate.method} {label}: {_size(estimate.index_bytes)}, "
+                  f"construção {build_flag}{_size(estimate.build_bytes)}  [{estimate.opclass}"
+                  f"{', ' + options if options else ''}]")
+            if not estimate.existing:
+                print(f"      CREATE INDEX {estimate.name} ON public.{plan.table} USING {estimate.method} "
+                      f"({plan.column} {estimate.opclass}) WITH ({options});")
+            elif estimate.method == 'ivfflat':
+                configured = dict(estimate.options).get('lists', '?')
+                print(f"      lists = {configured} (recomendado: {plan.lists}, ivfflat.probes = {plan.probes})")
+        print()
+
+        for kind, description in plan.issues:
+            print(f"   ❌ {kind}: {description}")
+        if plan.issues:
+            print()
+
+    issues = [issue for plan in plans for issue in plan.issues]
+    over_memory = [e for plan in plans for e in plan.estimates if e.build_bytes > work_mem]
+
+    print("=" * 80)
+    print("📊 RESUMO")
+    print("=" * 80)
+    print(f"Colunas vetoriais: {len(plans)}")
+    print(f"Colunas com índice ANN: {sum(1 for p in plans if p.indexes)}")
+    print(f"Problemas: {len(issues)}")
+    print(f"Armazenamento total estimado: "
+          f"{_size(sum(p.heap_bytes + p.toast_bytes + sum(e.index_bytes for e in p.estimates if e.existing) for p in plans))}")
+    print()
+
+    if over_memory:
+        print("⚠️  MEMÓRIA DE CONSTRUÇÃO:")
+        print(f"   {len(over_memory)} índice(s) precisam de mais que {maintenance_work_mem_mb} MB para construir em memória.")
+        print("   Aumentar maintenance_work_mem na sessão do CREATE INDEX/REINDEX; um hnsw que não cabe")
+        print("   continua a construção em disco, bem mais lenta.")
+        print()
+    if any(e.method == 'ivfflat' and e.existing for p in plans for e in p.estimates):
+        print("💡 RECOMENDAÇÃO:")
+        print("   Índices ivfflat calculam os centróides com os dados existentes na criação; criados na")
+        print("   migration (tabela vazia), precisam de REINDEX depois da carga do corpus para manter o recall.")
+
+    return len(issues)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Auditoria de colunas pgvector e dimensionamento de índices ANN")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help=f"Linhas por tabela para as estimativas (padrão: {DEFAULT_ROWS:,})")
+    parser.add_argument('--maintenance-work-mem', type=int, default=DEFAULT_MAINTENANCE_WORK_MEM_MB,
+                        help=f"maintenance_work_mem disponível em MB (padrão: {DEFAULT_MAINTENANCE_WORK_MEM_MB})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with profiling(args, 'audit-vectors'):
+        num_issues = audit_vectors(args.rows, args.maintenance_work_mem, open_cache(enabled=not args.no_cache),
+                                   args.jobs)
+    exit(0 if num_issues == 0 else 1)
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Escalabilidade das auditorias de tipos
+Gera projetos sintéticos com 10× e 100× (ou outras escalas) o tamanho atual (migrations,
+tabelas, colunas, ENUMs e arquivos de tipos) e mede, para audit-types,
+validate-type-sync e audit-literal-types, o tempo e o pico de memória de cada
+fase (extract, compare, report). Compara com o baseline versionado e falha se
+alguma fase regredir além da tolerância:
+
+    python3 scripts/benchmark-audit.py                       # 10× e 100× (o que roda no CI)
+    python3 scripts/benchmark-audit.py --scales 1000         # só medição: 1000× não tem baseline
+    python3 scripts/benchmark-audit.py --update-baseline     # grava o novo baseline
+
+Os tempos são normalizados por uma calibração de CPU (tokenização de SQL fixa,
+mediana de várias rodadas, medida uma vez antes de gerar qualquer projeto e
+usada em todas as escalas), para que o baseline gravado numa máquina valha em outra.
+"""
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from schema_audit.cache import NullCache
+from schema_audit.database_types import compare_three_way, load_database_types
+from schema_audit.enums import EnumCatalog
+from schema_audit.replay import MigrationReplay
+from schema_audit.sql_tokenizer import tokenize
+from schema_audit.synthetic import (BASE_SIZE, DATABASE_TYPES_SUBPATH, MIGRATIONS_SUBDIR, TYPES_SUBDIR,
+                                    SyntheticProject, generate_project)
+from schema_audit.ts_declarations import load_type_files
+
+SCRIPTS_DIR = Path(__file__).parent
+BASELINE_FILE = SCRIPTS_DIR / 'benchmarks' / 'audit-baseline.json'
+
+DEFAULT_SCALES = (10, 100)         # as escalas do baseline versionado
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25            # tempo normalizado acima do baseline
+DEFAULT_MEMORY_TOLERANCE = 0.15     # pico de memória acima do baseline
+MIN_SECONDS = 0.05                  # diferenças menores que isso são ruído de medição
+MIN_MEGABYTES = 1.0
+REPEAT_BUDGET_SECONDS = 60          # escalas grandes param de repetir depois deste tempo por ferramenta
+CALIBRATION_ROUNDS = 21
+
+PHASES = ('extract', 'compare', 'report')
+
+
+def load_script(name: str):
+    """Importa um script com hífen no nome (audit-types.py) como módulo"""
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), SCRIPTS_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---- fases de cada ferramenta (parse sem cache e sem processos, para medir só o algoritmo) ----
+
+def audit_types_phases(root: Path, state: dict):
+    at = load_script('audit-types')
+
+    def extract():
+        state['tables'] = at.extract_tables_from_sql(root / MIGRATIONS_SUBDIR, None, NullCache(), 1)
+        state['interfaces'] = at.extract_typescript_interfaces(root / TYPES_SUBDIR, NullCache(), 1)
+
+    def compare():
+        state['issues'] = at.compare_schemas(state['tables'], state['interfaces'])
+
+    def report():
+        at.write_report(root / 'RELATORIO_AUDITORIA_TIPOS.md', state['tables'], state['interfaces'], state['issues'])
+
+    return [('extract', extract), ('compare', compare), ('report', report)]
+
+
+def validate_type_sync_phases(root: Path, state: dict):
+    vs = load_script('validate-type-sync')
+
+    def extract():
+        type_files = [f for f in sorted((root / TYPES_SUBDIR).glob("*.ts")) if not f.name.startswith("_")]
+        state['generated'] = load_database_types(root / DATABASE_TYPES_SUBPATH)
+        state['analyses'] = [(f, vs.analyze_type_file(type_file))
+                             for f, type_file in zip(type_files, load_type_files(type_files, NullCache(), 1))]
+        state['tables'] = MigrationReplay.from_directory(root / MIGRATIONS_SUBDIR, NullCache(), 1).final.tables
+
+    def compare():
+        refs = [(f.name, kind, name) for f, analysis in state['analyses'] for kind, name in analysis['references']]
+        state['drift'] = compare_three_way(state['tables'], state['generated'], refs)
+
+    def report():
+        vs.report_drift(state['drift'])
+
+    return [('extract', extract), ('compare', compare), ('report', report)]
+
+
+def audit_literal_types_phases(root: Path, state: dict):
+    lt = load_script('audit-literal-types')
+
+    def extract():
+        ts_files = sorted((root / TYPES_SUBDIR).glob('*.ts'))
+        state['catalog'] = EnumCatalog.from_directory(root / MIGRATIONS_SUBDIR, NullCache(), 1)
+        state['generated'] = load_database_types(root / DATABASE_TYPES_SUBPATH)
+        state['scans'] = [lt.scan_type_file(type_file) for type_file in load_type_files(ts_files, NullCache(), 1)]
+
+    def compare():
+        aliases = [alias for scan in state['scans'] for alias in scan['aliases']]
+        state['resolved'] = resolved = lt.resolve_literal_types(aliases, state['catalog'])
+        state['drift'] = lt.enum_drift(state['catalog'], state['generated'], aliases, resolved)
+
+    def report():
+        lt.print_enum_drift(state['resolved'], state['drift'])
+
+    return [('extract', extract), ('compare', compare), ('report', report)]
+
+
+TOOLS = {
+    'audit-types': audit_types_phases,
+    'validate-type-sync': validate_type_sync_phases,
+    'audit-literal-types': audit_literal_types_phases,
+}
+
+
+# ---- medição ----
+
+def calibrate(rounds: int = CALIBRATION_ROUNDS) -> float:
+    """Segundos para tokenizar um SQL fixo (o mesmo em toda máquina): unidade dos tempos normalizados
+
+    Medida uma vez por execução, antes de gerar qualquer projeto: com o heap de
+    uma escala grande já preenchido, o valor dependeria da escala.
+    """
+    project = SyntheticProject(BASE_SIZE, seed=0)
+    text = ''.join(project._table_sql(k) for k in range(BASE_SIZE.tables))
+    del project
+    gc.collect()
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        sum(1 for _ in tokenize(text))
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def measure_tool(root: Path, phases_for, repeat: int, memory: bool) -> dict:
+    """Menor tempo de cada fase em até `repeat` execuções; pico de memória numa execução à parte"""
+    seconds = {phase: float('inf') for phase in PHASES}
+    peaks = {}
+    budget_start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for _ in range(repeat):
+            if seconds['extract'] != float('inf') and time.perf_counter() - budget_start > REPEAT_BUDGET_SECONDS:
+                break
+            state = {}
+            for phase, run in phases_for(root, state):
+                gc.collect()
+                started = time.perf_counter()
+                run()
+                seconds[phase] = min(seconds[phase], time.perf_counter() - started)
+            del state
+
+        if memory:
+            state = {}
+            gc.collect()
+            tracemalloc.start()
+            for phase, run in phases_for(root, state):
+                before = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                run()
+                peaks[phase] = (tracemalloc.get_traced_memory()[1] - before) / (1024 * 1024)
+            tracemalloc.stop()
+            del state
+
+    return {phase: {'seconds': round(seconds[phase], 4), **({'peak_mb': round(peaks[phase], 2)} if memory else {})}
+            for phase in PHASES}
+
+
+def _tree_bytes(root: Path) -> int:
+    return sum(path.stat().st_size for path in root.rglob('*') if path.is_file())
+
+
+def run_scale(scale: int, workdir: Path, repeat: int, memory: bool, tools, calibration: float) -> dict:
+    root = workdir / f"escala-{scale}"
+    shutil.rmtree(root, ignore_errors=True)
+    started = time.perf_counter()
+    project = generate_project(root, scale)
+    print(f"🏗️  {scale}×: {project.size.migrations:,} migrations, {len(project.tables):,} tabelas, "
+          f"{sum(len(c) for c in project.tables.values()):,} colunas, {len(project.enums):,} ENUMs, "
+          f"{project.size.type_files:,} arquivos de tipos ({_tree_bytes(root) / (1024 * 1024):,.1f} MB, "
+          f"gerado em {time.perf_counter() - started:.1f}s)")
+
+    result = {'calibration': calibration}
+    for tool in tools:
+        result[tool] = measure_tool(root, TOOLS[tool], repeat, memory)
+        timings = '  '.join(f"{phase} {result[tool][phase]['seconds']:8.3f}s" for phase in PHASES)
+        print(f"   {tool:22s} {timings}")
+    shutil.rmtree(root, ignore_errors=True)
+    return result
+
+
+# ---- baseline ----
+
+def compare_baseline(results: dict, baseline: dict, tolerance: float,
+                     memory_tolerance: float) -> list:
+    """Regressões (tipo, local, descrição) das fases medidas em relação ao baseline"""
+    regressions = []
+    for scale, result in sorted(results.items(), key=lambda item: int(item[0])):
+        base = baseline.get('results', {}).get(scale)
+        if base is None:
+            print(f"⚠️  Sem baseline para {scale}×: nada a comparar")
+            continue
+        # Tempo do baseline convertido para a velocidade de CPU desta máquina
+        speed = result['calibration'] / base['calibration']
+        for tool in TOOLS:
+            if tool not in result or tool not in base:
+                continue
+            for phase in PHASES:
+                now, before = result[tool][phase], base[tool][phase]
+                location = f"{tool}/{phase} @ {scale}×"
+                expected = before['seconds'] * speed
+                if now['seconds'] > expected * (1 + tolerance) and now['seconds'] - expected > MIN_SECONDS:
+                    regressions.append(('TIME_REGRESSION', location,
+                                        f"{now['seconds']:.3f}s, baseline {expected:.3f}s normalizado "
+                                        f"(+{now['seconds'] / expected - 1:.0%})"))
+                if 'peak_mb' in now and 'peak_mb' in before:
+                    if (now['peak_mb'] > before['peak_mb'] * (1 + memory_tolerance)
+                            and now['peak_mb'] - before['peak_mb'] > MIN_MEGABYTES):
+                        regressions.append(('MEMORY_REGRESSION', location,
+                                            f"pico {now['peak_mb']:.1f} MB, baseline {before['peak_mb']:.1f} MB "
+                                            f"(+{now['peak_mb'] / before['peak_mb'] - 1:.0%})"))
+    return regressions
+
+
+def _growth(before: float, now: float, factor: float) -> str:
+    return f"{now / before / factor:5.2f}" if before > 0 else "   - "
+
+
+def print_growth(results: dict) -> None:
+    """Crescimento de tempo e memória de cada fase entre escalas consecutivas (1.00 = linear)"""
+    scales = sorted(results, key=int)
+    for previous, current in zip(scales, scales[1:]):
+        factor = int(current) / int(previous)
+        print(f"📈 {previous}× → {current}× (dados ×{factor:g}); crescimento relativo ao linear (tempo / memória):")
+        for tool in TOOLS:
+            if tool not in results[current]:
+                continue
+            ratios = []
+            for phase in PHASES:
+                before, now = results[previous][tool][phase], results[current][tool][phase]
+                ratio = f"{phase} {_growth(before['seconds'], now['seconds'], factor)}"
+                if 'peak_mb' in before and 'peak_mb' in now:
+                    ratio += f" / {_growth(before['peak_mb'], now['peak_mb'], factor)}"
+                ratios.append(ratio)
+            print(f"   {tool:22s} {'  '.join(ratios)}")
+
+
+def main(args) -> int:
+    print("=" * 80)
+    print("⏱️  BENCHMARK: Auditorias de tipos em projetos sintéticos")
+    print("=" * 80)
+    print()
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    workdir = Path(tempfile.mkdtemp(prefix='audit-bench-', dir=args.workdir))
+    results = {}
+    calibration = round(calibrate(), 5)
+    print(f"🎯 Calibração: {calibration * 1000:.1f} ms (mediana de {CALIBRATION_ROUNDS} rodadas)")
+    print()
+    try:
+        for scale in args.scales:
+            results[str(scale)] = run_scale(scale, workdir, args.repeat, not args.no_memory, args.tools,
+                                            calibration)
+            print()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if len(results) > 1:
+        print_growth(results)
+        print()
+
+    if args.output:
+        args.output.write_text(json.dumps({'python': platform.python_version(), 'results': results},
+                                          indent=2, ensure_ascii=False) + '\n')
+
+    if args.update_baseline:
+        baseline.setdefault('results', {}).update(results)
+        baseline['python'] = platform.python_version()
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(baseline, indent=2, ensure_ascii=False, sort_keys=True) + '\n')
+        print(f"📄 Baseline atualizado: {args.baseline}")
+        return 0
+
+    regressions = compare_baseline(results, baseline, args.tolerance, args.memory_tolerance)
+
+    print("=" * 80)
+    print("📊 RESUMO")
+    print("=" * 80)
+    if baseline.get('python') and baseline['python'] != platform.python_version():
+        print(f"⚠️  Baseline gravado com Python {baseline['python']}; picos de memória podem variar")
+    if regressions:
+        print(f"❌ {len(regressions)} regressões em relação ao baseline:")
+        for kind, location, description in regressions:
+            print(f"   {kind}: {location}: {description}")
+    else:
+        print("✅ Nenhuma regressão em relação ao baseline")
+    return len(regressions)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark das auditorias de tipos em projetos sintéticos")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES),
+                        help="Escalas em relação ao tamanho atual do projeto (padrão: 10 100)")
+    parser.add_argument('--tools', nargs='+', choices=list(TOOLS), default=list(TOOLS),
+                        help="Ferramentas medidas (padrão: todas)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help=f"Execuções por fase; vale a mais rápida (padrão: {DEFAULT_REPEAT})")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="Não mede o pico de memória (a passada com tracemalloc é mais lenta)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                        help="Arquivo de baseline (padrão: scripts/benchmarks/audit-baseline.json)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Grava os resultados no baseline em vez de comparar")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Aumento de tempo normalizado tolerado (padrão: {DEFAULT_TOLERANCE:.0%})")
+    parser.add_argument('--memory-tolerance', type=float, default=DEFAULT_MEMORY_TOLERANCE,
+                        help=f"Aumento de pico de memória tolerado (padrão: {DEFAULT_MEMORY_TOLERANCE:.0%})")
+    parser.add_argument('--output', '-o', type=Path, help="Grava os resultados em JSON")
+    parser.add_argument('--workdir', type=Path, help="Diretório dos projetos gerados (padrão: temporário do sistema)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    num_regressions = main(parse_args())
+    sys.exit(0 if num_regressions == 0 else 1)
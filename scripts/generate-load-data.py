@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Carga sintética para benchmark a partir do schema das migrations
+Gera COPY de todas as tabelas em ordem de FKs (ENUMs, CHECK, NOT NULL e UNIQUE
+respeitados) para a saída padrão ou para um diretório, um arquivo por tabela:
+
+    python3 scripts/generate-load-data.py --rows 1000000 | psql "$DATABASE_URL"
+    python3 scripts/generate-load-data.py --rows 10000000 --output /tmp/carga -j 8
+    psql "$DATABASE_URL" -f /tmp/carga/load.sql
+
+Os triggers ficam desligados durante a carga (session_replication_role = replica,
+requer superusuário, como no Postgres local do Supabase); as FKs são consistentes
+por construção.
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from schema_audit.cache import NullCache, open_cache
+from schema_audit.enums import EnumCatalog
+from schema_audit.indexes import IndexModel
+from schema_audit.loadgen import BATCH_ROWS, DEFAULT_NULL_FRACTION, plan_load, write_load
+from schema_audit.parallel import resolve_jobs
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.replay import MigrationReplay
+
+# Raiz do projeto e migrations de onde vem o schema
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+MIGRATIONS_DIR = PROJECT_DIR / 'supabase' / 'migrations'
+
+DEFAULT_ROWS = 10_000
+
+# Planos do processo atual (cada worker monta os seus: os geradores não são serializáveis)
+_PLANS = {}
+
+
+def build_plans(args, cache):
+    tables = MigrationReplay.from_directory(MIGRATIONS_DIR, cache, 1).final.tables
+    model = IndexModel.from_directory(MIGRATIONS_DIR, cache, 1)
+    enums = EnumCatalog.from_directory(MIGRATIONS_DIR, cache, 1)
+    plans = plan_load(tables, model, enums, args.rows, args.table_rows, args.null_fraction)
+    if args.only:
+        plans = [plan for plan in plans if plan.table in args.only]
+    return plans
+
+
+def _init_worker(args):
+    _PLANS.update((plan.table, plan) for plan in build_plans(args, open_cache(enabled=not args.no_cache)))
+
+
+def _write_table(job):
+    table, path, seed, batch_rows, disable_triggers = job
+    with open(path, 'w', encoding='utf-8') as out:
+        write_load([_PLANS[table]], out, seed, batch_rows, disable_triggers)
+    return table, _PLANS[table].rows
+
+
+def generate(args, cache=None):
+    """Gera a carga; mensagens de progresso vão para stderr"""
+    if cache is None:
+        cache = NullCache()
+    profiler = current()
+    log = sys.stderr
+
+    print("=" * 80, file=log)
+    print("🏭 CARGA SINTÉTICA: COPY gerado a partir do schema das migrations", file=log)
+    print("=" * 80, file=log)
+
+    started = time.perf_counter()
+    with profiler.phase('build plans'):
+        plans = build_plans(args, cache)
+    for plan in plans:
+        for note in plan.notes:
+            print(f"⚠️  {plan.table}: {note}", file=log)
+
+    if args.output is None:
+        with profiler.phase('write copy'):
+            total = write_load(plans, sys.stdout, args.seed, args.batch_rows, not args.keep_triggers)
+    else:
+        args.output.mkdir(parents=True, exist_ok=True)
+        jobs = [(plan.table, args.output / f"{k:03d}_{plan.table.replace('.', '_')}.sql", args.seed,
+                 args.batch_rows, not args.keep_triggers) for k, plan in enumerate(plans, 1)]
+        with open(args.output / 'load.sql', 'w', encoding='utf-8') as out:
+            out.write(''.join(f"\\ir {path.name}\n" for _, path, *_ in jobs))
+        workers = min(resolve_jobs(args.jobs), len(jobs))
+        total = 0
+        with profiler.phase('write copy', workers=max(workers, 1)), \
+                ProcessPoolExecutor(max_workers=max(workers, 1), initializer=_init_worker, initargs=(args,)) as pool:
+            for table, rows in pool.map(_write_table, jobs):
+                total += rows
+                print(f"   ✅ {table}: {rows:,} linhas", file=log)
+    profiler.count('rows', total)
+
+    elapsed = time.perf_counter() - started
+    print(f"📊 {len(plans)} tabelas, {total:,} linhas em {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} linhas/s)",
+          file=log)
+    return total
+
+
+def _table_rows(values):
+    result = {}
+    for value in values or ():
+        table, _, rows = value.partition('=')
+        result[table] = int(rows)
+    return result
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Gera carga sintética (COPY) a partir do schema das migrations")
+    parser.add_argument('--rows', type=int, default=DEFAULT_ROWS,
+                        help=f"Linhas por tabela (padrão: {DEFAULT_ROWS:,})")
+    parser.add_argument('--table-rows', action='append', metavar='TABELA=N',
+                        help="Linhas de uma tabela específica (repetível)")
+    parser.add_argument('--only', nargs='+', metavar='TABELA',
+                        help="Gera só estas tabelas (as FKs continuam apontando para as linhas dos pais)")
+    parser.add_argument('--null-fraction', type=float, default=DEFAULT_NULL_FRACTION,
+                        help=f"Fração de NULL nas colunas anuláveis (padrão: {DEFAULT_NULL_FRACTION})")
+    parser.add_argument('--seed', type=int, default=0, help="Semente dos sorteios (padrão: 0)")
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS,
+                        help=f"Linhas por lote gerado (padrão: {BATCH_ROWS:,})")
+    parser.add_argument('--output', '-o', type=Path,
+                        help="Diretório de saída (um arquivo por tabela + load.sql); padrão: stdout")
+    parser.add_argument('--keep-triggers', action='store_true',
+                        help="Não desliga triggers durante a carga")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para gerar tabelas com --output (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    args = parser.parse_args()
+    args.table_rows = _table_rows(args.table_rows)
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    with profiling(args, 'generate-load-data'):
+        generate(args, open_cache(enabled=not args.no_cache))
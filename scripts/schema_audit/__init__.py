@@ -0,0 +1,35 @@
+"""
+Biblioteca compartilhada das auditorias de tipos
+=================================================
+Módulos usados por scripts/audit-types.py, scripts/validate-type-sync.py,
+scripts/audit-literal-types.py, scripts/audit-indexes.py,
+scripts/audit-migration-risk.py, scripts/audit-triggers.py, scripts/audit-storage.py,
+scripts/audit-vectors.py, scripts/generate-load-data.py e scripts/benchmark-audit.py.
+
+- sql_tokenizer: tokenizador SQL de passagem única e separador de comandos
+- model: registros compactos (Column, Property) com nomes internados e offsets no lugar do texto
+- sql_schema: extração de tabelas/colunas a partir do fluxo de comandos
+- replay: replay das migrations em ordem; snapshots guardam só as tabelas alteradas por migration
+- cache: cache persistente de parse, chaveado por hash de conteúdo + versão do parser
+- parallel: parse de arquivos distribuído entre processos, com resultado em ordem
+- matcher: índice tabela → interface por nomes normalizados e trie de prefixos
+- ts_tokenizer: tokenizador TypeScript em streaming (linha a linha), com lookahead
+- ts_declarations: modelo de um arquivo de tipos (declarações, campos aninhados, imports, referências), lido uma vez e compartilhado pelas auditorias de tipos
+- database_types: modelo do tipo Database gerado e comparação migrations × gerados × customizados
+- incremental: grafo de dependências da última auditoria e modo incremental sobre o staging do git
+- revisions: auditoria de um intervalo de commits direto dos objetos do git (linha do tempo, primeiro commit ruim)
+- pg_dump: importação de dumps `pg_dump --schema-only` (mmap, um comando por vez) para o mesmo modelo das migrations
+- watch: detecção de arquivos alterados por polling, para o modo --watch
+- lines: índice de inícios de linha (offset → linha por busca binária)
+- enums: catálogo de ENUMs das migrations e comparação de valores com uniões TypeScript
+- indexes: modelo de índices, FKs e políticas RLS por tabela, colunas sem índice e índices redundantes
+- migration_risk: lock adquirido e reescrita de tabela por comando de cada migration
+- query_sites: cadeias PostgREST das Edge Functions confrontadas com o modelo de índices
+- triggers: grafo de triggers/funções/cascatas de FK e fan-out transitivo de escrita por tabela
+- storage: largura/alinhamento dos tipos, tamanho de tupla, ordem ótima de colunas e candidatos a TOAST
+- vectors: colunas pgvector, buscas por distância, classe de operadores dos índices ANN e dimensionamento
+- loadgen: carga sintética em formato COPY, com chaves determinísticas e FKs/UNIQUE respeitados
+- reporting: inconsistências em streaming para JSON Lines, SARIF e markdown (agrupado por tipo via arquivos temporários)
+- profiling: tempos por fase/arquivo, contadores e cProfile, exportados em JSON e trace-event do Chrome
+- synthetic: projeto sintético (migrations, database.types.ts, tipos) em N× o tamanho atual, para benchmark
+"""
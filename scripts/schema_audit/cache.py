@@ -0,0 +1,159 @@
+"""
+Cache persistente de parse
+==========================
+Guarda em disco o resultado do parse de cada arquivo (.sql / .ts), indexado
+pelo hash SHA-256 do conteúdo + nome e versão do parser. Execuções seguintes
+(pre-commit, CI) só reprocessam arquivos cujo conteúdo mudou. Conteúdo lido de
+objetos do git pode ser indexado pelo SHA do blob (blob_key), sem ler o blob.
+
+Cada entrada é um pickle em `<diretório>/<parser>-<hash>.pickle`. O tamanho
+total é limitado: ao passar do limite, as entradas usadas há mais tempo (mtime,
+atualizado a cada acerto) são removidas.
+
+Variáveis de ambiente:
+  TYPE_AUDIT_CACHE_DIR   diretório do cache (padrão: <projeto>/.cache/type-audit)
+  TYPE_AUDIT_NO_CACHE=1  desativa o cache
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_CACHE_DIR = PROJECT_ROOT / ".cache" / "type-audit"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Versão do formato das entradas (muda a chave de todas as entradas)
+CACHE_FORMAT = 1
+
+
+class ParseCache:
+    """Cache em disco de resultados de parse, chaveado por hash de conteúdo"""
+
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes: Optional[int] = None
+
+    def key(self, parser: str, version: Union[int, str], data: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{CACHE_FORMAT}:{parser}:{version}:".encode())
+        digest.update(data)
+        return digest.hexdigest()
+
+    def blob_key(self, parser: str, version: Union[int, str], blob: str) -> str:
+        """Chave pelo SHA do blob git: blobs já parseados não precisam nem ser lidos do repositório"""
+        return hashlib.sha256(f"{CACHE_FORMAT}:{parser}:{version}:blob:{blob}".encode()).hexdigest()
+
+    def _entry_path(self, parser: str, key: str) -> Path:
+        return self.directory / f"{parser}-{key}.pickle"
+
+    def get(self, parser: str, key: str) -> Any:
+        """Retorna o valor cacheado ou levanta KeyError"""
+        path = self._entry_path(parser, key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as exc:
+            raise KeyError(key) from exc
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, parser: str, key: str, value: Any) -> None:
+        """Grava a entrada de forma atômica e aplica o limite de tamanho"""
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, self._entry_path(parser, key))
+        except OSError:
+            return  # Cache é opcional: falha de escrita não interrompe a auditoria
+        if self._total_bytes is not None:
+            self._total_bytes += size
+        if self._current_size() > self.max_bytes:
+            self.evict()
+
+    def parse_bytes(self, data: bytes, parser: str, version: Union[int, str], parse: Callable[[str], Any]) -> Any:
+        """Retorna parse(data decodificado), consultando o cache antes"""
+        key = self.key(parser, version, data)
+        try:
+            value = self.get(parser, key)
+        except KeyError:
+            self.misses += 1
+            value = parse(data.decode('utf-8'))
+            self.put(parser, key, value)
+            return value
+        self.hits += 1
+        return value
+
+    def parse_file(self, path: Path, parser: str, version: Union[int, str], parse: Callable[[str], Any]) -> Any:
+        """Retorna parse(conteúdo do arquivo), consultando o cache antes"""
+        return self.parse_bytes(Path(path).read_bytes(), parser, version, parse)
+
+    def _entries(self):
+        try:
+            return [e for e in os.scandir(self.directory) if e.name.endswith('.pickle')]
+        except OSError:
+            return []
+
+    def _current_size(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(e.stat().st_size for e in self._entries())
+        return self._total_bytes
+
+    def evict(self, target_ratio: float = 0.8) -> int:
+        """Remove as entradas menos usadas até ficar abaixo de target_ratio * max_bytes"""
+        entries = sorted(((e.stat().st_mtime, e.stat().st_size, e.path) for e in self._entries()))
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * target_ratio
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        return removed
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+        self._total_bytes = 0
+
+
+class NullCache(ParseCache):
+    """Cache desativado: sempre reprocessa"""
+
+    def __init__(self):
+        super().__init__(directory=Path(os.devnull))
+
+    def get(self, parser: str, key: str) -> Any:
+        raise KeyError(key)
+
+    def put(self, parser: str, key: str, value: Any) -> None:
+        pass
+
+
+def open_cache(enabled: bool = True) -> ParseCache:
+    """Cria o cache padrão respeitando TYPE_AUDIT_CACHE_DIR e TYPE_AUDIT_NO_CACHE"""
+    if not enabled or os.environ.get('TYPE_AUDIT_NO_CACHE') == '1':
+        return NullCache()
+    directory = os.environ.get('TYPE_AUDIT_CACHE_DIR')
+    return ParseCache(Path(directory) if directory else DEFAULT_CACHE_DIR)
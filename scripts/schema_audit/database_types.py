@@ -0,0 +1,365 @@
+"""
+Modelo do tipo Database gerado (packages/shared/database.types.ts)
+==================================================================
+Lê o arquivo gerado pelo `supabase gen types` em streaming (linha a linha, com
+o tokenizador TypeScript) e percorre o literal `export type Database = { ... }`
+acompanhando as chaves aninhadas. Só o que interessa à auditoria é guardado:
+
+- Tables: colunas de Row e Insert (tipo, opcional, nullable); Update não é guardado
+- Views: colunas de Row
+- Enums: valores de cada enum
+- Functions: nomes dos argumentos e o tipo de retorno
+
+Com o modelo, compare_three_way confronta migrations, tipos gerados e tipos
+customizados numa única passada sobre a união dos nomes de tabela: colunas,
+nulidade e tipo de cada coluna do Row, e as colunas que o Insert deve exigir.
+"""
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from .model import Tables
+from .ts_tokenizer import NEWLINE, PUNCT, STRING, Token, TokenStream, join_tokens, tokenize_lines
+
+# Incrementar quando o modelo mudar (invalida o cache de parse)
+PARSER_VERSION = 2
+
+# Combinações distintas (tipo, opcional, nullable) mantidas como instância única
+_COLUMN_CACHE_SIZE = 4096
+
+Path_ = Tuple[str, ...]
+
+
+class TsColumn(NamedTuple):
+    type: str
+    optional: bool
+    nullable: bool
+
+
+class GeneratedTable:
+    """Colunas de Row / Insert de uma tabela (ou view) gerada"""
+
+    __slots__ = ('name', 'row', 'insert')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.row: Dict[str, TsColumn] = {}
+        self.insert: Dict[str, TsColumn] = {}
+
+    def __repr__(self) -> str:
+        return f"GeneratedTable({self.name!r}, {len(self.row)} colunas)"
+
+
+class GeneratedFunction(NamedTuple):
+    args: Tuple[str, ...]
+    returns: str
+
+
+class DatabaseTypes:
+    """Modelo indexado de um schema do tipo Database"""
+
+    __slots__ = ('schema', 'tables', 'views', 'enums', 'functions')
+
+    def __init__(self, schema: str):
+        self.schema = schema
+        self.tables: Dict[str, GeneratedTable] = {}
+        self.views: Dict[str, GeneratedTable] = {}
+        self.enums: Dict[str, Tuple[str, ...]] = {}
+        self.functions: Dict[str, GeneratedFunction] = {}
+
+    def __repr__(self) -> str:
+        return (f"DatabaseTypes({self.schema!r}, {len(self.tables)} tabelas, {len(self.views)} views, "
+                f"{len(self.enums)} enums, {len(self.functions)} funções)")
+
+
+class _Member(NamedTuple):
+    path: Path_             # caminho do objeto que contém o membro
+    key: str
+    optional: bool
+    tokens: List[Token]     # tokens do tipo (vazio quando o valor é um objeto)
+    is_object: bool
+
+
+def _read_value(stream: TokenStream, path: Path_) -> Iterator[_Member]:
+    """Lê o tipo de um membro até o separador; objetos { } são percorridos recursivamente
+
+    Gera os membros dos objetos internos e, no fim, um _Member sentinela com os
+    tokens do tipo (key vazia), consumido por _read_object.
+    """
+    tokens: List[Token] = []
+    is_object = False
+    depth = 0
+    stream.skip_newlines()
+
+    while True:
+        tok = stream.peek()
+        if tok is None:
+            break
+        if tok.kind == NEWLINE:
+            if depth == 0:
+                nxt = stream.peek_significant()
+                # Uniões/interseções continuam na linha seguinte ("| 'a'")
+                if (tokens or is_object) and not (nxt is not None and nxt.kind == PUNCT and nxt.value in ('|', '&')):
+                    break
+            stream.next()
+            continue
+        if tok.kind == PUNCT:
+            if depth == 0 and tok.value in (';', ',', '}'):
+                break
+            if depth == 0 and tok.value == '{' and not tokens:
+                stream.next()
+                is_object = True
+                yield from _read_object(stream, path)
+                continue
+            if tok.value in ('{', '(', '[', '<'):
+                depth += 1
+            elif tok.value in ('}', ')', ']', '>'):
+                depth -= 1
+        tokens.append(stream.next())
+
+    yield _Member(path, '', False, tokens, is_object)
+
+
+def _read_object(stream: TokenStream, path: Path_) -> Iterator[_Member]:
+    """Percorre os membros de um tipo objeto cujo '{' já foi consumido"""
+    while True:
+        tok = stream.next()
+        if tok is None or tok.is_punct('}'):
+            return
+        if tok.kind == NEWLINE or tok.kind == PUNCT and tok.value in (';', ','):
+            continue
+        if tok.is_punct('['):
+            # Assinatura de índice / mapped type: [_ in never]: never
+            depth = 1
+            while depth and (tok := stream.next()) is not None:
+                if tok.kind == PUNCT and tok.value in ('[', ']'):
+                    depth += 1 if tok.value == '[' else -1
+            for _ in _read_value(stream, path):
+                pass
+            continue
+
+        key = tok.value
+        optional = False
+        nxt = stream.peek()
+        if nxt is not None and nxt.is_punct('?'):
+            stream.next()
+            optional = True
+            nxt = stream.peek()
+        if nxt is None or not nxt.is_punct(':'):
+            continue
+        stream.next()
+
+        member_path = path + (key,)
+        value = None
+        for member in _read_value(stream, member_path):
+            if member.key:
+                yield member
+            else:
+                value = member
+        yield _Member(path, key, optional, value.tokens, value.is_object)
+
+
+def iter_database_members(lines: Iterable[str], type_name: str = 'Database') -> Iterator[_Member]:
+    """Gera todos os membros (em qualquer profundidade) de `export type Database = { ... }`"""
+    stream = TokenStream(tokenize_lines(lines))
+    while True:
+        tok = stream.next()
+        if tok is None:
+            return
+        if not tok.is_ident('type'):
+            continue
+        name = stream.next()
+        if name is None or not name.is_ident(type_name):
+            continue
+        equals = stream.next()
+        if equals is None or not equals.is_punct('='):
+            continue
+        stream.skip_newlines()
+        opener = stream.next()
+        if opener is not None and opener.is_punct('{'):
+            yield from _read_object(stream, ())
+        return
+
+
+def _union_strings(tokens: List[Token]) -> Tuple[str, ...]:
+    return tuple(sys.intern(t.value) for t in tokens if t.kind == STRING)
+
+
+@lru_cache(maxsize=_COLUMN_CACHE_SIZE)
+def _ts_column(type_text: str, optional: bool, nullable: bool) -> TsColumn:
+    # Row / Insert de milhares de tabelas repetem os mesmos poucos tipos: uma instância por combinação
+    return TsColumn(type_text, optional, nullable)
+
+
+def _column(member: _Member) -> TsColumn:
+    type_text = sys.intern(join_tokens(member.tokens))
+    nullable = any(t.kind != STRING and t.value == 'null' for t in member.tokens)
+    return _ts_column(type_text, member.optional, nullable)
+
+
+def build_model(members: Iterable[_Member], schema: str = 'public') -> DatabaseTypes:
+    """Monta o modelo a partir do fluxo de membros, guardando só os caminhos relevantes"""
+    model = DatabaseTypes(schema)
+
+    for member in members:
+        path = member.path
+        if not path or path[0] != schema:
+            continue
+        depth = len(path)
+        section = path[1] if depth > 1 else None
+
+        if section in ('Tables', 'Views') and depth == 4 and not member.is_object:
+            # (schema, Tables, tabela, Row|Insert) → coluna; Update não é comparado
+            group = model.tables if section == 'Tables' else model.views
+            table = group.get(path[2])
+            if table is None:
+                table = group[path[2]] = GeneratedTable(sys.intern(path[2]))
+            kind, key = path[3], sys.intern(member.key)
+            if kind == 'Row':
+                table.row[key] = _column(member)
+            elif kind == 'Insert':
+                table.insert[key] = _column(member)
+        elif section == 'Enums' and depth == 2:
+            model.enums[sys.intern(member.key)] = _union_strings(member.tokens)
+        elif section == 'Functions' and depth == 2:
+            model.functions.setdefault(member.key, GeneratedFunction((), ''))
+        elif section == 'Functions' and depth == 3:
+            function = model.functions.get(path[2], GeneratedFunction((), ''))
+            if member.key == 'Returns':
+                model.functions[path[2]] = function._replace(returns=('{ ... }' if member.is_object else '') + join_tokens(member.tokens))
+        elif section == 'Functions' and depth == 4 and path[3] == 'Args':
+            function = model.functions.get(path[2], GeneratedFunction((), ''))
+            model.functions[path[2]] = function._replace(args=function.args + (member.key,))
+
+    return model
+
+
+def load_database_types(path: Path, schema: str = 'public') -> DatabaseTypes:
+    """Lê database.types.ts em streaming e retorna o modelo do schema"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_model(iter_database_members(f), schema)
+
+
+def parse_database_types(content: str, schema: str = 'public') -> DatabaseTypes:
+    """Versão para conteúdo já carregado (usada pelo cache de parse)"""
+    return build_model(iter_database_members(content.splitlines(keepends=True)), schema)
+
+
+# Tipos em que o gerador não expressa nulidade (ex.: inet → unknown)
+_OPAQUE_TYPES = frozenset({'unknown', 'any'})
+
+# Tipo TypeScript esperado para cada tipo do Postgres (sem tamanho/precisão)
+PG_TO_TS_TYPES = {
+    'UUID': 'string',
+    'VARCHAR': 'string',
+    'TEXT': 'string',
+    'BOOLEAN': 'boolean',
+    'INTEGER': 'number',
+    'BIGINT': 'number',
+    'DECIMAL': 'number',
+    'NUMERIC': 'number',
+    'TIMESTAMPTZ': 'string',
+    'TIMESTAMP': 'string',
+    'TIMESTAMP WITH TIME ZONE': 'string',
+    'TIMESTAMP WITHOUT TIME ZONE': 'string',
+    'DATE': 'string',
+    'TIME': 'string',
+    # Grafias canônicas, como o pg_dump escreve (--dump)
+    'CHARACTER VARYING': 'string',
+    'TIME WITH TIME ZONE': 'string',
+    'TIME WITHOUT TIME ZONE': 'string',
+    'JSONB': 'any',
+    'JSON': 'any',
+}
+
+# Como o gerador escreve o tipo esperado 'any' (json/jsonb)
+_JSON_TYPES = frozenset({'Json', 'any', 'unknown'})
+
+
+def map_pg_to_ts_type(pg_type: str) -> str:
+    """Mapeia tipos PostgreSQL para TypeScript ('unknown' quando não há mapeamento)"""
+    pg_type_upper = pg_type.upper().split('(')[0].strip()
+    return PG_TO_TS_TYPES.get(pg_type_upper, 'unknown')
+
+
+def _generated_type_matches(expected: str, generated: str) -> bool:
+    """Tipo gerado (sem `| null`) corresponde ao esperado pelo mapeamento"""
+    base = ' | '.join(part for part in (p.strip() for p in generated.split('|')) if part and part != 'null')
+    if expected == 'any':
+        return base in _JSON_TYPES
+    return base == expected
+
+
+def compare_three_way(migration_tables: Tables,
+                      generated: DatabaseTypes,
+                      custom_refs: Iterable[Tuple[str, str, str]] = ()) -> List[Tuple[str, str, str]]:
+    """Compara migrations × database.types.ts × tipos customizados
+
+    `migration_tables` vem do replay das migrations; `custom_refs` são tuplas
+    (arquivo, 'table'|'enum', nome) referenciadas pelos tipos customizados
+    (Tables['x']['Row'], Enums['y']). Retorna (tipo, local, descrição).
+    """
+    issues = []
+
+    refs_by_table: Dict[str, List[str]] = {}
+    for source, ref_kind, name in custom_refs:
+        if ref_kind == 'table':
+            refs_by_table.setdefault(name, []).append(source)
+        elif ref_kind == 'enum' and name not in generated.enums:
+            issues.append(('BROKEN_REFERENCE', f"{source}: Enums['{name}']",
+                           "Enum referenciado não existe em database.types.ts"))
+
+    for table_name in sorted(migration_tables.keys() | generated.tables.keys() | refs_by_table.keys()):
+        db_columns = migration_tables.get(table_name)
+        gen_table = generated.tables.get(table_name)
+
+        if gen_table is None:
+            for source in refs_by_table.get(table_name, ()):
+                issues.append(('BROKEN_REFERENCE', f"{source}: Tables['{table_name}']",
+                               "Tabela referenciada não existe em database.types.ts"))
+            if db_columns is not None:
+                issues.append(('MISSING_IN_GENERATED', table_name,
+                               "Tabela existe nas migrations mas não em database.types.ts (regenerar tipos?)"))
+            continue
+
+        if db_columns is None:
+            if table_name not in refs_by_table:
+                issues.append(('MISSING_IN_MIGRATIONS', table_name,
+                               "Tabela existe em database.types.ts mas não nas migrations"))
+            else:
+                issues.append(('MISSING_IN_MIGRATIONS', table_name,
+                               f"Tabela usada por {', '.join(sorted(set(refs_by_table[table_name])))} "
+                               "existe em database.types.ts mas não nas migrations"))
+            continue
+
+        row = gen_table.row
+        for col_name, col_info in db_columns.items():
+            gen_col = row.get(col_name)
+            if gen_col is None:
+                issues.append(('MISSING_IN_GENERATED', f"{table_name}.{col_name}",
+                               "Coluna existe nas migrations mas não no Row gerado"))
+                continue
+            if col_info.nullable != gen_col.nullable and gen_col.type not in _OPAQUE_TYPES:
+                issues.append(('NULLABLE_MISMATCH', f"{table_name}.{col_name}",
+                               f"Migrations: {'NULL' if col_info.nullable else 'NOT NULL'}, "
+                               f"database.types.ts: {gen_col.type}"))
+            expected = map_pg_to_ts_type(col_info.type)
+            if (expected != 'unknown' and gen_col.type not in _OPAQUE_TYPES
+                    and not _generated_type_matches(expected, gen_col.type)):
+                issues.append(('TYPE_MISMATCH', f"{table_name}.{col_name}",
+                               f"Migrations: {col_info.type} → esperado TS: {expected}, "
+                               f"database.types.ts: {gen_col.type}"))
+            # Sem valor padrão, o INSERT precisa informar a coluna NOT NULL
+            insert_col = gen_table.insert.get(col_name)
+            if (not col_info.nullable and not col_info.has_default and insert_col is not None
+                    and insert_col.optional):
+                issues.append(('INSERT_MISMATCH', f"{table_name}.{col_name}",
+                               "Coluna NOT NULL sem DEFAULT nas migrations, mas opcional no Insert gerado"))
+        for col_name in row:
+            if col_name not in db_columns:
+                issues.append(('MISSING_IN_MIGRATIONS', f"{table_name}.{col_name}",
+                               "Coluna existe no Row gerado mas não nas migrations"))
+
+    return issues
@@ -0,0 +1,218 @@
+"""
+Catálogo de ENUMs das migrations
+================================
+Extrai de supabase/migrations/ os comandos que definem tipos enumerados
+(CREATE TYPE ... AS ENUM, ALTER TYPE ... ADD VALUE / RENAME VALUE / RENAME TO,
+DROP TYPE), inclusive dentro de blocos DO $$ ... $$, e os aplica em ordem num
+catálogo indexado por nome do enum e por valor.
+
+A comparação com uniões de literais TypeScript é feita por operações de
+conjunto sobre os valores, não pela simples existência do enum.
+"""
+
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .model import intern
+from .parallel import parse_files
+from .sql_tokenizer import DOLLAR, STRING, Token, TokenCursor, split_statements
+
+# Incrementar quando a saída de parse_enum_operations mudar (invalida o cache de parse)
+PARSER_VERSION = 1
+
+# Operações:
+#   ('create_enum', nome, (valores, ...))
+#   ('add_value', nome, valor, ('before' | 'after', referência) | None)
+#   ('rename_value', nome, antigo, novo)
+#   ('rename_type', antigo, novo)
+#   ('drop_type', nome)
+EnumOperation = Tuple
+
+
+def _is_public(schema: Optional[str]) -> bool:
+    return schema is None or schema == 'public'
+
+
+def _string(cur: TokenCursor) -> Optional[str]:
+    tok = cur.peek()
+    if tok is None or tok.kind != STRING:
+        return None
+    cur.next()
+    return tok.value
+
+
+def _parse_create_type(ops: List[EnumOperation], tokens: List[Token]) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('create', 'type'):
+        return
+    schema, name = cur.qualified_name()
+    if name is None or not _is_public(schema) or not cur.accept('as', 'enum'):
+        return
+    peek = cur.peek()
+    if peek is None or not peek.is_punct('('):
+        return
+    values = tuple(intern(v) for v in (_string(part) for part in cur.take_group().split()) if v is not None)
+    ops.append(('create_enum', intern(name), values))
+
+
+def _parse_alter_type(ops: List[EnumOperation], tokens: List[Token]) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('alter', 'type'):
+        return
+    schema, name = cur.qualified_name()
+    if name is None or not _is_public(schema):
+        return
+
+    if cur.accept('add', 'value'):
+        cur.accept('if', 'not', 'exists')
+        value = _string(cur)
+        if value is None:
+            return
+        position = None
+        for where in ('before', 'after'):
+            if cur.accept(where):
+                ref = _string(cur)
+                position = (where, ref) if ref is not None else None
+        ops.append(('add_value', name, intern(value), position))
+    elif cur.accept('rename', 'value'):
+        old = _string(cur)
+        if old is not None and cur.accept('to'):
+            new = _string(cur)
+            if new is not None:
+                ops.append(('rename_value', name, old, intern(new)))
+    elif cur.accept('rename', 'to'):
+        new_name = cur.name()
+        if new_name:
+            ops.append(('rename_type', name, intern(new_name)))
+
+
+def _parse_drop_type(ops: List[EnumOperation], tokens: List[Token]) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('drop', 'type'):
+        return
+    cur.accept('if', 'exists')
+    for part in cur.split():
+        schema, name = part.qualified_name()
+        if name and _is_public(schema):
+            ops.append(('drop_type', name))
+
+
+_STATEMENT_PARSERS = {
+    'create type': _parse_create_type,
+    'alter type': _parse_alter_type,
+    'drop type': _parse_drop_type,
+}
+
+
+def parse_enum_operations(content: str) -> List[EnumOperation]:
+    """Operações sobre ENUMs de uma migration, em ordem (inclui blocos DO $$)"""
+    ops: List[EnumOperation] = []
+    for stmt in split_statements(content):
+        parser = _STATEMENT_PARSERS.get(stmt.kind)
+        if parser is not None:
+            parser(ops, stmt.tokens)
+        elif stmt.kind == 'do':
+            # Padrão idempotente: DO $$ BEGIN CREATE TYPE ...; EXCEPTION WHEN duplicate_object ...
+            for tok in stmt.tokens:
+                if tok.kind != DOLLAR:
+                    continue
+                for inner in split_statements(tok.value):
+                    toks = inner.tokens
+                    for i in range(len(toks) - 1):
+                        if toks[i].is_word('create', 'alter', 'drop') and toks[i + 1].is_word('type'):
+                            _STATEMENT_PARSERS[f"{toks[i].value} type"](ops, toks[i:])
+                            break
+    return ops
+
+
+class EnumComparison(NamedTuple):
+    enum: str
+    missing_in_ts: Tuple[str, ...]      # valores do banco ausentes na união TypeScript
+    missing_in_db: Tuple[str, ...]      # valores da união TypeScript ausentes no banco
+
+    @property
+    def matches(self) -> bool:
+        return not self.missing_in_ts and not self.missing_in_db
+
+
+class EnumCatalog:
+    """ENUMs do schema após aplicar as migrations em ordem"""
+
+    def __init__(self):
+        self.enums: Dict[str, Tuple[str, ...]] = {}
+        self.origin: Dict[str, str] = {}                    # enum → migration que o criou
+        self._by_value: Optional[Dict[str, FrozenSet[str]]] = None
+
+    @classmethod
+    def from_directory(cls, migrations_dir: Path, cache=None, jobs: Optional[int] = 1) -> 'EnumCatalog':
+        catalog = cls()
+        sql_files = sorted(migrations_dir.glob("*.sql"))
+        all_ops = parse_files(sql_files, 'enum_ops', PARSER_VERSION, parse_enum_operations, cache, jobs)
+        for sql_file, ops in zip(sql_files, all_ops):
+            catalog.apply(sql_file.name, ops)
+        return catalog
+
+    def apply(self, migration: str, ops: Iterable[EnumOperation]) -> None:
+        """Aplica as operações; referências a enums ou valores inexistentes são ignoradas"""
+        enums = self.enums
+        for op in ops:
+            kind, name = op[0], op[1]
+            if kind == 'create_enum':
+                enums[name] = op[2]
+                self.origin[name] = migration
+            elif name not in enums:
+                continue
+            elif kind == 'add_value':
+                values, value, position = list(enums[name]), op[2], op[3]
+                if value in values:
+                    continue
+                if position is not None and position[1] in values:
+                    index = values.index(position[1]) + (position[0] == 'after')
+                    values.insert(index, value)
+                else:
+                    values.append(value)
+                enums[name] = tuple(values)
+            elif kind == 'rename_value':
+                enums[name] = tuple(op[3] if v == op[2] else v for v in enums[name])
+            elif kind == 'rename_type':
+                enums[op[2]] = enums.pop(name)
+                self.origin[op[2]] = self.origin.pop(name)
+            elif kind == 'drop_type':
+                del enums[name]
+                del self.origin[name]
+        self._by_value = None
+
+    @property
+    def by_value(self) -> Dict[str, FrozenSet[str]]:
+        """Índice valor → enums que o contêm (montado sob demanda)"""
+        if self._by_value is None:
+            index: Dict[str, set] = {}
+            for name, values in self.enums.items():
+                for value in values:
+                    index.setdefault(value, set()).add(name)
+            self._by_value = {value: frozenset(names) for value, names in index.items()}
+        return self._by_value
+
+    def compare(self, enum: str, ts_values: Sequence[str]) -> EnumComparison:
+        """Compara os valores de uma união TypeScript com os do enum (KeyError se não existir)"""
+        db_values = self.enums[enum]
+        db_set, ts_set = set(db_values), set(ts_values)
+        return EnumComparison(
+            enum,
+            tuple(v for v in db_values if v not in ts_set),
+            tuple(v for v in ts_values if v not in db_set),
+        )
+
+    def closest(self, ts_values: Sequence[str]) -> Optional[Tuple[str, float]]:
+        """Enum com maior sobreposição (Jaccard) de valores, usando o índice por valor"""
+        ts_set = set(ts_values)
+        shared: Dict[str, int] = {}
+        for value in ts_set:
+            for name in self.by_value.get(value, ()):
+                shared[name] = shared.get(name, 0) + 1
+        best = None
+        for name, count in shared.items():
+            score = count / len(ts_set | set(self.enums[name]))
+            if best is None or score > best[1] or score == best[1] and name < best[0]:
+                best = (name, score)
+        return best
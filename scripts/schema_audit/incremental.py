@@ -0,0 +1,366 @@
+"""
+Auditoria incremental (pre-commit)
+==================================
+O modo --staged grava em .cache/type-audit-graph.pickle o grafo de
+dependências da auditoria do commit HEAD: operações de cada migration e
+interfaces de cada arquivo .ts (com o blob git de cada arquivo), a interface
+escolhida para cada tabela e as inconsistências de cada tabela. O grafo é
+montado a partir dos objetos do git (build_commit_graph), nunca da árvore de
+trabalho, que já contém as alterações em staging que ele deve julgar.
+
+No modo incremental, os arquivos alterados em relação ao grafo (área de
+staging) são lidos do índice do git e reparseados; só as tabelas cujas
+dependências mudaram são comparadas de novo:
+
+- migration alterada: tabelas tocadas pelas operações antigas e novas, seguindo
+  as renomeações feitas nas migrations seguintes
+- arquivo .ts alterado: tabelas cuja chave normalizada é prefixo da chave de
+  alguma interface adicionada, removida ou modificada no arquivo
+
+As inconsistências das demais tabelas vêm do grafo. O replay das operações em
+memória é refeito por inteiro, mas não relê nem reparseia nenhum arquivo.
+"""
+
+import hashlib
+import os
+import pickle
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .cache import PROJECT_ROOT, NullCache, ParseCache
+from .matcher import InterfaceIndex, TableMatch, name_key
+from .parallel import parse_contents
+from .profiling import current
+from .replay import _SchemaBuilder, apply_operations
+
+DEFAULT_GRAPH_PATH = PROJECT_ROOT / ".cache" / "type-audit-graph.pickle"
+
+# Versão do formato do grafo gravado em disco
+GRAPH_FORMAT = 1
+
+Issue = Tuple[str, str, str]
+CompareTable = Callable[[str, TableMatch, Dict, Dict], List[Issue]]
+
+
+class FileEntry(NamedTuple):
+    blob: str       # SHA-1 do blob git do conteúdo
+    parsed: Any     # operações (migration) ou interfaces (.ts)
+
+
+class AuditDelta(NamedTuple):
+    changed_files: Tuple[str, ...]
+    tables: Tuple[str, ...]         # tabelas comparadas de novo
+    added: Tuple[Issue, ...]        # inconsistências novas
+    removed: Tuple[Issue, ...]      # inconsistências resolvidas
+
+
+def blob_sha(data: bytes) -> str:
+    """SHA-1 do conteúdo como blob git (o mesmo de `git hash-object`)"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _git(root: Path, *args: str, stdin: Optional[bytes] = None) -> bytes:
+    return subprocess.run(['git', *args], cwd=root, input=stdin,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True).stdout
+
+
+def git_toplevel(path: Path = PROJECT_ROOT) -> Path:
+    return Path(_git(path, 'rev-parse', '--show-toplevel').decode().strip())
+
+
+def head_commit(root: Path) -> Optional[str]:
+    try:
+        return _git(root, 'rev-parse', '--verify', '-q', 'HEAD').decode().strip() or None
+    except subprocess.CalledProcessError:
+        return None
+
+
+def index_blobs(root: Path, paths: Iterable[str]) -> Dict[str, str]:
+    """Blob de cada caminho no índice do git (caminhos ausentes ficam de fora)"""
+    paths = list(paths)
+    if not paths:
+        return {}
+    blobs = {}
+    out = _git(root, 'ls-files', '-s', '-z', '--', *paths)
+    for record in out.split(b'\0'):
+        if not record:
+            continue
+        meta, path = record.split(b'\t', 1)
+        blobs[path.decode()] = meta.split()[1].decode()
+    return blobs
+
+
+def read_blobs(root: Path, shas: Iterable[str]) -> Dict[str, bytes]:
+    """Conteúdo de vários blobs com um único `git cat-file --batch`"""
+    shas = sorted(set(shas))
+    if not shas:
+        return {}
+    out = _git(root, 'cat-file', '--batch', stdin=''.join(f"{sha}\n" for sha in shas).encode())
+    blobs, pos = {}, 0
+    for sha in shas:
+        header_end = out.index(b'\n', pos)
+        size = int(out[pos:header_end].split()[2])
+        blobs[sha] = out[header_end + 1:header_end + 1 + size]
+        pos = header_end + 1 + size + 1
+    return blobs
+
+
+def tree_blobs(root, commit: str, paths: Sequence[str]) -> Dict[str, str]:
+    """Blob de cada arquivo sob `paths` no commit (caminho relativo à raiz → SHA)"""
+    blobs = {}
+    out = _git(root, 'ls-tree', '-r', '-z', commit, '--', *paths)
+    for record in out.split(b'\0'):
+        if record:
+            meta, path = record.split(b'\t', 1)
+            blobs[path.decode()] = meta.split()[2].decode()
+    return blobs
+
+
+def parse_blobs(root, blobs: Iterable[str], parser: str, version: Any, parse: Callable[[str], Any],
+                cache: Optional[ParseCache] = None, jobs: Optional[int] = 1) -> Dict[str, Any]:
+    """parse() de cada blob distinto, consultando o cache pelo SHA antes de ler o conteúdo do git"""
+    if cache is None:
+        cache = NullCache()
+    results, pending = {}, []
+    for blob in sorted(set(blobs)):
+        try:
+            results[blob] = cache.get(parser, cache.blob_key(parser, version, blob))
+            cache.hits += 1
+        except KeyError:
+            cache.misses += 1
+            pending.append(blob)
+
+    current().count(f"blobs:{parser}", len(results) + len(pending))
+    contents = read_blobs(root, pending)
+    parsed = parse_contents(pending, [contents[blob] for blob in pending], parser, parse, jobs)
+    for blob, value in zip(pending, parsed):
+        results[blob] = value
+        cache.put(parser, cache.blob_key(parser, version, blob), value)
+    return results
+
+
+def _touched_tables(ops: Iterable[Tuple]) -> Set[str]:
+    touched = set()
+    for op in ops:
+        touched.add(op[1])
+        if op[0] == 'rename_table':
+            touched.add(op[2])
+    return touched
+
+
+class AuditGraph:
+    """Estado auditado de um commit (ou da árvore de trabalho), atualizável por arquivo"""
+
+    __slots__ = ('versions', 'base', 'dirty', 'migrations', 'ts_files', 'tables', 'matches', 'issues')
+
+    def __init__(self, versions: Tuple, base: Optional[str], dirty: Iterable[str],
+                 migrations: Dict[str, FileEntry], ts_files: Dict[str, FileEntry]):
+        self.versions = versions
+        self.base = base                    # commit de onde o grafo foi montado
+        self.dirty = frozenset(dirty)       # arquivos que diferem de `base` no grafo
+        self.migrations = dict(sorted(migrations.items()))
+        self.ts_files = dict(sorted(ts_files.items()))
+        self.tables: Dict[str, Dict] = {}
+        self.matches: Dict[str, Optional[str]] = {}
+        self.issues: Dict[str, List[Issue]] = {}
+
+    def interfaces(self) -> Dict[str, Dict]:
+        """Interfaces de todos os arquivos, na mesma ordem de junção da execução completa"""
+        merged = {}
+        for entry in self.ts_files.values():
+            merged.update(entry.parsed)
+        return merged
+
+    def refresh(self, compare: CompareTable, affected: Optional[Set[str]] = None) -> None:
+        """Refaz o replay em memória e compara as tabelas afetadas (todas, se None)"""
+        builder = _SchemaBuilder({})
+        for entry in self.migrations.values():
+            apply_operations(builder, entry.parsed)
+        self.tables = {name: columns for name, columns in builder.tables.items() if columns}
+
+        interfaces = self.interfaces()
+        index = InterfaceIndex(interfaces.keys())
+        for table in (self.tables.keys() if affected is None else affected):
+            if table not in self.tables:
+                self.matches.pop(table, None)
+                self.issues.pop(table, None)
+                continue
+            match = index.resolve(table)
+            self.matches[table] = match.interface
+            self.issues[table] = compare(table, match, self.tables[table], interfaces)
+
+    def save(self, path: Path = DEFAULT_GRAPH_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((GRAPH_FORMAT, self.versions, self.base, self.dirty, self.migrations,
+                         self.ts_files, self.tables, self.matches, self.issues),
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, versions: Tuple, path: Path = DEFAULT_GRAPH_PATH) -> Optional['AuditGraph']:
+        """Grafo gravado, ou None se ausente, corrompido ou de outra versão dos parsers"""
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+        if not isinstance(state, tuple) or len(state) != 9 or state[0] != GRAPH_FORMAT or state[1] != versions:
+            return None
+        graph = cls(versions, state[2], state[3], state[4], state[5])
+        graph.tables, graph.matches, graph.issues = state[6], state[7], state[8]
+        return graph
+
+
+def _relative(root: Path, paths: Sequence[Path]) -> List[str]:
+    return [Path(os.path.relpath(p, root)).as_posix() for p in paths]
+
+
+def build_graph(root: Path, migration_files: Sequence[Path], migration_ops: Sequence[Any],
+                ts_files: Sequence[Path], ts_interfaces: Sequence[Any], versions: Tuple,
+                compare: CompareTable) -> AuditGraph:
+    """Grafo dos arquivos da árvore de trabalho (modo --watch; o --staged usa build_commit_graph)"""
+    migration_paths, ts_paths = _relative(root, migration_files), _relative(root, ts_files)
+    blobs = {rel: blob_sha(path.read_bytes())
+             for rel, path in zip(migration_paths + ts_paths, list(migration_files) + list(ts_files))}
+
+    base = head_commit(root)
+    dirty = set()
+    if base is not None and blobs:
+        # Arquivos cujo conteúdo lido não é o do commit base (editados ou novos)
+        committed = tree_blobs(root, base, list(blobs))
+        dirty = {rel for rel, sha in blobs.items() if committed.get(rel) != sha}
+
+    graph = AuditGraph(
+        versions, base, dirty,
+        {rel: FileEntry(blobs[rel], ops) for rel, ops in zip(migration_paths, migration_ops)},
+        {rel: FileEntry(blobs[rel], interfaces) for rel, interfaces in zip(ts_paths, ts_interfaces)},
+    )
+    graph.refresh(compare)
+    return graph
+
+
+def build_commit_graph(root: Path, commit: Optional[str], paths: Sequence[str],
+                       is_migration: Callable[[str], bool], is_tracked: Callable[[str], bool],
+                       parsers: Dict[str, Tuple[str, Any, Callable]], versions: Tuple, compare: CompareTable,
+                       cache: Optional[ParseCache] = None, jobs: Optional[int] = 1) -> AuditGraph:
+    """Grafo do estado de um commit, lido dos objetos do git (sem a árvore de trabalho nem o índice)
+
+    `commit` None (repositório sem commits) dá um grafo vazio: tudo no índice é alteração.
+    """
+    files = {}
+    if commit is not None:
+        files = {path: blob for path, blob in sorted(tree_blobs(root, commit, paths).items()) if is_tracked(path)}
+    entries: Dict[str, Dict[str, FileEntry]] = {}
+    for kind in ('migration', 'ts'):
+        selected = {path: blob for path, blob in files.items() if is_migration(path) == (kind == 'migration')}
+        parser, version, parse = parsers[kind]
+        parsed = parse_blobs(root, selected.values(), parser, version, parse, cache, jobs)
+        entries[kind] = {path: FileEntry(blob, parsed[blob]) for path, blob in selected.items()}
+
+    graph = AuditGraph(versions, commit, (), entries['migration'], entries['ts'])
+    graph.refresh(compare)
+    return graph
+
+
+def staged_changes(root: Path, graph: AuditGraph, is_tracked: Callable[[str], bool]) -> Dict[str, Optional[str]]:
+    """Arquivos auditados cujo conteúdo no índice difere do grafo: caminho → blob (None = removido)"""
+    args = ['diff', '--cached', '--name-only', '--no-renames', '-z']
+    if graph.base is not None:
+        args.append(graph.base)
+    names = {n.decode() for n in _git(root, *args).split(b'\0') if n}
+    if graph.base is None:
+        names.update(graph.migrations.keys() | graph.ts_files.keys())
+    candidates = {n for n in names | graph.dirty if is_tracked(n)}
+
+    staged = index_blobs(root, candidates)
+    changes = {}
+    for path in sorted(candidates):
+        old = graph.migrations.get(path) or graph.ts_files.get(path)
+        new_blob = staged.get(path)
+        if (old.blob if old else None) != new_blob:
+            changes[path] = new_blob
+    return changes
+
+
+def _ts_affected_tables(tables: Iterable[str], changed_interfaces: Iterable[str]) -> Set[str]:
+    """Tabelas cuja resolução pode depender das interfaces alteradas (chave exata ou prefixo)"""
+    by_key: Dict[Tuple[str, ...], List[str]] = {}
+    for table in tables:
+        by_key.setdefault(name_key(table), []).append(table)
+    affected = set()
+    for interface in changed_interfaces:
+        key = name_key(interface)
+        for i in range(1, len(key) + 1):
+            affected.update(by_key.get(key[:i], ()))
+    return affected
+
+
+def read_staged(root: Path, changes: Dict[str, Optional[str]]) -> Dict[str, Optional[bytes]]:
+    """Conteúdo no índice de cada arquivo alterado (None = removido)"""
+    blobs = read_blobs(root, (blob for blob in changes.values() if blob))
+    return {path: (blobs[blob] if blob else None) for path, blob in changes.items()}
+
+
+def update_graph(graph: AuditGraph, contents: Dict[str, Optional[bytes]],
+                 is_migration: Callable[[str], bool], parsers: Dict[str, Tuple[str, Any, Callable]],
+                 compare: CompareTable, cache: Optional[ParseCache] = None) -> AuditDelta:
+    """Aplica os arquivos alterados (caminho → conteúdo, None = removido) e recompara só as tabelas afetadas
+
+    `parsers` mapeia 'migration' e 'ts' para (nome no cache, versão, função de parse).
+    """
+    if cache is None:
+        cache = NullCache()
+
+    changed_migrations: Set[str] = set()
+    touched: Set[str] = set()
+    changed_interfaces: Set[str] = set()
+
+    for path, data in contents.items():
+        kind = 'migration' if is_migration(path) else 'ts'
+        files = graph.migrations if kind == 'migration' else graph.ts_files
+        old = files.pop(path, None)
+        parsed = None
+        if data is not None:
+            parser, version, parse = parsers[kind]
+            parsed = cache.parse_bytes(data, parser, version, parse)
+            files[path] = FileEntry(blob_sha(data), parsed)
+
+        if kind == 'migration':
+            changed_migrations.add(path)
+            for ops in (old.parsed if old else (), parsed or ()):
+                touched |= _touched_tables(ops)
+        else:
+            # Só interfaces adicionadas, removidas ou com propriedades diferentes
+            before, after = (old.parsed if old else {}), (parsed or {})
+            changed_interfaces.update(name for name in before.keys() | after.keys()
+                                      if before.get(name) != after.get(name))
+
+    graph.migrations = dict(sorted(graph.migrations.items()))
+    graph.ts_files = dict(sorted(graph.ts_files.items()))
+
+    # Renomeações posteriores levam a alteração adiante (users → usuarios)
+    if changed_migrations:
+        first = min(changed_migrations)
+        for path, entry in graph.migrations.items():
+            if path <= first:
+                continue
+            for op in entry.parsed:
+                if op[0] == 'rename_table' and op[1] in touched:
+                    touched.add(op[2])
+
+    affected = touched | _ts_affected_tables(graph.tables.keys() | touched, changed_interfaces)
+    before = {table: graph.issues.get(table, []) for table in affected}
+    graph.refresh(compare, affected)
+    graph.dirty = graph.dirty | contents.keys()
+
+    added, removed = [], []
+    for table in sorted(affected):
+        old_issues, new_issues = before[table], graph.issues.get(table, [])
+        added.extend(i for i in new_issues if i not in old_issues)
+        removed.extend(i for i in old_issues if i not in new_issues)
+
+    return AuditDelta(tuple(contents), tuple(sorted(affected)), tuple(added), tuple(removed))
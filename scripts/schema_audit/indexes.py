@@ -0,0 +1,693 @@
+"""
+Modelo de índices, chaves estrangeiras e políticas RLS
+======================================================
+Extrai das migrations, no mesmo fluxo de comandos do replay de tabelas:
+
+- CREATE [UNIQUE] INDEX (colunas/expressões, ordem, operator class, método e
+  predicado parcial) e DROP INDEX
+- índices implícitos de PRIMARY KEY e UNIQUE (na coluna, na tabela ou via
+  ALTER TABLE ADD CONSTRAINT)
+- chaves estrangeiras (REFERENCES na coluna, FOREIGN KEY na tabela ou via ALTER TABLE)
+- CREATE / DROP POLICY, com os identificadores usados em USING e WITH CHECK
+
+Comandos dentro de blocos DO $$ ... $$ também são considerados. O parse de cada
+arquivo não depende dos demais (cacheável); a aplicação em ordem monta, por
+tabela, o conjunto vigente de índices, FKs e políticas.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .lines import LineIndex
+from .model import Columns, Tables, column_type
+from .parallel import parse_files
+from .sql_schema import TABLE_CONSTRAINT_KEYWORDS
+from .sql_tokenizer import DOLLAR, IDENT, WORD, Token, TokenCursor, classify, split_statements
+from .storage import type_layout
+
+# Incrementar quando a saída de parse_index_operations mudar (invalida o cache de parse)
+PARSER_VERSION = 2
+
+
+class IndexKey(NamedTuple):
+    column: str                     # nome da coluna ou texto da expressão
+    expression: bool = False
+    descending: bool = False
+    opclass: Optional[str] = None
+
+
+class IndexDef(NamedTuple):
+    name: str
+    table: str
+    keys: Tuple[IndexKey, ...]
+    unique: bool = False
+    method: str = 'btree'
+    predicate: Optional[str] = None         # WHERE de índice parcial
+    constraint: Optional[str] = None        # 'primary' / 'unique' para índices implícitos
+    include: Tuple[str, ...] = ()
+    migration: str = ''
+    line: int = 0
+    options: Tuple[Tuple[str, str], ...] = ()   # WITH (lists = 100, m = 16, ...)
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(k.column for k in self.keys)
+
+
+class ForeignKey(NamedTuple):
+    table: str
+    columns: Tuple[str, ...]
+    ref_table: str
+    ref_columns: Tuple[str, ...]
+    on_delete: Optional[str] = None
+    not_valid: bool = False
+    migration: str = ''
+    line: int = 0
+
+
+class Policy(NamedTuple):
+    table: str
+    name: str
+    command: str                            # all / select / insert / update / delete
+    using: Tuple[str, ...]                  # identificadores candidatos a coluna em USING
+    check: Tuple[str, ...]                  # ... e em WITH CHECK
+    migration: str = ''
+    line: int = 0
+
+
+# Operações:
+#   ('create_index', IndexDef, if_not_exists)
+#   ('drop_index', nome)
+#   ('add_fk', ForeignKey)
+#   ('create_policy', Policy)
+#   ('drop_policy', tabela, nome)
+#   ('drop_table', tabela)
+#   ('rename_table', antiga, nova)
+IndexOperation = Tuple
+
+
+def _is_public(schema: Optional[str]) -> bool:
+    return schema is None or schema == 'public'
+
+
+def _source_text(cur: TokenCursor, source: str) -> str:
+    start, end = cur.span()
+    return ' '.join(source[start:end].split())
+
+
+def _name_list(cur: TokenCursor) -> Tuple[str, ...]:
+    """Lê '(a, b)' e retorna os nomes"""
+    peek = cur.peek()
+    if peek is None or not peek.is_punct('('):
+        return ()
+    return tuple(n for n in (part.name() for part in cur.take_group().split()) if n)
+
+
+def _parse_references(cur: TokenCursor) -> Optional[Tuple[str, Tuple[str, ...], Optional[str], bool]]:
+    """Após REFERENCES: (tabela, colunas, on_delete, not_valid)"""
+    schema, ref_table = cur.qualified_name()
+    if ref_table is None:
+        return None
+    ref_columns = _name_list(cur)
+    on_delete = None
+    not_valid = False
+    while not cur.at_end():
+        if cur.accept('on', 'delete'):
+            words = []
+            while not cur.at_end() and cur.peek().kind == WORD and cur.peek().value in (
+                    'cascade', 'restrict', 'no', 'action', 'set', 'null', 'default'):
+                words.append(cur.next().value)
+            on_delete = ' '.join(words) or None
+        elif cur.accept('not', 'valid'):
+            not_valid = True
+        else:
+            cur.next()
+    qualified = ref_table if _is_public(schema) else f"{schema}.{ref_table}"
+    return qualified, ref_columns or ('id',), on_delete, not_valid
+
+
+def _column_constraints(ops: List[IndexOperation], table: str, column: str, cur: TokenCursor,
+                        line: int) -> None:
+    """Restrições na definição de uma coluna: PRIMARY KEY, UNIQUE, REFERENCES"""
+    while not cur.at_end():
+        if cur.accept('primary', 'key'):
+            ops.append(('create_index', IndexDef(f"{table}_pkey", table, (IndexKey(column),), True,
+                                                 constraint='primary', line=line), False))
+        elif cur.accept('unique'):
+            ops.append(('create_index', IndexDef(f"{table}_{column}_key", table, (IndexKey(column),), True,
+                                                 constraint='unique', line=line), False))
+        elif cur.accept('references'):
+            parsed = _parse_references(cur)
+            if parsed:
+                ops.append(('add_fk', ForeignKey(table, (column,), *parsed, line=line)))
+            return
+        elif cur.peek().is_punct('('):
+            cur.take_group()
+        else:
+            cur.next()
+
+
+def _table_constraint(ops: List[IndexOperation], table: str, cur: TokenCursor, line: int) -> None:
+    """CONSTRAINT x PRIMARY KEY (...) / UNIQUE (...) / FOREIGN KEY (...) REFERENCES ..."""
+    name = None
+    if cur.accept('constraint'):
+        name = cur.name()
+    if cur.accept('primary', 'key'):
+        columns = _name_list(cur)
+        if columns:
+            ops.append(('create_index', IndexDef(name or f"{table}_pkey", table,
+                                                 tuple(IndexKey(c) for c in columns), True,
+                                                 constraint='primary', line=line), False))
+    elif cur.accept('unique'):
+        cur.accept('nulls', 'not', 'distinct')
+        columns = _name_list(cur)
+        if columns:
+            ops.append(('create_index', IndexDef(name or f"{table}_{'_'.join(columns)}_key", table,
+                                                 tuple(IndexKey(c) for c in columns), True,
+                                                 constraint='unique', line=line), False))
+    elif cur.accept('foreign', 'key'):
+        columns = _name_list(cur)
+        if columns and cur.accept('references'):
+            parsed = _parse_references(cur)
+            if parsed:
+                ops.append(('add_fk', ForeignKey(table, columns, *parsed, line=line)))
+
+
+def _parse_create_table(ops: List[IndexOperation], tokens: List[Token], source: str, line: int) -> None:
+    cur = TokenCursor(tokens)
+    cur.accept('create')
+    cur.skip_words(('temp', 'temporary', 'unlogged', 'global', 'local'))
+    if not cur.accept('table'):
+        return
+    cur.accept('if', 'not', 'exists')
+    schema, table = cur.qualified_name()
+    peek = cur.peek()
+    if table is None or not _is_public(schema) or peek is None or not peek.is_punct('('):
+        return
+    for part in cur.take_group().split():
+        first = part.peek()
+        if first is None:
+            continue
+        if first.kind == WORD and first.value in TABLE_CONSTRAINT_KEYWORDS:
+            _table_constraint(ops, table, part, line)
+            continue
+        column = part.name()
+        if column:
+            _column_constraints(ops, table, column, part, line)
+
+
+def _parse_alter_table(ops: List[IndexOperation], tokens: List[Token], source: str, line: int) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('alter', 'table'):
+        return
+    cur.accept('if', 'exists')
+    cur.accept('only')
+    schema, table = cur.qualified_name()
+    if table is None or not _is_public(schema):
+        return
+    for action in cur.split():
+        if action.accept('add'):
+            first = action.peek()
+            if first is None:
+                continue
+            if first.kind == WORD and first.value in TABLE_CONSTRAINT_KEYWORDS:
+                _table_constraint(ops, table, action, line)
+                continue
+            action.accept('column')
+            action.accept('if', 'not', 'exists')
+            column = action.name()
+            if column:
+                _column_constraints(ops, table, column, action, line)
+        elif action.accept('rename', 'to'):
+            new_name = action.name()
+            if new_name:
+                ops.append(('rename_table', table, new_name))
+                table = new_name
+
+
+def _index_key(part: TokenCursor, source: str) -> Optional[IndexKey]:
+    first = part.peek()
+    if first is None:
+        return None
+    if first.is_punct('('):
+        group = part.take_group()
+        column, expression = _source_text(group, source), True
+    else:
+        after = part.peek(1)
+        if first.kind in (WORD, IDENT) and (after is None or not after.is_punct('(')):
+            column, expression = part.next().value, False
+        else:
+            # Expressão sem parênteses extras: lower(email)
+            start = part.pos
+            part.next()
+            if part.peek() is not None and part.peek().is_punct('('):
+                part.take_group()
+            column, expression = ' '.join(source[part.tokens[start].start:part.tokens[part.pos - 1].end].split()), True
+
+    if part.accept('collate'):
+        part.name()
+    opclass = None
+    descending = False
+    while not part.at_end():
+        tok = part.next()
+        if tok.is_word('desc'):
+            descending = True
+        elif tok.is_word('asc', 'nulls', 'first', 'last'):
+            continue
+        elif tok.kind in (WORD, IDENT) and opclass is None:
+            opclass = tok.value
+    return IndexKey(column, expression, descending, opclass)
+
+
+def _index_options(group: TokenCursor) -> Tuple[Tuple[str, str], ...]:
+    """(('lists', '100'),) para WITH (lists = 100)"""
+    options = []
+    for part in group.split():
+        name = part.name()
+        tok = part.next()
+        value = part.next()
+        if name is not None and tok is not None and tok.value == '=' and value is not None:
+            options.append((name.lower(), value.value.lower()))
+    return tuple(options)
+
+
+def _parse_create_index(ops: List[IndexOperation], tokens: List[Token], source: str, line: int) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('create'):
+        return
+    unique = cur.accept('unique')
+    if not cur.accept('index'):
+        return
+    cur.accept('concurrently')
+    if_not_exists = cur.accept('if', 'not', 'exists')
+    name = None
+    if cur.peek() is not None and not cur.peek().is_word('on'):
+        name = cur.name()
+    if not cur.accept('on'):
+        return
+    cur.accept('only')
+    schema, table = cur.qualified_name()
+    if table is None or not _is_public(schema):
+        return
+    method = 'btree'
+    if cur.accept('using'):
+        method = cur.name() or method
+    peek = cur.peek()
+    if peek is None or not peek.is_punct('('):
+        return
+    keys = tuple(k for k in (_index_key(part, source) for part in cur.take_group().split()) if k)
+
+    include: Tuple[str, ...] = ()
+    options: Tuple[Tuple[str, str], ...] = ()
+    predicate = None
+    while not cur.at_end():
+        if cur.accept('include'):
+            include = _name_list(cur)
+        elif cur.accept('with') and cur.peek() is not None and cur.peek().is_punct('('):
+            options = _index_options(cur.take_group())
+        elif cur.accept('where'):
+            predicate = _source_text(cur, source)
+            break
+        elif cur.peek().is_punct('('):
+            cur.take_group()
+        else:
+            cur.next()
+
+    if name is None:
+        name = f"{table}_{'_'.join(k.column for k in keys if not k.expression) or 'expr'}_idx"
+    ops.append(('create_index', IndexDef(name, table, keys, unique, method.lower(), predicate,
+                                         include=include, line=line, options=options), if_not_exists))
+
+
+def _parse_drop_index(ops: List[IndexOperation], tokens: List[Token], source: str, line: int) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('drop', 'index'):
+        return
+    cur.accept('concurrently')
+    cur.accept('if', 'exists')
+    for part in cur.split():
+        schema, name = part.qualified_name()
+        if name and _is_public(schema):
+            ops.append(('drop_index', name))
+
+
+def predicate_identifiers(cur: TokenCursor, table: str) -> Tuple[str, ...]:
+    """Identificadores de uma expressão de política que podem ser colunas da tabela
+
+    Ignora subconsultas (SELECT ...), nomes de funções e nomes qualificados por
+    outra tabela/schema; a filtragem final contra as colunas reais é feita na análise.
+    """
+    names: List[str] = []
+    tokens = cur.tokens
+    i, end = cur.pos, cur.end
+    while i < end:
+        tok = tokens[i]
+        if tok.is_punct('(') and i + 1 < end and tokens[i + 1].is_word('select'):
+            i = TokenCursor(tokens, i, end).group_end() + 1
+            continue
+        if tok.kind in (WORD, IDENT):
+            nxt = tokens[i + 1] if i + 1 < end else None
+            prev = tokens[i - 1] if i > cur.pos else None
+            is_call = nxt is not None and nxt.is_punct('(')
+            is_qualifier = nxt is not None and nxt.is_punct('.')
+            if prev is not None and prev.is_punct('.'):
+                qualifier = tokens[i - 2] if i - 2 >= cur.pos else None
+                if qualifier is not None and qualifier.value == table and not is_call:
+                    names.append(tok.value)
+            elif not is_call and not is_qualifier and tok.value not in names:
+                names.append(tok.value)
+        i += 1
+    return tuple(dict.fromkeys(names))
+
+
+def _parse_create_policy(ops: List[IndexOperation], tokens: List[Token], source: str, line: int) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('create', 'policy'):
+        return
+    name = cur.name()
+    if name is None or not cur.accept('on'):
+        return
+    schema, table = cur.qualified_name()
+    if table is None or not _is_public(schema):
+        return
+
+    command = 'all'
+    using: Tuple[str, ...] = ()
+    check: Tuple[str, ...] = ()
+    while not cur.at_end():
+        if cur.accept('for'):
+            if cur.at_end():
+                break
+            command = cur.next().value
+        elif cur.accept('using'):
+            if cur.peek() is not None and cur.peek().is_punct('('):
+                using = predicate_identifiers(cur.take_group(), table)
+        elif cur.accept('with', 'check'):
+            if cur.peek() is not None and cur.peek().is_punct('('):
+                check = predicate_identifiers(cur.take_group(), table)
+        else:
+            cur.next()
+    ops.append(('create_policy', Policy(table, name, command, using, check, line=line)))
+
+
+def _parse_drop_policy(ops: List[IndexOperation], tokens: List[Token], source: str, line: int) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('drop', 'policy'):
+        return
+    cur.accept('if', 'exists')
+    name = cur.name()
+    if name is None or not cur.accept('on'):
+        return
+    schema, table = cur.qualified_name()
+    if table and _is_public(schema):
+        ops.append(('drop_policy', table, name))
+
+
+def _parse_drop_table(ops: List[IndexOperation], tokens: List[Token], source: str, line: int) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('drop', 'table'):
+        return
+    cur.accept('if', 'exists')
+    for part in cur.split():
+        schema, table = part.qualified_name()
+        if table and _is_public(schema):
+            ops.append(('drop_table', table))
+
+
+_STATEMENT_PARSERS = {
+    'create table': _parse_create_table,
+    'alter table': _parse_alter_table,
+    'drop table': _parse_drop_table,
+    'create index': _parse_create_index,
+    'drop index': _parse_drop_index,
+    'create policy': _parse_create_policy,
+    'drop policy': _parse_drop_policy,
+}
+
+
+def _parse_do_block(ops: List[IndexOperation], tokens: List[Token], line: int) -> None:
+    """Comandos de DDL dentro de DO $$ ... $$ (IF NOT EXISTS ... THEN CREATE INDEX ...)
+
+    As condições não são avaliadas; linhas são as do início do bloco.
+    """
+    for tok in tokens:
+        if tok.kind != DOLLAR:
+            continue
+        body = tok.value
+        for inner in split_statements(body):
+            toks = inner.tokens
+            for i, first in enumerate(toks):
+                if not first.is_word('create', 'alter', 'drop'):
+                    continue
+                kind = classify(toks[i:])
+                parser = _STATEMENT_PARSERS.get(kind)
+                if parser is not None:
+                    parser(ops, toks[i:], body, line)
+                    break
+
+
+def parse_index_operations(content: str) -> List[IndexOperation]:
+    """Operações de índices, FKs e políticas de uma migration, em ordem (inclui blocos DO $$)"""
+    ops: List[IndexOperation] = []
+    lines = LineIndex(content)
+    for stmt in split_statements(content):
+        parser = _STATEMENT_PARSERS.get(stmt.kind)
+        if parser is not None:
+            parser(ops, stmt.tokens, content, lines.line_of(stmt.start))
+        elif stmt.kind == 'do':
+            _parse_do_block(ops, stmt.tokens, lines.line_of(stmt.start))
+    return ops
+
+
+class TableIndexes:
+    """Índices, FKs e políticas vigentes de uma tabela"""
+
+    __slots__ = ('table', 'indexes', 'foreign_keys', 'policies')
+
+    def __init__(self, table: str):
+        self.table = table
+        self.indexes: Dict[str, IndexDef] = {}
+        self.foreign_keys: List[ForeignKey] = []
+        self.policies: Dict[str, Policy] = {}
+
+    def covering(self, columns: Iterable[str], include_partial: bool = True) -> List[IndexDef]:
+        """Índices B-tree cujas primeiras colunas são exatamente `columns` (em qualquer ordem)"""
+        wanted = set(columns)
+        found = []
+        for index in self.indexes.values():
+            # GIN/GiST/HNSW não atendem às buscas por igualdade de FKs e políticas
+            if index.method not in ('btree', 'hash'):
+                continue
+            if not include_partial and index.predicate:
+                continue
+            leading = index.keys[:len(wanted)]
+            if len(leading) == len(wanted) and not any(k.expression for k in leading) \
+                    and {k.column for k in leading} == wanted:
+                found.append(index)
+        return found
+
+
+class IndexModel:
+    """Índices, FKs e políticas por tabela após aplicar as migrations em ordem"""
+
+    def __init__(self):
+        self.tables: Dict[str, TableIndexes] = {}
+        self._index_table: Dict[str, str] = {}     # nome do índice → tabela
+
+    @classmethod
+    def from_directory(cls, migrations_dir: Path, cache=None, jobs: Optional[int] = 1) -> 'IndexModel':
+        model = cls()
+        sql_files = sorted(migrations_dir.glob("*.sql"))
+        all_ops = parse_files(sql_files, 'index_ops', PARSER_VERSION, parse_index_operations, cache, jobs)
+        for sql_file, ops in zip(sql_files, all_ops):
+            model.apply(sql_file.name, ops)
+        return model
+
+    def table(self, name: str) -> TableIndexes:
+        entry = self.tables.get(name)
+        if entry is None:
+            entry = self.tables[name] = TableIndexes(name)
+        return entry
+
+    def apply(self, migration: str, ops: Iterable[IndexOperation]) -> None:
+        for op in ops:
+            kind = op[0]
+            if kind == 'create_index':
+                index, if_not_exists = op[1], op[2]
+                if if_not_exists and index.name in self._index_table:
+                    continue
+                entry = self.table(index.table)
+                entry.indexes[index.name] = index._replace(migration=migration)
+                self._index_table[index.name] = index.table
+            elif kind == 'drop_index':
+                table = self._index_table.pop(op[1], None)
+                if table is not None:
+                    self.tables[table].indexes.pop(op[1], None)
+            elif kind == 'add_fk':
+                self.table(op[1].table).foreign_keys.append(op[1]._replace(migration=migration))
+            elif kind == 'create_policy':
+                policy = op[1]
+                self.table(policy.table).policies[policy.name] = policy._replace(migration=migration)
+            elif kind == 'drop_policy':
+                entry = self.tables.get(op[1])
+                if entry is not None:
+                    entry.policies.pop(op[2], None)
+            elif kind == 'drop_table':
+                entry = self.tables.pop(op[1], None)
+                if entry is not None:
+                    for name in entry.indexes:
+                        self._index_table.pop(name, None)
+            elif kind == 'rename_table':
+                entry = self.tables.pop(op[1], None)
+                if entry is not None:
+                    entry.table = op[2]
+                    entry.indexes = {n: i._replace(table=op[2]) for n, i in entry.indexes.items()}
+                    entry.foreign_keys = [fk._replace(table=op[2]) for fk in entry.foreign_keys]
+                    entry.policies = {n: p._replace(table=op[2]) for n, p in entry.policies.items()}
+                    self.tables[op[2]] = entry
+                    for name in entry.indexes:
+                        self._index_table[name] = op[2]
+
+
+class IndexSuggestion(NamedTuple):
+    table: str
+    columns: Tuple[str, ...]
+    reasons: Tuple[str, ...]        # ex.: 'FK → condominios (ON DELETE cascade)', 'RLS sindico_view'
+
+    @property
+    def statement(self) -> str:
+        name = f"idx_{self.table}_{'_'.join(self.columns)}"
+        return f"CREATE INDEX {name} ON public.{self.table} ({', '.join(self.columns)});"
+
+
+_LOW_SELECTIVITY_TYPES = frozenset({'boolean', 'bool'})
+
+
+def missing_indexes(model: IndexModel, tables: Tables) -> List[IndexSuggestion]:
+    """Colunas de FKs e de predicados RLS sem índice que as tenha como colunas iniciais
+
+    `tables` são as colunas do schema final (replay das migrations), usadas para
+    separar colunas reais de palavras-chave e funções nas expressões das políticas.
+    """
+    suggestions: Dict[Tuple[str, Tuple[str, ...]], List[str]] = {}
+
+    for table_name in sorted(model.tables):
+        entry = model.tables[table_name]
+        columns = tables.get(table_name)
+        if columns is None:
+            continue
+
+        for fk in entry.foreign_keys:
+            # Índice parcial só serve à FK se o predicado não restringe valores não nulos
+            if any(not idx.predicate or idx.predicate.lower().endswith('is not null')
+                   for idx in entry.covering(fk.columns)):
+                continue
+            on_delete = f" ON DELETE {fk.on_delete.upper()}" if fk.on_delete else ''
+            suggestions.setdefault((table_name, fk.columns), []).append(f"FK → {fk.ref_table}{on_delete}")
+
+        for policy in entry.policies.values():
+            for column in dict.fromkeys(policy.using + policy.check):
+                if column not in columns or entry.covering((column,)):
+                    continue
+                # Flags booleanas têm seletividade baixa demais para um índice próprio
+                if columns[column].type.lower() in _LOW_SELECTIVITY_TYPES:
+                    continue
+                suggestions.setdefault((table_name, (column,)), []).append(f"RLS {policy.name}")
+
+    return [IndexSuggestion(table, cols, tuple(dict.fromkeys(reasons)))
+            for (table, cols), reasons in suggestions.items()]
+
+
+_EXPRESSION_WIDTH = 16
+_INDEX_TUPLE_HEADER = 8     # IndexTupleData (ItemPointer + t_info)
+_ITEM_ID = 4                # ponteiro de linha na página
+_MAXALIGN = 8
+
+
+def key_width(column_type: Optional[str]) -> int:
+    """Largura estimada de uma chave de índice do tipo dado (mesma tabela de tipos do heap)"""
+    if not column_type:
+        return _EXPRESSION_WIDTH
+    return type_layout(column_type).width
+
+
+def index_entry_bytes(index: IndexDef, columns: Columns) -> int:
+    """Bytes gravados no índice B-tree por linha inserida (tupla alinhada + ItemId)"""
+    width = _INDEX_TUPLE_HEADER
+    for key in index.keys:
+        width += _EXPRESSION_WIDTH if key.expression else key_width(column_type(columns.get(key.column)))
+    for column in index.include:
+        width += key_width(column_type(columns.get(column)))
+    return -(-width // _MAXALIGN) * _MAXALIGN + _ITEM_ID
+
+
+class RedundantIndex(NamedTuple):
+    kind: str                   # DUPLICATE / PREFIX_COVERED / IMPLIED_BY_CONSTRAINT
+    index: IndexDef
+    covered_by: IndexDef
+    entry_bytes: int            # custo por INSERT (e por UPDATE não-HOT)
+
+    @property
+    def statement(self) -> str:
+        return f"DROP INDEX IF EXISTS public.{self.index.name};"
+
+
+def _key_signature(keys: Iterable[IndexKey]) -> Tuple:
+    return tuple((k.column, k.expression, k.opclass) for k in keys)
+
+
+def _same_direction(shorter: Tuple[IndexKey, ...], longer: Tuple[IndexKey, ...]) -> bool:
+    """B-tree pode ser percorrido nos dois sentidos: basta a ordem relativa coincidir"""
+    if len(shorter) == 1:
+        return True
+    same = all(a.descending == b.descending for a, b in zip(shorter, longer))
+    flipped = all(a.descending != b.descending for a, b in zip(shorter, longer))
+    return same or flipped
+
+
+def _covers(index: IndexDef, other: IndexDef) -> bool:
+    """`other` atende a todas as buscas de `index` (mesmo método e predicado, chaves como prefixo)"""
+    if index.method != 'btree' or other.method != 'btree':
+        return index.method == other.method and index.keys == other.keys \
+            and index.predicate == other.predicate
+    if index.predicate != other.predicate or len(index.keys) > len(other.keys):
+        return False
+    prefix = other.keys[:len(index.keys)]
+    if _key_signature(prefix) != _key_signature(index.keys) or not _same_direction(index.keys, prefix):
+        return False
+    # Um índice único só é dispensável se o outro garante a mesma unicidade
+    return not index.unique or other.unique and len(other.keys) == len(index.keys)
+
+
+def redundant_indexes(model: IndexModel, tables: Tables) -> List[RedundantIndex]:
+    """Índices duplicados, cobertos pelo prefixo de outro ou implícitos em PK/UNIQUE
+
+    Índices de constraints nunca são sugeridos para remoção. Entre duplicatas
+    exatas, o criado por último é o redundante.
+    """
+    found: List[RedundantIndex] = []
+    for table_name in sorted(model.tables):
+        columns = tables.get(table_name)
+        if columns is None:
+            continue
+        indexes = list(model.tables[table_name].indexes.values())
+        for position, index in enumerate(indexes):
+            if index.constraint:
+                continue
+            for other_position, other in enumerate(indexes):
+                if other is index or not _covers(index, other):
+                    continue
+                exact = len(other.keys) == len(index.keys) and other.include == index.include \
+                    and other.unique == index.unique
+                if other.constraint:
+                    kind = 'IMPLIED_BY_CONSTRAINT'
+                elif exact:
+                    # Duplicata: mantém o primeiro criado
+                    if other_position > position:
+                        continue
+                    kind = 'DUPLICATE'
+                else:
+                    kind = 'PREFIX_COVERED'
+                found.append(RedundantIndex(kind, index, other, index_entry_bytes(index, columns)))
+                break
+    return found
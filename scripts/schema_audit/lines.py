@@ -0,0 +1,32 @@
+"""
+Índice de linhas
+================
+Converte offsets de caractere em números de linha com busca binária sobre os
+inícios de linha, calculados uma única vez por arquivo. Substitui o padrão
+`content[:offset].count('\\n')`, que é O(n) por consulta (O(n²) por arquivo).
+"""
+
+from bisect import bisect_right
+from typing import List
+
+
+class LineIndex:
+    """Offsets de início de cada linha de um texto"""
+
+    __slots__ = ('starts',)
+
+    def __init__(self, content: str):
+        starts: List[int] = [0]
+        find = content.find
+        pos = find('\n')
+        while pos >= 0:
+            starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        self.starts = starts
+
+    def line_of(self, offset: int) -> int:
+        """Número da linha (1-based) que contém o offset"""
+        return bisect_right(self.starts, offset)
+
+    def __len__(self) -> int:
+        return len(self.starts)
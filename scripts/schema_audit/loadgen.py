@@ -0,0 +1,471 @@
+"""
+Carga sintética a partir do schema das migrations
+=================================================
+Gera linhas no formato texto do COPY para cada tabela do schema final, em ordem
+topológica de FKs, respeitando ENUMs, listas CHECK (col IN (...)), faixas
+(BETWEEN, > N), NOT NULL e restrições UNIQUE/PRIMARY KEY.
+
+Nenhuma chave é guardada em memória: o valor de uma coluna chave na linha j é
+uma função pura de j (UUID derivado de tabela + j, texto `coluna-j`, ...), então
+uma FK escolhe um índice de linha do pai e recalcula o valor. Restrições UNIQUE
+compostas distribuem j em base mista pelas colunas (FK → linhas do pai, ENUM →
+valores, DATE → dias) e a primeira coluna ilimitada recebe o quociente; sem
+coluna ilimitada, a tabela é limitada ao produto das cardinalidades.
+
+As demais colunas sorteiam lotes inteiros de um conjunto fixo de valores
+pré-formatados (random.choices), e cada lote vira texto com um único join, de
+modo que a memória não depende do número de linhas.
+"""
+
+import random
+import re
+import zlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, TextIO, Tuple
+
+from .enums import EnumCatalog
+from .indexes import IndexModel
+from .model import Column, Columns, Tables, column_definition
+from .storage import _type_parts
+
+NULL = '\\N'
+BATCH_ROWS = 10_000
+POOL_SIZE = 1024
+VECTOR_POOL_SIZE = 64
+DATE_RANGE_DAYS = 3650
+BASE_DATE = date(2016, 1, 1)
+BASE_TIMESTAMP = datetime(2016, 1, 1, tzinfo=timezone.utc)
+DEFAULT_NULL_FRACTION = 0.1
+
+# Tabelas fora do schema public referenciadas por FKs (auth.users do Supabase)
+EXTERNAL_TABLES: Tables = {
+    'auth.users': {
+        'id': Column('uuid', False),
+        'email': Column('varchar(255)', True),
+        'created_at': Column('timestamptz', True),
+    },
+}
+
+_PHRASES = (
+    'Vazamento no teto da garagem do bloco B',
+    'Reunião ordinária para aprovação das contas',
+    'Barulho excessivo após as 22h no apartamento',
+    'Manutenção preventiva dos elevadores sociais',
+    'Troca das lâmpadas do hall de entrada',
+    'Solicitação de segunda via do boleto condominial',
+    'Portão da garagem não fecha completamente',
+    'Limpeza da caixa d\'água agendada para sábado',
+)
+_INTEGER_TYPES = frozenset({'smallint', 'int2', 'integer', 'int', 'int4', 'bigint', 'int8'})
+_SEQUENCE_TYPES = frozenset({'serial', 'bigserial', 'smallserial', 'serial4', 'serial8', 'serial2'})
+_FLOAT_TYPES = frozenset({'real', 'float4', 'double precision', 'float8', 'float'})
+_TIMESTAMP_TYPES = frozenset({'timestamp', 'timestamptz', 'timestamp with time zone', 'timestamp without time zone'})
+
+_QUOTED_RE = re.compile(r"'((?:[^']|'')*)'")
+_CHECK_IN_RE = re.compile(r"CHECK\s*\(\s*(\w+)\s+IN\s*\(([^)]*)\)", re.IGNORECASE)
+_CHECK_BETWEEN_RE = re.compile(r"CHECK\s*\(\s*(\w+)\s+BETWEEN\s+(-?\d+)\s+AND\s+(-?\d+)", re.IGNORECASE)
+_CHECK_MIN_RE = re.compile(r"CHECK\s*\(\s*(\w+)\s*(>=?)\s*(-?\d+)", re.IGNORECASE)
+
+
+class Domain(NamedTuple):
+    """Valores possíveis de uma coluna: value(d) para 0 <= d < cardinality (0 = ilimitada)"""
+    cardinality: int
+    value: Callable[[int], str]
+    spread: int = 1 << 30       # faixa de sorteio quando ilimitada
+    shared: Optional[Tuple] = None  # chave para reaproveitar o conjunto sorteado entre colunas
+
+
+def copy_escape(text: str) -> str:
+    """Escapa um valor para o formato texto do COPY"""
+    return text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def _uuid_domain(namespace: str) -> Domain:
+    """UUID determinístico: 8 dígitos do namespace + 24 do número da linha"""
+    prefix = f"{zlib.crc32(namespace.encode()):08x}-"
+
+    def value(q: int) -> str:
+        if q < 1 << 48:
+            return f"{prefix}0000-0000-0000-{q:012x}"
+        digits = f"{q:024x}"
+        return f"{prefix}{digits[:4]}-{digits[4:8]}-{digits[8:12]}-{digits[12:]}"
+    return Domain(0, value, 1 << 40)
+
+
+def _check_values(column: str, full_def: str) -> Optional[List[str]]:
+    """Valores de CHECK (coluna IN ('a', 'b')) na definição da coluna"""
+    m = _CHECK_IN_RE.search(full_def)
+    if not m or m.group(1) != column:
+        return None
+    return [copy_escape(v.replace("''", "'")) for v in _QUOTED_RE.findall(m.group(2))] or None
+
+
+def _check_range(column: str, full_def: str) -> Tuple[int, Optional[int]]:
+    """(mínimo, máximo) de CHECK (coluna BETWEEN a AND b) / (coluna > n); padrão (0, None)"""
+    m = _CHECK_BETWEEN_RE.search(full_def)
+    if m and m.group(1) == column:
+        return int(m.group(2)), int(m.group(3))
+    m = _CHECK_MIN_RE.search(full_def)
+    if m and m.group(1) == column:
+        return int(m.group(3)) + (1 if m.group(2) == '>' else 0), None
+    return 0, None
+
+
+def _text_domain(table: str, column: str, limit: Optional[int]) -> Domain:
+    if 'email' in column:
+        def value(q: int) -> str:
+            return f"{table.rsplit('.', 1)[-1]}{q}@carga.local"
+    elif limit is not None and limit < len(column) + 12:
+        def value(q: int) -> str:
+            return str(q)[-limit:]
+    else:
+        def value(q: int) -> str:
+            text = f"{column}-{q} {_PHRASES[q % len(_PHRASES)]}"
+            return text[:limit] if limit else text
+    return Domain(0, value)
+
+
+def _vector_domain(dimensions: int) -> Domain:
+    rng = random.Random(dimensions)
+    pool = ['[' + ','.join(f"{rng.uniform(-1, 1):.4f}" for _ in range(dimensions)) + ']'
+            for _ in range(VECTOR_POOL_SIZE)]
+    return Domain(len(pool), pool.__getitem__, shared=('vector', dimensions))
+
+
+def column_domain(table: str, column: str, info: Column, enums: Dict[str, Tuple[str, ...]]) -> Domain:
+    """Domínio de valores de uma coluna a partir do tipo e das restrições da definição"""
+    full_def = column_definition(info)
+    base, mods = _type_parts(info.type or 'text')
+    if base.endswith('[]'):
+        return Domain(1, lambda d: '{}', shared=('array',))
+    values = _check_values(column, full_def)
+    if values:
+        return Domain(len(values), values.__getitem__)
+    if base.startswith('public.') and base[7:] in enums:
+        labels = [copy_escape(v) for v in enums[base[7:]]]
+        return Domain(len(labels), labels.__getitem__, shared=('enum', base))
+    if base in ('boolean', 'bool'):
+        return Domain(2, ('t', 'f').__getitem__, shared=('boolean',))
+    if base in _INTEGER_TYPES:
+        low, high = _check_range(column, full_def)
+        if high is not None:
+            return Domain(high - low + 1, lambda d: str(low + d), shared=('integer', low, high))
+        return Domain(0, lambda q: str(low + q), 1000, ('integer', low))
+    if base in ('numeric', 'decimal') or base in _FLOAT_TYPES:
+        scale = mods[1] if len(mods) > 1 else 2
+        digits = min((mods[0] - scale) if mods else 6, 6)
+        low, _ = _check_range(column, full_def)
+        step = 10 ** scale
+        return Domain(0, lambda q: f"{low + (q + 1) / step:.{scale}f}", 10 ** digits * step - 1,
+                      ('numeric', low, digits, scale))
+    if base == 'date':
+        return Domain(DATE_RANGE_DAYS, lambda d: (BASE_DATE + timedelta(days=d)).isoformat(), shared=('date',))
+    if base in _TIMESTAMP_TYPES:
+        return Domain(0, lambda q: (BASE_TIMESTAMP + timedelta(seconds=q)).isoformat(' '), DATE_RANGE_DAYS * 86400,
+                      ('timestamp',))
+    if base == 'time':
+        return Domain(86400, lambda d: f"{d // 3600:02d}:{d // 60 % 60:02d}:{d % 60:02d}", shared=('time',))
+    if base == 'uuid':
+        return _uuid_domain(f"{table}.{column}")
+    if base in ('jsonb', 'json'):
+        literal = '[]' if "'[]'" in full_def else '{}'
+        return Domain(1, lambda d: literal, shared=('json', literal))
+    if base in ('inet', 'cidr'):
+        return Domain(0, lambda q: f"10.{q >> 16 & 255}.{q >> 8 & 255}.{q & 255}", 1 << 24, ('inet',))
+    if base in ('vector', 'halfvec') and mods:
+        return _vector_domain(mods[0])
+    limit = mods[0] if mods and base in ('varchar', 'char', 'character', 'bpchar') else None
+    return _text_domain(table, column, limit)
+
+
+def _is_sequence(info: Column) -> bool:
+    """serial / IDENTITY: o banco numera as linhas 1, 2, 3... na ordem do COPY"""
+    base, _ = _type_parts(info.type)
+    return base in _SEQUENCE_TYPES or ' as identity' in column_definition(info).lower()
+
+
+def _is_generated(info: Column) -> bool:
+    """Colunas que o COPY não deve receber: GENERATED, IDENTITY e serial"""
+    return _is_sequence(info) or 'generated' in column_definition(info).lower()
+
+
+# Unidade de geração: (colunas, função(linhas, rng) → uma lista de valores por coluna)
+Unit = Tuple[Tuple[str, ...], Callable[[range, random.Random], List[List[str]]]]
+
+
+class TablePlan:
+    """Colunas, número de linhas e geradores de uma tabela"""
+
+    def __init__(self, table: str, columns: Columns, rows: int):
+        self.table = table
+        self.schema_columns = columns
+        self.columns: List[str] = [c for c, info in columns.items() if not _is_generated(info)]
+        self.rows = rows
+        self.pure: Dict[str, Callable[[int], str]] = {      # coluna → valor na linha j
+            c: (lambda j: str(j + 1)) for c, info in columns.items() if _is_sequence(info)
+        }
+        self.units: List[Unit] = []
+        self.parents: Set[str] = set()
+        self.notes: List[str] = []
+
+    @property
+    def qualified_name(self) -> str:
+        return self.table if '.' in self.table else f"public.{self.table}"
+
+    def copy_header(self) -> str:
+        columns = ', '.join('"' + c + '"' for c in self.columns)
+        return f"COPY {self.qualified_name} ({columns}) FROM stdin;\n"
+
+    def batches(self, seed: int = 0, batch_rows: int = BATCH_ROWS) -> Iterator[str]:
+        """Texto COPY em lotes de `batch_rows` linhas"""
+        rng = random.Random(f"{seed}:{self.table}")
+        position = {c: i for i, c in enumerate(self.columns)}
+        for start in range(0, self.rows, batch_rows):
+            rows = range(start, min(start + batch_rows, self.rows))
+            data: List[List[str]] = [[]] * len(self.columns)
+            for columns, generate in self.units:
+                for column, values in zip(columns, generate(rows, rng)):
+                    data[position[column]] = values
+            yield '\n'.join(map('\t'.join, zip(*data))) + '\n'
+
+    def write_copy(self, out: TextIO, seed: int = 0, batch_rows: int = BATCH_ROWS) -> None:
+        out.write(self.copy_header())
+        for chunk in self.batches(seed, batch_rows):
+            out.write(chunk)
+        out.write('\\.\n\n')
+
+
+def sample_pool(domain: Domain, name: str) -> List[str]:
+    """Conjunto fixo de valores pré-formatados de onde os lotes são sorteados"""
+    if domain.cardinality and domain.cardinality <= POOL_SIZE:
+        return [domain.value(d) for d in range(domain.cardinality)]
+    sampler = random.Random(name)
+    spread = domain.cardinality or domain.spread
+    return [domain.value(int(sampler.random() * spread)) for _ in range(POOL_SIZE)]
+
+
+def _with_nulls(values: List[str], fraction: float, rng: random.Random) -> List[str]:
+    count = int(len(values) * fraction)
+    for k in rng.sample(range(len(values)), count):
+        values[k] = NULL
+    return values
+
+
+class _Group(NamedTuple):
+    """Colunas geradas juntas: uma FK (mesmo índice de linha do pai) ou uma coluna avulsa"""
+    columns: Tuple[str, ...]
+    parent: Optional[TablePlan] = None
+    ref_columns: Tuple[str, ...] = ()
+    domain: Optional[Domain] = None
+
+
+class LoadPlanner:
+    """Monta os TablePlan a partir do schema final, índices únicos, FKs e ENUMs"""
+
+    def __init__(self, tables: Tables, model: IndexModel, enums: EnumCatalog,
+                 rows: int, table_rows: Optional[Dict[str, int]] = None,
+                 null_fraction: float = DEFAULT_NULL_FRACTION):
+        self.tables = tables
+        self.model = model
+        self.enums = enums.enums
+        self._pools: Dict[Tuple, List[str]] = {}
+        self.null_fraction = null_fraction
+        table_rows = table_rows or {}
+        self.plans: Dict[str, TablePlan] = {
+            name: TablePlan(name, columns, table_rows.get(name, rows)) for name, columns in tables.items() if columns
+        }
+        self.foreign_keys = self._foreign_keys()
+        for external, columns in EXTERNAL_TABLES.items():
+            if any(ref == external for fks in self.foreign_keys.values() for _, ref, _ in fks):
+                self.plans[external] = TablePlan(external, columns, table_rows.get(external, rows))
+                self.foreign_keys[external] = []
+        self.referenced = self._referenced()
+
+    def _foreign_keys(self) -> Dict[str, List[Tuple[Tuple[str, ...], str, Tuple[str, ...]]]]:
+        """FKs cujas colunas existem no schema final e cujo pai é gerado"""
+        known = set(self.plans) | set(EXTERNAL_TABLES)
+        result: Dict[str, List[Tuple[Tuple[str, ...], str, Tuple[str, ...]]]] = {}
+        for table, plan in self.plans.items():
+            entry = self.model.tables.get(table)
+            fks = []
+            seen: Set[Tuple[str, ...]] = set()
+            for fk in (entry.foreign_keys if entry else ()):
+                parent_columns = self.tables.get(fk.ref_table) or EXTERNAL_TABLES.get(fk.ref_table, {})
+                if fk.columns in seen or fk.ref_table not in known or not fk.ref_columns \
+                        or not all(c in plan.columns for c in fk.columns) \
+                        or not all(c in parent_columns for c in fk.ref_columns):
+                    continue
+                seen.add(fk.columns)
+                fks.append((fk.columns, fk.ref_table, fk.ref_columns))
+            result[table] = fks
+        return result
+
+    def _referenced(self) -> Dict[str, List[Tuple[str, ...]]]:
+        referenced: Dict[str, List[Tuple[str, ...]]] = {}
+        for fks in self.foreign_keys.values():
+            for _, parent, ref_columns in fks:
+                if ref_columns not in referenced.setdefault(parent, []):
+                    referenced[parent].append(ref_columns)
+        return referenced
+
+    def order(self) -> List[str]:
+        """Ordem topológica (pais antes dos filhos); tabelas em ciclo vão ao fim, por nome"""
+        pending = {t: {p for _, p, _ in self.foreign_keys.get(t, ()) if p != t and p in self.plans}
+                   for t in self.plans}
+        ordered: List[str] = []
+        while True:
+            ready = sorted(t for t, deps in pending.items() if not deps)
+            if not ready:
+                break
+            ordered.extend(ready)
+            for table in ready:
+                del pending[table]
+            for deps in pending.values():
+                deps.difference_update(ready)
+        return ordered + sorted(pending)
+
+    def build(self) -> List[TablePlan]:
+        """Planos em ordem topológica; limites de linhas dos pais são aplicados antes dos filhos"""
+        order = self.order()
+        for table in order:
+            self._plan_table(self.plans[table])
+        return [self.plans[t] for t in order]
+
+    def _unique_keys(self, plan: TablePlan) -> List[Tuple[str, ...]]:
+        """PRIMARY KEY, colunas referenciadas por FKs e demais UNIQUE, nesta ordem"""
+        entry = self.model.tables.get(plan.table)
+        indexes = [idx for idx in (entry.indexes.values() if entry else ())
+                   if idx.unique and idx.keys and not any(k.expression for k in idx.keys)]
+        keys: List[Tuple[str, ...]] = [idx.columns for idx in indexes if idx.constraint == 'primary']
+        if plan.table in EXTERNAL_TABLES:
+            keys.append(('id',))
+        keys += self.referenced.get(plan.table, [])
+        keys += sorted((idx.columns for idx in indexes if idx.constraint != 'primary'), key=len)
+        return [k for k in dict.fromkeys(keys) if all(c in plan.columns for c in k)]
+
+    def _plan_table(self, plan: TablePlan) -> None:
+        groups: Dict[str, _Group] = {}
+        for columns, parent, ref_columns in self.foreign_keys.get(plan.table, ()):
+            group = _Group(columns, self.plans[parent], ref_columns)
+            for column in columns:
+                groups.setdefault(column, group)
+            if parent != plan.table:
+                plan.parents.add(parent)
+        for column in plan.columns:
+            if column not in groups:
+                groups[column] = _Group((column,), domain=column_domain(
+                    plan.table, column, plan.schema_columns[column], self.enums))
+
+        assigned: Set[str] = set()
+        for key in self._unique_keys(plan):
+            key_groups = list(dict.fromkeys(groups[c] for c in key if c not in assigned))
+            key_groups = [g for g in key_groups if g.parent is not plan and not assigned & set(g.columns)]
+            if key_groups:
+                self._assign_unique(plan, key_groups)
+                assigned.update(c for g in key_groups for c in g.columns)
+
+        for group in dict.fromkeys(groups[c] for c in plan.columns if c not in assigned):
+            if assigned & set(group.columns):
+                # FK com parte das colunas em uma restrição UNIQUE: o restante é avulso
+                for column in group.columns:
+                    if column not in assigned:
+                        self._assign_random(plan, _Group((column,), domain=column_domain(
+                            plan.table, column, plan.schema_columns[column], self.enums)))
+            else:
+                self._assign_random(plan, group)
+
+    def _assign_unique(self, plan: TablePlan, key_groups: List[_Group]) -> None:
+        """Distribui o número da linha em base mista pelos grupos de uma restrição UNIQUE"""
+        finite = [g for g in key_groups if g.parent is not None or g.domain.cardinality]
+        unbounded = [g for g in key_groups if g not in finite]
+        finite.sort(key=lambda g: g.parent is None)
+        divisor = 1
+        for group in finite:
+            cardinality = group.parent.rows if group.parent is not None else group.domain.cardinality
+            self._register_digit(plan, group, divisor, max(cardinality, 1))
+            divisor *= max(cardinality, 1)
+        if unbounded:
+            self._register_digit(plan, unbounded[0], divisor, 0)
+            for group in unbounded[1:]:
+                self._assign_random(plan, group)
+        elif divisor < plan.rows:
+            plan.notes.append(f"limitada a {divisor:,} linhas por UNIQUE ({', '.join(c for g in key_groups for c in g.columns)})")
+            plan.rows = divisor
+
+    def _register_digit(self, plan: TablePlan, group: _Group, divisor: int, cardinality: int) -> None:
+        """Colunas do grupo como função pura da linha: dígito (j // divisor) % cardinalidade"""
+        if cardinality:
+            def digit(j: int) -> int:
+                return j // divisor % cardinality
+        else:
+            def digit(j: int) -> int:
+                return j // divisor
+        if group.parent is not None:
+            parent, ref_columns = group.parent, group.ref_columns
+            for position, column in enumerate(group.columns):
+                ref = ref_columns[position]
+                plan.pure[column] = lambda j, ref=ref: parent.pure[ref](digit(j))
+        else:
+            value = group.domain.value
+            plan.pure[group.columns[0]] = lambda j: value(digit(j))
+        functions = [plan.pure[c] for c in group.columns]
+        plan.units.append((group.columns, lambda rows, rng: [[f(j) for j in rows] for f in functions]))
+
+    def _nullable(self, plan: TablePlan, columns: Sequence[str]) -> bool:
+        return self.null_fraction > 0 and all(plan.schema_columns[c].nullable for c in columns)
+
+    def _assign_random(self, plan: TablePlan, group: _Group) -> None:
+        nullable = self._nullable(plan, group.columns)
+        fraction = self.null_fraction
+
+        if group.parent is plan:
+            # Autorreferência: aponta para uma linha anterior (a primeira aponta para si mesma)
+            own, ref_columns = plan, group.ref_columns
+
+            def generate(rows: range, rng: random.Random) -> List[List[str]]:
+                picks = [rng.randrange(j) if j else 0 for j in rows]
+                values = [[own.pure[ref](p) for p in picks] for ref in ref_columns]
+                return [_with_nulls(v, fraction, rng) if nullable else v for v in values]
+        elif group.parent is not None:
+            parent, ref_columns = group.parent, group.ref_columns
+
+            def generate(rows: range, rng: random.Random) -> List[List[str]]:
+                if parent.rows == 0:
+                    return [[NULL] * len(rows) for _ in ref_columns]
+                picks = rng.choices(range(parent.rows), k=len(rows))
+                values = [[parent.pure[ref](p) for p in picks] for ref in ref_columns]
+                return [_with_nulls(v, fraction, rng) if nullable else v for v in values]
+        else:
+            domain, name = group.domain, f"{plan.table}.{group.columns[0]}"
+            pools = self._pools
+
+            def generate(rows: range, rng: random.Random) -> List[List[str]]:
+                # Montado no primeiro lote: tabelas fora de --only não pagam o custo
+                key = domain.shared or name
+                pool = pools.get(key)
+                if pool is None:
+                    pool = pools[key] = sample_pool(domain, str(key))
+                values = rng.choices(pool, k=len(rows))
+                return [_with_nulls(values, fraction, rng) if nullable else values]
+        plan.units.append((group.columns, generate))
+
+
+def plan_load(tables: Tables, model: IndexModel, enums: EnumCatalog, rows: int,
+              table_rows: Optional[Dict[str, int]] = None,
+              null_fraction: float = DEFAULT_NULL_FRACTION) -> List[TablePlan]:
+    """Planos de geração de todas as tabelas, em ordem de carga"""
+    return LoadPlanner(tables, model, enums, rows, table_rows, null_fraction).build()
+
+
+def write_load(plans: Iterable[TablePlan], out: TextIO, seed: int = 0, batch_rows: int = BATCH_ROWS,
+               disable_triggers: bool = True) -> int:
+    """Escreve os COPY de todas as tabelas em `out`; retorna o total de linhas"""
+    total = 0
+    if disable_triggers:
+        out.write("SET session_replication_role = replica;\n\n")
+    for plan in plans:
+        plan.write_copy(out, seed, batch_rows)
+        total += plan.rows
+    if disable_triggers:
+        out.write("SET session_replication_role = DEFAULT;\n")
+    return total
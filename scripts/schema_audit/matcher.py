@@ -0,0 +1,134 @@
+"""
+Índice de nomes tabela → interface
+==================================
+Normaliza nomes de tabelas (snake_case, plural) e de interfaces (PascalCase,
+camelCase, singular) para a mesma chave: palavras em minúsculas, no singular,
+unidas por '_'. `usuarios_canais_preferencias` e `UsuarioCanalPreferencia`
+viram `usuario_canal_preferencia`.
+
+A resolução de uma tabela é uma consulta em dicionário pela chave; se não houver
+interface com a chave exata, uma trie de palavras devolve as interfaces cujo nome
+começa pelas palavras da tabela (`assembleias` → `AssembleiaFormData`). Mais de
+um candidato é reportado como ambíguo, nunca escolhido arbitrariamente.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .profiling import current
+
+_WORD_SPLIT_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z]|\d|\b|_)|[A-Z]?[a-z]+|[A-Z]+|\d+')
+
+# Palavras terminadas em 's' que já estão no singular
+_INVARIANT_WORDS = frozenset({
+    'status', 'bonus', 'gas', 'lapis', 'onibus', 'virus', 'atlas', 'pais', 'mais', 'apis',
+})
+
+# (sufixo do plural, sufixo do singular), do mais específico para o mais geral
+_PLURAL_RULES: Tuple[Tuple[str, str], ...] = (
+    ('oes', 'ao'),    # notificacoes → notificacao
+    ('ais', 'al'),    # habitacionais → habitacional
+    ('eis', 'el'),    # imoveis → imovel
+    ('ns', 'm'),      # mensagens → mensagem
+    ('ores', 'or'),   # conectores → conector
+    ('zes', 'z'),     # vezes → vez
+    ('ies', 'y'),     # policies → policy
+    ('s', ''),        # usuarios → usuario
+)
+
+
+def split_words(name: str) -> List[str]:
+    """Divide snake_case, camelCase e PascalCase em palavras minúsculas (FAQVoto → faq, voto)"""
+    words = []
+    for part in name.split('_'):
+        words.extend(w.lower() for w in _WORD_SPLIT_RE.findall(part))
+    return words
+
+
+def singularize(word: str) -> str:
+    """Singular aproximado em português/inglês, suficiente para nomes de tabelas"""
+    if len(word) <= 3 or word in _INVARIANT_WORDS or word.endswith('ss'):
+        return word
+    for plural, singular in _PLURAL_RULES:
+        if word.endswith(plural):
+            return word[:len(word) - len(plural)] + singular
+    return word
+
+
+def name_key(name: str) -> Tuple[str, ...]:
+    """Chave normalizada de um nome de tabela ou interface"""
+    return tuple(singularize(w) for w in split_words(name))
+
+
+class TableMatch(NamedTuple):
+    interface: Optional[str]        # interface escolhida (None se nenhuma ou ambígua)
+    candidates: Tuple[str, ...]     # todas as interfaces candidatas
+    via: str                        # 'exact', 'prefix', 'ambiguous' ou 'none'
+
+
+class _TrieNode:
+    __slots__ = ('children', 'names', '_subtree')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.names: List[str] = []
+        self._subtree: Optional[Tuple[str, ...]] = None
+
+    def subtree(self) -> Tuple[str, ...]:
+        """Nomes neste nó e abaixo dele (calculado uma vez)"""
+        if self._subtree is None:
+            names = list(self.names)
+            for word in sorted(self.children):
+                names.extend(self.children[word].subtree())
+            self._subtree = tuple(names)
+        return self._subtree
+
+
+class InterfaceIndex:
+    """Índice de interfaces por chave normalizada, com trie de palavras para prefixos"""
+
+    def __init__(self, interface_names: Iterable[str]):
+        self.by_key: Dict[Tuple[str, ...], List[str]] = {}
+        self.root = _TrieNode()
+        for name in sorted(interface_names):
+            key = name_key(name)
+            if not key:
+                continue
+            self.by_key.setdefault(key, []).append(name)
+            node = self.root
+            for word in key:
+                node = node.children.setdefault(word, _TrieNode())
+            node.names.append(name)
+
+    def _prefix_candidates(self, key: Tuple[str, ...]) -> Tuple[str, ...]:
+        node = self.root
+        for word in key:
+            node = node.children.get(word)
+            if node is None:
+                return ()
+        return node.subtree()
+
+    def resolve(self, table_name: str) -> TableMatch:
+        key = name_key(table_name)
+        exact = self.by_key.get(key)
+        if exact:
+            if len(exact) == 1:
+                return TableMatch(exact[0], (exact[0],), 'exact')
+            return TableMatch(None, tuple(exact), 'ambiguous')
+
+        candidates = self._prefix_candidates(key) if key else ()
+        if len(candidates) == 1:
+            return TableMatch(candidates[0], candidates, 'prefix')
+        if candidates:
+            return TableMatch(None, candidates, 'ambiguous')
+        return TableMatch(None, (), 'none')
+
+
+def match_tables(table_names: Iterable[str], interface_names: Iterable[str]) -> Dict[str, TableMatch]:
+    """Resolve cada tabela contra o índice de interfaces"""
+    index = InterfaceIndex(interface_names)
+    matches = {table: index.resolve(table) for table in table_names}
+    profiler = current()
+    for match in matches.values():
+        profiler.count(f"matches:{match.via}")
+    return matches
@@ -0,0 +1,488 @@
+"""
+Risco de lock e reescrita das migrations
+========================================
+Classifica cada comando de supabase/migrations/ pelo lock que adquire e por
+reescrever (ou varrer) a tabela inteira enquanto o segura:
+
+- CREATE INDEX sem CONCURRENTLY (SHARE: bloqueia escritas durante o build)
+- ADD COLUMN com DEFAULT volátil, SERIAL ou coluna gerada STORED (reescrita)
+- ALTER COLUMN TYPE (reescrita, exceto conversões binárias como varchar → text)
+- SET NOT NULL, ADD CONSTRAINT FOREIGN KEY / CHECK sem NOT VALID (varredura)
+- ADD CONSTRAINT UNIQUE / PRIMARY KEY sem USING INDEX (build sob ACCESS EXCLUSIVE)
+- DROP TABLE, TRUNCATE, VACUUM FULL, CLUSTER, REINDEX, UPDATE/DELETE sem WHERE
+
+Comandos sobre tabelas criadas na própria migration são de baixo risco (a
+tabela ainda está vazia). Comandos em blocos DO $$ ... $$ também são avaliados.
+O parse de cada arquivo é independente (cacheável); o tipo anterior das colunas
+em ALTER COLUMN TYPE vem dos snapshots do replay.
+"""
+
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from .lines import LineIndex
+from .model import Tables, column_type
+from .parallel import parse_files
+from .replay import MigrationReplay
+from .sql_schema import TABLE_CONSTRAINT_KEYWORDS
+from .sql_tokenizer import DOLLAR, WORD, Token, TokenCursor, classify, split_statements
+
+# Incrementar quando a saída de parse_migration_risks mudar (invalida o cache de parse)
+PARSER_VERSION = 1
+
+LOW, MEDIUM, HIGH = 0, 1, 2
+RISK_LEVELS = ('LOW', 'MEDIUM', 'HIGH')
+
+# Locks do PostgreSQL, do mais fraco ao mais forte (os relevantes para DDL)
+ROW_EXCLUSIVE = 'ROW EXCLUSIVE'
+SHARE_UPDATE_EXCLUSIVE = 'SHARE UPDATE EXCLUSIVE'
+SHARE = 'SHARE'
+SHARE_ROW_EXCLUSIVE = 'SHARE ROW EXCLUSIVE'
+ACCESS_EXCLUSIVE = 'ACCESS EXCLUSIVE'
+
+# Funções voláteis: como DEFAULT de ADD COLUMN, forçam a reescrita da tabela
+# (now()/current_timestamp são STABLE e não reescrevem desde o PostgreSQL 11)
+VOLATILE_FUNCTIONS = frozenset({
+    'gen_random_uuid', 'uuid_generate_v4', 'uuid_generate_v1', 'random', 'clock_timestamp',
+    'timeofday', 'nextval', 'txid_current', 'gen_random_bytes',
+})
+_SERIAL_TYPES = frozenset({'serial', 'bigserial', 'smallserial', 'serial4', 'serial8', 'serial2'})
+
+
+class StatementRisk(NamedTuple):
+    line: int
+    table: Optional[str]
+    action: str                     # ex.: 'CREATE INDEX idx_x', 'ALTER COLUMN status TYPE text'
+    lock: str
+    rewrite: bool                   # reescreve ou varre a tabela inteira sob o lock
+    risk: int                       # LOW / MEDIUM / HIGH
+    advice: str = ''
+    new_table: bool = False         # tabela criada antes, na mesma migration
+    column: Optional[str] = None    # ALTER COLUMN TYPE: coluna e tipo novo (refinados na análise)
+    new_type: Optional[str] = None
+
+    @property
+    def level(self) -> str:
+        return RISK_LEVELS[self.risk]
+
+
+class MigrationRisk(NamedTuple):
+    migration: str
+    statements: List[StatementRisk]
+    lock_timeout: bool              # a migration define lock_timeout antes dos comandos
+
+    @property
+    def risk(self) -> int:
+        return max((s.risk for s in self.statements), default=LOW)
+
+    @property
+    def level(self) -> str:
+        return RISK_LEVELS[self.risk]
+
+
+def _is_public(schema: Optional[str]) -> bool:
+    return schema is None or schema == 'public'
+
+
+def _source_text(cur: TokenCursor, source: str) -> str:
+    start, end = cur.span()
+    return ' '.join(source[start:end].split())
+
+
+class _MigrationScanner:
+    """Estado do parse de um arquivo: tabelas criadas nele e riscos encontrados"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self.lines = LineIndex(source)
+        self.created: Set[str] = set()
+        self.risks: List[StatementRisk] = []
+        self.lock_timeout = False
+
+    def add(self, line: int, table: Optional[str], action: str, lock: str, rewrite: bool,
+            risk: int, advice: str = '', **extra) -> None:
+        self.risks.append(StatementRisk(line, table, action, lock, rewrite, risk, advice,
+                                        table in self.created, **extra))
+
+    # Comandos
+
+    def scan(self, source: str, base_line: Optional[int] = None) -> None:
+        for stmt in split_statements(source):
+            line = base_line if base_line is not None else self.lines.line_of(stmt.start)
+            tokens = stmt.tokens
+            if base_line is not None:
+                # Dentro de DO $$: o comando pode vir após IF ... THEN / BEGIN
+                for i, tok in enumerate(tokens):
+                    if tok.kind == WORD and tok.value in _STATEMENT_VERBS:
+                        tokens = tokens[i:]
+                        break
+                else:
+                    continue
+            self.statement(tokens, source, line)
+
+    def statement(self, tokens: List[Token], source: str, line: int) -> None:
+        kind = classify(tokens)
+        handler = _HANDLERS.get(kind)
+        if handler is not None:
+            handler(self, TokenCursor(tokens), source, line)
+        elif kind == 'do':
+            for tok in tokens:
+                if tok.kind == DOLLAR:
+                    self.scan(tok.value, line)
+
+    def create_table(self, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('create')
+        cur.skip_words(('temp', 'temporary', 'unlogged', 'global', 'local'))
+        cur.accept('table')
+        cur.accept('if', 'not', 'exists')
+        schema, table = cur.qualified_name()
+        if table and _is_public(schema):
+            self.created.add(table)
+
+    def create_index(self, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('create')
+        unique = cur.accept('unique')
+        cur.accept('index')
+        concurrently = cur.accept('concurrently')
+        cur.accept('if', 'not', 'exists')
+        name = None if cur.peek() is not None and cur.peek().is_word('on') else cur.name()
+        if not cur.accept('on'):
+            return
+        cur.accept('only')
+        schema, table = cur.qualified_name()
+        if not _is_public(schema):
+            return
+        action = f"CREATE {'UNIQUE ' if unique else ''}INDEX {name or ''}".rstrip()
+        if concurrently:
+            self.add(line, table, action + ' CONCURRENTLY', SHARE_UPDATE_EXCLUSIVE, False, LOW)
+        else:
+            self.add(line, table, action, SHARE, True, HIGH,
+                     "Usar CREATE INDEX CONCURRENTLY (fora de transação) para não bloquear escritas")
+
+    def drop_index(self, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('drop', 'index')
+        concurrently = cur.accept('concurrently')
+        cur.accept('if', 'exists')
+        for part in cur.split():
+            schema, name = part.qualified_name()
+            if not name or not _is_public(schema):
+                continue
+            if concurrently:
+                self.add(line, None, f"DROP INDEX CONCURRENTLY {name}", SHARE_UPDATE_EXCLUSIVE, False, LOW)
+            else:
+                self.add(line, None, f"DROP INDEX {name}", ACCESS_EXCLUSIVE, False, MEDIUM,
+                         "Usar DROP INDEX CONCURRENTLY para não enfileirar leituras atrás do lock")
+
+    def drop_table(self, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('drop', 'table')
+        cur.accept('if', 'exists')
+        for part in cur.split():
+            schema, table = part.qualified_name()
+            if table and _is_public(schema):
+                self.add(line, table, f"DROP TABLE {table}", ACCESS_EXCLUSIVE, False, HIGH,
+                         "Remover o uso no código em um deploy anterior; o DROP apaga os dados")
+
+    def truncate(self, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('truncate')
+        cur.accept('table')
+        cur.accept('only')
+        for part in cur.split():
+            schema, table = part.qualified_name()
+            if table and _is_public(schema):
+                self.add(line, table, f"TRUNCATE {table}", ACCESS_EXCLUSIVE, True, HIGH)
+
+    def maintenance(self, cur: TokenCursor, source: str, line: int) -> None:
+        """VACUUM FULL, CLUSTER, REINDEX (sem CONCURRENTLY)"""
+        verb = cur.next().value
+        options = set()
+        while not cur.at_end() and cur.peek().is_word(*_MAINTENANCE_OPTIONS):
+            options.add(cur.next().value)
+        if verb == 'vacuum' and 'full' not in options:
+            return
+        _, table = cur.qualified_name()
+        action = f"{verb.upper()}{' FULL' if 'full' in options else ''}"
+        if 'concurrently' in options:
+            self.add(line, table, action + ' CONCURRENTLY', SHARE_UPDATE_EXCLUSIVE, False, LOW)
+        else:
+            self.add(line, table, action, ACCESS_EXCLUSIVE, True, HIGH,
+                     "Executar fora das migrations, em janela de manutenção")
+
+    def dml(self, cur: TokenCursor, source: str, line: int) -> None:
+        """UPDATE/DELETE em migration (backfill): sem WHERE, varre e reescreve todas as linhas"""
+        verb = cur.next().value
+        if verb == 'delete' and not cur.accept('from'):
+            return
+        cur.accept('only')
+        schema, table = cur.qualified_name()
+        if not table or not _is_public(schema):
+            return
+        has_where = any(tok.is_word('where') for tok in cur.remaining())
+        if has_where:
+            self.add(line, table, f"{verb.upper()} {table} ... WHERE", ROW_EXCLUSIVE, False, LOW)
+        else:
+            self.add(line, table, f"{verb.upper()} {table} (todas as linhas)", ROW_EXCLUSIVE, True, MEDIUM,
+                     "Fazer o backfill em lotes fora da migration (gera bloat e trava linhas)")
+
+    def create_trigger(self, cur: TokenCursor, source: str, line: int) -> None:
+        remaining = cur.remaining()
+        for i, tok in enumerate(remaining):
+            if tok.is_word('on'):
+                schema, table = TokenCursor(remaining, i + 1).qualified_name()
+                if table and _is_public(schema):
+                    self.add(line, table, "CREATE TRIGGER", SHARE_ROW_EXCLUSIVE, False, LOW)
+                return
+
+    def policy(self, cur: TokenCursor, source: str, line: int) -> None:
+        verb = cur.next().value
+        cur.accept('policy')
+        cur.accept('if', 'exists')
+        cur.name()
+        if cur.accept('on'):
+            schema, table = cur.qualified_name()
+            if table and _is_public(schema):
+                self.add(line, table, f"{verb.upper()} POLICY", ACCESS_EXCLUSIVE, False, LOW)
+
+    def set(self, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('set')
+        cur.skip_words(('local', 'session'))
+        if cur.accept('lock_timeout'):
+            self.lock_timeout = True
+
+    def alter_table(self, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('alter', 'table')
+        cur.accept('if', 'exists')
+        cur.accept('only')
+        schema, table = cur.qualified_name()
+        if table is None or not _is_public(schema):
+            return
+        for action in cur.split():
+            self.alter_action(table, action, source, line)
+
+    def alter_action(self, table: str, cur: TokenCursor, source: str, line: int) -> None:
+        if cur.accept('add'):
+            first = cur.peek()
+            if first is not None and first.kind == WORD and first.value in TABLE_CONSTRAINT_KEYWORDS:
+                self.add_constraint(table, cur, line)
+            else:
+                self.add_column(table, cur, source, line)
+        elif cur.accept('alter'):
+            cur.accept('column')
+            column = cur.name()
+            if cur.accept('type') or cur.accept('set', 'data', 'type'):
+                new_type = _source_text(TokenCursor(cur.tokens, cur.pos, _type_end(cur)), source)
+                self.add(line, table, f"ALTER COLUMN {column} TYPE {new_type}", ACCESS_EXCLUSIVE, True, HIGH,
+                         "Criar coluna nova, copiar em lotes e trocar; ou garantir conversão binária",
+                         column=column, new_type=new_type)
+            elif cur.accept('set', 'not', 'null'):
+                self.add(line, table, f"ALTER COLUMN {column} SET NOT NULL", ACCESS_EXCLUSIVE, True, HIGH,
+                         f"Adicionar CHECK ({column} IS NOT NULL) NOT VALID, VALIDATE CONSTRAINT e depois "
+                         "SET NOT NULL (PostgreSQL 12+ não varre de novo)")
+            else:
+                self.add(line, table, f"ALTER COLUMN {column}", ACCESS_EXCLUSIVE, False, LOW)
+        elif cur.accept('drop'):
+            if cur.accept('constraint'):
+                self.add(line, table, "DROP CONSTRAINT", ACCESS_EXCLUSIVE, False, LOW)
+            else:
+                cur.accept('column')
+                cur.accept('if', 'exists')
+                column = cur.name()
+                self.add(line, table, f"DROP COLUMN {column}", ACCESS_EXCLUSIVE, False, MEDIUM,
+                         "Remover o uso da coluna no código num deploy anterior")
+        elif cur.accept('rename'):
+            if cur.accept('to'):
+                target = f"TO {cur.name()}"
+            else:
+                cur.accept('column')
+                cur.accept('constraint')
+                target = cur.name() or ''
+            self.add(line, table, f"RENAME {target}".rstrip(), ACCESS_EXCLUSIVE, False, MEDIUM,
+                     "Quebra clientes já publicados que usam o nome antigo")
+        elif cur.accept('validate', 'constraint'):
+            self.add(line, table, "VALIDATE CONSTRAINT", SHARE_UPDATE_EXCLUSIVE, False, LOW)
+        elif cur.accept('set'):
+            if cur.accept('logged') or cur.accept('unlogged') or cur.accept('tablespace'):
+                self.add(line, table, "SET LOGGED/UNLOGGED/TABLESPACE", ACCESS_EXCLUSIVE, True, HIGH)
+            elif cur.accept('without', 'oids'):
+                self.add(line, table, "SET WITHOUT OIDS", ACCESS_EXCLUSIVE, True, HIGH)
+            else:
+                self.add(line, table, "SET", ACCESS_EXCLUSIVE, False, LOW)
+        else:
+            # ENABLE ROW LEVEL SECURITY, ENABLE/DISABLE TRIGGER, OWNER TO ...
+            first = cur.peek()
+            self.add(line, table, (first.value.upper() if first is not None else 'ALTER TABLE'),
+                     ACCESS_EXCLUSIVE, False, LOW)
+
+    def add_column(self, table: str, cur: TokenCursor, source: str, line: int) -> None:
+        cur.accept('column')
+        cur.accept('if', 'not', 'exists')
+        column = cur.name()
+        type_token = cur.peek()
+        rest = cur.remaining()
+        words = {tok.value for tok in rest if tok.kind == WORD}
+        action = f"ADD COLUMN {column}"
+
+        if type_token is not None and type_token.is_word(*_SERIAL_TYPES):
+            self.add(line, table, action + f" {type_token.value.upper()}", ACCESS_EXCLUSIVE, True, HIGH,
+                     "SERIAL preenche todas as linhas com nextval(): usar IDENTITY em tabela nova ou "
+                     "adicionar a coluna sem default e preencher em lotes")
+            return
+        if 'generated' in words and 'stored' in words:
+            self.add(line, table, action + " GENERATED ... STORED", ACCESS_EXCLUSIVE, True, HIGH,
+                     "Coluna gerada STORED reescreve a tabela")
+            return
+        default = _default_expression(rest)
+        volatile = [tok.value for i, tok in enumerate(default) if tok.kind == WORD
+                    and tok.value in VOLATILE_FUNCTIONS and i + 1 < len(default) and default[i + 1].is_punct('(')]
+        if volatile:
+            self.add(line, table, action + f" DEFAULT {volatile[0]}()", ACCESS_EXCLUSIVE, True, HIGH,
+                     "DEFAULT volátil reescreve a tabela: adicionar sem default, preencher em lotes e "
+                     "depois SET DEFAULT")
+        elif 'primary' in words or 'unique' in words:
+            self.add(line, table, action + " UNIQUE/PRIMARY KEY", ACCESS_EXCLUSIVE, True, HIGH,
+                     "Criar o índice único com CONCURRENTLY e usar ADD CONSTRAINT ... USING INDEX")
+        elif 'references' in words:
+            self.add(line, table, action + " REFERENCES", SHARE_ROW_EXCLUSIVE, False, MEDIUM,
+                     "Bloqueia escritas também na tabela referenciada durante o ALTER")
+        elif 'check' in words:
+            self.add(line, table, action + " CHECK", ACCESS_EXCLUSIVE, True, MEDIUM,
+                     "A restrição é verificada em todas as linhas existentes")
+        else:
+            self.add(line, table, action, ACCESS_EXCLUSIVE, False, LOW)
+
+    def add_constraint(self, table: str, cur: TokenCursor, line: int) -> None:
+        if cur.accept('constraint'):
+            cur.name()
+        words = [tok.value for tok in cur.remaining() if tok.kind == WORD]
+        not_valid = any(a == 'not' and b == 'valid' for a, b in zip(words, words[1:]))
+        if cur.accept('foreign', 'key'):
+            if not_valid:
+                self.add(line, table, "ADD FOREIGN KEY NOT VALID", SHARE_ROW_EXCLUSIVE, False, LOW)
+            else:
+                self.add(line, table, "ADD FOREIGN KEY", SHARE_ROW_EXCLUSIVE, True, HIGH,
+                         "Usar NOT VALID e VALIDATE CONSTRAINT num comando separado")
+        elif cur.accept('check'):
+            if not_valid:
+                self.add(line, table, "ADD CHECK NOT VALID", ACCESS_EXCLUSIVE, False, LOW)
+            else:
+                self.add(line, table, "ADD CHECK", ACCESS_EXCLUSIVE, True, HIGH,
+                         "Usar NOT VALID e VALIDATE CONSTRAINT num comando separado")
+        elif cur.accept('unique') or cur.accept('primary', 'key') or cur.accept('exclude'):
+            if 'using' in words and 'index' in words:
+                self.add(line, table, "ADD CONSTRAINT ... USING INDEX", ACCESS_EXCLUSIVE, False, LOW)
+            else:
+                self.add(line, table, "ADD UNIQUE/PRIMARY KEY", ACCESS_EXCLUSIVE, True, HIGH,
+                         "Criar o índice com CONCURRENTLY e usar ADD CONSTRAINT ... USING INDEX")
+
+
+def _type_end(cur: TokenCursor) -> int:
+    """Fim do tipo em ALTER COLUMN ... TYPE: até USING / COLLATE"""
+    for i in range(cur.pos, cur.end):
+        if cur.tokens[i].is_word('using', 'collate'):
+            return i
+    return cur.end
+
+
+def _default_expression(tokens: List[Token]) -> List[Token]:
+    """Tokens da expressão após DEFAULT, até a próxima restrição de coluna"""
+    for i, tok in enumerate(tokens):
+        if tok.is_word('default'):
+            end = i + 1
+            depth = 0
+            while end < len(tokens):
+                t = tokens[end]
+                if t.is_punct('('):
+                    depth += 1
+                elif t.is_punct(')'):
+                    depth -= 1
+                elif depth == 0 and t.is_word('not', 'null', 'constraint', 'check', 'references',
+                                              'unique', 'primary', 'generated', 'collate'):
+                    break
+                end += 1
+            return tokens[i + 1:end]
+    return []
+
+
+_MAINTENANCE_OPTIONS = ('full', 'verbose', 'analyze', 'freeze', 'table', 'index', 'concurrently')
+
+_STATEMENT_VERBS = frozenset({
+    'create', 'alter', 'drop', 'truncate', 'vacuum', 'cluster', 'reindex', 'update', 'delete', 'set',
+})
+
+_HANDLERS = {
+    'create table': _MigrationScanner.create_table,
+    'alter table': _MigrationScanner.alter_table,
+    'drop table': _MigrationScanner.drop_table,
+    'create index': _MigrationScanner.create_index,
+    'drop index': _MigrationScanner.drop_index,
+    'create trigger': _MigrationScanner.create_trigger,
+    'create policy': _MigrationScanner.policy,
+    'drop policy': _MigrationScanner.policy,
+    'truncate': _MigrationScanner.truncate,
+    'vacuum': _MigrationScanner.maintenance,
+    'cluster': _MigrationScanner.maintenance,
+    'reindex': _MigrationScanner.maintenance,
+    'update': _MigrationScanner.dml,
+    'delete': _MigrationScanner.dml,
+    'set': _MigrationScanner.set,
+}
+
+
+def parse_migration_risks(content: str) -> Dict:
+    """Riscos de cada comando da migration: {'statements': [...], 'lock_timeout': bool}"""
+    scanner = _MigrationScanner(content)
+    scanner.scan(content)
+    return {'statements': scanner.risks, 'lock_timeout': scanner.lock_timeout}
+
+
+def _type_parts(type_text: str):
+    """('varchar', (255,)) para 'VARCHAR(255)'; modificadores ausentes = ()"""
+    text = type_text.lower().replace('character varying', 'varchar').replace('public.', '')
+    base, _, mods = text.partition('(')
+    numbers = tuple(int(m) for m in mods.rstrip(')').replace(' ', '').split(',') if m.isdigit())
+    return base.strip(), numbers
+
+
+def is_binary_coercible(old_type: str, new_type: str) -> bool:
+    """Conversões que o PostgreSQL faz sem reescrever a tabela"""
+    old_base, old_mods = _type_parts(old_type)
+    new_base, new_mods = _type_parts(new_type)
+    if old_base in ('varchar', 'text') and new_base == 'text':
+        return True
+    if old_base == new_base == 'varchar':
+        return not new_mods or old_mods and new_mods[0] >= old_mods[0]
+    if old_base == new_base in ('numeric', 'decimal'):
+        # Aumentar a precisão mantendo a escala não reescreve
+        return not new_mods or len(old_mods) == len(new_mods) == 2 \
+            and new_mods[0] >= old_mods[0] and new_mods[1] == old_mods[1]
+    return old_base == new_base and old_mods == new_mods
+
+
+def _refine(risk: StatementRisk, previous_tables: Tables) -> StatementRisk:
+    """Ajusta o risco com o schema anterior à migration"""
+    if risk.new_table:
+        return risk._replace(risk=LOW, rewrite=False, advice='Tabela criada nesta migration (vazia)')
+    if risk.new_type is not None:
+        old = column_type(previous_tables.get(risk.table, {}).get(risk.column))
+        if old and is_binary_coercible(old, risk.new_type):
+            return risk._replace(rewrite=False, risk=LOW, advice=f"Conversão binária de {old} (sem reescrita)")
+    return risk
+
+
+def analyze_migrations(migrations_dir: Path, cache=None, jobs: Optional[int] = 1,
+                       replay: Optional[MigrationReplay] = None) -> List[MigrationRisk]:
+    """Relatório de risco por migration, em ordem de aplicação"""
+    sql_files = sorted(migrations_dir.glob("*.sql"))
+    if replay is None:
+        replay = MigrationReplay.from_directory(migrations_dir, cache, jobs)
+    scans = parse_files(sql_files, 'migration_risk', PARSER_VERSION, parse_migration_risks, cache, jobs)
+    report = []
+    # Schema anterior a cada migration, atualizado no lugar em vez de remontar cada snapshot
+    for (_, previous), sql_file, scan in zip(replay.iter_tables(), sql_files, scans):
+        statements = [_refine(risk, previous) for risk in scan['statements']]
+        report.append(MigrationRisk(sql_file.name, statements, scan['lock_timeout']))
+    return report
+
+
+def risk_level(name: str) -> int:
+    """Nível a partir do nome ('low', 'MEDIUM', ...)"""
+    return RISK_LEVELS.index(name.upper())
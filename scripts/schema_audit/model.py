@@ -0,0 +1,77 @@
+"""
+Modelo compacto do schema
+=========================
+Registros imutáveis e com slots para colunas das migrations e propriedades das
+interfaces TypeScript, no lugar de um dicionário por coluna:
+
+- Column: tipo, nullable e a posição da definição no arquivo de origem
+  (offsets), em vez de uma cópia do texto (`full_def`); o texto é lido do
+  arquivo só quando alguém pede (column_definition, column_line).
+- Property: tipo e opcionalidade de uma propriedade TypeScript.
+
+Nomes de tabelas, colunas, tipos e valores de ENUM passam por sys.intern: o
+mesmo 'uuid' ou 'created_at' de milhares de colunas vira um único objeto, e as
+comparações por igualdade começam pela identidade.
+"""
+
+import sys
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional
+
+from .lines import LineIndex
+
+intern = sys.intern
+
+# Arquivos de origem mantidos em memória ao ler definições (colunas vêm em ordem de migration)
+_SOURCE_CACHE_SIZE = 32
+
+
+class Column(NamedTuple):
+    type: str
+    nullable: bool
+    start: int = 0          # offsets da definição no arquivo de origem
+    end: int = 0
+    source: str = ''        # caminho da migration (vazio quando o texto não veio de um arquivo)
+    has_default: bool = False   # DEFAULT, serial, identidade ou coluna gerada: o INSERT pode omitir
+
+
+class Property(NamedTuple):
+    type: str
+    optional: bool
+
+
+Columns = Dict[str, Column]
+Tables = Dict[str, Columns]
+
+
+@lru_cache(maxsize=_SOURCE_CACHE_SIZE)
+def _source_text(path: str) -> str:
+    try:
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return ''
+
+
+def column_definition(column: Optional[Column]) -> str:
+    """Texto da definição da coluna (`valor NUMERIC CHECK (valor >= 0)`), lido do arquivo de origem"""
+    if column is None or not column.source or column.end <= column.start:
+        return ''
+    return _source_text(column.source)[column.start:column.end]
+
+
+@lru_cache(maxsize=_SOURCE_CACHE_SIZE)
+def _source_lines(path: str) -> LineIndex:
+    return LineIndex(_source_text(path))
+
+
+def column_line(column: Optional[Column]) -> int:
+    """Linha (1-based) da definição da coluna no arquivo de origem, ou 0 se desconhecida"""
+    if column is None or not column.source:
+        return 0
+    return _source_lines(column.source).line_of(column.start)
+
+
+def column_type(column: Optional[Column]) -> Optional[str]:
+    """Tipo da coluna, ou None para coluna inexistente"""
+    return None if column is None else column.type
@@ -0,0 +1,326 @@
+"""
+Importação de dumps `pg_dump --schema-only`
+===========================================
+Lê o schema que o banco realmente tem (exportado com `pg_dump --schema-only`)
+para o mesmo modelo que o replay das migrations produz (Tables de model.Column e
+um EnumCatalog), para comparar migrations × banco real × tipos TypeScript.
+
+O dump não é lido inteiro para a memória: o arquivo é mapeado (mmap) e um
+varredor de bytes separa os comandos em ';' fora de strings, identificadores
+entre aspas, corpos $tag$ e comentários, e as linhas de meta-comandos do psql
+(\\connect, \\restrict). Só um comando por vez é decodificado e passa pelos
+parsers das migrations (sql_schema, replay, enums); as posições das colunas são
+offsets de caractere no arquivo, como nas migrations.
+
+O pg_dump escreve os tipos na forma canônica do Postgres (`character varying`,
+`timestamp with time zone`, `public.status`); canonical_type leva os dois lados
+a essa forma antes de comparar. write_dump faz o caminho inverso, gerando um
+dump no formato do pg_dump a partir de um modelo de schema, para testes sem um
+Postgres local.
+"""
+
+import mmap
+import re
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from .enums import EnumCatalog, parse_enum_operations
+from .model import Tables, intern
+from .profiling import current
+from .replay import Operation, _is_public, _SchemaBuilder, apply_operations, parse_migration
+from .sql_tokenizer import Token, TokenCursor, classify, tokenize
+
+# Trecho sem nenhum byte que mude o estado do varredor
+_PLAIN_RE = re.compile(rb"[^'\"$;\-/\\]+")
+_DOLLAR_TAG_RE = re.compile(rb"\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$")
+_COMMENT_DELIM_RE = re.compile(rb"/\*|\*/")
+_ESCAPE_DELIM_RE = re.compile(rb"[\\']")
+_WORD_BYTES = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_') | frozenset(range(0x80, 0x100))
+
+# Comandos que alteram tabelas ou ENUMs (os demais são só classificados)
+_TABLE_STATEMENTS = frozenset({'create table', 'alter table', 'drop table'})
+_ENUM_STATEMENTS = frozenset({'create type', 'alter type', 'drop type'})
+# Tokens que bastam para classificar e achar o schema (CREATE UNLOGGED TABLE IF NOT EXISTS public.x)
+_CLASSIFY_TOKENS = 12
+
+# Sinônimos → nome canônico (format_type do Postgres, como o pg_dump escreve)
+_TYPE_ALIASES = {
+    'varchar': 'character varying', 'char': 'character', 'bpchar': 'character',
+    'int': 'integer', 'int4': 'integer', 'serial': 'integer', 'serial4': 'integer',
+    'int8': 'bigint', 'bigserial': 'bigint', 'serial8': 'bigint',
+    'int2': 'smallint', 'smallserial': 'smallint', 'serial2': 'smallint',
+    'float': 'double precision', 'float8': 'double precision', 'float4': 'real',
+    'bool': 'boolean', 'decimal': 'numeric', 'varbit': 'bit varying',
+    'timestamptz': 'timestamp with time zone', 'timestamp': 'timestamp without time zone',
+    'timetz': 'time with time zone', 'time': 'time without time zone',
+}
+_TYPE_RE = re.compile(r"""
+    (?:[a-z_][a-z0-9_$]*\.)?                # schema (public., extensions., pg_catalog.)
+    (?P<base>[a-z_][a-z0-9_$]*(?:\ [a-z_][a-z0-9_$]*)*?)
+    (?P<modifiers>\([^()]*\))?
+    (?:\ (?P<zone>with(?:out)?\ time\ zone))?
+    (?P<array>(?:\[\d*\])+|\ array)?
+""", re.VERBOSE)
+
+# Diferença entre migrations e banco: (tipo, local, descrição), como nas demais auditorias
+Drift = Tuple[str, str, str]
+
+
+class SchemaDump(NamedTuple):
+    path: str
+    tables: Tables
+    enums: EnumCatalog
+    statements: int
+
+
+def iter_segments(buf) -> Iterator[Tuple[int, int, bool]]:
+    """(início, fim, é SQL) em bytes; os trechos são contíguos e cobrem o buffer inteiro
+
+    Cada trecho SQL termina logo após um ';' de nível zero (ou no fim do buffer);
+    linhas de meta-comandos do psql (que começam com '\\') saem como trechos à
+    parte, com `é SQL` falso.
+    """
+    n = len(buf)
+    start = i = 0
+    plain = _PLAIN_RE.match
+    while i < n:
+        m = plain(buf, i)
+        if m is not None:
+            i = m.end()
+            continue
+        c = buf[i]
+        if c == 0x3B:                                   # ;
+            i += 1
+            yield start, i, True
+            start = i
+        elif c == 0x27:                                 # '
+            escape = i > 0 and buf[i - 1] in b'Ee' and not (i > 1 and buf[i - 2] in _WORD_BYTES)
+            i = _skip_escape_string(buf, i + 1) if escape else _skip_to(buf, b"'", i + 1)
+        elif c == 0x22:                                 # "
+            i = _skip_to(buf, b'"', i + 1)
+        elif c == 0x24:                                 # $
+            tag = _DOLLAR_TAG_RE.match(buf, i)
+            if tag is None or i > 0 and buf[i - 1] in _WORD_BYTES:
+                i += 1
+            else:
+                i = _skip_to(buf, tag.group(), tag.end())
+        elif c == 0x2D:                                 # -
+            i = _skip_to(buf, b'\n', i + 2) if buf[i + 1:i + 2] == b'-' else i + 1
+        elif c == 0x2F:                                 # /
+            i = _skip_block_comment(buf, i) if buf[i + 1:i + 2] == b'*' else i + 1
+        elif i == 0 or buf[i - 1] == 0x0A:              # \ no início da linha: meta-comando do psql
+            if start < i:
+                yield start, i, True
+            start, i = i, _skip_to(buf, b'\n', i)
+            yield start, i, False
+            start = i
+        else:
+            i += 1
+    if start < n:
+        yield start, n, True
+
+
+def _skip_to(buf, delimiter: bytes, pos: int) -> int:
+    """Posição logo após a próxima ocorrência do delimitador (fim do buffer se não houver)"""
+    k = buf.find(delimiter, pos)
+    return len(buf) if k < 0 else k + len(delimiter)
+
+
+def _skip_escape_string(buf, pos: int) -> int:
+    """Fim de um literal E'...' a partir do conteúdo (aceita \\' além de '')"""
+    while True:
+        m = _ESCAPE_DELIM_RE.search(buf, pos)
+        if m is None:
+            return len(buf)
+        if m.group() == b'\\':
+            pos = m.end() + 1
+        elif buf[m.end():m.end() + 1] == b"'":
+            pos = m.end() + 1
+        else:
+            return m.end()
+
+
+def _skip_block_comment(buf, pos: int) -> int:
+    """Fim de um comentário /* ... */ (o Postgres permite aninhamento)"""
+    depth = 1
+    pos += 2
+    while depth:
+        m = _COMMENT_DELIM_RE.search(buf, pos)
+        if m is None:
+            return len(buf)
+        depth += 1 if m.group() == b'/*' else -1
+        pos = m.end()
+    return pos
+
+
+def _shift(ops: List[Operation], offset: int) -> List[Operation]:
+    """Operações com as posições das colunas relativas ao arquivo, não ao comando"""
+    if not offset:
+        return ops
+    shifted = []
+    for op in ops:
+        if op[0] == 'create_table':
+            columns = {name: column._replace(start=column.start + offset, end=column.end + offset)
+                       for name, column in op[2].items()}
+            op = op[:2] + (columns,) + op[3:]
+        elif op[0] == 'add_column':
+            column = op[3]
+            op = op[:3] + (column._replace(start=column.start + offset, end=column.end + offset),) + op[4:]
+        shifted.append(op)
+    return shifted
+
+
+def _table_schema(tokens: List[Token]) -> Optional[str]:
+    """Schema da tabela de um CREATE TABLE (None se não qualificada)"""
+    cur = TokenCursor(tokens)
+    while not cur.at_end() and not cur.accept('table'):
+        cur.next()
+    cur.accept('if', 'not', 'exists')
+    return cur.qualified_name()[0]
+
+
+def load_pg_dump(path: Path) -> SchemaDump:
+    """Tabelas e ENUMs do schema public de um dump `pg_dump --schema-only` (formato texto)
+
+    A memória usada é a do modelo resultante mais um comando por vez,
+    independentemente do tamanho do arquivo.
+    """
+    source = intern(str(path))
+    builder = _SchemaBuilder()
+    catalog = EnumCatalog()
+    statements = 0
+    char_base = 0
+    with open(path, 'rb') as f:
+        # mmap não aceita arquivo vazio
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if f.seek(0, 2) else b''
+        try:
+            for start, end, is_sql in iter_segments(buf):
+                text = buf[start:end].decode('utf-8', 'replace')
+                if is_sql:
+                    statements += _apply_segment(builder, catalog, text, char_base, source)
+                char_base += len(text)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+    current().count('dump_statements', statements)
+    tables = {name: columns for name, columns in builder.tables.items() if columns}
+    return SchemaDump(source, tables, catalog, statements)
+
+
+def _apply_segment(builder: _SchemaBuilder, catalog: EnumCatalog, text: str, char_base: int, source: str) -> bool:
+    """Aplica ao modelo o comando de um trecho do dump; retorna False se o trecho não tem comando"""
+    # Os primeiros tokens bastam para classificar; só comandos de tabela/ENUM são tokenizados inteiros
+    head = list(islice(tokenize(text), _CLASSIFY_TOKENS))
+    if not head:
+        return False
+    kind = classify(head)
+    if kind in _TABLE_STATEMENTS:
+        if kind == 'create table' and not _is_public(_table_schema(head)):
+            return True     # auth.users, storage.objects ... (o replay já filtra ALTER/DROP)
+        apply_operations(builder, _shift(parse_migration(text), char_base), source)
+    elif kind in _ENUM_STATEMENTS:
+        catalog.apply(source, parse_enum_operations(text))
+    return True
+
+
+def canonical_type(type_text: str) -> str:
+    """Tipo como o pg_dump o escreve (VARCHAR(255) → character varying(255), TIMESTAMPTZ → timestamp with time zone)"""
+    text = type_text.replace('"', '').lower()
+    text = ' '.join(re.sub(r'\s*([(,\[])\s*|\s*([)\]])', lambda m: m.group(1) or m.group(2), text).split())
+    m = _TYPE_RE.fullmatch(text)
+    if m is None:
+        return text
+    base, modifiers, zone = m.group('base'), m.group('modifiers') or '', m.group('zone')
+    # O Postgres ignora as dimensões declaradas: o pg_dump escreve sempre um único []
+    array = '[]' if m.group('array') else ''
+    if zone:
+        return f"{base}{modifiers} {zone}{array}"
+    canonical = _TYPE_ALIASES.get(base, base)
+    if modifiers and canonical.startswith(('timestamp ', 'time ')):
+        word, rest = canonical.split(' ', 1)
+        return f"{word}{modifiers} {rest}{array}"
+    return f"{canonical}{modifiers}{array}"
+
+
+def diff_schema(migrations: Tables, database: Tables) -> List[Drift]:
+    """Diferenças entre o schema das migrations e o do banco, como (tipo, local, descrição)"""
+    drift = []
+    for table in sorted(migrations.keys() - database.keys()):
+        drift.append(('MISSING_IN_DATABASE', table, "Tabela criada nas migrations não existe no banco"))
+    for table in sorted(database.keys() - migrations.keys()):
+        drift.append(('MISSING_IN_MIGRATIONS', table, "Tabela existe no banco mas em nenhuma migration"))
+
+    for table in sorted(migrations.keys() & database.keys()):
+        expected, actual = migrations[table], database[table]
+        for col in (c for c in expected if c not in actual):
+            drift.append(('MISSING_IN_DATABASE', f"{table}.{col}", "Coluna das migrations não existe no banco"))
+        for col in (c for c in actual if c not in expected):
+            drift.append(('MISSING_IN_MIGRATIONS', f"{table}.{col}", "Coluna existe no banco mas em nenhuma migration"))
+        for col in (c for c in expected if c in actual):
+            a, b = expected[col], actual[col]
+            if canonical_type(a.type) != canonical_type(b.type):
+                drift.append(('TYPE_DRIFT', f"{table}.{col}", f"Migrations: {a.type} → banco: {b.type}"))
+            if a.nullable != b.nullable:
+                drift.append(('NULLABLE_DRIFT', f"{table}.{col}",
+                              f"Migrations: {'NULL' if a.nullable else 'NOT NULL'} → "
+                              f"banco: {'NULL' if b.nullable else 'NOT NULL'}"))
+    return drift
+
+
+def diff_enums(migrations: EnumCatalog, database: EnumCatalog) -> List[Drift]:
+    """Diferenças de ENUMs (existência e valores) entre migrations e banco"""
+    drift = []
+    for enum in sorted(migrations.enums.keys() | database.enums.keys()):
+        if enum not in database.enums:
+            drift.append(('MISSING_IN_DATABASE', enum, "ENUM criado nas migrations não existe no banco"))
+        elif enum not in migrations.enums:
+            drift.append(('MISSING_IN_MIGRATIONS', enum, "ENUM existe no banco mas em nenhuma migration"))
+        else:
+            comparison = migrations.compare(enum, database.enums[enum])
+            if not comparison.matches:
+                parts = []
+                if comparison.missing_in_ts:
+                    parts.append(f"ausentes no banco: {', '.join(comparison.missing_in_ts)}")
+                if comparison.missing_in_db:
+                    parts.append(f"ausentes nas migrations: {', '.join(comparison.missing_in_db)}")
+                drift.append(('ENUM_DRIFT', enum, f"Valores {'; '.join(parts)}"))
+    return drift
+
+
+def _quote_ident(name: str) -> str:
+    return name if re.fullmatch(r'[a-z_][a-z0-9_$]*', name) else '"' + name.replace('"', '""') + '"'
+
+
+def _qualified_type(type_text: str, enums: EnumCatalog) -> str:
+    canonical = canonical_type(type_text)
+    base = canonical.split('[', 1)[0]
+    return f"public.{canonical}" if base in enums.enums else canonical
+
+
+def write_dump(out: TextIO, tables: Tables, enums: Optional[EnumCatalog] = None) -> None:
+    """Escreve o schema no formato de `pg_dump --schema-only` (ENUMs, tabelas e NOT NULL)
+
+    Substituto de um Postgres local para gerar dumps de teste a partir das
+    migrations; defaults, índices e restrições não fazem parte do modelo e não
+    são escritos.
+    """
+    enums = enums or EnumCatalog()
+    out.write("--\n-- PostgreSQL database dump\n--\n\n\\restrict schema-audit\n\n")
+    out.write("SET statement_timeout = 0;\nSET client_encoding = 'UTF8';\n"
+              "SET standard_conforming_strings = on;\n"
+              "SELECT pg_catalog.set_config('search_path', '', false);\n"
+              "SET check_function_bodies = false;\n\n")
+    for enum in sorted(enums.enums):
+        out.write(f"--\n-- Name: {enum}; Type: TYPE; Schema: public; Owner: postgres\n--\n\n")
+        values = ',\n'.join("    '" + value.replace("'", "''") + "'" for value in enums.enums[enum])
+        out.write(f"CREATE TYPE public.{_quote_ident(enum)} AS ENUM (\n{values}\n);\n\n\n")
+        out.write(f"ALTER TYPE public.{_quote_ident(enum)} OWNER TO postgres;\n\n")
+    for table in sorted(tables):
+        out.write(f"--\n-- Name: {table}; Type: TABLE; Schema: public; Owner: postgres\n--\n\n")
+        columns = ',\n'.join(
+            f"    {_quote_ident(name)} {_qualified_type(column.type, enums)}{'' if column.nullable else ' NOT NULL'}"
+            for name, column in tables[table].items())
+        out.write(f"CREATE TABLE public.{_quote_ident(table)} (\n{columns}\n);\n\n\n")
+        out.write(f"ALTER TABLE public.{_quote_ident(table)} OWNER TO postgres;\n\n")
+    out.write("--\n-- PostgreSQL database dump complete\n--\n\n\\unrestrict schema-audit\n\n")
@@ -0,0 +1,224 @@
+"""
+Instrumentação das auditorias
+=============================
+Tempo por fase e por arquivo, contadores (arquivos, comandos, correspondências)
+e cProfile opcional, exportados em JSON e no formato trace-event do Chrome
+(chrome://tracing, ui.perfetto.dev, speedscope) para a visão em flame graph:
+
+    python3 scripts/audit-types.py --timings tempos.json --trace trace.json
+    python3 scripts/audit-indexes.py --cprofile auditoria.prof
+
+O profiler ativo é global ao processo, como o logging: as bibliotecas chamam
+`current()`, que devolve um NullProfiler sem custo quando nenhuma opção foi
+pedida. O parse de cada arquivo, nos workers de parse_files, é medido no
+próprio worker e registrado com o pid, uma faixa por processo no trace.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Funções do cProfile listadas no JSON (por tempo acumulado)
+HOTSPOTS = 30
+
+
+class Span(NamedTuple):
+    name: str
+    category: str               # 'phase', 'parse:<parser>'
+    start: float                # time.perf_counter() (monotônico, comum aos processos)
+    duration: float
+    pid: int
+    args: Tuple[Tuple[str, object], ...]
+
+
+class Profiler:
+    """Coleta fases, arquivos e contadores de uma execução"""
+
+    enabled = True
+
+    def __init__(self, tool: str = '', cprofile: bool = False):
+        self.tool = tool
+        self.started = time.perf_counter()
+        self.pid = os.getpid()
+        self.spans: List[Span] = []
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._cprofile = None
+        if cprofile:
+            import cProfile     # só com --cprofile: mantém rápida a inicialização das ferramentas
+            self._cprofile = cProfile.Profile()
+
+    @contextmanager
+    def phase(self, name: str, category: str = 'phase', **args) -> Iterator[None]:
+        """Mede o bloco como uma fase (fases podem ser aninhadas)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append(Span(name, category, start, time.perf_counter() - start, self.pid,
+                                   tuple(args.items())))
+
+    def record(self, name: str, category: str, start: float, duration: float,
+               pid: Optional[int] = None, **args) -> None:
+        """Registra um intervalo medido em outro lugar (ex.: parse num worker)"""
+        self.spans.append(Span(name, category, start, duration, pid or self.pid, tuple(args.items())))
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def merge_counters(self, counters: Dict[str, int]) -> None:
+        for name, n in counters.items():
+            self.counters[name] += n
+
+    # ---- cProfile ----
+
+    def start(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        if self._cprofile is not None:
+            self._cprofile.disable()
+
+    def _hotspots(self) -> List[Dict]:
+        if self._cprofile is None:
+            return []
+        import pstats
+        stats = pstats.Stats(self._cprofile)
+        rows = []
+        for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append({'function': function, 'file': f"{Path(filename).name}:{line}",
+                         'calls': calls, 'own_seconds': round(own, 6), 'cumulative_seconds': round(cumulative, 6)})
+        rows.sort(key=lambda row: row['cumulative_seconds'], reverse=True)
+        return rows[:HOTSPOTS]
+
+    # ---- exportação ----
+
+    def to_dict(self) -> Dict:
+        """Resumo em JSON: fases, arquivos (mais lentos primeiro), contadores e hotspots do cProfile"""
+        phases = [{'name': s.name, 'seconds': round(s.duration, 6), 'start': round(s.start - self.started, 6),
+                   **dict(s.args)} for s in sorted(self.spans, key=lambda s: s.start) if s.category == 'phase']
+        files = [{'file': s.name, 'parser': s.category.split(':', 1)[1], 'seconds': round(s.duration, 6),
+                  'pid': s.pid, **dict(s.args)}
+                 for s in sorted(self.spans, key=lambda s: s.duration, reverse=True) if s.category.startswith('parse:')]
+        return {
+            'tool': self.tool,
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+            'phases': phases,
+            'files': files,
+            'counters': dict(sorted(self.counters.items())),
+            'hotspots': self._hotspots(),
+        }
+
+    def trace_events(self) -> List[Dict]:
+        """Eventos 'X' (duração completa) por intervalo e 'C' com os contadores no fim da execução"""
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': self.pid,
+                   'args': {'name': self.tool or 'auditoria'}}]
+        for s in sorted(self.spans, key=lambda s: (s.start, -s.duration)):
+            events.append({'name': s.name, 'cat': s.category, 'ph': 'X', 'pid': self.pid, 'tid': s.pid,
+                           'ts': round((s.start - self.started) * 1e6, 3), 'dur': round(s.duration * 1e6, 3),
+                           'args': {k: v for k, v in s.args}})
+        if self.counters:
+            events.append({'name': 'contadores', 'ph': 'C', 'pid': self.pid, 'tid': self.pid,
+                           'ts': round((time.perf_counter() - self.started) * 1e6, 3),
+                           'args': dict(self.counters)})
+        return events
+
+    def write_json(self, path: Path) -> None:
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2, ensure_ascii=False) + '\n')
+
+    def write_trace(self, path: Path) -> None:
+        Path(path).write_text(json.dumps({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}) + '\n')
+
+    def write_cprofile(self, path: Path) -> None:
+        if self._cprofile is not None:
+            self._cprofile.dump_stats(str(path))
+
+    def print_summary(self, out=sys.stderr) -> None:
+        """Fases de primeiro nível (sem as aninhadas) e contadores, para ver onde o tempo foi"""
+        phases = sorted((s for s in self.spans if s.category == 'phase'), key=lambda s: s.start)
+        total = time.perf_counter() - self.started
+        print(f"⏱️  {self.tool}: {total:.3f}s", file=out)
+        end = float('-inf')
+        for span in phases:
+            if span.start >= end:
+                print(f"   {span.name:30s} {span.duration:9.3f}s  {span.duration / total if total else 0:6.1%}", file=out)
+                end = span.start + span.duration
+        if self.counters:
+            print("   " + ', '.join(f"{name}={n:,}" for name, n in sorted(self.counters.items())), file=out)
+
+
+class NullProfiler(Profiler):
+    """Instrumentação desligada: tudo é no-op"""
+
+    enabled = False
+
+    def __init__(self):
+        super().__init__()
+
+    def phase(self, name: str, category: str = 'phase', **args):
+        return nullcontext()
+
+    def record(self, name: str, category: str, start: float, duration: float,
+               pid: Optional[int] = None, **args) -> None:
+        pass
+
+    def count(self, name: str, n: int = 1) -> None:
+        pass
+
+    def merge_counters(self, counters: Dict[str, int]) -> None:
+        pass
+
+
+_ACTIVE: Profiler = NullProfiler()
+
+
+def current() -> Profiler:
+    """Profiler ativo no processo (NullProfiler quando a instrumentação está desligada)"""
+    return _ACTIVE
+
+
+def activate(profiler: Profiler) -> Profiler:
+    """Ativa o profiler e devolve o anterior"""
+    global _ACTIVE
+    previous, _ACTIVE = _ACTIVE, profiler
+    return previous
+
+
+def add_profiling_args(parser) -> None:
+    """Opções de instrumentação comuns a todos os scripts de auditoria"""
+    group = parser.add_argument_group('instrumentação')
+    group.add_argument('--timings', type=Path, metavar='ARQUIVO',
+                       help="Grava tempos por fase/arquivo e contadores em JSON")
+    group.add_argument('--trace', type=Path, metavar='ARQUIVO',
+                       help="Grava trace-event do Chrome (chrome://tracing, Perfetto)")
+    group.add_argument('--cprofile', type=Path, metavar='ARQUIVO',
+                       help="Executa sob cProfile e grava as estatísticas (.prof, para pstats/snakeviz)")
+
+
+@contextmanager
+def profiling(args, tool: str) -> Iterator[Profiler]:
+    """Ativa a instrumentação pedida nas opções; ao sair, grava as exportações e o resumo em stderr"""
+    if not (args.timings or args.trace or args.cprofile):
+        yield current()
+        return
+
+    profiler = Profiler(tool, cprofile=bool(args.cprofile))
+    previous = activate(profiler)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        activate(previous)
+        if args.timings:
+            profiler.write_json(args.timings)
+        if args.trace:
+            profiler.write_trace(args.trace)
+        if args.cprofile:
+            profiler.write_cprofile(args.cprofile)
+        profiler.print_summary()
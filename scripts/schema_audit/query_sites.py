@@ -0,0 +1,229 @@
+"""
+Consultas PostgREST das Edge Functions
+======================================
+Extrai das fontes de supabase/functions/ as cadeias do cliente Supabase
+(`.from('tabela')` seguido de `.select/.update/.delete`, filtros `.eq/.in/.is/
+.gt/...`, `.match({...})`, `.order(...)`, `.range/.limit/.single`) e confronta
+as colunas filtradas e ordenadas com o modelo de índices das migrations.
+
+Cada ponto de consulta é classificado:
+
+- SEQ_SCAN: há filtros, mas nenhum índice B-tree começa por uma coluna filtrada
+- FULL_SCAN: leitura/escrita sem filtro e sem limite (a tabela inteira)
+- SORT: ORDER BY sem índice que entregue a ordem após os filtros de igualdade
+- UNKNOWN_TABLE / UNKNOWN_COLUMN: tabela ou coluna que não existe no schema
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .indexes import IndexDef, IndexModel, TableIndexes
+from .model import Columns, Tables
+from .ts_tokenizer import IDENT, NEWLINE, PUNCT, STRING, Token, tokenize
+
+# Incrementar quando a saída de parse_query_sites mudar (invalida o cache de parse)
+PARSER_VERSION = 1
+
+# Métodos que filtram por uma coluna (primeiro argumento)
+EQUALITY_FILTERS = frozenset({'eq', 'in', 'is', 'contains', 'containedBy'})
+RANGE_FILTERS = frozenset({'gt', 'gte', 'lt', 'lte', 'like', 'ilike', 'neq', 'textSearch'})
+_OPERATIONS = frozenset({'select', 'insert', 'upsert', 'update', 'delete'})
+_LIMITS = frozenset({'range', 'limit', 'single', 'maybeSingle'})
+
+
+class QuerySite(NamedTuple):
+    line: int
+    table: str
+    operation: str                          # select / insert / upsert / update / delete
+    filters: Tuple[Tuple[str, str], ...]    # (método, coluna)
+    order: Tuple[str, ...]
+    limited: bool                           # .range / .limit / .single / .maybeSingle
+
+    @property
+    def equality_columns(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(c for m, c in self.filters if m in EQUALITY_FILTERS))
+
+    @property
+    def filter_columns(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(c for _, c in self.filters))
+
+    @property
+    def shape(self) -> Tuple:
+        """Identifica consultas equivalentes para a contagem de frequência"""
+        return (self.table, self.operation, tuple(sorted(self.filters)), self.order)
+
+
+def _call_arguments(tokens: List[Token], i: int) -> Tuple[List[List[Token]], int]:
+    """Argumentos de uma chamada a partir do '(' em tokens[i]: (argumentos, índice após ')')"""
+    args: List[List[Token]] = [[]]
+    depth = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.kind == PUNCT:
+            if tok.value in '([{':
+                depth += 1
+                if depth == 1:
+                    i += 1
+                    continue
+            elif tok.value in ')]}':
+                depth -= 1
+                if depth == 0:
+                    return [a for a in args if a], i + 1
+            elif tok.value == ',' and depth == 1:
+                args.append([])
+                i += 1
+                continue
+        args[-1].append(tok)
+        i += 1
+    return [a for a in args if a], i
+
+
+def _object_keys(arg: List[Token]) -> List[str]:
+    """Chaves de primeiro nível de um literal objeto ({ a: 1, 'b': 2 })"""
+    keys = []
+    depth = 0
+    for j, tok in enumerate(arg):
+        if tok.kind == PUNCT and tok.value in '([{':
+            depth += 1
+        elif tok.kind == PUNCT and tok.value in ')]}':
+            depth -= 1
+        elif depth == 1 and tok.kind in (IDENT, STRING) and j + 1 < len(arg) and arg[j + 1].is_punct(':') \
+                and (arg[j - 1].is_punct('{') or arg[j - 1].is_punct(',')):
+            keys.append(tok.value)
+    return keys
+
+
+def _string_argument(args: List[List[Token]], index: int = 0) -> Optional[str]:
+    if len(args) > index and len(args[index]) == 1 and args[index][0].kind == STRING:
+        return args[index][0].value
+    return None
+
+
+def parse_query_sites(content: str) -> List[QuerySite]:
+    """Pontos de consulta `.from('tabela')...` de um arquivo TypeScript"""
+    tokens = [tok for tok in tokenize(content) if tok.kind != NEWLINE]
+    sites: List[QuerySite] = []
+    i = 0
+    n = len(tokens)
+    while i < n - 3:
+        tok = tokens[i]
+        if not (tok.is_ident('from') and i > 0 and tokens[i - 1].is_punct('.') and tokens[i + 1].is_punct('(')):
+            i += 1
+            continue
+        args, i = _call_arguments(tokens, i + 1)
+        table = _string_argument(args)
+        if table is None:
+            continue
+
+        operation = 'select'
+        filters: List[Tuple[str, str]] = []
+        order: List[str] = []
+        limited = False
+        # Segue a cadeia: .metodo(args) .metodo(args) ...
+        while i + 2 < n and tokens[i].is_punct('.') and tokens[i + 1].kind == IDENT \
+                and tokens[i + 2].is_punct('('):
+            method = tokens[i + 1].value
+            args, i = _call_arguments(tokens, i + 2)
+            if method in _OPERATIONS:
+                # .insert(...).select() continua sendo um insert
+                if operation == 'select' or method != 'select':
+                    operation = method
+            elif method in EQUALITY_FILTERS or method in RANGE_FILTERS:
+                column = _string_argument(args)
+                if column is not None:
+                    filters.append((method, column))
+            elif method == 'filter':
+                column, op = _string_argument(args), _string_argument(args, 1)
+                if column is not None:
+                    filters.append(('eq' if op in ('eq', 'in', 'is') else 'gt', column))
+            elif method == 'match' and args:
+                filters.extend(('eq', key) for key in _object_keys(args[0]))
+            elif method == 'order':
+                column = _string_argument(args)
+                if column is not None:
+                    order.append(column)
+            elif method in _LIMITS:
+                limited = True
+        sites.append(QuerySite(tok.line, table, operation, tuple(filters), tuple(order), limited))
+    return sites
+
+
+class QueryFinding(NamedTuple):
+    kind: str                   # SEQ_SCAN / FULL_SCAN / SORT / UNKNOWN_TABLE / UNKNOWN_COLUMN
+    site: QuerySite
+    locations: Tuple[str, ...]  # arquivo:linha de cada ocorrência da mesma consulta
+    detail: str
+
+    @property
+    def count(self) -> int:
+        return len(self.locations)
+
+
+_WORD_RE = re.compile(r'[A-Za-z_]\w*')
+
+
+def _usable(index: IndexDef, filtered: Set[str], columns: Columns) -> bool:
+    """Índice B-tree cujo predicado parcial (se houver) só usa colunas filtradas na consulta"""
+    if index.method not in ('btree', 'hash') or not index.keys or index.keys[0].expression:
+        return False
+    if index.predicate:
+        referenced = {w for w in _WORD_RE.findall(index.predicate) if w in columns}
+        return referenced <= filtered
+    return True
+
+
+def _supports_order(index: IndexDef, equality: Set[str], order: Tuple[str, ...]) -> bool:
+    """As colunas do índice após o prefixo de igualdade entregam a ordem pedida"""
+    keys = [k.column for k in index.keys if not k.expression]
+    position = 0
+    while position < len(keys) and keys[position] in equality:
+        position += 1
+    return tuple(keys[position:position + len(order)]) == order
+
+
+def classify_site(site: QuerySite, entry: Optional[TableIndexes],
+                  columns: Optional[Columns]) -> Optional[Tuple[str, str]]:
+    """(tipo, detalhe) do problema mais grave do ponto de consulta, ou None"""
+    if columns is None:
+        return 'UNKNOWN_TABLE', f"Tabela {site.table} não existe nas migrations"
+    unknown = [c for c in site.filter_columns + site.order if c not in columns]
+    if unknown:
+        return 'UNKNOWN_COLUMN', f"Colunas inexistentes em {site.table}: {', '.join(unknown)}"
+    if site.operation in ('insert', 'upsert'):
+        return None
+
+    indexes = [idx for idx in (entry.indexes.values() if entry else ()) if _usable(idx, set(site.filter_columns), columns)]
+    if not site.filters:
+        if site.order and any(_supports_order(idx, set(), site.order) for idx in indexes) and site.limited:
+            return None
+        if not site.limited or site.operation in ('update', 'delete'):
+            return 'FULL_SCAN', f"{site.operation.upper()} sem filtro percorre {site.table} inteira"
+        return None
+
+    filtered = set(site.filter_columns)
+    if not any(idx.keys[0].column in filtered for idx in indexes):
+        return 'SEQ_SCAN', (f"Nenhum índice começa por {', '.join(site.filter_columns)}; sugestão: "
+                            f"CREATE INDEX ON public.{site.table} ({', '.join(site.equality_columns or site.filter_columns)});")
+    if site.order and not any(_supports_order(idx, set(site.equality_columns), site.order) for idx in indexes):
+        return 'SORT', f"ORDER BY {', '.join(site.order)} ordena todas as linhas filtradas (sem índice na ordem)"
+    return None
+
+
+def analyze_query_sites(sites_by_file: Dict[str, List[QuerySite]], model: IndexModel,
+                        tables: Tables) -> List[QueryFinding]:
+    """Problemas por formato de consulta, do mais frequente para o menos frequente"""
+    grouped: Dict[Tuple, List[str]] = {}
+    first: Dict[Tuple, QuerySite] = {}
+    for file_name, sites in sites_by_file.items():
+        for site in sites:
+            grouped.setdefault(site.shape, []).append(f"{file_name}:{site.line}")
+            first.setdefault(site.shape, site)
+
+    findings = []
+    for shape, locations in grouped.items():
+        site = first[shape]
+        verdict = classify_site(site, model.tables.get(site.table), tables.get(site.table))
+        if verdict is not None:
+            findings.append(QueryFinding(verdict[0], site, tuple(locations), verdict[1]))
+    findings.sort(key=lambda f: (-f.count, f.site.table, f.locations[0]))
+    return findings
@@ -0,0 +1,447 @@
+"""
+Replay incremental das migrations
+=================================
+Aplica os arquivos de supabase/migrations/ em ordem sobre um modelo de schema em
+memória (CREATE/DROP TABLE, ALTER TABLE ADD/DROP/RENAME/ALTER COLUMN, RENAME TO)
+e guarda um snapshot após cada migration.
+
+Cada snapshot guarda só as tabelas que a migration alterou (copy-on-write por
+tabela: o dicionário de colunas é copiado uma vez na primeira alteração);
+tabelas intocadas são compartilhadas. O schema corrente é um único dicionário
+atualizado no lugar, e o schema de uma migration anterior é remontado a partir
+das mudanças quando pedido. Assim a memória cresce com o número de alterações,
+não com migrations × tabelas, e "schema na migration N" e o diff entre duas
+migrations continuam saindo da memória, sem reprocessar nenhum arquivo.
+
+Os snapshots devem ser tratados como somente leitura.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .model import Columns, Tables, intern
+from .parallel import parse_files
+from .sql_schema import TABLE_CONSTRAINT_KEYWORDS, parse_column, parse_create_table
+from .sql_tokenizer import DOLLAR, WORD, Token, TokenCursor, split_statements
+
+# Incrementar quando a saída de parse_migration mudar (invalida o cache de parse)
+PARSER_VERSION = 3
+
+# Mudanças de uma migration: tabela → colunas após a migration, ou None se removida
+Changes = Dict[str, Optional[Columns]]
+
+
+def apply_changes(tables: Tables, changes: Changes) -> None:
+    for table, columns in changes.items():
+        if columns is None:
+            tables.pop(table, None)
+        else:
+            tables[table] = columns
+
+
+class SchemaSnapshot:
+    """Estado do schema logo após uma migration (índice 0 = schema vazio)
+
+    `tables` é montado a partir das mudanças na primeira consulta; o último
+    snapshot aponta para o schema corrente do replay.
+    """
+
+    __slots__ = ('index', 'migration', 'changes', '_previous', '_tables')
+
+    def __init__(self, index: int, migration: Optional[str], changes: Changes,
+                 previous: Optional['SchemaSnapshot'] = None, tables: Optional[Tables] = None):
+        self.index = index
+        self.migration = migration
+        self.changes = changes
+        self._previous = previous
+        self._tables = tables
+
+    @property
+    def tables(self) -> Tables:
+        if self._tables is None:
+            chain = []
+            snapshot = self
+            while snapshot._tables is None:
+                chain.append(snapshot)
+                snapshot = snapshot._previous
+            tables = dict(snapshot._tables)
+            for step in reversed(chain):
+                apply_changes(tables, step.changes)
+            self._tables = tables
+        return self._tables
+
+    def __repr__(self) -> str:
+        return f"SchemaSnapshot({self.index}, {self.migration!r}, {len(self.changes)} tabelas alteradas)"
+
+
+class _SchemaBuilder:
+    """Aplica operações sobre o schema no lugar, copiando as colunas de uma tabela na primeira alteração
+
+    `changes` registra o estado final de cada tabela tocada (None = removida).
+    """
+
+    def __init__(self, tables: Optional[Tables] = None):
+        self.tables: Tables = {} if tables is None else tables
+        self.changes: Changes = {}
+        self._owned = set()
+
+    def writable(self, table: str) -> Optional[Columns]:
+        columns = self.tables.get(table)
+        if columns is None:
+            return None
+        if table not in self._owned:
+            columns = dict(columns)
+            self.tables[table] = columns
+            self.changes[table] = columns
+            self._owned.add(table)
+        return columns
+
+    def put(self, table: str, columns: Columns) -> None:
+        self.tables[table] = self.changes[table] = dict(columns)
+        self._owned.add(table)
+
+    def drop(self, table: str) -> None:
+        if self.tables.pop(table, None) is not None:
+            self.changes[table] = None
+        self._owned.discard(table)
+
+    def rename(self, old: str, new: str) -> None:
+        if old in self.tables:
+            self.tables[new] = self.changes[new] = self.tables.pop(old)
+            self.changes[old] = None
+            if old in self._owned:
+                self._owned.discard(old)
+                self._owned.add(new)
+            else:
+                self._owned.discard(new)
+
+
+# Operações de schema extraídas de uma migration. São tuplas simples (serializáveis),
+# independentes do estado anterior do schema, para que o parse de cada arquivo possa
+# ser cacheado e só a aplicação dependa da ordem.
+#   ('create_table', tabela, colunas, if_not_exists)
+#   ('drop_table', tabela)
+#   ('rename_table', antiga, nova)
+#   ('add_column', tabela, coluna, Column, if_not_exists)
+#   ('drop_column', tabela, coluna)
+#   ('rename_column', tabela, antiga, nova)
+#   ('alter_column', tabela, coluna, {campo: valor})
+Operation = Tuple
+
+
+def _is_public(schema: Optional[str]) -> bool:
+    return schema is None or schema == 'public'
+
+
+def _type_text(cur: TokenCursor, source: str, stop_words: Iterable[str]) -> Optional[str]:
+    """Lê um nome de tipo até uma palavra de parada e retorna o texto com espaços normalizados"""
+    start = cur.pos
+    while not cur.at_end():
+        tok = cur.peek()
+        if tok.kind == WORD and tok.value in stop_words:
+            break
+        if tok.is_punct('('):
+            cur.take_group()
+            continue
+        cur.next()
+    if cur.pos == start:
+        return None
+    return ' '.join(source[cur.tokens[start].start:cur.tokens[cur.pos - 1].end].split())
+
+
+def _parse_alter_action(ops: List[Operation], table: str, action: TokenCursor, source: str) -> str:
+    """Interpreta uma ação de ALTER TABLE; retorna o nome (possivelmente novo) da tabela"""
+    if action.accept('add'):
+        first = action.peek()
+        if first is None:
+            return table
+        if first.kind == WORD and first.value in TABLE_CONSTRAINT_KEYWORDS:
+            while not action.at_end():
+                if action.accept('primary', 'key') and action.peek() is not None and action.peek().is_punct('('):
+                    for part in action.take_group().split():
+                        col_name = part.name()
+                        if col_name:
+                            ops.append(('alter_column', table, col_name, {'nullable': False}))
+                    break
+                action.next()
+            return table
+        action.accept('column')
+        if_not_exists = action.accept('if', 'not', 'exists')
+        parsed = parse_column(action, source)
+        if parsed:
+            col_name, info = parsed
+            ops.append(('add_column', table, col_name, info, if_not_exists))
+        return table
+
+    if action.accept('drop'):
+        if action.accept('constraint'):
+            return table
+        action.accept('column')
+        action.accept('if', 'exists')
+        col_name = action.name()
+        if col_name:
+            ops.append(('drop_column', table, col_name))
+        return table
+
+    if action.accept('rename'):
+        if action.accept('to'):
+            new_name = action.name()
+            if new_name:
+                ops.append(('rename_table', table, new_name))
+                return new_name
+            return table
+        if action.accept('constraint'):
+            return table
+        action.accept('column')
+        old = action.name()
+        if not action.accept('to'):
+            return table
+        new = action.name()
+        if old and new:
+            ops.append(('rename_column', table, old, new))
+        return table
+
+    if action.accept('alter'):
+        action.accept('column')
+        col_name = action.name()
+        if col_name is None:
+            return table
+        if action.accept('set', 'data', 'type') or action.accept('type'):
+            new_type = _type_text(action, source, ('using', 'collate'))
+            if new_type:
+                ops.append(('alter_column', table, col_name, {'type': new_type}))
+        elif action.accept('set', 'not', 'null'):
+            ops.append(('alter_column', table, col_name, {'nullable': False}))
+        elif action.accept('drop', 'not', 'null'):
+            ops.append(('alter_column', table, col_name, {'nullable': True}))
+        elif action.accept('set', 'default'):
+            ops.append(('alter_column', table, col_name, {'has_default': not action.accept('null')}))
+        elif action.accept('drop', 'default'):
+            ops.append(('alter_column', table, col_name, {'has_default': False}))
+        elif action.accept('add', 'generated'):
+            ops.append(('alter_column', table, col_name, {'has_default': True}))
+        return table
+
+    return table
+
+
+def _parse_alter_table(ops: List[Operation], tokens: List[Token], source: str) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('alter', 'table'):
+        return
+    cur.accept('if', 'exists')
+    cur.accept('only')
+    schema, table = cur.qualified_name()
+    if table is None or not _is_public(schema):
+        return
+    table = intern(table)
+    for action in cur.split():
+        table = _parse_alter_action(ops, table, action, source)
+
+
+def _parse_drop_table(ops: List[Operation], tokens: List[Token]) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('drop', 'table'):
+        return
+    cur.accept('if', 'exists')
+    for part in cur.split():
+        schema, table = part.qualified_name()
+        if table and _is_public(schema):
+            ops.append(('drop_table', table))
+
+
+def _has_if_not_exists(tokens: List[Token]) -> bool:
+    cur = TokenCursor(tokens)
+    while not cur.at_end() and not cur.accept('table'):
+        cur.next()
+    return cur.accept('if', 'not', 'exists')
+
+
+def _parse_do_block(ops: List[Operation], tokens: List[Token], source: str) -> None:
+    """Extrai os ALTER TABLE de dentro de um bloco DO $$ ... $$
+
+    Condições (IF EXISTS ...) não são avaliadas; como as ações sobre colunas
+    inexistentes são ignoradas na aplicação, um RENAME condicional só tem efeito
+    quando a coluna de origem existe, que é o padrão usado nas migrations.
+    """
+    for tok in tokens:
+        if tok.kind != DOLLAR:
+            continue
+        body = tok.value
+        base = source.find(body, tok.start)
+        first = len(ops)
+        for inner in split_statements(body):
+            toks = inner.tokens
+            for i in range(len(toks) - 1):
+                if toks[i].is_word('alter') and toks[i + 1].is_word('table'):
+                    _parse_alter_table(ops, toks[i:], body)
+                    break
+        # Posições das colunas relativas ao arquivo, não ao corpo do bloco
+        for k in range(first, len(ops)):
+            if ops[k][0] == 'add_column':
+                column = ops[k][3]
+                ops[k] = ops[k][:3] + (column._replace(start=column.start + base, end=column.end + base),) + ops[k][4:]
+
+
+def parse_migration(content: str) -> List[Operation]:
+    """Converte o texto de uma migration na lista ordenada de operações de schema"""
+    ops: List[Operation] = []
+    for stmt in split_statements(content):
+        kind = stmt.kind
+        if kind == 'create table':
+            parsed = parse_create_table(stmt)
+            if parsed:
+                table, columns = parsed
+                ops.append(('create_table', table, columns, _has_if_not_exists(stmt.tokens)))
+        elif kind == 'alter table':
+            _parse_alter_table(ops, stmt.tokens, content)
+        elif kind == 'drop table':
+            _parse_drop_table(ops, stmt.tokens)
+        elif kind == 'do':
+            _parse_do_block(ops, stmt.tokens, content)
+    return ops
+
+
+def _with_source(columns: Columns, source: str) -> Columns:
+    # Nomes e tipos vindos do cache (pickle) não são internados: internar aqui
+    return {intern(name): column._replace(type=intern(column.type), source=source)
+            for name, column in columns.items()}
+
+
+def apply_operations(builder: _SchemaBuilder, ops: Iterable[Operation], source: str = '') -> None:
+    """Aplica as operações ao builder; operações sobre tabelas/colunas inexistentes são ignoradas
+
+    `source` (caminho da migration) é gravado nas colunas criadas, para column_definition.
+    """
+    for op in ops:
+        kind, table = op[0], op[1]
+        if kind == 'create_table':
+            if op[3] and table in builder.tables:
+                continue
+            builder.put(table, _with_source(op[2], source) if source else op[2])
+        elif kind == 'drop_table':
+            builder.drop(table)
+        elif kind == 'rename_table':
+            builder.rename(table, op[2])
+        elif table in builder.tables:
+            columns = builder.writable(table)
+            if kind == 'add_column':
+                if not (op[4] and op[2] in columns):
+                    columns[intern(op[2])] = op[3]._replace(type=intern(op[3].type), source=source) if source else op[3]
+            elif kind == 'drop_column':
+                columns.pop(op[2], None)
+            elif kind == 'rename_column':
+                if op[2] in columns:
+                    columns[op[3]] = columns.pop(op[2])
+            elif kind == 'alter_column':
+                if op[2] in columns:
+                    columns[op[2]] = columns[op[2]]._replace(**op[3])
+
+
+class MigrationReplay:
+    """Sequência de snapshots do schema, um por migration aplicada"""
+
+    def __init__(self):
+        self._tables: Tables = {}
+        self.snapshots: List[SchemaSnapshot] = [SchemaSnapshot(0, None, {}, tables={})]
+
+    @classmethod
+    def from_directory(cls, migrations_dir: Path, cache=None, jobs: Optional[int] = 1) -> 'MigrationReplay':
+        """Replay de todos os *.sql do diretório
+
+        `cache` (ParseCache) evita reparsear arquivos inalterados e `jobs` distribui
+        o parse entre processos; a aplicação continua serial e em ordem.
+        """
+        replay = cls()
+        sql_files = sorted(migrations_dir.glob("*.sql"))
+        all_ops = parse_files(sql_files, 'migration_ops', PARSER_VERSION, parse_migration, cache, jobs)
+        for sql_file, ops in zip(sql_files, all_ops):
+            replay.apply_operations(sql_file.name, ops, intern(str(sql_file)))
+        return replay
+
+    def apply(self, migration: str, content: str) -> SchemaSnapshot:
+        """Aplica uma migration sobre o último snapshot e registra o novo"""
+        return self.apply_operations(migration, parse_migration(content))
+
+    def apply_operations(self, migration: str, ops: Iterable[Operation], source: str = '') -> SchemaSnapshot:
+        previous = self.snapshots[-1]
+        if previous._tables is self._tables:
+            previous._tables = None     # o schema corrente vai mudar: remontar a partir das mudanças
+        builder = _SchemaBuilder(self._tables)
+        apply_operations(builder, ops, source)
+        snapshot = SchemaSnapshot(len(self.snapshots), migration, builder.changes, previous, self._tables)
+        self.snapshots.append(snapshot)
+        return snapshot
+
+    def iter_tables(self) -> Iterator[Tuple[SchemaSnapshot, Tables]]:
+        """(snapshot, tabelas) em ordem, atualizando um único dicionário (válido só até a próxima iteração)"""
+        tables: Tables = {}
+        for snapshot in self.snapshots:
+            apply_changes(tables, snapshot.changes)
+            yield snapshot, tables
+
+    @property
+    def final(self) -> SchemaSnapshot:
+        return self.snapshots[-1]
+
+    @property
+    def migrations(self) -> List[str]:
+        return [s.migration for s in self.snapshots[1:]]
+
+    def snapshot(self, ref: Union[int, str]) -> SchemaSnapshot:
+        """Snapshot por posição (1 = primeira migration, 0 = vazio) ou por nome/prefixo de versão"""
+        return self.snapshots[migration_index(self.migrations, ref)]
+
+
+def migration_index(migrations: Sequence[str], ref: Union[int, str]) -> int:
+    """Posição do snapshot de `ref` na sequência de migrations (0 = schema vazio)
+
+    Strings só com dígitos e menos de 8 caracteres são tratadas como posição;
+    as versões das migrations têm 14 dígitos (20240101000006). Levanta KeyError
+    para posição fora do intervalo e nome desconhecido ou ambíguo.
+    """
+    if isinstance(ref, int) or ref.isdigit() and len(ref) < 8:
+        if not 0 <= int(ref) <= len(migrations):
+            raise KeyError(f"Posição fora do intervalo: {ref} (0 a {len(migrations)})")
+        return int(ref)
+    matches = [k for k, name in enumerate(migrations, 1) if name == ref or name.startswith(ref)]
+    if len(matches) != 1:
+        raise KeyError(f"Migration não encontrada ou ambígua: {ref}")
+    return matches[0]
+
+
+def diff_snapshots(old: SchemaSnapshot, new: SchemaSnapshot) -> List[Tuple[str, str, str]]:
+    """Diferenças de `old` para `new` como (tipo, local, descrição)
+
+    Tabelas compartilhadas entre os snapshots (mesmo objeto) são puladas sem
+    comparar colunas.
+    """
+    changes = []
+    old_tables, new_tables = old.tables, new.tables
+
+    for table in sorted(new_tables.keys() - old_tables.keys()):
+        changes.append(('TABLE_ADDED', table, f"{len(new_tables[table])} colunas"))
+    for table in sorted(old_tables.keys() - new_tables.keys()):
+        changes.append(('TABLE_DROPPED', table, ''))
+
+    for table in sorted(old_tables.keys() & new_tables.keys()):
+        before, after = old_tables[table], new_tables[table]
+        if before is after:
+            continue
+        for col in sorted(after.keys() - before.keys()):
+            changes.append(('COLUMN_ADDED', f"{table}.{col}", after[col].type))
+        for col in sorted(before.keys() - after.keys()):
+            changes.append(('COLUMN_DROPPED', f"{table}.{col}", before[col].type))
+        for col in sorted(before.keys() & after.keys()):
+            a, b = before[col], after[col]
+            if a is b:
+                continue
+            if a.type != b.type or a.nullable != b.nullable:
+                changes.append((
+                    'COLUMN_CHANGED',
+                    f"{table}.{col}",
+                    f"{a.type}{'' if a.nullable else ' NOT NULL'} → "
+                    f"{b.type}{'' if b.nullable else ' NOT NULL'}"
+                ))
+
+    return changes
@@ -0,0 +1,211 @@
+"""
+Relatórios em streaming
+=======================
+Cada inconsistência vai para os destinos (sinks) assim que é encontrada, sem
+acumular a lista inteira em memória:
+
+- JsonLinesSink: um objeto JSON por linha, gravado e descarregado na hora
+- SarifSink: SARIF 2.1.0 (code scanning do GitHub anota o PR), com os
+  resultados escritos um a um entre o cabeçalho e o fechamento do documento
+- MarkdownSink: o relatório markdown agrupado por tipo, montado no fechamento
+  a partir de um arquivo temporário por tipo (memória = contadores por tipo)
+- SummarySink: contagem por tipo e as primeiras ocorrências, para o terminal
+
+    with ReportStream([JsonLinesSink(out), MarkdownSink(path, titulo)]) as stream:
+        for finding in findings:
+            stream.emit(finding)
+"""
+
+import json
+import tempfile
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_VERSION = '2.1.0'
+
+# Ocorrências de cada tipo guardadas pelo SummarySink
+SUMMARY_SAMPLES = 10
+
+
+class Finding(NamedTuple):
+    type: str
+    location: str               # tabela.coluna, Interface.propriedade ...
+    description: str
+    path: str = ''              # arquivo relativo à raiz do repositório (vazio = sem arquivo)
+    line: int = 0               # 1-based (0 = arquivo inteiro)
+
+
+class ReportSink:
+    """Destino de um relatório em streaming"""
+
+    def emit(self, finding: Finding) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class JsonLinesSink(ReportSink):
+    """Uma inconsistência por linha: {"tool", "type", "location", "description", "path", "line"}"""
+
+    def __init__(self, out: TextIO, tool: str):
+        self.out = out
+        self.tool = tool
+
+    def emit(self, finding: Finding) -> None:
+        record = {'tool': self.tool, **finding._asdict()}
+        self.out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.out.flush()
+
+
+class SarifSink(ReportSink):
+    """SARIF 2.1.0 com um run; `rules` descreve cada tipo de inconsistência (id → descrição curta)"""
+
+    def __init__(self, out: TextIO, tool: str, rules: Dict[str, str], level: str = 'warning'):
+        self.out = out
+        self.level = level
+        self._rule_index = {rule: k for k, rule in enumerate(rules)}
+        self._first = True
+        driver = {
+            'name': tool,
+            'informationUri': 'https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html',
+            'rules': [{'id': rule, 'shortDescription': {'text': text}} for rule, text in rules.items()],
+        }
+        header = json.dumps({'$schema': SARIF_SCHEMA, 'version': SARIF_VERSION,
+                             'runs': [{'tool': {'driver': driver}, 'results': []}]}, ensure_ascii=False)
+        # Cabeçalho até a abertura de "results"; os resultados entram um a um
+        split = header.rindex('[]') + 1
+        self._closing = header[split:]
+        out.write(header[:split] + '\n')
+
+    def emit(self, finding: Finding) -> None:
+        result = {
+            'ruleId': finding.type,
+            'level': self.level,
+            'message': {'text': f"{finding.location}: {finding.description}"},
+        }
+        if finding.type in self._rule_index:
+            result['ruleIndex'] = self._rule_index[finding.type]
+        if finding.path:
+            physical = {'artifactLocation': {'uri': finding.path}}
+            if finding.line:
+                physical['region'] = {'startLine': finding.line}
+            result['locations'] = [{'physicalLocation': physical,
+                                    'logicalLocations': [{'fullyQualifiedName': finding.location}]}]
+        else:
+            result['locations'] = [{'logicalLocations': [{'fullyQualifiedName': finding.location}]}]
+        self.out.write(('' if self._first else ',\n') + json.dumps(result, ensure_ascii=False))
+        self._first = False
+
+    def close(self) -> None:
+        self.out.write('\n' + self._closing + '\n')
+        self.out.flush()
+
+
+class MarkdownSink(ReportSink):
+    """Relatório markdown agrupado por tipo (ordem alfabética), com resumo e data
+
+    As ocorrências de cada tipo vão para um arquivo temporário; no fechamento o
+    relatório é montado copiando os arquivos, sem reter as ocorrências.
+    """
+
+    def __init__(self, path: Path, title: str, summary: Iterable[str] = (), total_label: str = 'Inconsistências encontradas'):
+        self.path = Path(path)
+        self.title = title
+        self.summary = list(summary)
+        self.total_label = total_label
+        self.counts: Dict[str, int] = defaultdict(int)
+        self._spools: Dict[str, TextIO] = {}
+
+    def emit(self, finding: Finding) -> None:
+        spool = self._spools.get(finding.type)
+        if spool is None:
+            spool = self._spools[finding.type] = tempfile.TemporaryFile('w+', encoding='utf-8')
+        spool.write(f"- **{finding.location}**\n")
+        spool.write(f"  - {finding.description}\n")
+        self.counts[finding.type] += 1
+
+    def close(self) -> None:
+        total = sum(self.counts.values())
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(f"# {self.title}\n\n")
+                f.write(f"**Data:** {datetime.now().astimezone().strftime('%Y-%m-%d %H:%M:%S %Z')}\n\n")
+                f.write(f"## Resumo\n\n")
+                for line in self.summary:
+                    f.write(f"- {line}\n")
+                f.write(f"- **{self.total_label}: {total}**\n\n")
+
+                if total > 0:
+                    f.write("## Inconsistências Detalhadas\n\n")
+                    for issue_type in sorted(self._spools):
+                        f.write(f"### {issue_type} ({self.counts[issue_type]} ocorrências)\n\n")
+                        spool = self._spools[issue_type]
+                        spool.seek(0)
+                        for chunk in iter(lambda: spool.read(1 << 16), ''):
+                            f.write(chunk)
+                        f.write("\n")
+        finally:
+            for spool in self._spools.values():
+                spool.close()
+            self._spools.clear()
+
+
+class SummarySink(ReportSink):
+    """Contagem por tipo e as primeiras `samples` ocorrências de cada tipo"""
+
+    def __init__(self, samples: int = SUMMARY_SAMPLES):
+        self.samples = samples
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.first: Dict[str, List[Finding]] = defaultdict(list)
+
+    def emit(self, finding: Finding) -> None:
+        self.counts[finding.type] += 1
+        if len(self.first[finding.type]) < self.samples:
+            self.first[finding.type].append(finding)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def by_type(self) -> Iterator[Tuple[str, int, List[Finding]]]:
+        """(tipo, total, primeiras ocorrências) em ordem alfabética de tipo"""
+        for issue_type in sorted(self.counts):
+            yield issue_type, self.counts[issue_type], self.first[issue_type]
+
+
+class ReportStream:
+    """Repassa cada inconsistência a todos os sinks; fecha todos ao sair do bloco"""
+
+    def __init__(self, sinks: Iterable[ReportSink]):
+        self.sinks = list(sinks)
+        self.total = 0
+
+    def emit(self, finding: Finding) -> None:
+        self.total += 1
+        for sink in self.sinks:
+            sink.emit(finding)
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
+
+    def __enter__(self) -> 'ReportStream':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+@contextmanager
+def open_output(path: Optional[Path]) -> Iterator[Optional[TextIO]]:
+    """Arquivo de saída de um sink (None = sink desligado)"""
+    if path is None:
+        yield None
+    else:
+        with open(path, 'w', encoding='utf-8') as out:
+            yield out
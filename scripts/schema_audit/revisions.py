@@ -0,0 +1,191 @@
+"""
+Auditoria de um intervalo de revisões
+=====================================
+Audita cada commit de um intervalo (`origin/main~50..HEAD`) lendo migrations e
+tipos direto dos objetos do git, sem checkout e sem tocar na árvore de trabalho:
+
+1. `git rev-list --first-parent` lista os commits que alteram os diretórios
+   auditados (os demais têm o mesmo resultado do commit anterior)
+2. `git ls-tree` dá o blob de cada arquivo em cada commit; blobs repetidos entre
+   commits são parseados uma única vez, com o cache de parse indexado pelo SHA
+   do blob (blobs em cache nem são lidos do repositório)
+3. os commits são avaliados em paralelo (replay + comparação), cada worker com
+   os resultados de parse herdados do processo principal
+
+Com as inconsistências de cada commit, a linha do tempo mostra em que commit
+cada uma apareceu ou foi resolvida, e first_bad aponta, como um `git bisect`,
+o commit que introduziu cada inconsistência ainda presente no fim do intervalo.
+"""
+
+import re
+import subprocess
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .cache import ParseCache
+from .incremental import CompareTable, Issue, _git, parse_blobs, tree_blobs
+from .matcher import match_tables
+from .parallel import resolve_jobs
+from .profiling import current
+from .replay import _SchemaBuilder, apply_operations
+
+# Parser por tipo de arquivo: 'migration' e 'ts' → (nome no cache, versão, função de parse)
+Parsers = Dict[str, Tuple[str, Any, Callable]]
+
+
+class Revision(NamedTuple):
+    commit: str
+    subject: str
+    migrations: Tuple[str, ...]     # blobs das migrations, em ordem de aplicação
+    ts_files: Tuple[str, ...]       # blobs dos arquivos .ts, em ordem de junção
+
+
+class RevisionAudit(NamedTuple):
+    commit: str
+    subject: str
+    issues: Tuple[Issue, ...]
+
+
+class TimelineEntry(NamedTuple):
+    commit: str
+    subject: str
+    added: Tuple[Issue, ...]        # inconsistências que aparecem neste commit
+    removed: Tuple[Issue, ...]      # inconsistências resolvidas neste commit
+
+
+def unknown_revisions(root, rev_range: str) -> List[str]:
+    """Lados de `A..B` / `A...B` (ou a revisão única) que não resolvem para um commit"""
+    unknown = []
+    for rev in re.split(r'\.\.\.?', rev_range):
+        if not rev:
+            continue    # lado omitido = HEAD
+        try:
+            _git(root, 'rev-parse', '--verify', '--quiet', f"{rev}^{{commit}}")
+        except subprocess.CalledProcessError:
+            unknown.append(rev)
+    return unknown
+
+
+def list_commits(root, rev_range: str, paths: Sequence[str]) -> List[Tuple[str, str]]:
+    """(commit, assunto) do mais antigo ao mais novo; em `A..B`, inclui A como estado inicial"""
+    out = _git(root, 'rev-list', '--reverse', '--first-parent', '--format=%s', rev_range, '--', *paths)
+    commits = []
+    lines = out.decode('utf-8', 'replace').splitlines()
+    for header, subject in zip(lines[::2], lines[1::2]):
+        commits.append((header.split()[1], subject))
+    if '..' in rev_range and not rev_range.startswith('..'):
+        base = rev_range.split('..', 1)[0]
+        out = _git(root, 'log', '-1', '--format=%H%n%s', base)
+        commit, subject = out.decode('utf-8', 'replace').split('\n', 1)
+        commits.insert(0, (commit, subject.strip()))
+    return commits
+
+
+def load_revisions(root, rev_range: str, is_migration: Callable[[str], bool], is_tracked: Callable[[str], bool],
+                   paths: Sequence[str]) -> List[Revision]:
+    """Commits do intervalo com os blobs auditados de cada um"""
+    revisions = []
+    for commit, subject in list_commits(root, rev_range, paths):
+        files = {path: blob for path, blob in sorted(tree_blobs(root, commit, paths).items()) if is_tracked(path)}
+        revisions.append(Revision(
+            commit, subject,
+            tuple(blob for path, blob in files.items() if is_migration(path)),
+            tuple(blob for path, blob in files.items() if not is_migration(path)),
+        ))
+    return revisions
+
+
+# Estado dos workers: herdado do processo principal (ver _init_worker)
+_PARSED: Dict[str, Dict[str, Any]] = {}
+_COMPARE: Optional[CompareTable] = None
+
+
+def _init_worker(parsed: Dict[str, Dict[str, Any]], compare: CompareTable) -> None:
+    global _PARSED, _COMPARE
+    _PARSED, _COMPARE = parsed, compare
+
+
+def _evaluate(revision: Revision) -> Tuple[Issue, ...]:
+    """Replay das migrations do commit e comparação de todas as tabelas, como na auditoria completa"""
+    builder = _SchemaBuilder()
+    for blob in revision.migrations:
+        apply_operations(builder, _PARSED['migration'][blob])
+    tables = {name: columns for name, columns in builder.tables.items() if columns}
+
+    interfaces = {}
+    for blob in revision.ts_files:
+        interfaces.update(_PARSED['ts'][blob])
+
+    issues = []
+    for table, match in match_tables(sorted(tables), interfaces.keys()).items():
+        issues.extend(_COMPARE(table, match, tables[table], interfaces))
+    return tuple(issues)
+
+
+def audit_revisions(revisions: Sequence[Revision], root, parsers: Parsers, compare: CompareTable,
+                    cache: Optional[ParseCache] = None, jobs: Optional[int] = 1) -> List[RevisionAudit]:
+    """Inconsistências de cada commit; commits com os mesmos blobs são avaliados uma vez"""
+    profiler = current()
+    parsed = {}
+    for kind, attribute in (('migration', 'migrations'), ('ts', 'ts_files')):
+        parser, version, parse = parsers[kind]
+        blobs = (blob for revision in revisions for blob in getattr(revision, attribute))
+        parsed[kind] = parse_blobs(root, blobs, parser, version, parse, cache, jobs)
+
+    unique: Dict[Tuple, Revision] = {}
+    for revision in revisions:
+        unique.setdefault((revision.migrations, revision.ts_files), revision)
+    tasks = list(unique.values())
+    profiler.count('revisions', len(revisions))
+    profiler.count('revisions_evaluated', len(tasks))
+
+    workers = min(resolve_jobs(jobs), len(tasks))
+    with profiler.phase('evaluate revisions', revisions=len(tasks), workers=max(workers, 1)):
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(parsed, compare)) as pool:
+                results = list(pool.map(_evaluate, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+        else:
+            _init_worker(parsed, compare)
+            results = [_evaluate(task) for task in tasks]
+    by_files = {(task.migrations, task.ts_files): issues for task, issues in zip(tasks, results)}
+
+    return [RevisionAudit(r.commit, r.subject, by_files[(r.migrations, r.ts_files)]) for r in revisions]
+
+
+def timeline(audits: Sequence[RevisionAudit]) -> List[TimelineEntry]:
+    """Commits em que o conjunto de inconsistências mudou (o primeiro commit entra com todas as suas)"""
+    entries = []
+    previous: Tuple[Issue, ...] = ()
+    for audit in audits:
+        before = set(previous)
+        after = set(audit.issues)
+        added = tuple(i for i in audit.issues if i not in before)
+        removed = tuple(i for i in previous if i not in after)
+        if added or removed or not entries:
+            entries.append(TimelineEntry(audit.commit, audit.subject, added, removed))
+        previous = audit.issues
+    return entries
+
+
+def first_bad(audits: Sequence[RevisionAudit],
+              selected: Callable[[Issue], bool] = lambda issue: True) -> List[Tuple[RevisionAudit, Tuple[Issue, ...]]]:
+    """Para cada inconsistência do último commit: o commit a partir do qual ela está sempre presente
+
+    Devolve (commit, inconsistências introduzidas) em ordem de commit. Inconsistências
+    presentes desde o primeiro commit do intervalo ficam com ele (o intervalo não
+    alcança a origem delas).
+    """
+    if not audits:
+        return []
+    pending = {issue for issue in audits[-1].issues if selected(issue)}
+    introduced: Dict[int, List[Issue]] = {}
+    for position in range(len(audits) - 1, -1, -1):
+        present = set(audits[position - 1].issues) if position > 0 else set()
+        gone = {issue for issue in pending if issue not in present}
+        if gone:
+            introduced[position] = [i for i in audits[-1].issues if i in gone]
+            pending -= gone
+        if not pending:
+            break
+    return [(audits[position], tuple(issues)) for position, issues in sorted(introduced.items())]
@@ -0,0 +1,123 @@
+"""
+Extração de tabelas a partir do fluxo de comandos SQL
+=====================================================
+Consome os comandos gerados por sql_tokenizer.split_statements e interpreta
+CREATE TABLE coluna a coluna, respeitando parênteses aninhados (CHECK, DEFAULT
+now(), NUMERIC(12,2) ...) e ignorando o conteúdo de strings e blocos $$.
+Cada coluna vira um model.Column com a posição da definição no texto.
+"""
+
+from typing import Iterator, Optional, Set, Tuple
+
+from .model import Column, Columns, intern
+from .sql_tokenizer import PUNCT, WORD, Statement, TokenCursor, split_statements
+
+# Palavras que iniciam uma restrição de tabela (não uma coluna)
+TABLE_CONSTRAINT_KEYWORDS = frozenset({
+    'constraint', 'primary', 'unique', 'foreign', 'check', 'exclude', 'like',
+})
+
+# Palavras que encerram o tipo de uma coluna e iniciam suas restrições
+COLUMN_CONSTRAINT_KEYWORDS = frozenset({
+    'not', 'null', 'default', 'primary', 'references', 'unique', 'check',
+    'constraint', 'generated', 'collate', 'deferrable', 'initially',
+})
+
+# Tipos com valor padrão implícito (sequência)
+SERIAL_TYPES = frozenset({'serial', 'bigserial', 'smallserial', 'serial2', 'serial4', 'serial8'})
+
+_CREATE_TABLE_MODIFIERS = frozenset({'temp', 'temporary', 'unlogged', 'global', 'local'})
+
+
+def parse_column(cur: TokenCursor, source: str) -> Optional[Tuple[str, Column]]:
+    """Interpreta uma definição de coluna; retorna (nome, coluna) ou None"""
+    start, end = cur.span()
+    col_name = cur.name()
+    if col_name is None:
+        return None
+
+    type_start = cur.pos
+    while not cur.at_end():
+        tok = cur.peek()
+        if tok.kind == WORD and tok.value in COLUMN_CONSTRAINT_KEYWORDS:
+            break
+        if tok.kind == PUNCT and tok.value in '([':
+            cur.take_group()
+            continue
+        cur.next()
+    if cur.pos == type_start:
+        return None
+    type_text = ' '.join(source[cur.tokens[type_start].start:cur.tokens[cur.pos - 1].end].split())
+
+    not_null = False
+    has_default = type_text.lower() in SERIAL_TYPES
+    while not cur.at_end():
+        if cur.accept('not', 'null') or cur.accept('primary', 'key'):
+            not_null = True
+            continue
+        if cur.accept('default', 'null'):
+            continue
+        if cur.accept('default') or cur.accept('generated'):
+            has_default = True
+            continue
+        tok = cur.peek()
+        if tok.kind == PUNCT and tok.value == '(':
+            cur.take_group()
+            continue
+        cur.next()
+
+    return intern(col_name), Column(intern(type_text), not not_null, start, end, has_default=has_default)
+
+
+def _primary_key_columns(cur: TokenCursor) -> Set[str]:
+    """Colunas de uma restrição PRIMARY KEY (a, b) declarada no nível da tabela"""
+    while not cur.at_end():
+        if cur.accept('primary', 'key'):
+            if cur.peek() is not None and cur.peek().is_punct('('):
+                return {p.name() for p in cur.take_group().split()} - {None}
+            return set()
+        cur.next()
+    return set()
+
+
+def parse_create_table(stmt: Statement) -> Optional[Tuple[str, Columns]]:
+    """Interpreta um CREATE TABLE; retorna (tabela, colunas) ou None se não for uma definição de colunas"""
+    cur = TokenCursor(stmt.tokens)
+    if not cur.accept('create'):
+        return None
+    cur.skip_words(_CREATE_TABLE_MODIFIERS)
+    if not cur.accept('table'):
+        return None
+    cur.accept('if', 'not', 'exists')
+    _schema, table_name = cur.qualified_name()
+    tok = cur.peek()
+    if table_name is None or tok is None or not tok.is_punct('('):
+        return None  # CREATE TABLE ... AS SELECT / PARTITION OF
+
+    columns: Columns = {}
+    pk_columns: Set[str] = set()
+    for part in cur.take_group().split():
+        first = part.peek()
+        if first is None:
+            continue
+        if first.kind == WORD and first.value in TABLE_CONSTRAINT_KEYWORDS:
+            pk_columns |= _primary_key_columns(part)
+            continue
+        parsed = parse_column(part, stmt.source)
+        if parsed:
+            col_name, info = parsed
+            columns[col_name] = info
+
+    for col_name in pk_columns & columns.keys():
+        columns[col_name] = columns[col_name]._replace(nullable=False)
+
+    return intern(table_name), columns
+
+
+def iter_create_tables(content: str) -> Iterator[Tuple[str, Columns]]:
+    """Gera (tabela, colunas) para cada CREATE TABLE do arquivo, em ordem"""
+    for stmt in split_statements(content):
+        if stmt.kind == 'create table':
+            parsed = parse_create_table(stmt)
+            if parsed:
+                yield parsed
@@ -0,0 +1,324 @@
+"""
+Tokenizador SQL de passagem única
+=================================
+Varre o texto das migrations uma única vez (tempo linear), reconhecendo strings,
+identificadores entre aspas, blocos dollar-quoted ($$ ... $$ / $tag$ ... $tag$)
+e comentários, e agrupa os tokens em comandos separados por ';'.
+
+Nenhuma expressão regular usada aqui tem quantificadores aninhados: todas casam
+ancoradas na posição atual, então não há backtracking catastrófico.
+"""
+
+import re
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .profiling import current
+
+# Tipos de token
+WORD = 'word'        # palavra-chave ou identificador sem aspas (normalizado em minúsculas)
+IDENT = 'ident'      # "identificador entre aspas"
+STRING = 'string'    # 'literal' ou E'literal'
+DOLLAR = 'dollar'    # $tag$ corpo $tag$
+NUMBER = 'number'
+PARAM = 'param'      # $1, $2 ...
+PUNCT = 'punct'      # ( ) , ; . [ ]
+OP = 'op'            # operadores (::, =, ||, ->> ...)
+
+# Padrão mestre ancorado na posição atual. Nenhuma alternativa tem quantificadores
+# aninhados ambíguos, então cada casamento é linear no tamanho do token. Comentários
+# /* */ e corpos $tag$ são consumidos fora do regex, com str.find.
+_TOKEN_RE = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<line_comment>--[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<escape_string>[Ee]')
+  | (?P<string>'[^']*(?:''[^']*)*'?)
+  | (?P<ident>"[^"]*(?:""[^"]*)*"?)
+  | (?P<param>\$\d+)
+  | (?P<dollar>\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_\u0080-\uffff][A-Za-z0-9_$\u0080-\uffff]*)
+  | (?P<punct>[(),;.\[\]])
+  | (?P<op>(?:[+*<>=~!@#%^&|`?:]|-(?!-)|/(?!\*))+)
+""", re.VERBOSE)
+_COMMENT_DELIM_RE = re.compile(r'/\*|\*/')
+
+# Modificadores entre o verbo e o tipo de objeto (CREATE OR REPLACE FUNCTION, CREATE UNIQUE INDEX ...)
+_OBJECT_MODIFIERS = frozenset({
+    'or', 'replace', 'unique', 'temp', 'temporary', 'unlogged', 'global', 'local',
+    'constraint', 'materialized', 'trusted', 'procedural', 'recursive', 'default',
+})
+_OBJECT_VERBS = frozenset({'create', 'alter', 'drop', 'comment'})
+
+
+class Token(NamedTuple):
+    """Token léxico. `value` é normalizado (minúsculas para WORD, conteúdo sem aspas)"""
+    kind: str
+    value: str
+    start: int
+    end: int
+
+    def is_word(self, *words: str) -> bool:
+        return self.kind == WORD and self.value in words
+
+    def is_punct(self, char: str) -> bool:
+        return self.kind == PUNCT and self.value == char
+
+
+class Statement:
+    """Comando SQL completo (sem o ';' final) com seus tokens e a classificação"""
+
+    __slots__ = ('source', 'tokens', 'start', 'end', 'kind')
+
+    def __init__(self, source: str, tokens: List[Token]):
+        self.source = source
+        self.tokens = tokens
+        self.start = tokens[0].start
+        self.end = tokens[-1].end
+        self.kind = classify(tokens)
+
+    @property
+    def text(self) -> str:
+        return self.source[self.start:self.end]
+
+    @property
+    def line(self) -> int:
+        return self.source.count('\n', 0, self.start) + 1
+
+    def __repr__(self) -> str:
+        return f"Statement({self.kind!r}, {self.start}:{self.end})"
+
+
+def _scan_escape_string(text: str, i: int) -> int:
+    """Fim de um literal E'...' (aceita \\' além de '')"""
+    n = len(text)
+    j = i + 1
+    while j < n:
+        c = text[j]
+        if c == '\\':
+            j += 2
+        elif c == "'":
+            if j + 1 < n and text[j + 1] == "'":
+                j += 2
+            else:
+                return j + 1
+        else:
+            j += 1
+    return n
+
+
+def _scan_block_comment(text: str, i: int) -> int:
+    """Fim de um comentário /* ... */ (o Postgres permite aninhamento)"""
+    depth = 1
+    pos = i + 2
+    while depth:
+        m = _COMMENT_DELIM_RE.search(text, pos)
+        if not m:
+            return len(text)
+        depth += 1 if m.group() == '/*' else -1
+        pos = m.end()
+    return pos
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    """Gera os tokens do texto SQL, descartando espaços e comentários"""
+    n = len(text)
+    i = 0
+    match = _TOKEN_RE.match
+    while i < n:
+        m = match(text, i)
+        if m is None:
+            # Caractere desconhecido: emite como operador de um caractere
+            yield Token(OP, text[i], i, i + 1)
+            i += 1
+            continue
+
+        kind = m.lastgroup
+        j = m.end()
+
+        if kind == 'space' or kind == 'line_comment':
+            pass
+        elif kind == 'word':
+            yield Token(WORD, m.group().lower(), i, j)
+        elif kind == 'punct':
+            yield Token(PUNCT, m.group(), i, j)
+        elif kind == 'op':
+            yield Token(OP, m.group(), i, j)
+        elif kind == 'number':
+            yield Token(NUMBER, m.group(), i, j)
+        elif kind == 'string':
+            yield Token(STRING, text[i + 1:j - 1].replace("''", "'"), i, j)
+        elif kind == 'ident':
+            yield Token(IDENT, text[i + 1:j - 1].replace('""', '"'), i, j)
+        elif kind == 'param':
+            yield Token(PARAM, m.group(), i, j)
+        elif kind == 'dollar':
+            tag = m.group()
+            k = text.find(tag, j)
+            if k < 0:
+                yield Token(DOLLAR, text[j:], i, n)
+                return
+            yield Token(DOLLAR, text[j:k], i, k + len(tag))
+            j = k + len(tag)
+        elif kind == 'escape_string':
+            k = _scan_escape_string(text, j - 1)
+            yield Token(STRING, text[j:k - 1], i, k)
+            j = k
+        else:  # block_comment
+            j = _scan_block_comment(text, i)
+        i = j
+
+
+def classify(tokens: List[Token]) -> str:
+    """Classifica o comando pelas palavras iniciais ('create table', 'alter type', 'do' ...)"""
+    first = tokens[0]
+    if first.kind != WORD:
+        return 'other'
+    verb = first.value
+    if verb not in _OBJECT_VERBS:
+        return verb
+    for tok in tokens[1:]:
+        if tok.kind != WORD:
+            break
+        if tok.value in _OBJECT_MODIFIERS:
+            continue
+        if tok.value == 'on' and verb == 'comment':
+            continue
+        return f"{verb} {tok.value}"
+    return verb
+
+
+def split_statements(text: str) -> Iterator[Statement]:
+    """Gera os comandos do texto em ordem, separando por ';' fora de strings e blocos $$"""
+    tokens: List[Token] = []
+    count = 0
+    try:
+        for tok in tokenize(text):
+            if tok.kind == PUNCT and tok.value == ';':
+                if tokens:
+                    count += 1
+                    yield Statement(text, tokens)
+                    tokens = []
+            else:
+                tokens.append(tok)
+        if tokens:
+            count += 1
+            yield Statement(text, tokens)
+    finally:
+        current().count('statements', count)
+
+
+class TokenCursor:
+    """Cursor sobre os tokens de um comando, com os atalhos usados pelos parsers"""
+
+    __slots__ = ('tokens', 'pos', 'end')
+
+    def __init__(self, tokens: List[Token], pos: int = 0, end: Optional[int] = None):
+        self.tokens = tokens
+        self.pos = pos
+        self.end = len(tokens) if end is None else end
+
+    def at_end(self) -> bool:
+        return self.pos >= self.end
+
+    def peek(self, offset: int = 0) -> Optional[Token]:
+        i = self.pos + offset
+        return self.tokens[i] if i < self.end else None
+
+    def next(self) -> Optional[Token]:
+        tok = self.peek()
+        if tok is not None:
+            self.pos += 1
+        return tok
+
+    def accept(self, *words: str) -> bool:
+        """Consome a sequência de palavras-chave se ela estiver na posição atual"""
+        for k, word in enumerate(words):
+            tok = self.peek(k)
+            if tok is None or not tok.is_word(word):
+                return False
+        self.pos += len(words)
+        return True
+
+    def accept_punct(self, char: str) -> bool:
+        tok = self.peek()
+        if tok is not None and tok.is_punct(char):
+            self.pos += 1
+            return True
+        return False
+
+    def skip_words(self, words) -> None:
+        while True:
+            tok = self.peek()
+            if tok is None or tok.kind != WORD or tok.value not in words:
+                return
+            self.pos += 1
+
+    def name(self) -> Optional[str]:
+        tok = self.peek()
+        if tok is None or tok.kind not in (WORD, IDENT):
+            return None
+        self.pos += 1
+        return tok.value
+
+    def qualified_name(self) -> Tuple[Optional[str], Optional[str]]:
+        """Lê `schema.nome` ou `nome`; retorna (schema, nome)"""
+        first = self.name()
+        if first is None:
+            return None, None
+        if self.accept_punct('.'):
+            second = self.name()
+            return first, second
+        return None, first
+
+    def group_end(self) -> int:
+        """Índice do ')' que fecha o '(' na posição atual (ou `end` se não fechar)"""
+        depth = 0
+        for i in range(self.pos, self.end):
+            tok = self.tokens[i]
+            if tok.kind == PUNCT:
+                if tok.value in '([':
+                    depth += 1
+                elif tok.value in ')]':
+                    depth -= 1
+                    if depth == 0:
+                        return i
+        return self.end
+
+    def take_group(self) -> 'TokenCursor':
+        """Consome um grupo '( ... )' e retorna um cursor sobre o seu conteúdo"""
+        close = self.group_end()
+        inner = TokenCursor(self.tokens, self.pos + 1, close)
+        self.pos = min(close + 1, self.end)
+        return inner
+
+    def split(self, sep: str = ',') -> List['TokenCursor']:
+        """Divide o restante do cursor em partes separadas por `sep` no nível 0 de parênteses"""
+        parts = []
+        depth = 0
+        start = self.pos
+        for i in range(self.pos, self.end):
+            tok = self.tokens[i]
+            if tok.kind != PUNCT:
+                continue
+            if tok.value in '([':
+                depth += 1
+            elif tok.value in ')]':
+                depth -= 1
+            elif tok.value == sep and depth == 0:
+                parts.append(TokenCursor(self.tokens, start, i))
+                start = i + 1
+        if start < self.end:
+            parts.append(TokenCursor(self.tokens, start, self.end))
+        self.pos = self.end
+        return parts
+
+    def remaining(self) -> List[Token]:
+        return self.tokens[self.pos:self.end]
+
+    def span(self) -> Tuple[int, int]:
+        """Offsets (início, fim) no texto-fonte dos tokens restantes"""
+        if self.pos >= self.end:
+            return 0, 0
+        return self.tokens[self.pos].start, self.tokens[self.end - 1].end
+
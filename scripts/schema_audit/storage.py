@@ -0,0 +1,164 @@
+"""
+Largura de linha e alinhamento das colunas
+==========================================
+Estima o tamanho em disco de uma tupla do PostgreSQL a partir dos tipos das
+colunas (largura e alinhamento de cada tipo, como em pg_type.typlen/typalign):
+
+- cabeçalho de 23 bytes + bitmap de nulos, alinhado a 8 (MAXALIGN)
+- cada coluna começa no próximo múltiplo do seu alinhamento (padding)
+- valores de tamanho variável curtos (< 127 bytes) usam cabeçalho de 1 byte e
+  não são alinhados; os longos usam cabeçalho de 4 bytes alinhado a 4
+- valores grandes vão para a TOAST: na linha fica só um ponteiro de 18 bytes
+
+A ordem ótima agrupa as colunas de largura fixa por alinhamento decrescente
+(8, 4, 2, 1) e deixa as de tamanho variável no fim. Todas as colunas são
+consideradas não nulas (pior caso).
+"""
+
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from .model import Columns, Tables
+
+HEAP_TUPLE_HEADER = 23
+ITEM_ID = 4
+MAXALIGN = 8
+SHORT_VARLENA_MAX = 126         # até aqui o valor usa cabeçalho de 1 byte
+TOAST_TUPLE_THRESHOLD = 2032    # tuplas maiores têm valores comprimidos/movidos para a TOAST
+TOAST_POINTER = 18
+
+
+class TypeLayout(NamedTuple):
+    width: int          # bytes na linha (típico, para tipos variáveis)
+    align: int          # 1, 2, 4 ou 8
+    variable: bool      # varlena
+    toast: Optional[str] = None     # motivo para provável TOAST, se houver
+
+
+# (largura, alinhamento) dos tipos de largura fixa
+_FIXED = {
+    'boolean': (1, 1), 'bool': (1, 1), '"char"': (1, 1),
+    'smallint': (2, 2), 'int2': (2, 2), 'smallserial': (2, 2),
+    'integer': (4, 4), 'int': (4, 4), 'int4': (4, 4), 'serial': (4, 4), 'real': (4, 4), 'float4': (4, 4),
+    'date': (4, 4), 'oid': (4, 4),
+    'bigint': (8, 8), 'int8': (8, 8), 'bigserial': (8, 8), 'double precision': (8, 8), 'float8': (8, 8),
+    'timestamptz': (8, 8), 'timestamp': (8, 8), 'timestamp with time zone': (8, 8),
+    'timestamp without time zone': (8, 8), 'time': (8, 8), 'money': (8, 8),
+    'timetz': (12, 8), 'interval': (16, 8), 'uuid': (16, 1), 'macaddr': (6, 4), 'point': (16, 8),
+}
+_ENUM = (4, 4)
+
+# Tamanho típico do conteúdo dos tipos variáveis sem limite declarado
+_TYPICAL = {
+    'text': 32, 'jsonb': 96, 'json': 96, 'bytea': 64, 'inet': 7, 'cidr': 7, 'tsvector': 128,
+}
+_NUMERIC_BASE = 3               # cabeçalho curto + cabeçalho do numeric
+_ARRAY_HEADER = 24              # varlena + ndim/flags/tipo + dimensões
+
+
+def _type_parts(type_text: str) -> Tuple[str, Tuple[int, ...]]:
+    """('varchar', (255,)) para 'VARCHAR(255)'"""
+    text = ' '.join(type_text.lower().split()).replace('character varying', 'varchar')
+    base, _, mods = text.partition('(')
+    numbers = tuple(int(m) for m in mods.split(')')[0].replace(' ', '').split(',') if m.isdigit())
+    return base.strip(), numbers
+
+
+def _varlena(content: int, toast: Optional[str] = None) -> TypeLayout:
+    if content <= SHORT_VARLENA_MAX:
+        return TypeLayout(content + 1, 1, True, toast)
+    if content + 4 > TOAST_TUPLE_THRESHOLD:
+        return TypeLayout(TOAST_POINTER, 1, True, toast)
+    return TypeLayout(content + 4, 4, True, toast)
+
+
+def vector_bytes(dimensions: int) -> int:
+    """Tamanho de um valor pgvector: cabeçalho varlena + dim + reservado + float4 por dimensão"""
+    return 8 + 4 * dimensions
+
+
+def type_layout(type_text: Optional[str]) -> TypeLayout:
+    """Largura, alinhamento e risco de TOAST de um tipo de coluna"""
+    if not type_text:
+        return _varlena(_TYPICAL['text'])
+    base, mods = _type_parts(type_text)
+    if base.endswith('[]'):
+        element = type_layout(base[:-2])
+        return _varlena(_ARRAY_HEADER + 4 * element.width, "array: cresce com o número de elementos")
+    if base in _FIXED:
+        width, align = _FIXED[base]
+        return TypeLayout(width, align, False)
+    if base.startswith('public.'):
+        return TypeLayout(*_ENUM, False)
+    if base in ('varchar', 'char', 'character', 'bpchar'):
+        if not mods:
+            return _varlena(_TYPICAL['text'], "sem limite de tamanho")
+        limit = mods[0]
+        typical = limit if base != 'varchar' else min(limit, max(limit // 2, 1), 64)
+        return _varlena(typical, f"{base}({limit}) pode passar de 2 kB" if limit * 4 > TOAST_TUPLE_THRESHOLD else None)
+    if base in ('numeric', 'decimal'):
+        digits = mods[0] if mods else 20
+        return _varlena(_NUMERIC_BASE + 2 * -(-digits // 4) - 1)
+    if base in ('vector', 'halfvec'):
+        dimensions = mods[0] if mods else 0
+        size = vector_bytes(dimensions) if base == 'vector' else 8 + 2 * dimensions
+        toast = f"{base}({dimensions}): {size} bytes por valor" if size > TOAST_TUPLE_THRESHOLD // 4 else None
+        return _varlena(size, toast)
+    if base in ('text', 'jsonb', 'json', 'bytea', 'tsvector'):
+        return _varlena(_TYPICAL[base], "tamanho ilimitado")
+    if base in _TYPICAL:
+        return _varlena(_TYPICAL[base])
+    # Tipo desconhecido (domínio, extensão): tratado como enum de 4 bytes
+    return TypeLayout(*_ENUM, False)
+
+
+def tuple_size(layouts: Sequence[TypeLayout], nullable: bool = False) -> Tuple[int, int]:
+    """(bytes por linha na página incluindo ItemId, bytes de padding entre colunas)"""
+    header = HEAP_TUPLE_HEADER + ((len(layouts) + 7) // 8 if nullable else 0)
+    header = -(-header // MAXALIGN) * MAXALIGN
+    offset = 0
+    padding = 0
+    for layout in layouts:
+        aligned = -(-offset // layout.align) * layout.align
+        padding += aligned - offset
+        offset = aligned + layout.width
+    data = -(-(header + offset) // MAXALIGN) * MAXALIGN
+    return data + ITEM_ID, padding
+
+
+def optimal_order(columns: Sequence[Tuple[str, TypeLayout]]) -> List[Tuple[str, TypeLayout]]:
+    """Fixos por alinhamento decrescente (e largura), variáveis no fim; estável no empate"""
+    return sorted(columns, key=lambda c: (c[1].variable, -c[1].align, -c[1].width))
+
+
+class TableLayout(NamedTuple):
+    table: str
+    columns: Tuple[str, ...]
+    row_bytes: int
+    padding: int
+    optimal_columns: Tuple[str, ...]
+    optimal_row_bytes: int
+    toast: Tuple[Tuple[str, str], ...]      # (coluna, motivo)
+
+    @property
+    def saved(self) -> int:
+        return self.row_bytes - self.optimal_row_bytes
+
+
+def analyze_table(table: str, columns: Columns) -> TableLayout:
+    """Layout atual × ótimo de uma tabela do modelo de schema"""
+    layouts = [(name, type_layout(info.type)) for name, info in columns.items()]
+    nullable = any(info.nullable for info in columns.values())
+    current, padding = tuple_size([l for _, l in layouts], nullable)
+    best = optimal_order(layouts)
+    optimal, _ = tuple_size([l for _, l in best], nullable)
+    return TableLayout(
+        table, tuple(columns), current, padding, tuple(n for n, _ in best), optimal,
+        tuple((name, layout.toast) for name, layout in layouts if layout.toast),
+    )
+
+
+def analyze_storage(tables: Tables) -> List[TableLayout]:
+    """Layouts de todas as tabelas, das maiores economias para as menores"""
+    layouts = [analyze_table(name, columns) for name, columns in tables.items() if columns]
+    layouts.sort(key=lambda l: (-l.saved, -l.row_bytes, l.table))
+    return layouts
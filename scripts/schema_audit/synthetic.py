@@ -0,0 +1,347 @@
+"""
+Projeto sintético para benchmark das auditorias de tipos
+========================================================
+Gera, numa raiz temporária, a mesma estrutura do repositório (migrations em
+supabase/migrations, packages/shared/database.types.ts e arquivos de tipos em
+packages/shared/src/types) com `escala` vezes o tamanho atual do projeto.
+
+O conteúdo imita o que as auditorias encontram de verdade: ENUMs criados e
+alterados ao longo das migrations, tabelas com FKs para tabelas anteriores,
+colunas adicionadas, renomeadas e removidas depois, funções plpgsql com corpo
+$$, políticas RLS; do lado TypeScript, o Database no formato do `supabase gen
+types`, aliases Enums['x'] / Tables['x']['Row'], uniões de literais e
+interfaces com divergências injetadas. Tudo é determinístico para a semente.
+"""
+
+import random
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Tuple
+
+from .matcher import singularize, split_words
+
+
+class ProjectSize(NamedTuple):
+    migrations: int
+    tables: int
+    columns_per_table: int
+    enums: int
+    type_files: int
+
+    def scaled(self, factor: int) -> 'ProjectSize':
+        return ProjectSize(self.migrations * factor, self.tables * factor, self.columns_per_table,
+                           self.enums * factor, self.type_files * factor)
+
+
+# Tamanho atual do projeto (escala 1)
+BASE_SIZE = ProjectSize(migrations=21, tables=61, columns_per_table=15, enums=37, type_files=1)
+
+MIGRATIONS_SUBDIR = Path('supabase') / 'migrations'
+DATABASE_TYPES_SUBPATH = Path('packages') / 'shared' / 'database.types.ts'
+TYPES_SUBDIR = Path('packages') / 'shared' / 'src' / 'types'
+
+# Frações de divergência injetadas nos tipos TypeScript
+DRIFT_COLUMN = 0.02         # coluna ausente em database.types.ts / interface
+DRIFT_TYPE = 0.03           # tipo errado na interface
+DRIFT_NULLABLE = 0.05       # `| null` esquecido na interface
+DRIFT_ENUM_VALUE = 0.1      # valor de ENUM ausente (gerado ou união de literais)
+
+_TABLE_WORDS = ('registros', 'eventos', 'contas', 'pagamentos', 'notificacoes', 'mensagens', 'imoveis',
+                'documentos', 'usuarios', 'reservas', 'ocorrencias', 'votacoes')
+_ENUM_WORDS = ('status_pedido', 'tipo_conta', 'nivel_acesso', 'categoria_evento', 'canal_envio',
+               'prioridade_chamado')
+_COLUMN_WORDS = ('valor', 'descricao', 'codigo', 'nome', 'observacao', 'total', 'data_referencia',
+                 'quantidade', 'titulo', 'origem', 'metadados', 'ativo', 'ordem', 'limite')
+_ENUM_VALUES = ('rascunho', 'pendente', 'ativo', 'inativo', 'aprovado', 'rejeitado', 'cancelado',
+                'arquivado', 'em_andamento', 'concluido', 'suspenso', 'expirado')
+
+# (tipo PostgreSQL, tipo TypeScript em database.types.ts)
+_COLUMN_TYPES: Tuple[Tuple[str, str], ...] = (
+    ('VARCHAR(255)', 'string'),
+    ('TEXT', 'string'),
+    ('INTEGER', 'number'),
+    ('BIGINT', 'number'),
+    ('NUMERIC(12,2)', 'number'),
+    ('BOOLEAN', 'boolean'),
+    ('TIMESTAMPTZ', 'string'),
+    ('DATE', 'string'),
+    ('JSONB', 'Json'),
+    ('UUID', 'string'),
+)
+
+
+class _Column(NamedTuple):
+    pg_type: str
+    ts_type: str
+    nullable: bool
+    has_default: bool
+
+
+def _pascal(name: str) -> str:
+    """notificacoes_12 → Notificacoes12 (o índice de nomes singulariza cada palavra)"""
+    return ''.join(word.capitalize() for word in name.split('_'))
+
+
+def _singular_pascal(name: str) -> str:
+    """Nome de interface no singular, como nos tipos do projeto (notificacoes_12 → Notificacao12)"""
+    return ''.join(singularize(word).capitalize() for word in split_words(name))
+
+
+class SyntheticProject:
+    """Schema sintético mantido em memória enquanto as migrations são escritas"""
+
+    def __init__(self, size: ProjectSize, seed: int = 0):
+        self.size = size
+        self.rng = random.Random(seed)
+        self.tables: Dict[str, Dict[str, _Column]] = {}
+        self.enums: Dict[str, List[str]] = {}
+        self.parents: Dict[str, str] = {}
+
+    # ---- migrations ----
+
+    def _enum_sql(self, k: int) -> str:
+        name = f"{_ENUM_WORDS[k % len(_ENUM_WORDS)]}_{k}"
+        values = self.rng.sample(_ENUM_VALUES, self.rng.randint(3, 7))
+        self.enums[name] = values
+        return f"CREATE TYPE public.{name} AS ENUM ({', '.join(repr(v) for v in values)});\n"
+
+    def _column_def(self, name: str, column: _Column) -> str:
+        parts = [name, column.pg_type]
+        if not column.nullable:
+            parts.append('NOT NULL')
+        if column.has_default:
+            parts.append({'BOOLEAN': 'DEFAULT false', 'INTEGER': 'DEFAULT 0', 'TIMESTAMPTZ': 'DEFAULT NOW()',
+                          'JSONB': "DEFAULT '{}'::jsonb"}.get(column.pg_type, "DEFAULT ''"))
+        return ' '.join(parts)
+
+    def _random_column(self) -> _Column:
+        rng = self.rng
+        if self.enums and rng.random() < 0.15:
+            enum = rng.choice(list(self.enums)[-64:])
+            pg_type, ts_type = f"public.{enum}", f"Database[\"public\"][\"Enums\"][\"{enum}\"]"
+        else:
+            pg_type, ts_type = rng.choice(_COLUMN_TYPES)
+        has_default = pg_type in ('BOOLEAN', 'INTEGER', 'TIMESTAMPTZ', 'JSONB') and rng.random() < 0.5
+        return _Column(pg_type, ts_type, rng.random() < 0.6, has_default)
+
+    def _table_sql(self, k: int) -> str:
+        rng = self.rng
+        name = f"{_TABLE_WORDS[k % len(_TABLE_WORDS)]}_{k}"
+        columns = {'id': _Column('UUID', 'string', False, True)}
+        parent = rng.choice(list(self.tables)[-200:]) if self.tables else None
+        if parent is not None:
+            columns[f"{parent}_id"] = _Column('UUID', 'string', False, False)
+            self.parents[name] = parent
+        for j in range(self.size.columns_per_table - len(columns) - 1):
+            columns[f"{_COLUMN_WORDS[j % len(_COLUMN_WORDS)]}_{j}"] = self._random_column()
+        columns['created_at'] = _Column('TIMESTAMPTZ', 'string', False, True)
+        self.tables[name] = columns
+
+        lines = ["    id UUID PRIMARY KEY DEFAULT gen_random_uuid()"]
+        for column_name, column in list(columns.items())[1:]:
+            if column_name == f"{parent}_id":
+                lines.append(f"    {column_name} UUID NOT NULL REFERENCES public.{parent}(id) ON DELETE CASCADE")
+            else:
+                lines.append(f"    {self._column_def(column_name, column)}")
+        sql = [f"-- Tabela {name}\n",
+               f"CREATE TABLE IF NOT EXISTS public.{name} (\n" + ',\n'.join(lines) + "\n);\n\n",
+               f"COMMENT ON TABLE public.{name} IS 'Tabela sintética {k} (benchmark)';\n"]
+        sql.extend(f"COMMENT ON COLUMN public.{name}.{column_name} IS 'Campo {column_name} de {name}';\n"
+                   for column_name in columns)
+        if parent is not None:
+            sql.append(f"CREATE INDEX IF NOT EXISTS idx_{name}_{parent}_id ON public.{name}({parent}_id);\n")
+        sql.append(f"CREATE INDEX IF NOT EXISTS idx_{name}_created_at ON public.{name}(created_at DESC);\n")
+        sql.append(f"ALTER TABLE public.{name} ENABLE ROW LEVEL SECURITY;\n")
+        sql.append(f"CREATE POLICY \"{name}_select\" ON public.{name} FOR SELECT\n"
+                   f"    USING (auth.uid() IS NOT NULL);\n\n")
+        if parent is not None:
+            sql.append(f"CREATE POLICY \"{name}_insert\" ON public.{name} FOR INSERT\n"
+                       f"    WITH CHECK (EXISTS (\n"
+                       f"        SELECT 1 FROM public.{parent} p\n"
+                       f"        WHERE p.id = {parent}_id AND auth.uid() IS NOT NULL\n"
+                       f"    ));\n\n")
+        sql.append(f"GRANT SELECT, INSERT, UPDATE ON public.{name} TO authenticated;\n\n")
+        sql.append(f"CREATE OR REPLACE FUNCTION public.{name}_resumo(p_desde TIMESTAMPTZ)\n"
+                   f"RETURNS TABLE (dia DATE, total BIGINT) AS $$\n"
+                   f"    SELECT date_trunc('day', t.created_at)::date AS dia, COUNT(*) AS total\n"
+                   f"    FROM public.{name} t\n"
+                   f"    WHERE t.created_at >= p_desde\n"
+                   f"    GROUP BY 1\n"
+                   f"    ORDER BY 1 DESC;\n"
+                   f"$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;\n\n")
+        sql.append(f"CREATE OR REPLACE FUNCTION public.{name}_touch()\n"
+                   f"RETURNS TRIGGER AS $$\n"
+                   f"BEGIN\n"
+                   f"    -- mantém created_at; ajustes do registro antes da gravação\n"
+                   f"    IF NEW.created_at IS NULL THEN\n"
+                   f"        NEW.created_at := NOW();\n"
+                   f"    END IF;\n"
+                   f"    RETURN NEW;\n"
+                   f"END;\n"
+                   f"$$ LANGUAGE plpgsql;\n\n"
+                   f"CREATE TRIGGER trg_{name}_touch BEFORE INSERT OR UPDATE ON public.{name}\n"
+                   f"    FOR EACH ROW EXECUTE FUNCTION public.{name}_touch();\n\n")
+        return ''.join(sql)
+
+    def _evolve_sql(self, count: int) -> str:
+        """ALTERs sobre tabelas e ENUMs já criados: ADD/RENAME/DROP COLUMN, ADD VALUE"""
+        rng = self.rng
+        names = list(self.tables)
+        sql = []
+        for _ in range(count):
+            table = rng.choice(names)
+            columns = self.tables[table]
+            action = rng.random()
+            if action < 0.5:
+                column_name = f"extra_{len(columns)}"
+                column = self._random_column()
+                columns[column_name] = column
+                sql.append(f"ALTER TABLE public.{table} ADD COLUMN IF NOT EXISTS "
+                           f"{self._column_def(column_name, column)};\n")
+            elif action < 0.7:
+                old = rng.choice([c for c in columns if c not in ('id', 'created_at', f"{self.parents.get(table)}_id")])
+                new = f"{old}_v2" if not old.endswith('_v2') else old[:-3]
+                if new in columns:
+                    continue
+                columns[new] = columns.pop(old)
+                sql.append(f"ALTER TABLE public.{table} RENAME COLUMN {old} TO {new};\n")
+            elif action < 0.85:
+                candidates = [c for c in columns if c.startswith('extra_')]
+                if not candidates:
+                    continue
+                column_name = rng.choice(candidates)
+                del columns[column_name]
+                sql.append(f"ALTER TABLE public.{table} DROP COLUMN IF EXISTS {column_name};\n")
+            elif self.enums:
+                enum = rng.choice(list(self.enums))
+                value = f"valor_{len(self.enums[enum])}"
+                self.enums[enum].append(value)
+                sql.append(f"ALTER TYPE public.{enum} ADD VALUE IF NOT EXISTS '{value}';\n")
+        return ''.join(sql)
+
+    def write_migrations(self, directory: Path) -> List[Path]:
+        """Distribui ENUMs e tabelas pelas migrations; a partir da segunda, cada uma também altera as anteriores"""
+        directory.mkdir(parents=True, exist_ok=True)
+        size = self.size
+        paths = []
+        enum_k = table_k = 0
+        for i in range(size.migrations):
+            enum_end = size.enums * (i + 1) // size.migrations
+            table_end = size.tables * (i + 1) // size.migrations
+            parts = [f"-- Migration sintética {i + 1} de {size.migrations}\n\n"]
+            while enum_k < enum_end:
+                parts.append(self._enum_sql(enum_k))
+                enum_k += 1
+            parts.append('\n')
+            while table_k < table_end:
+                parts.append(self._table_sql(table_k))
+                table_k += 1
+            if i > 0:
+                parts.append(self._evolve_sql(max(1, size.tables // size.migrations // 2)))
+            path = directory / f"2024{1 + i // 1_000_000:02d}{i % 1_000_000:06d}_sintetica_{i + 1}.sql"
+            path.write_text(''.join(parts), encoding='utf-8')
+            paths.append(path)
+        return paths
+
+    # ---- database.types.ts ----
+
+    def _generated_columns(self, table: str) -> List[Tuple[str, _Column]]:
+        rng = self.rng
+        return sorted((name, column) for name, column in self.tables[table].items()
+                      if name == 'id' or rng.random() >= DRIFT_COLUMN)
+
+    def write_database_types(self, path: Path) -> None:
+        """Database no formato do `supabase gen types` (colunas ordenadas, Row/Insert/Update, Relationships)"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        rng = self.rng
+        with open(path, 'w', encoding='utf-8') as out:
+            out.write("export type Json =\n  | string\n  | number\n  | boolean\n  | null\n"
+                      "  | { [key: string]: Json | undefined }\n  | Json[]\n\n")
+            out.write("export type Database = {\n  public: {\n    Tables: {\n")
+            for table in sorted(self.tables):
+                columns = self._generated_columns(table)
+                out.write(f"      {table}: {{\n        Row: {{\n")
+                for name, column in columns:
+                    out.write(f"          {name}: {column.ts_type}{' | null' if column.nullable else ''}\n")
+                for section in ('Insert', 'Update'):
+                    out.write(f"        }}\n        {section}: {{\n")
+                    for name, column in columns:
+                        optional = section == 'Update' or column.nullable or column.has_default
+                        out.write(f"          {name}{'?' if optional else ''}: {column.ts_type}"
+                                  f"{' | null' if column.nullable else ''}\n")
+                out.write("        }\n        Relationships: [\n")
+                parent = self.parents.get(table)
+                if parent is not None:
+                    out.write(f"          {{\n            foreignKeyName: \"{table}_{parent}_id_fkey\"\n"
+                              f"            columns: [\"{parent}_id\"]\n            isOneToOne: false\n"
+                              f"            referencedRelation: \"{parent}\"\n"
+                              f"            referencedColumns: [\"id\"]\n          }},\n")
+                out.write("        ]\n      }\n")
+            out.write("    }\n    Views: {\n      [_ in never]: never\n    }\n")
+            out.write("    Functions: {\n      [_ in never]: never\n    }\n    Enums: {\n")
+            for enum in sorted(self.enums):
+                values = [v for v in self.enums[enum] if rng.random() >= DRIFT_ENUM_VALUE] or self.enums[enum]
+                out.write(f"      {enum}:\n" + ''.join(f"        | \"{v}\"\n" for v in values))
+            out.write("    }\n    CompositeTypes: {\n      [_ in never]: never\n    }\n  }\n}\n")
+
+    # ---- tipos customizados ----
+
+    def _interface(self, table: str) -> List[str]:
+        rng = self.rng
+        lines = [f"export interface {_singular_pascal(table)} {{"]
+        for name, column in self.tables[table].items():
+            if name != 'id' and rng.random() < DRIFT_COLUMN:
+                continue
+            if column.pg_type.startswith('public.'):
+                ts_type = _pascal(column.pg_type[len('public.'):])
+            elif column.ts_type == 'Json':
+                ts_type = 'Json'
+            elif rng.random() < DRIFT_TYPE:
+                ts_type = 'number' if column.ts_type == 'string' else 'string'
+            else:
+                ts_type = column.ts_type
+            null = ' | null' if column.nullable and rng.random() >= DRIFT_NULLABLE else ''
+            lines.append(f"  {name}: {ts_type}{null};")
+        if rng.random() < DRIFT_COLUMN * 5:
+            lines.append("  campo_calculado?: number;")
+        lines.append("}")
+        return lines
+
+    def write_type_files(self, directory: Path) -> List[Path]:
+        """Arquivos de tipos no estilo de derived.ts: aliases de Enums/Tables, uniões de literais e interfaces"""
+        directory.mkdir(parents=True, exist_ok=True)
+        rng = self.rng
+        tables, enums = sorted(self.tables), sorted(self.enums)
+        files = self.size.type_files
+        paths = []
+        for f in range(files):
+            out = ["/**", f" * Tipos sintéticos {f + 1} de {files} (benchmark das auditorias)", " */", "",
+                   "import { Database } from '../../database.types';", "",
+                   "export type Tables = Database['public']['Tables'];",
+                   "export type Enums = Database['public']['Enums'];",
+                   "export type Json = string | number | boolean | null | { [key: string]: Json | undefined } | Json[];",
+                   ""]
+            for k, enum in enumerate(enums[f::files]):
+                if k % 3 == 2:
+                    # união de literais no lugar do alias, como nos tipos antigos
+                    values = [v for v in self.enums[enum] if rng.random() >= DRIFT_ENUM_VALUE] or self.enums[enum]
+                    out.append(f"export type {_pascal(enum)} = {' | '.join(repr(v) for v in values)};")
+                else:
+                    out.append(f"export type {_pascal(enum)} = Enums['{enum}'];")
+            out.append("")
+            for table in tables[f::files]:
+                out.append(f"export type {_singular_pascal(table)}Row = Tables['{table}']['Row'];")
+                out.extend(self._interface(table))
+                out.append("")
+            path = directory / f"dominio_{f + 1:04d}.ts"
+            path.write_text('\n'.join(out), encoding='utf-8')
+            paths.append(path)
+        return paths
+
+
+def generate_project(root: Path, scale: int, seed: int = 0) -> SyntheticProject:
+    """Gera o projeto sintético na raiz (escala 1 = tamanho atual do repositório)"""
+    project = SyntheticProject(BASE_SIZE.scaled(scale), seed)
+    project.write_migrations(root / MIGRATIONS_SUBDIR)
+    project.write_database_types(root / DATABASE_TYPES_SUBPATH)
+    project.write_type_files(root / TYPES_SUBDIR)
+    return project
@@ -0,0 +1,7 @@
+"""
+Testes de comportamento da biblioteca das auditorias
+====================================================
+Executar a partir de scripts/:
+
+    python3 -m unittest discover -s schema_audit/tests -t .
+"""
@@ -0,0 +1,65 @@
+import unittest
+
+from schema_audit.database_types import compare_three_way, parse_database_types
+from schema_audit.replay import MigrationReplay
+
+GENERATED = """
+export type Database = {
+  public: {
+    Tables: {
+      contas: {
+        Row: {
+          id: string
+          numero: string
+          saldo: number | null
+          dados: Json | null
+          nome: string
+        }
+        Insert: {
+          id?: string
+          numero: string
+          saldo?: number | null
+          dados?: Json | null
+          nome?: string
+        }
+        Update: {
+          id?: string
+          numero?: string
+          saldo?: number | null
+          dados?: Json | null
+          nome?: string
+        }
+      }
+    }
+    Enums: {}
+  }
+}
+"""
+
+
+def migration_tables(sql):
+    replay = MigrationReplay()
+    replay.apply("20240101000001_contas.sql", sql)
+    return replay.final.tables
+
+
+class CompareThreeWayTest(unittest.TestCase):
+
+    def test_matching_schema_has_no_issues(self):
+        tables = migration_tables("CREATE TABLE contas (id UUID PRIMARY KEY DEFAULT gen_random_uuid(), "
+                                  "numero TEXT NOT NULL, saldo NUMERIC(12, 2), dados JSONB, "
+                                  "nome TEXT NOT NULL DEFAULT '');")
+        self.assertEqual(compare_three_way(tables, parse_database_types(GENERATED)), [])
+
+    def test_type_and_insert_mismatches(self):
+        tables = migration_tables("CREATE TABLE contas (id UUID PRIMARY KEY DEFAULT gen_random_uuid(), "
+                                  "numero INTEGER NOT NULL, saldo NUMERIC(12, 2), dados JSONB, "
+                                  "nome TEXT NOT NULL);")
+        self.assertEqual([issue[:2] for issue in compare_three_way(tables, parse_database_types(GENERATED))], [
+            ('TYPE_MISMATCH', 'contas.numero'),
+            ('INSERT_MISMATCH', 'contas.nome'),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from schema_audit.incremental import (build_commit_graph, build_graph, head_commit, read_staged, staged_changes,
+                                      update_graph)
+from schema_audit.replay import parse_migration
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+
+MIGRATION = "supabase/migrations/20240101000001_inicial.sql"
+TYPES = "packages/shared/src/types/usuario.ts"
+
+PARSERS = {
+    'migration': ('migration_ops', 1, parse_migration),
+    'ts': ('ts_test', 1, lambda content: {
+        line.split()[2]: set(line.split()[3:]) for line in content.splitlines() if line.startswith('// interface')
+    }),
+}
+
+
+def compare(table, match, columns, interfaces):
+    """Uma inconsistência por coluna ausente da interface escolhida"""
+    if match.interface is None:
+        return []
+    return [('MISSING_IN_TS', f"{table}.{column}", '') for column in columns
+            if column not in interfaces[match.interface]]
+
+
+def is_migration(path):
+    return path.startswith('supabase/')
+
+
+def git(root, *args):
+    subprocess.run(['git', '-c', 'user.name=t', '-c', 'user.email=t@t', *args], cwd=root, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class StagedDeltaTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.write(MIGRATION, "CREATE TABLE usuarios (id UUID, nome TEXT);\nCREATE TABLE blocos (id UUID);\n")
+        self.write(TYPES, "// interface Usuario id nome\n// interface Bloco id\n")
+        git(self.root, 'init', '-q')
+        git(self.root, 'add', '.')
+        git(self.root, 'commit', '-q', '-m', 'inicial')
+
+        paths = [self.root / MIGRATION], [self.root / TYPES]
+        self.graph = build_graph(self.root, paths[0], [parse_migration(paths[0][0].read_text())],
+                                 paths[1], [PARSERS['ts'][2](paths[1][0].read_text())], (1,), compare)
+
+    def write(self, relative, content):
+        path = self.root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    def stage(self, relative, content):
+        self.write(relative, content)
+        git(self.root, 'add', relative)
+
+    def delta(self):
+        changes = staged_changes(self.root, self.graph, lambda path: path in (MIGRATION, TYPES) or
+                                 path.startswith('supabase/migrations/'))
+        return update_graph(self.graph, read_staged(self.root, changes), is_migration, PARSERS, compare)
+
+    def test_full_graph_has_no_issues(self):
+        self.assertEqual(self.graph.issues, {'usuarios': [], 'blocos': []})
+
+    def test_nothing_staged(self):
+        self.assertEqual(staged_changes(self.root, self.graph, lambda path: True), {})
+
+    def test_new_migration_recompares_only_touched_tables(self):
+        self.stage("supabase/migrations/20240101000002_email.sql", "ALTER TABLE usuarios ADD COLUMN email TEXT;")
+        delta = self.delta()
+        self.assertEqual(delta.tables, ('usuarios',))
+        self.assertEqual(delta.added, (('MISSING_IN_TS', 'usuarios.email', ''),))
+        self.assertEqual(delta.removed, ())
+
+    def test_interface_change_resolves_issue(self):
+        self.stage("supabase/migrations/20240101000002_email.sql", "ALTER TABLE usuarios ADD COLUMN email TEXT;")
+        self.delta()
+        self.stage(TYPES, "// interface Usuario id nome email\n// interface Bloco id\n")
+        delta = self.delta()
+        self.assertEqual(delta.tables, ('usuarios',))
+        self.assertEqual(delta.removed, (('MISSING_IN_TS', 'usuarios.email', ''),))
+
+    def test_commit_graph_ignores_working_tree_and_index(self):
+        self.stage("supabase/migrations/20240101000002_email.sql", "ALTER TABLE usuarios ADD COLUMN email TEXT;")
+        graph = build_commit_graph(self.root, head_commit(self.root), ['supabase', 'packages'],
+                                   is_migration, lambda path: True, PARSERS, (1,), compare)
+        self.assertEqual(list(graph.migrations), [MIGRATION])
+        self.assertEqual(graph.issues, {'usuarios': [], 'blocos': []})
+
+        # O grafo do HEAD julga a migration em staging
+        changes = staged_changes(self.root, graph, lambda path: True)
+        delta = update_graph(graph, read_staged(self.root, changes), is_migration, PARSERS, compare)
+        self.assertEqual(delta.added, (('MISSING_IN_TS', 'usuarios.email', ''),))
+
+    def test_rename_in_later_migration_follows_the_change(self):
+        self.write("supabase/migrations/20240101000003_renomeia.sql", "ALTER TABLE blocos RENAME TO torres;")
+        git(self.root, 'add', '.')
+        self.delta()
+        self.stage(MIGRATION, "CREATE TABLE usuarios (id UUID, nome TEXT);\nCREATE TABLE blocos (id UUID, andar INT);\n")
+        delta = self.delta()
+        self.assertIn('torres', delta.tables)
+
+
+@unittest.skipUnless(shutil.which('git'), "git indisponível")
+class StagedGateTest(unittest.TestCase):
+    """audit-types.py --staged num repositório mínimo: um commit rejeitado não pode virar a referência"""
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        shutil.copytree(SCRIPTS_DIR, self.root / 'scripts',
+                        ignore=shutil.ignore_patterns('__pycache__', 'tests', 'benchmarks'))
+        for relative, content in (
+            ("supabase/migrations/20240101000001_inicial.sql", "CREATE TABLE usuarios (id UUID NOT NULL);\n"),
+            ("packages/shared/src/types/usuario.ts", "export interface Usuario {\n  id: string;\n}\n"),
+        ):
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        git(self.root, 'init', '-q')
+        git(self.root, 'add', '.')
+        git(self.root, 'commit', '-q', '-m', 'inicial')
+        self.assertEqual(self.audit().returncode, 0)
+
+    def audit(self, *args):
+        return subprocess.run([sys.executable, 'scripts/audit-types.py', '--no-cache', '--jobs', '1', *args],
+                              cwd=self.root, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    def test_rejected_commit_keeps_failing(self):
+        migration = self.root / "supabase/migrations/20240101000002_email.sql"
+        migration.write_text("ALTER TABLE usuarios ADD COLUMN email TEXT NOT NULL;\n")
+        git(self.root, 'add', '.')
+
+        first, second = self.audit('--staged'), self.audit('--staged')
+        self.assertEqual(first.returncode, 1, first.stdout)
+        self.assertIn('usuarios.email', first.stdout)
+        self.assertEqual(second.returncode, 1, second.stdout)
+
+    def test_full_audit_does_not_approve_staged_changes(self):
+        migration = self.root / "supabase/migrations/20240101000002_email.sql"
+        migration.write_text("ALTER TABLE usuarios ADD COLUMN email TEXT NOT NULL;\n")
+        git(self.root, 'add', '.')
+
+        self.assertEqual(self.audit().returncode, 0)
+        result = self.audit('--staged')
+        self.assertEqual(result.returncode, 1, result.stdout)
+
+        # Sem grafo, o --staged monta o do HEAD, não o da árvore de trabalho
+        (self.root / '.cache' / 'type-audit-graph.pickle').unlink()
+        result = self.audit('--staged')
+        self.assertEqual(result.returncode, 1, result.stdout)
+
+    def test_clean_commit_passes(self):
+        (self.root / "packages/shared/src/types/usuario.ts").write_text(
+            "export interface Usuario {\n  id: string;\n  email: string;\n}\n")
+        (self.root / "supabase/migrations/20240101000002_email.sql").write_text(
+            "ALTER TABLE usuarios ADD COLUMN email TEXT NOT NULL;\n")
+        git(self.root, 'add', '.')
+        result = self.audit('--staged')
+        self.assertEqual(result.returncode, 0, result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from schema_audit.indexes import parse_index_operations
+
+
+class TruncatedStatementTest(unittest.TestCase):
+
+    def test_truncated_create_index_is_ignored(self):
+        for sql in ("CREATE INDEX", "CREATE UNIQUE INDEX IF NOT EXISTS", "CREATE INDEX CONCURRENTLY"):
+            self.assertEqual(parse_index_operations(sql), [], sql)
+
+    def test_truncated_create_policy_keeps_default_command(self):
+        (kind, policy), = parse_index_operations("CREATE POLICY p ON t FOR")
+        self.assertEqual((kind, policy.table, policy.command), ('create_policy', 't', 'all'))
+
+    def test_complete_policy(self):
+        (_, policy), = parse_index_operations("CREATE POLICY p ON t FOR SELECT USING (a = 1);")
+        self.assertEqual((policy.command, policy.using), ('select', ('a',)))
+
+
+if __name__ == '__main__':
+    unittest.main()
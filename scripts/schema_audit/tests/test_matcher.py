@@ -0,0 +1,56 @@
+import unittest
+
+from schema_audit.matcher import InterfaceIndex, match_tables, name_key, singularize, split_words
+
+
+class NameKeyTest(unittest.TestCase):
+
+    def test_split_words(self):
+        self.assertEqual(split_words('usuarios_canais_preferencias'), ['usuarios', 'canais', 'preferencias'])
+        self.assertEqual(split_words('UsuarioCanalPreferencia'), ['usuario', 'canal', 'preferencia'])
+        self.assertEqual(split_words('FAQVoto'), ['faq', 'voto'])
+
+    def test_singularize(self):
+        self.assertEqual([singularize(w) for w in ('notificacoes', 'habitacionais', 'mensagens', 'conectores',
+                                                   'usuarios', 'status', 'gas')],
+                         ['notificacao', 'habitacional', 'mensagem', 'conector', 'usuario', 'status', 'gas'])
+
+    def test_table_and_interface_share_a_key(self):
+        self.assertEqual(name_key('usuarios_canais_preferencias'), name_key('UsuarioCanalPreferencia'))
+
+
+class ResolveTest(unittest.TestCase):
+
+    def test_exact_match(self):
+        match = InterfaceIndex(['Notificacao', 'NotificacaoEntrega']).resolve('notificacoes')
+        self.assertEqual((match.interface, match.via), ('Notificacao', 'exact'))
+
+    def test_single_prefix_candidate(self):
+        match = InterfaceIndex(['AssembleiaFormData', 'Usuario']).resolve('assembleias')
+        self.assertEqual((match.interface, match.candidates, match.via),
+                         ('AssembleiaFormData', ('AssembleiaFormData',), 'prefix'))
+
+    def test_several_prefix_candidates_are_ambiguous(self):
+        match = InterfaceIndex(['AssembleiaStats', 'AssembleiaFormData']).resolve('assembleias')
+        self.assertIsNone(match.interface)
+        self.assertEqual(match.via, 'ambiguous')
+        self.assertEqual(match.candidates, ('AssembleiaFormData', 'AssembleiaStats'))
+
+    def test_interfaces_with_the_same_key_are_ambiguous(self):
+        match = InterfaceIndex(['Usuario', 'Usuarios']).resolve('usuarios')
+        self.assertEqual((match.interface, match.via), (None, 'ambiguous'))
+
+    def test_exact_match_wins_over_prefix_candidates(self):
+        match = InterfaceIndex(['Chamado', 'ChamadoMensagem', 'ChamadoStats']).resolve('chamados')
+        self.assertEqual((match.interface, match.via), ('Chamado', 'exact'))
+
+    def test_no_candidates(self):
+        self.assertEqual(InterfaceIndex(['Usuario']).resolve('faq').via, 'none')
+
+    def test_match_tables(self):
+        matches = match_tables(['usuarios', 'faq'], ['Usuario'])
+        self.assertEqual({table: match.via for table, match in matches.items()}, {'usuarios': 'exact', 'faq': 'none'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from schema_audit.query_sites import parse_query_sites
+
+
+class ParseQuerySitesTest(unittest.TestCase):
+
+    def test_chain_with_filters_order_and_limit(self):
+        sites = parse_query_sites("const { data } = await supabase.from('avisos')\n"
+                                  "  .select('*').eq('condominio_id', id).order('criado_em').limit(10);\n")
+        self.assertEqual(len(sites), 1)
+        site = sites[0]
+        self.assertEqual((site.table, site.operation, site.filters, site.order, site.limited),
+                         ('avisos', 'select', (('eq', 'condominio_id'),), ('criado_em',), True))
+
+    def test_from_at_start_of_file_is_not_a_method_call(self):
+        # Sem o `.` antes, `from(...)` não é o cliente; o token anterior não pode vir do fim do arquivo
+        self.assertEqual(parse_query_sites("from('t').select('*').eq('a', 1)."), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
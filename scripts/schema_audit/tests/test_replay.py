@@ -0,0 +1,141 @@
+import unittest
+
+from schema_audit.replay import MigrationReplay, diff_snapshots, migration_index, parse_migration
+
+
+def replay(*migrations):
+    result = MigrationReplay()
+    for k, content in enumerate(migrations, 1):
+        result.apply(f"2024010100000{k}_m{k}.sql", content)
+    return result
+
+
+def shape(tables):
+    return {table: {name: (c.type, c.nullable) for name, c in columns.items()} for table, columns in tables.items()}
+
+
+class AlterTableTest(unittest.TestCase):
+
+    def test_add_drop_rename_and_alter_columns(self):
+        final = replay(
+            "CREATE TABLE t (a INT NOT NULL, b TEXT, c TEXT);",
+            """
+            ALTER TABLE t ADD COLUMN d BOOLEAN NOT NULL DEFAULT false, DROP COLUMN b;
+            ALTER TABLE t RENAME COLUMN c TO e;
+            ALTER TABLE t ALTER COLUMN a TYPE BIGINT USING a::bigint;
+            ALTER TABLE t ALTER COLUMN a DROP NOT NULL;
+            ALTER TABLE t ALTER COLUMN e SET NOT NULL;
+            """,
+        ).final
+        self.assertEqual(shape(final.tables), {
+            't': {'a': ('BIGINT', True), 'e': ('TEXT', False), 'd': ('BOOLEAN', False)},
+        })
+
+    def test_set_and_drop_default(self):
+        final = replay(
+            "CREATE TABLE t (a INT NOT NULL, b INT NOT NULL DEFAULT 0);",
+            "ALTER TABLE t ALTER COLUMN a SET DEFAULT 1, ALTER COLUMN b DROP DEFAULT;",
+        ).final
+        self.assertEqual({name: c.has_default for name, c in final.tables['t'].items()}, {'a': True, 'b': False})
+
+    def test_rename_table_and_drop_table(self):
+        final = replay(
+            "CREATE TABLE users (id UUID); CREATE TABLE tmp (id UUID);",
+            "ALTER TABLE users RENAME TO usuarios; DROP TABLE IF EXISTS tmp, inexistente;",
+        ).final
+        self.assertEqual(list(final.tables), ['usuarios'])
+
+    def test_if_not_exists_keeps_existing_definitions(self):
+        final = replay(
+            "CREATE TABLE t (a INT);",
+            "CREATE TABLE IF NOT EXISTS t (b INT); ALTER TABLE t ADD COLUMN IF NOT EXISTS a TEXT;",
+        ).final
+        self.assertEqual(shape(final.tables), {'t': {'a': ('INT', True)}})
+
+    def test_other_schemas_are_ignored(self):
+        ops = parse_migration("ALTER TABLE auth.users ADD COLUMN x INT; DROP TABLE storage.objects;")
+        self.assertEqual(ops, [])
+
+    def test_operations_on_missing_tables_and_columns_are_ignored(self):
+        final = replay(
+            "CREATE TABLE t (a INT);",
+            "ALTER TABLE nada ADD COLUMN x INT; ALTER TABLE t RENAME COLUMN zz TO yy; ALTER TABLE t DROP COLUMN zz;",
+        ).final
+        self.assertEqual(shape(final.tables), {'t': {'a': ('INT', True)}})
+
+    def test_primary_key_constraint_makes_columns_not_null(self):
+        final = replay("CREATE TABLE t (a INT, b INT);", "ALTER TABLE t ADD PRIMARY KEY (a);").final
+        self.assertEqual(shape(final.tables), {'t': {'a': ('INT', False), 'b': ('INT', True)}})
+
+
+class DoBlockTest(unittest.TestCase):
+
+    def test_alter_table_inside_do_block(self):
+        content = (
+            "CREATE TABLE t (nome TEXT);\n"
+            "DO $$\nBEGIN\n"
+            "  IF EXISTS (SELECT 1 FROM information_schema.columns WHERE column_name = 'nome') THEN\n"
+            "    ALTER TABLE t RENAME COLUMN nome TO titulo;\n"
+            "  END IF;\n"
+            "  ALTER TABLE t ADD COLUMN criado_em TIMESTAMPTZ;\n"
+            "END $$;\n"
+        )
+        snapshot = replay(content).final
+        self.assertEqual(list(snapshot.tables['t']), ['titulo', 'criado_em'])
+
+        # Offsets das colunas do bloco são relativos ao arquivo, não ao corpo do $$
+        column = snapshot.tables['t']['criado_em']
+        self.assertEqual(content[column.start:column.end], 'criado_em TIMESTAMPTZ')
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.replay = replay(
+            "CREATE TABLE a (x INT); CREATE TABLE b (y INT);",
+            "ALTER TABLE a ADD COLUMN z TEXT NOT NULL;",
+            "DROP TABLE b;",
+        )
+
+    def test_snapshots_are_rebuilt_for_earlier_migrations(self):
+        snapshots = self.replay.snapshots
+        self.assertEqual(snapshots[0].tables, {})
+        self.assertEqual(shape(snapshots[1].tables), {'a': {'x': ('INT', True)}, 'b': {'y': ('INT', True)}})
+        self.assertEqual(shape(snapshots[2].tables)['a'], {'x': ('INT', True), 'z': ('TEXT', False)})
+        self.assertEqual(list(snapshots[3].tables), ['a'])
+
+    def test_snapshots_keep_only_changed_tables(self):
+        self.assertEqual(list(self.replay.snapshots[2].changes), ['a'])
+        self.assertEqual(self.replay.snapshots[3].changes, {'b': None})
+        # Tabela intocada é o mesmo objeto entre snapshots
+        self.assertIs(self.replay.snapshots[1].tables['b'], self.replay.snapshots[2].tables['b'])
+
+    def test_snapshot_by_position_and_version_prefix(self):
+        self.assertIs(self.replay.snapshot(2), self.replay.snapshots[2])
+        self.assertIs(self.replay.snapshot('2'), self.replay.snapshots[2])
+        self.assertIs(self.replay.snapshot('20240101000003'), self.replay.snapshots[3])
+
+    def test_unknown_or_out_of_range_ref(self):
+        migrations = self.replay.migrations
+        self.assertEqual(migration_index(migrations, '0'), 0)
+        self.assertEqual(migration_index(migrations, '3'), 3)
+        for ref in ('4', '99', 'nope', '2024'):
+            with self.assertRaises(KeyError):
+                migration_index(migrations, ref)
+        with self.assertRaises(KeyError):
+            self.replay.snapshot(99)
+
+    def test_diff_between_snapshots(self):
+        old, new = self.replay.snapshots[1], self.replay.final
+        self.assertEqual(diff_snapshots(old, new), [
+            ('TABLE_DROPPED', 'b', ''),
+            ('COLUMN_ADDED', 'a.z', 'TEXT'),
+        ])
+
+    def test_iter_tables_matches_snapshots(self):
+        seen = [shape(tables) for _, tables in self.replay.iter_tables()]
+        self.assertEqual(seen, [shape(s.tables) for s in self.replay.snapshots])
+
+
+if __name__ == '__main__':
+    unittest.main()
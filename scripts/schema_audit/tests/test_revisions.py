@@ -0,0 +1,31 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from schema_audit.revisions import unknown_revisions
+from schema_audit.tests.test_incremental import git
+
+
+@unittest.skipUnless(shutil.which('git'), "git indisponível")
+class UnknownRevisionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        (self.root / 'a.txt').write_text('a')
+        git(self.root, 'init', '-q')
+        git(self.root, 'add', '.')
+        git(self.root, 'commit', '-q', '-m', 'inicial')
+
+    def test_valid_ranges(self):
+        for rev_range in ('HEAD', 'HEAD..HEAD', 'HEAD...HEAD', '..HEAD', 'HEAD..'):
+            self.assertEqual(unknown_revisions(self.root, rev_range), [], rev_range)
+
+    def test_unknown_sides_are_reported(self):
+        self.assertEqual(unknown_revisions(self.root, 'nope..HEAD'), ['nope'])
+        self.assertEqual(unknown_revisions(self.root, 'HEAD~1..zz'), ['HEAD~1', 'zz'])
+
+
+if __name__ == '__main__':
+    unittest.main()
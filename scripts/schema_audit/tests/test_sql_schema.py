@@ -0,0 +1,83 @@
+import unittest
+
+from schema_audit.sql_schema import iter_create_tables
+
+
+def tables(text):
+    return dict(iter_create_tables(text))
+
+
+class CreateTableTest(unittest.TestCase):
+
+    def test_types_with_arguments_and_nullability(self):
+        text = """
+        CREATE TABLE IF NOT EXISTS public.lancamentos (
+            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+            valor NUMERIC(12, 2) NOT NULL CHECK (valor >= 0),
+            descricao TEXT,
+            tags TEXT[] DEFAULT '{}',
+            criado_em TIMESTAMP WITH TIME ZONE DEFAULT now()
+        );
+        """
+        columns = tables(text)['lancamentos']
+        self.assertEqual(list(columns), ['id', 'valor', 'descricao', 'tags', 'criado_em'])
+        self.assertEqual([(c.type, c.nullable) for c in columns.values()], [
+            ('UUID', False),
+            ('NUMERIC(12, 2)', False),
+            ('TEXT', True),
+            ('TEXT[]', True),
+            ('TIMESTAMP WITH TIME ZONE', True),
+        ])
+
+    def test_default_serial_and_generated_columns(self):
+        text = """
+        CREATE TABLE t (
+            id BIGSERIAL PRIMARY KEY,
+            nome TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'ativo',
+            apelido TEXT DEFAULT NULL,
+            total INT GENERATED ALWAYS AS (1) STORED,
+            seq INT GENERATED BY DEFAULT AS IDENTITY
+        );
+        """
+        columns = tables(text)['t']
+        self.assertEqual({name: c.has_default for name, c in columns.items()}, {
+            'id': True, 'nome': False, 'status': True, 'apelido': False, 'total': True, 'seq': True,
+        })
+
+    def test_column_offsets_point_at_the_definition(self):
+        text = "CREATE TABLE t (\n  a INT NOT NULL,\n  b TEXT DEFAULT 'x, y'\n);"
+        columns = tables(text)['t']
+        self.assertEqual(text[columns['a'].start:columns['a'].end], 'a INT NOT NULL')
+        self.assertEqual(text[columns['b'].start:columns['b'].end], "b TEXT DEFAULT 'x, y'")
+
+    def test_table_constraints_are_not_columns(self):
+        text = """
+        CREATE TABLE votos (
+            pauta_id UUID REFERENCES pautas(id),
+            unidade_id UUID,
+            CONSTRAINT votos_unicos UNIQUE (pauta_id, unidade_id),
+            PRIMARY KEY (pauta_id, unidade_id),
+            CHECK (pauta_id IS NOT NULL)
+        );
+        """
+        columns = tables(text)['votos']
+        self.assertEqual(list(columns), ['pauta_id', 'unidade_id'])
+        self.assertFalse(columns['pauta_id'].nullable)
+        self.assertFalse(columns['unidade_id'].nullable)
+
+    def test_quoted_column_names(self):
+        columns = tables('CREATE TABLE t ("Nome Completo" TEXT NOT NULL, "order" INT)')['t']
+        self.assertEqual(list(columns), ['Nome Completo', 'order'])
+
+    def test_create_table_as_and_partition_of_are_skipped(self):
+        text = "CREATE TABLE copia AS SELECT * FROM t; CREATE TABLE p PARTITION OF t FOR VALUES IN (1);"
+        self.assertEqual(tables(text), {})
+
+    def test_semicolon_inside_check_string_does_not_split(self):
+        text = "CREATE TABLE t (a TEXT CHECK (a <> ';'), b INT);"
+        self.assertEqual(list(tables(text)['t']), ['a', 'b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from schema_audit.sql_tokenizer import DOLLAR, IDENT, STRING, WORD, split_statements, tokenize
+
+
+def kinds_values(text):
+    return [(tok.kind, tok.value) for tok in tokenize(text)]
+
+
+class TokenizeTest(unittest.TestCase):
+
+    def test_words_are_lowercased_and_quoted_identifiers_kept(self):
+        self.assertEqual(kinds_values('ALTER TABLE "Minha ""Tabela"""'), [
+            (WORD, 'alter'), (WORD, 'table'), (IDENT, 'Minha "Tabela"'),
+        ])
+
+    def test_string_with_doubled_quote(self):
+        self.assertEqual(kinds_values("SELECT 'it''s'"), [(WORD, 'select'), (STRING, "it's")])
+
+    def test_escape_string_accepts_backslash_quote(self):
+        text = r"SELECT E'it\'s; here', 1"
+        tokens = list(tokenize(text))
+        self.assertEqual(tokens[1].kind, STRING)
+        self.assertEqual(text[tokens[1].start:tokens[1].end], r"E'it\'s; here'")
+        self.assertEqual(tokens[2].value, ',')
+
+    def test_dollar_quoted_body_is_one_token(self):
+        tokens = list(tokenize("AS $body$ BEGIN; SELECT '$$'; END $body$ LANGUAGE sql"))
+        self.assertEqual(tokens[1].kind, DOLLAR)
+        self.assertEqual(tokens[1].value, " BEGIN; SELECT '$$'; END ")
+        self.assertTrue(tokens[2].is_word('language'))
+
+    def test_unterminated_dollar_quote_runs_to_end(self):
+        tokens = list(tokenize("DO $$ BEGIN"))
+        self.assertEqual(tokens[-1].kind, DOLLAR)
+        self.assertEqual(tokens[-1].value, " BEGIN")
+
+    def test_nested_block_comments_are_skipped(self):
+        self.assertEqual(kinds_values("a /* x /* y */ z; */ b -- c;\nd"), [
+            (WORD, 'a'), (WORD, 'b'), (WORD, 'd'),
+        ])
+
+    def test_positional_parameter_is_not_dollar_quote(self):
+        self.assertEqual([tok.kind for tok in tokenize("$1 + $2")], ['param', 'op', 'param'])
+
+
+class SplitStatementsTest(unittest.TestCase):
+
+    def test_semicolons_inside_strings_bodies_and_comments_do_not_split(self):
+        text = ("CREATE FUNCTION f() RETURNS void AS $$ BEGIN; END $$ LANGUAGE plpgsql;\n"
+                "/* ; /* ; */ ; */ SELECT E'a\\';', 'b;';\n"
+                "DO $x$ BEGIN ALTER TABLE t ADD COLUMN c int; END $x$;")
+        statements = list(split_statements(text))
+        self.assertEqual([s.kind for s in statements], ['create function', 'select', 'do'])
+        self.assertEqual([s.line for s in statements], [1, 2, 3])
+
+    def test_classify_skips_modifiers(self):
+        text = "CREATE OR REPLACE FUNCTION f(); CREATE UNIQUE INDEX i ON t (a); COMMENT ON TABLE t IS 'x'"
+        self.assertEqual([s.kind for s in split_statements(text)],
+                         ['create function', 'create index', 'comment table'])
+
+    def test_empty_statements_are_dropped(self):
+        self.assertEqual(len(list(split_statements(";; SELECT 1;;"))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from schema_audit.cache import NullCache
+from schema_audit.ts_declarations import load_type_files
+
+
+class LoadedTypeFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+        self.paths = []
+        for name in ('a.ts', 'b.ts'):
+            path = self.root / name
+            path.write_text(f"export interface {name[0].upper()} {{\n  id: string;\n}}\n")
+            self.paths.append(path)
+
+    def test_loaded_models_are_reused(self):
+        cache, loaded = NullCache(), {}
+        first = load_type_files(self.paths[:1], cache, 1, loaded)
+        self.assertEqual(list(loaded), [self.paths[0].resolve()])
+
+        # Só b.ts é lido; a.ts vem do modelo já carregado, mesmo por um caminho relativo diferente
+        self.paths[0].write_text("export interface Outro {}\n")
+        again = self.root / '.' / 'a.ts'
+        both = load_type_files([again, self.paths[1]], cache, 1, loaded)
+        self.assertIs(both[0], first[0])
+        self.assertEqual([d.name for d in both[1].declarations], ['B'])
+        self.assertEqual(cache.misses, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,365 @@
+"""
+Grafo de triggers e amplificação de escrita
+===========================================
+Extrai das migrations os CREATE TRIGGER (BEFORE/AFTER/INSTEAD OF, eventos,
+nível ROW/STATEMENT, condição WHEN e função chamada) e os corpos das funções
+(plpgsql ou sql): tabelas escritas (INSERT INTO, UPDATE, DELETE FROM) e outras
+funções chamadas. Com as FKs ON DELETE CASCADE / SET NULL do modelo de índices,
+calcula o fan-out transitivo de uma escrita de linha em cada tabela: quantos
+triggers disparam e quantas escritas aninhadas acontecem, com ciclos detectados.
+
+SQL dinâmico (EXECUTE) não é resolvido; a função é marcada como dinâmica.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .indexes import IndexModel
+from .lines import LineIndex
+from .parallel import parse_files
+from .sql_tokenizer import DOLLAR, WORD, Token, TokenCursor, classify, split_statements
+
+# Incrementar quando a saída de parse_trigger_operations mudar (invalida o cache de parse)
+PARSER_VERSION = 1
+
+EVENTS = ('insert', 'update', 'delete')
+
+# Palavras seguidas de '(' que não são chamadas de função do usuário
+_NOT_CALLS = frozenset({
+    'if', 'elsif', 'values', 'in', 'exists', 'coalesce', 'case', 'when', 'and', 'or', 'not',
+    'select', 'returning', 'into', 'using', 'over', 'filter', 'any', 'all', 'array', 'row',
+})
+
+
+class Trigger(NamedTuple):
+    name: str
+    table: str
+    timing: str                     # before / after / instead of
+    events: Tuple[str, ...]         # insert / update / delete / truncate
+    level: str                      # row / statement
+    function: str
+    conditional: bool = False       # tem cláusula WHEN
+    migration: str = ''
+    line: int = 0
+
+
+class FunctionBody(NamedTuple):
+    name: str
+    writes: Tuple[Tuple[str, str], ...]     # (evento, tabela)
+    calls: Tuple[str, ...]                  # candidatos a funções chamadas (filtrados na análise)
+    dynamic: bool                           # usa EXECUTE com SQL dinâmico
+    migration: str = ''
+    line: int = 0
+
+
+# Operações:
+#   ('create_function', FunctionBody)
+#   ('drop_function', nome)
+#   ('create_trigger', Trigger)
+#   ('drop_trigger', tabela, nome)
+TriggerOperation = Tuple
+
+
+def _table_name(schema: Optional[str], name: str) -> str:
+    """Tabelas do schema public sem prefixo; as demais qualificadas (auth.users)"""
+    return name if schema is None or schema == 'public' else f"{schema}.{name}"
+
+
+def scan_body(body: str) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...], bool]:
+    """Escritas, chamadas e uso de EXECUTE no corpo de uma função"""
+    writes: List[Tuple[str, str]] = []
+    calls: List[str] = []
+    dynamic = False
+    for stmt in split_statements(body):
+        tokens = stmt.tokens
+        for i, tok in enumerate(tokens):
+            if tok.kind != WORD:
+                continue
+            prev = tokens[i - 1] if i else None
+            if tok.value == 'insert' and i + 1 < len(tokens) and tokens[i + 1].is_word('into'):
+                schema, name = TokenCursor(tokens, i + 2).qualified_name()
+                if name:
+                    writes.append(('insert', _table_name(schema, name)))
+            elif tok.value == 'update' and not (prev is not None and prev.is_word('for', 'do', 'of', 'on')):
+                cur = TokenCursor(tokens, i + 1)
+                cur.accept('only')
+                schema, name = cur.qualified_name()
+                nxt = cur.peek()
+                if name and nxt is not None and (nxt.is_word('set') or nxt.kind == WORD and
+                                                 cur.peek(1) is not None and cur.peek(1).is_word('set')):
+                    writes.append(('update', _table_name(schema, name)))
+            elif tok.value == 'delete' and i + 1 < len(tokens) and tokens[i + 1].is_word('from'):
+                cur = TokenCursor(tokens, i + 2)
+                cur.accept('only')
+                schema, name = cur.qualified_name()
+                if name:
+                    writes.append(('delete', _table_name(schema, name)))
+            elif tok.value == 'execute' and not (prev is not None and prev.is_word('each', 'row', 'statement')):
+                dynamic = True
+            elif tok.value not in _NOT_CALLS and i + 1 < len(tokens) and tokens[i + 1].is_punct('('):
+                if prev is not None and prev.is_punct('.'):
+                    qualifier = tokens[i - 2] if i >= 2 else None
+                    if qualifier is None or not qualifier.is_word('public'):
+                        continue
+                calls.append(tok.value)
+    return tuple(dict.fromkeys(writes)), tuple(dict.fromkeys(calls)), dynamic
+
+
+def _parse_create_function(ops: List[TriggerOperation], tokens: List[Token], line: int) -> None:
+    cur = TokenCursor(tokens)
+    cur.accept('create')
+    cur.accept('or', 'replace')
+    if not cur.accept('function') and not cur.accept('procedure'):
+        return
+    schema, name = cur.qualified_name()
+    if name is None or schema not in (None, 'public'):
+        return
+    body = next((tok.value for tok in tokens if tok.kind == DOLLAR), None)
+    if body is None:
+        return
+    writes, calls, dynamic = scan_body(body)
+    ops.append(('create_function', FunctionBody(name, writes, tuple(c for c in calls if c != name),
+                                                dynamic, line=line)))
+
+
+def _parse_drop_function(ops: List[TriggerOperation], tokens: List[Token], line: int) -> None:
+    cur = TokenCursor(tokens)
+    cur.accept('drop')
+    if not cur.accept('function') and not cur.accept('procedure'):
+        return
+    cur.accept('if', 'exists')
+    for part in cur.split():
+        schema, name = part.qualified_name()
+        if name and schema in (None, 'public'):
+            ops.append(('drop_function', name))
+
+
+def _parse_create_trigger(ops: List[TriggerOperation], tokens: List[Token], line: int) -> None:
+    cur = TokenCursor(tokens)
+    cur.accept('create')
+    cur.accept('or', 'replace')
+    cur.accept('constraint')
+    if not cur.accept('trigger'):
+        return
+    name = cur.name()
+    if cur.accept('instead', 'of'):
+        timing = 'instead of'
+    elif cur.accept('before'):
+        timing = 'before'
+    elif cur.accept('after'):
+        timing = 'after'
+    else:
+        return
+
+    events: List[str] = []
+    while not cur.at_end() and not cur.peek().is_word('on'):
+        tok = cur.next()
+        if tok.is_word('insert', 'update', 'delete', 'truncate'):
+            events.append(tok.value)
+        elif tok.is_word('of'):
+            # UPDATE OF col1, col2: colunas ignoradas (o evento continua sendo update)
+            while not cur.at_end() and not cur.peek().is_word('on', 'or'):
+                cur.next()
+    if name is None or not cur.accept('on'):
+        return
+    schema, table = cur.qualified_name()
+
+    level = 'statement'
+    conditional = False
+    function = None
+    while not cur.at_end():
+        if cur.accept('for'):
+            cur.accept('each')
+            level = 'row' if cur.accept('row') else 'statement'
+        elif cur.accept('when'):
+            conditional = True
+            if cur.peek() is not None and cur.peek().is_punct('('):
+                cur.take_group()
+        elif cur.accept('execute'):
+            if not cur.accept('function'):
+                cur.accept('procedure')
+            _, function = cur.qualified_name()
+            break
+        else:
+            cur.next()
+    if table is None or function is None:
+        return
+    ops.append(('create_trigger', Trigger(name, _table_name(schema, table), timing, tuple(events), level,
+                                          function, conditional, line=line)))
+
+
+def _parse_drop_trigger(ops: List[TriggerOperation], tokens: List[Token], line: int) -> None:
+    cur = TokenCursor(tokens)
+    if not cur.accept('drop', 'trigger'):
+        return
+    cur.accept('if', 'exists')
+    name = cur.name()
+    if name and cur.accept('on'):
+        schema, table = cur.qualified_name()
+        if table:
+            ops.append(('drop_trigger', _table_name(schema, table), name))
+
+
+_STATEMENT_PARSERS = {
+    'create function': _parse_create_function,
+    'create procedure': _parse_create_function,
+    'drop function': _parse_drop_function,
+    'drop procedure': _parse_drop_function,
+    'create trigger': _parse_create_trigger,
+    'drop trigger': _parse_drop_trigger,
+}
+
+
+def parse_trigger_operations(content: str) -> List[TriggerOperation]:
+    """Funções e triggers de uma migration, em ordem (inclui blocos DO $$)"""
+    ops: List[TriggerOperation] = []
+    lines = LineIndex(content)
+    for stmt in split_statements(content):
+        line = lines.line_of(stmt.start)
+        parser = _STATEMENT_PARSERS.get(stmt.kind)
+        if parser is not None:
+            parser(ops, stmt.tokens, line)
+        elif stmt.kind == 'do':
+            for tok in stmt.tokens:
+                if tok.kind != DOLLAR:
+                    continue
+                for inner in split_statements(tok.value):
+                    toks = inner.tokens
+                    for i, first in enumerate(toks):
+                        if first.is_word('create', 'drop'):
+                            parser = _STATEMENT_PARSERS.get(classify(toks[i:]))
+                            if parser is not None:
+                                parser(ops, toks[i:], line)
+                            break
+    return ops
+
+
+class WriteStep(NamedTuple):
+    """Nó da árvore de fan-out: uma escrita e o que ela dispara"""
+    event: str
+    table: str
+    via: str                        # trigger (função) ou FK que causou a escrita
+    depth: int
+
+
+class FanOut(NamedTuple):
+    table: str
+    event: str
+    triggers: int                   # execuções de trigger por linha escrita (transitivo)
+    row_triggers: int
+    statement_triggers: int
+    nested_writes: int              # escritas em outras linhas/tabelas causadas pela escrita original
+    depth: int
+    tables: Tuple[str, ...]         # tabelas tocadas transitivamente
+    steps: Tuple[WriteStep, ...]
+    cycles: Tuple[str, ...]         # caminhos que voltam a uma escrita já em andamento
+    dynamic: Tuple[str, ...]        # funções com SQL dinâmico no caminho
+
+
+class TriggerGraph:
+    """Triggers e funções vigentes após aplicar as migrations em ordem"""
+
+    def __init__(self):
+        self.triggers: Dict[str, Dict[str, Trigger]] = {}       # tabela → nome → trigger
+        self.functions: Dict[str, FunctionBody] = {}
+        self.cascades: Dict[str, List[Tuple[str, str, str]]] = {}   # tabela pai → (evento, filha, via)
+
+    @classmethod
+    def from_directory(cls, migrations_dir: Path, cache=None, jobs: Optional[int] = 1,
+                       index_model: Optional[IndexModel] = None) -> 'TriggerGraph':
+        graph = cls()
+        sql_files = sorted(migrations_dir.glob("*.sql"))
+        all_ops = parse_files(sql_files, 'trigger_ops', PARSER_VERSION, parse_trigger_operations, cache, jobs)
+        for sql_file, ops in zip(sql_files, all_ops):
+            graph.apply(sql_file.name, ops)
+        if index_model is not None:
+            graph.add_foreign_keys(index_model)
+        return graph
+
+    def apply(self, migration: str, ops: Iterable[TriggerOperation]) -> None:
+        for op in ops:
+            kind = op[0]
+            if kind == 'create_function':
+                self.functions[op[1].name] = op[1]._replace(migration=migration)
+            elif kind == 'drop_function':
+                self.functions.pop(op[1], None)
+            elif kind == 'create_trigger':
+                trigger = op[1]._replace(migration=migration)
+                self.triggers.setdefault(trigger.table, {})[trigger.name] = trigger
+            elif kind == 'drop_trigger':
+                self.triggers.get(op[1], {}).pop(op[2], None)
+
+    def add_foreign_keys(self, model: IndexModel) -> None:
+        """Escritas implícitas de FKs: DELETE no pai → DELETE (CASCADE) ou UPDATE (SET NULL/DEFAULT) na filha"""
+        for entry in model.tables.values():
+            for fk in entry.foreign_keys:
+                action = (fk.on_delete or '').lower()
+                if action == 'cascade':
+                    event = 'delete'
+                elif action.startswith('set'):
+                    event = 'update'
+                else:
+                    continue
+                self.cascades.setdefault(fk.ref_table, []).append(
+                    (event, fk.table, f"FK {fk.table}({', '.join(fk.columns)}) ON DELETE {action.upper()}"))
+
+    def firing(self, table: str, event: str) -> List[Trigger]:
+        """Triggers que disparam para o evento na tabela, BEFORE antes de AFTER, por nome"""
+        triggers = [t for t in self.triggers.get(table, {}).values() if event in t.events]
+        return sorted(triggers, key=lambda t: (t.timing != 'before', t.name))
+
+    def _function_writes(self, name: str, seen: Set[str], dynamic: List[str]) -> List[Tuple[str, str]]:
+        """Escritas de uma função, incluindo as das funções do usuário que ela chama"""
+        function = self.functions.get(name)
+        if function is None or name in seen:
+            return []
+        seen.add(name)
+        if function.dynamic:
+            dynamic.append(name)
+        writes = list(function.writes)
+        for call in function.calls:
+            if call in self.functions:
+                writes.extend(self._function_writes(call, seen, dynamic))
+        return writes
+
+    def fan_out(self, table: str, event: str, max_depth: int = 10) -> FanOut:
+        """Fan-out transitivo de uma escrita de linha (`event`) em `table`"""
+        steps: List[WriteStep] = []
+        cycles: List[str] = []
+        dynamic: List[str] = []
+        counts = {'row': 0, 'statement': 0}
+        deepest = 0
+
+        def visit(current: str, current_event: str, depth: int, path: Tuple[Tuple[str, str], ...]) -> None:
+            nonlocal deepest
+            deepest = max(deepest, depth)
+            if depth >= max_depth:
+                return
+            children: List[Tuple[str, str, str]] = []
+            for trigger in self.firing(current, current_event):
+                counts['row' if trigger.level == 'row' else 'statement'] += 1
+                for write_event, write_table in self._function_writes(trigger.function, set(), dynamic):
+                    children.append((write_event, write_table, f"{trigger.name} → {trigger.function}()"))
+            if current_event == 'delete':
+                children.extend(self.cascades.get(current, ()))
+            for child_event, child_table, via in children:
+                key = (child_table, child_event)
+                steps.append(WriteStep(child_event, child_table, via, depth + 1))
+                if key in path:
+                    cycles.append(' → '.join(f"{e.upper()} {t}" for t, e in path + (key,)))
+                    continue
+                visit(child_table, child_event, depth + 1, path + (key,))
+
+        visit(table, event, 0, ((table, event),))
+        return FanOut(
+            table, event, counts['row'] + counts['statement'], counts['row'], counts['statement'],
+            len(steps), deepest, tuple(dict.fromkeys(s.table for s in steps)), tuple(steps),
+            tuple(dict.fromkeys(cycles)), tuple(dict.fromkeys(dynamic)),
+        )
+
+    def report(self, tables: Iterable[str]) -> List[FanOut]:
+        """Fan-out de INSERT/UPDATE/DELETE em cada tabela, do maior para o menor"""
+        results = [self.fan_out(table, event) for table in tables for event in EVENTS]
+        results = [r for r in results if r.triggers or r.nested_writes]
+        results.sort(key=lambda r: (-(r.triggers + r.nested_writes), -r.depth, r.table, EVENTS.index(r.event)))
+        return results
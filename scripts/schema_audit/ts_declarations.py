@@ -0,0 +1,343 @@
+"""
+Declarações dos arquivos de tipos TypeScript
+============================================
+Uma única leitura e tokenização (ts_tokenizer) por arquivo, numa passada
+linear, produz o modelo usado por todas as verificações dos arquivos de tipos
+(audit-types, validate-type-sync, audit-literal-types):
+
+- imports: módulos importados/reexportados (`from '../database.types'`)
+- declarations: interfaces e aliases `type`, com bases do `extends`, o lado
+  direito do alias e os membros do corpo objeto. Objetos aninhados, genéricos
+  (`Record<string, { a: X }>`) e uniões em várias linhas são delimitados pelo
+  balanceamento de { ( [ <, não por expressão regular.
+- fields: todos os campos `nome: Tipo`, em qualquer nível de aninhamento
+- references: tabelas e ENUMs do database.types usados (Tables['x'], Enums['y'])
+
+O resultado é cacheável (parse_files) e compartilhado entre as ferramentas pela
+mesma chave de cache: load_type_files é o ponto de entrada. Numa execução só
+(audit-all-types), os modelos já carregados são repassados a cada verificação
+em `loaded` e os arquivos não são lidos de novo.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .model import intern
+from .parallel import parse_files
+from .ts_tokenizer import (CLOSERS, IDENT, NEWLINE, NUMBER, OPENERS, PUNCT, STRING, Token, TokenStream,
+                           join_tokens, token_end, tokenize)
+
+# Incrementar quando parse_type_file mudar (invalida o cache de parse)
+PARSER_VERSION = 1
+
+# Aliases do database.types que referenciam tabelas / ENUMs: Tables['x'], Enums['y']
+TABLE_ALIASES = frozenset({'Tables', 'TablesInsert', 'TablesUpdate'})
+ENUM_ALIASES = frozenset({'Enums'})
+
+# Um tipo continua na linha seguinte depois destes tokens ou antes deles
+_CONTINUES_AFTER = frozenset({'|', '&', '=>', ':', '?', '=', ',', '.', 'extends', 'keyof', 'typeof', 'infer', 'is'})
+_CONTINUES_BEFORE = frozenset({'|', '&', '=>', ':', '?', '.', 'extends'})
+_WORD_RE = re.compile(r'\w+')
+_NO_TOKEN = Token(NEWLINE, '', 0, 0)
+
+
+class Member(NamedTuple):
+    name: str
+    type: str           # texto do tipo como no arquivo, com espaços normalizados
+    optional: bool
+    line: int
+
+
+class Declaration(NamedTuple):
+    kind: str                               # 'interface' | 'type'
+    name: str
+    exported: bool
+    generic: bool                           # tem parâmetros de tipo (<T>)
+    line: int
+    extends: Tuple[str, ...]                # bases de uma interface (A, Omit<B, "c">)
+    value: str                              # lado direito de um alias (vazio para interfaces)
+    members: Optional[Tuple[Member, ...]]   # corpo objeto; None quando o alias não é um objeto literal
+
+
+class TypeFile(NamedTuple):
+    imports: Tuple[str, ...]
+    declarations: Tuple[Declaration, ...]
+    fields: Tuple[Member, ...]
+    references: Tuple[Tuple[str, str], ...]     # ('table' | 'enum', nome), ordenado
+
+
+class _Span:
+    """Primeiro e último token de um tipo, e os objetos literais do nível zero"""
+
+    __slots__ = ('first', 'last', 'objects')
+
+    def __init__(self):
+        self.first: Optional[Token] = None
+        self.last: Optional[Token] = None
+        self.objects: List[Tuple[Token, Tuple[Member, ...], Token]] = []
+
+    def add(self, tok: Token) -> None:
+        if self.first is None:
+            self.first = tok
+        self.last = tok
+
+
+class _TypeFileParser:
+    """Percorre o fluxo de tokens uma vez; declarações e campos saem em ordem de arquivo"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.references: Set[Tuple[str, str]] = set()
+        self.imports: List[str] = []
+        self.declarations: List[Declaration] = []
+        self.fields: List[Optional[Member]] = []
+        self.stream = TokenStream(self._observe(tokenize(content)))
+
+    def _observe(self, tokens: Iterable[Token]) -> Iterator[Token]:
+        """Repassa os tokens registrando Tables['x'] / Enums['y'] em qualquer posição"""
+        alias = opener = name = _NO_TOKEN     # os três tokens significativos anteriores
+        for tok in tokens:
+            kind = tok.kind
+            if kind == PUNCT:
+                if (tok.value == ']' and name.kind == STRING and opener.value == '[' and alias.kind == IDENT
+                        and _WORD_RE.fullmatch(name.value)):
+                    if alias.value in TABLE_ALIASES:
+                        self.references.add(('table', name.value))
+                    elif alias.value in ENUM_ALIASES:
+                        self.references.add(('enum', name.value))
+            if kind != NEWLINE:
+                alias, opener, name = opener, name, tok
+            yield tok
+
+    def text(self, span: _Span) -> str:
+        if span.first is None:
+            return ''
+        return ' '.join(self.content[span.first.offset:token_end(self.content, span.last)].split())
+
+    # ---- tipos ----
+
+    def _continues(self, last: Token) -> bool:
+        if last.kind in (PUNCT, IDENT) and last.value in _CONTINUES_AFTER:
+            return True
+        nxt = self.stream.peek_significant()
+        return nxt is not None and nxt.kind in (PUNCT, IDENT) and nxt.value in _CONTINUES_BEFORE
+
+    def read_type(self) -> _Span:
+        """Lê um tipo até ';', ',' ou um fechamento do nível zero, ou até o fim da linha quando completo"""
+        stream = self.stream
+        span = _Span()
+        depth = 0
+        while True:
+            tok = stream.peek()
+            if tok is None:
+                return span
+            if tok.kind == NEWLINE:
+                if depth == 0 and span.last is not None and not self._continues(span.last):
+                    return span
+                stream.next()
+                continue
+            if tok.kind == PUNCT:
+                if depth == 0 and (tok.value in (';', ',') or tok.value in CLOSERS):
+                    return span
+                if tok.value == '{':
+                    stream.next()
+                    members, close = self.read_object()
+                    if depth == 0:
+                        span.objects.append((tok, members, close))
+                    span.add(tok)
+                    if close is not None:
+                        span.add(close)
+                    continue
+                if tok.value in OPENERS:
+                    depth += 1
+                elif tok.value in CLOSERS:
+                    depth -= 1
+            span.add(stream.next())
+
+    def read_object(self) -> Tuple[Tuple[Member, ...], Optional[Token]]:
+        """Membros de um tipo objeto cujo '{' já foi consumido; devolve também o '}'"""
+        stream = self.stream
+        members = []
+        while True:
+            tok = stream.next()
+            if tok is None or tok.is_punct('}'):
+                return tuple(members), tok
+            if tok.kind == NEWLINE or tok.kind == PUNCT and tok.value in (';', ','):
+                continue
+            if tok.is_punct('['):
+                # Assinatura de índice / mapped type: [key: string]: T, [K in keyof T]?: T[K]
+                self._skip_to_close(']')
+                self.read_type()
+                continue
+            nxt = stream.peek()
+            if tok.is_ident('readonly') and nxt is not None and (nxt.kind in (IDENT, STRING) or nxt.is_punct('[')):
+                continue
+            if tok.kind not in (IDENT, STRING, NUMBER):
+                self.read_type()        # assinatura de chamada/construtor
+                continue
+
+            optional = False
+            if nxt is not None and nxt.is_punct('?'):
+                stream.next()
+                optional = True
+                nxt = stream.peek()
+            if nxt is None or not nxt.is_punct(':'):
+                self.read_type()        # método: nome(args): T
+                continue
+            stream.next()
+
+            slot = len(self.fields)
+            self.fields.append(None)
+            member = Member(intern(tok.value), intern(self.text(self.read_type())), optional, tok.line)
+            self.fields[slot] = member
+            members.append(member)
+
+    def _skip_to_close(self, closer: str) -> None:
+        """Consome até o fechamento do grupo cujo abridor já foi consumido"""
+        depth = 1
+        while depth:
+            tok = self.stream.next()
+            if tok is None:
+                return
+            if tok.kind == PUNCT:
+                if tok.value in OPENERS:
+                    depth += 1
+                elif tok.value in CLOSERS:
+                    depth -= 1
+
+    # ---- declarações ----
+
+    def read_type_params(self) -> bool:
+        tok = self.stream.peek()
+        if tok is not None and tok.is_punct('<'):
+            self.stream.skip_group()
+            return True
+        return False
+
+    def read_interface(self, exported: bool, line: int) -> None:
+        stream = self.stream
+        name = stream.next()
+        if name is None or name.kind != IDENT:
+            return
+        generic = self.read_type_params()
+        extends = []
+        tok = stream.peek_significant()
+        if tok is not None and tok.is_ident('extends'):
+            stream.skip_newlines()
+            stream.next()
+            while True:
+                stream.skip_newlines()
+                base: List[Token] = []
+                depth = 0
+                while (tok := stream.peek()) is not None:
+                    if tok.kind == PUNCT and depth == 0 and tok.value in (',', '{'):
+                        break
+                    if tok.kind == PUNCT and tok.value in OPENERS:
+                        depth += 1
+                    elif tok.kind == PUNCT and tok.value in CLOSERS:
+                        depth -= 1
+                    if tok.kind != NEWLINE:
+                        base.append(tok)
+                    stream.next()
+                if base:
+                    extends.append(intern(join_tokens(base)))
+                if tok is None or not tok.is_punct(','):
+                    break
+                stream.next()
+        stream.skip_newlines()
+        tok = stream.next()
+        members: Tuple[Member, ...] = ()
+        if tok is not None and tok.is_punct('{'):
+            members = self.read_object()[0]
+        self.declarations.append(Declaration('interface', intern(name.value), exported, generic, line,
+                                             tuple(extends), '', members))
+
+    def read_alias(self, exported: bool, line: int) -> None:
+        stream = self.stream
+        name = stream.next()
+        generic = self.read_type_params()
+        tok = stream.peek_significant()
+        if tok is None or not tok.is_punct('=') or name is None:
+            return
+        stream.skip_newlines()
+        stream.next()
+        span = self.read_type()
+        members = None
+        if len(span.objects) == 1:
+            opener, object_members, close = span.objects[0]
+            if span.first is opener and span.last is close:
+                members = object_members
+        self.declarations.append(Declaration('type', intern(name.value), exported, generic, line,
+                                             (), intern(self.text(span)), members))
+
+    def read_statement(self) -> None:
+        """Consome um comando de nível zero que não é declaração de tipo, registrando `from '...'` e `import '...'`"""
+        stream = self.stream
+        depth = 0
+        prev = None
+        while (tok := stream.next()) is not None:
+            prev, before = tok, prev
+            if tok.kind == NEWLINE:
+                if depth == 0:
+                    nxt = stream.peek_significant()
+                    if not (nxt is not None and (nxt.is_ident('from') or nxt.kind == PUNCT and nxt.value in ('.', '=>'))):
+                        return
+                continue
+            if tok.kind == PUNCT:
+                if tok.value == ';' and depth == 0:
+                    return
+                if tok.value in OPENERS:
+                    depth += 1
+                elif tok.value in CLOSERS:
+                    depth -= 1
+            elif tok.kind == STRING and before is not None and before.is_ident('from', 'import'):
+                self.imports.append(tok.value)
+
+    def parse(self) -> TypeFile:
+        stream = self.stream
+        while (tok := stream.peek()) is not None:
+            if tok.kind == NEWLINE or tok.is_punct(';'):
+                stream.next()
+                continue
+            exported = tok.is_ident('export')
+            if exported:
+                stream.next()
+                tok = stream.peek()
+            if tok is not None and tok.is_ident('declare'):
+                stream.next()
+                tok = stream.peek()
+            if tok is None:
+                break
+            nxt = stream.peek(1)
+            if tok.is_ident('interface') and nxt is not None and nxt.kind == IDENT:
+                stream.next()
+                self.read_interface(exported, tok.line)
+            elif tok.is_ident('type') and nxt is not None and nxt.kind == IDENT:
+                stream.next()
+                self.read_alias(exported, tok.line)
+            else:
+                self.read_statement()
+
+        return TypeFile(tuple(self.imports), tuple(self.declarations), tuple(m for m in self.fields if m),
+                        tuple(sorted(self.references)))
+
+
+def parse_type_file(content: str) -> TypeFile:
+    """Declarações, campos, imports e referências ao database.types de um arquivo de tipos"""
+    return _TypeFileParser(content).parse()
+
+
+def load_type_files(paths: Sequence[Path], cache=None, jobs: Optional[int] = 1,
+                    loaded: Optional[Dict[Path, TypeFile]] = None) -> List[TypeFile]:
+    """parse_type_file de cada arquivo, em ordem; o cache é compartilhado entre as auditorias
+
+    Com `loaded` (caminho absoluto → modelo), os arquivos já presentes não são
+    lidos de novo e os demais são parseados e acrescentados.
+    """
+    if loaded is None:
+        return parse_files(paths, 'ts_declarations', PARSER_VERSION, parse_type_file, cache, jobs)
+    keys = [Path(path).resolve() for path in paths]
+    missing = [key for key in dict.fromkeys(keys) if key not in loaded]
+    loaded.update(zip(missing, parse_files(missing, 'ts_declarations', PARSER_VERSION, parse_type_file, cache, jobs)))
+    return [loaded[key] for key in keys]
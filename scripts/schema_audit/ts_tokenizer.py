@@ -0,0 +1,220 @@
+"""
+Tokenizador TypeScript em streaming
+===================================
+Lê o arquivo linha a linha (sem carregar o conteúdo inteiro) e gera tokens com
+posição (linha e offset). Comentários /* */ e template strings que atravessam
+linhas são tratados por estado entre linhas. As quebras de linha são emitidas
+como tokens NEWLINE porque separam membros de tipos objeto.
+
+Todas as alternativas do padrão mestre casam ancoradas e sem quantificadores
+aninhados ambíguos, então o custo é linear no tamanho do arquivo.
+"""
+
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+IDENT = 'ident'
+STRING = 'string'
+TEMPLATE = 'template'
+NUMBER = 'number'
+PUNCT = 'punct'
+NEWLINE = 'newline'
+
+_TOKEN_RE = re.compile(r"""
+    (?P<space>[ \t\r\f\v]+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<template>`)
+  | (?P<ident>[A-Za-z_$\u0080-\uffff][\w$\u0080-\uffff]*)
+  | (?P<number>\d[\d_]*(?:\.\d+)?(?:[eE][+-]?\d+)?n?)
+  | (?P<punct>=>|\.\.\.|\?\.|[{}()\[\]<>:;,|&?=.*+\-!/%^~@\#])
+""", re.VERBOSE)
+
+OPENERS = {'{': '}', '(': ')', '[': ']', '<': '>'}
+CLOSERS = frozenset(OPENERS.values())
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str      # texto do token (strings sem as aspas)
+    line: int       # linha (1-based)
+    offset: int     # offset absoluto, em caracteres, no arquivo
+
+    def is_punct(self, char: str) -> bool:
+        return self.kind == PUNCT and self.value == char
+
+    def is_ident(self, *names: str) -> bool:
+        return self.kind == IDENT and self.value in names
+
+
+def tokenize_lines(lines: Iterable[str]) -> Iterator[Token]:
+    """Gera os tokens de uma sequência de linhas (ex.: um arquivo aberto)"""
+    in_comment = False
+    in_template = False
+    template_parts: List[str] = []
+    template_start = (0, 0)
+    offset = 0
+
+    for line_no, line in enumerate(lines, 1):
+        n = len(line)
+        i = 0
+
+        while i < n:
+            if in_comment:
+                end = line.find('*/', i)
+                if end < 0:
+                    i = n
+                    break
+                in_comment = False
+                i = end + 2
+                continue
+
+            if in_template:
+                end = line.find('`', i)
+                if end < 0:
+                    template_parts.append(line[i:])
+                    i = n
+                    break
+                template_parts.append(line[i:end])
+                yield Token(TEMPLATE, ''.join(template_parts), *template_start)
+                in_template = False
+                template_parts = []
+                i = end + 1
+                continue
+
+            c = line[i]
+            if c == '\n':
+                yield Token(NEWLINE, '\n', line_no, offset + i)
+                i += 1
+                continue
+
+            m = _TOKEN_RE.match(line, i)
+            if m is None:
+                i += 1  # caractere fora da gramática de tipos: ignorado
+                continue
+
+            kind = m.lastgroup
+            j = m.end()
+            if kind == 'space' or kind == 'line_comment':
+                pass
+            elif kind == 'ident':
+                yield Token(IDENT, m.group(), line_no, offset + i)
+            elif kind == 'punct':
+                yield Token(PUNCT, m.group(), line_no, offset + i)
+            elif kind == 'string':
+                yield Token(STRING, m.group()[1:-1], line_no, offset + i)
+            elif kind == 'number':
+                yield Token(NUMBER, m.group(), line_no, offset + i)
+            elif kind == 'block_comment':
+                end = line.find('*/', j)
+                if end < 0:
+                    in_comment = True
+                    j = n
+                else:
+                    j = end + 2
+            else:  # template
+                in_template = True
+                template_start = (line_no, offset + i)
+            i = j
+
+        offset += n
+
+    if in_template:
+        yield Token(TEMPLATE, ''.join(template_parts), *template_start)
+
+
+def tokenize(text: str) -> Iterator[Token]:
+    """Gera os tokens de um texto já carregado"""
+    return tokenize_lines(text.splitlines(keepends=True))
+
+
+def token_end(text: str, tok: Token) -> int:
+    """Offset logo após o token no texto (strings com as aspas, templates até a crase final)"""
+    if tok.kind == TEMPLATE:
+        end = text.find('`', tok.offset + 1)
+        return len(text) if end < 0 else end + 1
+    m = _TOKEN_RE.match(text, tok.offset)
+    return tok.offset + len(tok.value) if m is None else m.end()
+
+
+class TokenStream:
+    """Iterador de tokens com lookahead, usado pelos leitores de tipos"""
+
+    __slots__ = ('_tokens', '_buffer')
+
+    def __init__(self, tokens: Iterable[Token]):
+        self._tokens = iter(tokens)
+        self._buffer: List[Token] = []
+
+    def peek(self, k: int = 0) -> Optional[Token]:
+        while len(self._buffer) <= k:
+            tok = next(self._tokens, None)
+            if tok is None:
+                return None
+            self._buffer.append(tok)
+        return self._buffer[k]
+
+    def next(self) -> Optional[Token]:
+        if self._buffer:
+            return self._buffer.pop(0)
+        return next(self._tokens, None)
+
+    def peek_significant(self) -> Optional[Token]:
+        """Próximo token que não é NEWLINE (sem consumir)"""
+        k = 0
+        while True:
+            tok = self.peek(k)
+            if tok is None or tok.kind != NEWLINE:
+                return tok
+            k += 1
+
+    def skip_newlines(self) -> None:
+        while True:
+            tok = self.peek()
+            if tok is None or tok.kind != NEWLINE:
+                return
+            self.next()
+
+    def skip_group(self) -> None:
+        """Consome um grupo balanceado a partir do abridor atual"""
+        depth = 0
+        while True:
+            tok = self.next()
+            if tok is None:
+                return
+            if tok.kind == PUNCT:
+                if tok.value in OPENERS:
+                    depth += 1
+                elif tok.value in CLOSERS:
+                    depth -= 1
+                    if depth <= 0:
+                        return
+
+
+_NO_SPACE_BEFORE = frozenset({')', ']', '>', ',', ';', '.', ':', '?'})
+_NO_SPACE_AFTER = frozenset({'(', '[', '<', '.'})
+_CALL_OPENERS = frozenset({'(', '[', '<'})
+_CALL_PRECEDERS = frozenset({')', ']', '>'})
+
+
+def _needs_space(prev: Token, tok: Token) -> bool:
+    if tok.kind == PUNCT and tok.value in _NO_SPACE_BEFORE:
+        return False
+    if prev.kind == PUNCT and prev.value in _NO_SPACE_AFTER:
+        return False
+    if tok.kind == PUNCT and tok.value in _CALL_OPENERS:
+        return not (prev.kind == IDENT or prev.kind == PUNCT and prev.value in _CALL_PRECEDERS)
+    return True
+
+
+def join_tokens(tokens: List[Token]) -> str:
+    """Reconstrói o texto de um tipo com espaçamento canônico ('string | null', 'Json[]')"""
+    out: List[str] = []
+    prev: Optional[Token] = None
+    for tok in tokens:
+        if prev is not None and _needs_space(prev, tok):
+            out.append(' ')
+        out.append(f'"{tok.value}"' if tok.kind == STRING else tok.value)
+        prev = tok
+    return ''.join(out)
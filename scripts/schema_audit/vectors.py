@@ -0,0 +1,377 @@
+"""
+Colunas pgvector: índices, buscas e dimensionamento
+===================================================
+Localiza as colunas `vector(n)`/`halfvec(n)` do schema, as buscas por
+similaridade nas funções das migrations (`ORDER BY col <=> $1 LIMIT k`) e os
+índices ivfflat/hnsw de cada coluna, e verifica se a classe de operadores do
+índice corresponde ao operador de distância usado na busca:
+
+- `<->` L2 (vector_l2_ops), `<#>` produto interno (vector_ip_ops),
+  `<=>` cosseno (vector_cosine_ops), `<+>` L1 (vector_l1_ops)
+
+Para um número de linhas estima heap + TOAST, tamanho do índice e a memória de
+construção (maintenance_work_mem), com os parâmetros recomendados pelo pgvector:
+ivfflat `lists = linhas / 1000` (até 1M linhas, depois √linhas) e hnsw `m = 16`,
+`ef_construction = 64`. As estimativas seguem o layout em disco do pgvector
+(um valor de 1536 dimensões ocupa 6 kB: uma entrada de índice por página).
+"""
+
+import math
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .indexes import IndexDef, IndexKey, IndexModel
+from .lines import LineIndex
+from .model import Tables
+from .parallel import parse_files
+from .sql_tokenizer import DOLLAR, IDENT, OP, WORD, Token, TokenCursor, split_statements
+from .storage import ITEM_ID, MAXALIGN, TOAST_TUPLE_THRESHOLD, _type_parts, analyze_table
+
+# Incrementar quando a saída de parse_vector_searches mudar (invalida o cache de parse)
+PARSER_VERSION = 1
+
+PAGE_SIZE = 8192
+PAGE_HEADER = 24
+TOAST_CHUNK = 1996              # TOAST_MAX_CHUNK_SIZE
+INDEX_TUPLE_HEADER = 8
+
+DISTANCE_OPERATORS = {'<->': 'L2', '<#>': 'produto interno', '<=>': 'cosseno', '<+>': 'L1'}
+_OPCLASS_SUFFIX = {'l2': '<->', 'ip': '<#>', 'cosine': '<=>', 'l1': '<+>'}
+ANN_METHODS = ('ivfflat', 'hnsw')
+MAX_INDEX_DIMENSIONS = {'vector': 2000, 'halfvec': 4000}
+
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 64
+_HNSW_ELEMENT_HEADER = 72       # tipo/nível + 10 heap TIDs + TID dos vizinhos
+_HNSW_MEMORY_ELEMENT = 128      # HnswElementData + ponteiros do grafo em memória
+_HNSW_MEMORY_CANDIDATE = 16     # HnswCandidate: ponteiro + distância
+_IVFFLAT_MIN_SAMPLES = 10000
+_IVFFLAT_SAMPLES_PER_LIST = 50
+
+# Palavras que não são alias depois de FROM/JOIN tabela
+_NOT_ALIAS = frozenset({
+    'where', 'join', 'inner', 'left', 'right', 'full', 'cross', 'natural', 'on', 'using', 'order',
+    'group', 'limit', 'having', 'union', 'lateral', 'window', 'offset', 'for', 'returning',
+})
+# Palavras que encerram a busca por ORDER BY antes de um operador de distância
+_CLAUSE_WORDS = frozenset({'select', 'where', 'and', 'or', 'from', 'on', 'having', 'when', 'then', 'set'})
+
+
+class VectorSearch(NamedTuple):
+    """Uso de um operador de distância no corpo de uma função"""
+    function: str
+    operator: str
+    operands: Tuple[Tuple[Optional[str], str], ...]     # (tabela ou None, coluna) de cada lado
+    tables: Tuple[str, ...]                             # tabelas do FROM/JOIN do comando
+    ordered: bool                                       # ORDER BY distância (usa índice ANN)
+    filtered: bool                                      # comando também tem WHERE
+    migration: str = ''
+    line: int = 0
+
+
+VectorOperation = Tuple
+
+
+def _statement_tables(tokens: List[Token]) -> Tuple[Dict[str, str], Tuple[str, ...]]:
+    """Aliases (alias → tabela) e tabelas referenciadas em FROM/JOIN"""
+    aliases: Dict[str, str] = {}
+    tables: List[str] = []
+    for i, tok in enumerate(tokens):
+        if not tok.is_word('from', 'join'):
+            continue
+        cur = TokenCursor(tokens, i + 1)
+        cur.accept('only')
+        schema, name = cur.qualified_name()
+        if name is None or schema not in (None, 'public'):
+            continue
+        tables.append(name)
+        aliases[name] = name
+        cur.accept('as')
+        alias = cur.peek()
+        if alias is not None and alias.kind in (WORD, IDENT) and alias.value not in _NOT_ALIAS:
+            aliases[alias.value] = name
+    return aliases, tuple(dict.fromkeys(tables))
+
+
+def _operand(tokens: List[Token], i: int, step: int, aliases: Dict[str, str]) -> Optional[Tuple[Optional[str], str]]:
+    """(tabela, coluna) do operando em tokens[i] (`col` ou `alias.col`), lendo na direção `step`"""
+    if not 0 <= i < len(tokens) or tokens[i].kind not in (WORD, IDENT):
+        return None
+    near = tokens[i]
+    dot = i + step
+    if 0 <= dot + step < len(tokens) and tokens[dot].is_punct('.') and tokens[dot + step].kind in (WORD, IDENT):
+        qualifier, column = (tokens[dot + step], near) if step < 0 else (near, tokens[dot + step])
+        return aliases.get(qualifier.value, qualifier.value), column.value
+    return None, near.value
+
+
+def _is_ordered(tokens: List[Token], i: int) -> bool:
+    """O operador em tokens[i] faz parte de um ORDER BY"""
+    j = i - 1
+    while j > 0:
+        tok = tokens[j]
+        if tok.is_punct(',') or tok.is_punct(';') or tok.kind == WORD and tok.value in _CLAUSE_WORDS:
+            return False
+        if tok.is_word('by') and tokens[j - 1].is_word('order'):
+            return True
+        j -= 1
+    return False
+
+
+def scan_searches(function: str, body: str) -> List[VectorSearch]:
+    """Buscas por distância vetorial no corpo de uma função"""
+    searches = []
+    for stmt in split_statements(body):
+        tokens = stmt.tokens
+        aliases, tables = _statement_tables(tokens)
+        filtered = any(tok.is_word('where') for tok in tokens)
+        for i, tok in enumerate(tokens):
+            if tok.kind != OP or tok.value not in DISTANCE_OPERATORS:
+                continue
+            operands = tuple(o for o in (_operand(tokens, i - 1, -1, aliases),
+                                         _operand(tokens, i + 1, 1, aliases)) if o)
+            searches.append(VectorSearch(function, tok.value, operands, tables,
+                                         _is_ordered(tokens, i), filtered))
+    return searches
+
+
+def parse_vector_searches(content: str) -> List[VectorOperation]:
+    """('create_function', nome, buscas) / ('drop_function', nome) de uma migration, em ordem"""
+    ops: List[VectorOperation] = []
+    lines = LineIndex(content)
+    for stmt in split_statements(content):
+        cur = TokenCursor(stmt.tokens)
+        if stmt.kind == 'create function':
+            cur.accept('create')
+            cur.accept('or', 'replace')
+            cur.accept('function')
+            schema, name = cur.qualified_name()
+            body = next((tok.value for tok in stmt.tokens if tok.kind == DOLLAR), None)
+            if name is None or schema not in (None, 'public') or body is None:
+                continue
+            line = lines.line_of(stmt.start)
+            ops.append(('create_function', name,
+                        tuple(s._replace(line=line) for s in scan_searches(name, body))))
+        elif stmt.kind == 'drop function':
+            cur.accept('drop', 'function')
+            cur.accept('if', 'exists')
+            for part in cur.split():
+                schema, name = part.qualified_name()
+                if name and schema in (None, 'public'):
+                    ops.append(('drop_function', name))
+    return ops
+
+
+def load_vector_searches(migrations_dir: Path, cache=None, jobs: Optional[int] = 1) -> Dict[str, Tuple[VectorSearch, ...]]:
+    """Buscas das funções vigentes após aplicar as migrations em ordem (função → buscas)"""
+    sql_files = sorted(migrations_dir.glob("*.sql"))
+    all_ops = parse_files(sql_files, 'vector_ops', PARSER_VERSION, parse_vector_searches, cache, jobs)
+    functions: Dict[str, Tuple[VectorSearch, ...]] = {}
+    for sql_file, ops in zip(sql_files, all_ops):
+        for op in ops:
+            if op[0] == 'create_function':
+                functions[op[1]] = tuple(s._replace(migration=sql_file.name) for s in op[2])
+            else:
+                functions.pop(op[1], None)
+    return {name: searches for name, searches in functions.items() if searches}
+
+
+def vector_type(type_text: Optional[str]) -> Optional[Tuple[str, int]]:
+    """('vector', 1536) para 'vector(1536)'; None se não for tipo pgvector"""
+    if not type_text:
+        return None
+    base, mods = _type_parts(type_text)
+    base = base.rsplit('.', 1)[-1]
+    if base not in MAX_INDEX_DIMENSIONS:
+        return None
+    return base, mods[0] if mods else 0
+
+
+def value_bytes(base: str, dimensions: int) -> int:
+    """Valor sem compressão: cabeçalho varlena + dim + reservado + 4 (vector) ou 2 (halfvec) bytes por dimensão"""
+    return 8 + (4 if base == 'vector' else 2) * dimensions
+
+
+def opclass_operator(opclass: Optional[str]) -> str:
+    """Operador de distância atendido pela classe de operadores (padrão: L2)"""
+    suffix = (opclass or 'vector_l2_ops').lower()
+    for name, operator in _OPCLASS_SUFFIX.items():
+        if suffix.endswith(f"_{name}_ops"):
+            return operator
+    return '<->'
+
+
+def recommended_lists(rows: int) -> int:
+    """lists do ivfflat: linhas / 1000 até 1M linhas, √linhas acima disso"""
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def _maxalign(size: int) -> int:
+    return -(-size // MAXALIGN) * MAXALIGN
+
+
+def _pages(rows: int, tuple_bytes: int, special: int = 0) -> int:
+    per_page = max(1, (PAGE_SIZE - PAGE_HEADER - special) // tuple_bytes)
+    return -(-rows // per_page)
+
+
+def heap_bytes(rows: int, row_bytes: int) -> int:
+    """Páginas da tabela principal (row_bytes já inclui o ItemId)"""
+    return _pages(rows, row_bytes) * PAGE_SIZE
+
+
+def toast_bytes(rows: int, size: int) -> int:
+    """Tabela TOAST (chunks de 1996 bytes) + seu índice para valores acima de 2 kB"""
+    if size <= TOAST_TUPLE_THRESHOLD:
+        return 0
+    full, rest = divmod(size, TOAST_CHUNK)
+    chunk_tuples = [TOAST_CHUNK] * full + ([rest] if rest else [])
+    per_value = sum(_maxalign(24 + 12 + chunk) + ITEM_ID for chunk in chunk_tuples)
+    data = -(-rows * per_value // (PAGE_SIZE - PAGE_HEADER)) * PAGE_SIZE
+    index = _pages(rows * len(chunk_tuples), 20) * PAGE_SIZE * 10 // 9
+    return data + index
+
+
+def ivfflat_bytes(rows: int, size: int, lists: int) -> Tuple[int, int]:
+    """(tamanho do índice, memória de construção) de um ivfflat"""
+    entry = _maxalign(INDEX_TUPLE_HEADER + size) + ITEM_ID
+    center = _maxalign(INDEX_TUPLE_HEADER + 8 + size) + ITEM_ID
+    pages = 1 + _pages(lists, center, 16) + _pages(rows, entry, 16)
+    samples = min(rows, max(lists * _IVFFLAT_SAMPLES_PER_LIST, _IVFFLAT_MIN_SAMPLES))
+    return pages * PAGE_SIZE, (samples + lists) * size
+
+
+def hnsw_bytes(rows: int, size: int, m: int = HNSW_M) -> Tuple[int, int]:
+    """(tamanho do índice, memória para construir o grafo inteiro em memória) de um hnsw"""
+    # Camada 0 tem 2m vizinhos; camadas superiores m, com nível esperado 1/(m-1)
+    neighbors = 2 * m + -(-m // (m - 1))
+    element = _maxalign(INDEX_TUPLE_HEADER + _HNSW_ELEMENT_HEADER + size) + ITEM_ID
+    neighbor_tuple = _maxalign(INDEX_TUPLE_HEADER + 4 + 6 * neighbors) + ITEM_ID
+    pages = 1 + _pages(rows, element + neighbor_tuple, 16)
+    memory = rows * (_HNSW_MEMORY_ELEMENT + size + _HNSW_MEMORY_CANDIDATE * neighbors)
+    return pages * PAGE_SIZE, memory
+
+
+class IndexEstimate(NamedTuple):
+    name: str                   # nome do índice (ou sugestão, se não existir)
+    method: str
+    opclass: str
+    options: Tuple[Tuple[str, str], ...]
+    index_bytes: int
+    build_bytes: int            # maintenance_work_mem para construir sem ir a disco
+    existing: bool
+
+
+class VectorColumnPlan(NamedTuple):
+    table: str
+    column: str
+    base: str                   # vector / halfvec
+    dimensions: int
+    value_bytes: int
+    indexes: Tuple[IndexDef, ...]
+    searches: Tuple[VectorSearch, ...]
+    issues: Tuple[Tuple[str, str], ...]     # (tipo, descrição)
+    heap_bytes: int             # tabela inteira (todas as colunas)
+    toast_bytes: int            # valores da coluna fora da linha
+    estimates: Tuple[IndexEstimate, ...]
+    lists: int                  # lists recomendado para o número de linhas
+
+    @property
+    def probes(self) -> int:
+        """ivfflat.probes inicial recomendado (√lists)"""
+        return max(1, int(math.sqrt(self.lists)))
+
+
+def _estimate(index: IndexDef, rows: int, size: int, existing: bool) -> IndexEstimate:
+    options = dict(index.options)
+    opclass = index.keys[0].opclass or 'vector_l2_ops'
+    if index.method == 'ivfflat':
+        lists = int(options.get('lists', recommended_lists(rows)))
+        index_size, build = ivfflat_bytes(rows, size, lists)
+    else:
+        index_size, build = hnsw_bytes(rows, size, int(options.get('m', HNSW_M)))
+    return IndexEstimate(index.name, index.method, opclass, index.options, index_size, build, existing)
+
+
+def _resolve(search: VectorSearch, tables: Tables) -> Optional[Tuple[str, str]]:
+    """(tabela, coluna vetorial) comparada pela busca, se estiver no schema"""
+    for table, column in search.operands:
+        candidates = [table] if table is not None else list(search.tables)
+        for name in candidates:
+            info = tables.get(name, {}).get(column)
+            if info is not None and vector_type(info.type):
+                return name, column
+    return None
+
+
+def _issues(table: str, column: str, base: str, dimensions: int, indexes: Tuple[IndexDef, ...],
+            searches: Tuple[VectorSearch, ...]) -> Tuple[Tuple[str, str], ...]:
+    issues = []
+    if dimensions > MAX_INDEX_DIMENSIONS[base]:
+        issues.append(('DIMENSIONS', f"{base}({dimensions}) passa do limite de {MAX_INDEX_DIMENSIONS[base]} "
+                                     f"dimensões dos índices ivfflat/hnsw"))
+    ordered = {s.operator for s in searches if s.ordered}
+    functions = ', '.join(sorted({s.function for s in searches}))
+    if searches and not ordered:
+        issues.append(('NOT_ORDERED', f"{functions} calcula a distância sem ORDER BY: nenhum índice é usado"))
+    for operator in sorted(ordered):
+        matching = [idx for idx in indexes if opclass_operator(idx.keys[0].opclass) == operator]
+        if not indexes:
+            issues.append(('NO_INDEX', f"ORDER BY {column} {operator} em {functions} percorre {table} inteira "
+                                       f"(sem índice ivfflat/hnsw)"))
+        elif not matching:
+            found = ', '.join(f"{idx.name} ({idx.keys[0].opclass or 'vector_l2_ops'})" for idx in indexes)
+            issues.append(('OPCLASS_MISMATCH', f"Busca por {DISTANCE_OPERATORS[operator]} ({operator}) não usa "
+                                               f"{found}: classe de operadores diferente"))
+        elif any(s.filtered for s in searches if s.operator == operator and s.ordered):
+            issues.append(('FILTERED', f"Busca com WHERE filtra depois da varredura aproximada: pode devolver "
+                                       f"menos que LIMIT linhas (aumentar probes/ef_search)"))
+    return tuple(issues)
+
+
+def plan_vectors(tables: Tables, model: IndexModel,
+                 searches: Dict[str, Tuple[VectorSearch, ...]], rows: int) -> List[VectorColumnPlan]:
+    """Plano de armazenamento e índice de cada coluna vetorial do schema"""
+    by_column: Dict[Tuple[str, str], List[VectorSearch]] = {}
+    for function_searches in searches.values():
+        for search in function_searches:
+            target = _resolve(search, tables)
+            if target is not None:
+                by_column.setdefault(target, []).append(search)
+
+    plans = []
+    for table, columns in sorted(tables.items()):
+        layout = None
+        for column, info in columns.items():
+            parsed = vector_type(info.type)
+            if parsed is None:
+                continue
+            base, dimensions = parsed
+            size = value_bytes(base, dimensions)
+            if layout is None:
+                layout = analyze_table(table, columns)
+            entry = model.tables.get(table)
+            indexes = tuple(idx for idx in (entry.indexes.values() if entry else ())
+                            if idx.method in ANN_METHODS and idx.keys and idx.keys[0].column == column)
+            column_searches = tuple(by_column.get((table, column), ()))
+            issues = _issues(table, column, base, dimensions, indexes, column_searches)
+
+            estimates = [_estimate(idx, rows, size, True) for idx in indexes]
+            if not estimates:
+                # Sem índice: estima as duas opções para o operador usado na busca
+                operator = next((s.operator for s in column_searches if s.ordered), '<->')
+                opclass = f"{base}_{next(n for n, o in _OPCLASS_SUFFIX.items() if o == operator)}_ops"
+                for method, options in (('hnsw', (('m', str(HNSW_M)), ('ef_construction', str(HNSW_EF_CONSTRUCTION)))),
+                                        ('ivfflat', (('lists', str(recommended_lists(rows))),))):
+                    suggestion = IndexDef(f"idx_{table}_{column}_{method}", table, (IndexKey(column, opclass=opclass),),
+                                          method=method, options=options)
+                    estimates.append(_estimate(suggestion, rows, size, False))
+
+            plans.append(VectorColumnPlan(
+                table, column, base, dimensions, size, indexes, column_searches, issues,
+                heap_bytes(rows, layout.row_bytes), toast_bytes(rows, size), tuple(estimates),
+                recommended_lists(rows),
+            ))
+    return plans
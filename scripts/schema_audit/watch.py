@@ -0,0 +1,76 @@
+"""
+Observação de diretórios por polling
+====================================
+Usado pelo modo --watch da auditoria: a cada intervalo, lista os diretórios
+observados com os.scandir e compara (mtime_ns, tamanho) de cada arquivo com a
+varredura anterior. Só os arquivos criados, alterados ou removidos são lidos.
+
+Os diretórios observados são pequenos e planos (supabase/migrations,
+packages/shared/src/types), então uma varredura custa poucas chamadas de
+sistema e funciona igual em Linux, macOS e containers (onde inotify sobre
+volumes montados nem sempre dispara).
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+Stamp = Tuple[int, int]
+
+
+class PollingWatcher:
+    """Detecta mudanças em arquivos de diretórios relativos a `root`"""
+
+    def __init__(self, root: Path, directories: Sequence[str], accept: Callable[[str], bool]):
+        self.root = Path(root)
+        self.directories = list(directories)
+        self.accept = accept
+        self.stamps: Dict[str, Stamp] = self.scan()
+
+    def scan(self) -> Dict[str, Stamp]:
+        """(mtime_ns, tamanho) de cada arquivo aceito, por caminho relativo"""
+        stamps = {}
+        for directory in self.directories:
+            try:
+                entries = os.scandir(self.root / directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    rel = f"{directory}/{entry.name}"
+                    if not self.accept(rel):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    stamps[rel] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def poll(self) -> Dict[str, Optional[bytes]]:
+        """Arquivos alterados desde a última chamada: caminho → conteúdo (None = removido)"""
+        stamps = self.scan()
+        changes: Dict[str, Optional[bytes]] = {}
+        for rel in sorted(stamps.keys() | self.stamps.keys()):
+            stamp = stamps.get(rel)
+            if stamp == self.stamps.get(rel):
+                continue
+            if stamp is None:
+                changes[rel] = None
+                continue
+            try:
+                changes[rel] = (self.root / rel).read_bytes()
+            except OSError:
+                # Removido entre a varredura e a leitura: aparece na próxima
+                stamps.pop(rel)
+        self.stamps = stamps
+        return changes
+
+    def watch(self, interval: float = 0.1) -> Iterator[Dict[str, Optional[bytes]]]:
+        """Gera um lote de mudanças sempre que algo muda (até KeyboardInterrupt)"""
+        while True:
+            changes = self.poll()
+            if changes:
+                yield changes
+            time.sleep(interval)
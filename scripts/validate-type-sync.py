@@ -8,18 +8,35 @@ Uso: python3 scripts/validate-type-sync.py
 Retorna: 0 (sucesso) ou 1 (erro encontrado)
 """
 
+import argparse
 import re
 import sys
 import os
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+from schema_audit.cache import open_cache
+from schema_audit.database_types import compare_three_way, load_database_types
+from schema_audit.profiling import add_profiling_args, current, profiling
+from schema_audit.replay import MigrationReplay
+from schema_audit.ts_declarations import TypeFile, load_type_files
+
 # Caminho do projeto
 PROJECT_ROOT = Path(__file__).parent.parent
 
 # Arquivos a validar
 CUSTOM_TYPES_DIR = PROJECT_ROOT / "packages/shared/src/types"
 DATABASE_TYPES_FILE = PROJECT_ROOT / "packages/shared/database.types.ts"
+MIGRATIONS_DIR = PROJECT_ROOT / "supabase/migrations"
+
+# Módulos aceitos como import de database.types
+DATABASE_TYPES_MODULES = ('../database.types', '@versix/shared/database.types')
+
+# Nomes de interface que indicam tipo de dados do banco (deveriam estender database.types)
+DATA_KEYWORDS = ('Config', 'Log', 'Row', 'Data', 'Status')
+
+_WORD_RE = re.compile(r'\w+')
 
 def extract_imports(file_path: Path) -> Dict[str, str]:
     """Extrai imports de database.types.ts"""
@@ -35,65 +52,80 @@ def extract_imports(file_path: Path) -> Dict[str, str]:
         print(f"❌ Erro ao ler {file_path}: {e}")
     return imports
 
-def extract_interface_definitions(file_path: Path) -> List[Tuple[str, str]]:
-    """Extrai definições de interfaces/types de um arquivo"""
-    definitions = []
-    try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-
-            # Pattern para: export interface X extends DatabaseTypeRow { }
-            pattern = r"export (?:interface|type) (\w+)\s+(?:extends\s+(\w+)|=)"
-            matches = re.finditer(pattern, content)
+def check_imports_database_types(type_file: TypeFile) -> Tuple[bool, str]:
+    """Verifica se o arquivo importa de database.types"""
+    if any(module in DATABASE_TYPES_MODULES for module in type_file.imports):
+        return True, "✅"
+    return False, "⚠️  Não importa database.types"
 
-            for match in matches:
-                name = match.group(1)
-                extends = match.group(2) or "N/A"
-                definitions.append((name, extends))
-    except Exception as e:
-        print(f"❌ Erro ao ler {file_path}: {e}")
+def interface_definitions(type_file: TypeFile) -> List[Tuple[str, str]]:
+    """Aliases exportados e interfaces exportadas com extends (nome, base ou "N/A")"""
+    definitions = []
+    for decl in type_file.declarations:
+        if not decl.exported or decl.generic:
+            continue
+        if decl.kind == 'type':
+            definitions.append((decl.name, "N/A"))
+        elif decl.extends:
+            definitions.append((decl.name, _WORD_RE.match(decl.extends[0]).group()))
     return definitions
 
-def check_imports_database_types(file_path: Path) -> Tuple[bool, str]:
-    """Verifica se o arquivo importa de database.types"""
-    try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-            if "from '../database.types'" in content or "from '@versix/shared/database.types'" in content:
-                return True, "✅"
-            else:
-                return False, "⚠️  Não importa database.types"
-    except Exception as e:
-        return False, f"❌ Erro: {e}"
-
-def validate_type_extension(file_path: Path) -> List[str]:
+def type_extension_issues(type_file: TypeFile) -> List[str]:
     """Valida que tipos customizados estendem de database.types"""
     issues = []
-    try:
-        with open(file_path, 'r') as f:
-            content = f.read()
 
-            # Encontra interfaces que parecem duplicar banco de dados
-            # Pattern: interface XYZ { id: string; ... } sem extends
-            pattern = r"export interface (\w+)\s*\{(?![^}]*extends)"
-            matches = re.finditer(pattern, content)
-
-            for match in matches:
-                interface_name = match.group(1)
-                # Verificar se é um tipo de dados que deveria estender database.types
-                # Tipo heurístico: se tem 'Config', 'Log', 'Row', 'Data' no nome, deveria estender
-                if any(keyword in interface_name for keyword in ['Config', 'Log', 'Row', 'Data', 'Status']):
-                    # Verificar se está estendendo algo
-                    pattern_extends = fr"export interface {interface_name}\s+extends\s+\w+"
-                    if not re.search(pattern_extends, content):
-                        issues.append(f"⚠️  {interface_name}: Interface pode estar duplicando campos do banco")
-    except Exception as e:
-        issues.append(f"❌ Erro ao validar {file_path}: {e}")
+    # Interfaces sem extends com nome de tipo de dados ('Config', 'Log', 'Row', ...) deveriam estender
+    for decl in type_file.declarations:
+        if decl.kind == 'interface' and decl.exported and not decl.generic and not decl.extends:
+            if any(keyword in decl.name for keyword in DATA_KEYWORDS):
+                issues.append(f"⚠️  {decl.name}: Interface pode estar duplicando campos do banco")
 
     return issues
 
-def main():
-    """Função principal"""
+def analyze_type_file(type_file: TypeFile) -> Dict:
+    """Executa as verificações sobre o modelo de um arquivo de tipos (uma passada por verificação)"""
+    return {
+        'imports': check_imports_database_types(type_file),
+        'definitions': interface_definitions(type_file),
+        'issues': type_extension_issues(type_file),
+        'references': type_file.references,
+    }
+
+def report_drift(drift: List[Tuple[str, str, str]]) -> Tuple[List[str], List[str]]:
+    """Exibe a comparação em três vias e a converte em (erros, avisos)"""
+    errors, warnings = [], []
+    by_type = defaultdict(list)
+    for issue_type, location, description in drift:
+        by_type[issue_type].append((location, description))
+    if not drift:
+        print("   ✅ Migrations, tipos gerados e tipos customizados estão sincronizados")
+    for issue_type, entries in sorted(by_type.items()):
+        print(f"   {issue_type}: {len(entries)}")
+        for location, description in entries[:3]:
+            print(f"     - {location}: {description}")
+
+    # Referência quebrada em tipo customizado não compila: é erro
+    for location, description in by_type.get('BROKEN_REFERENCE', []):
+        errors.append(f"❌ {location}: {description}")
+    for issue_type, entries in sorted(by_type.items()):
+        if issue_type != 'BROKEN_REFERENCE':
+            warnings.append(f"⚠️  {len(entries)} ocorrências de {issue_type} entre migrations e database.types.ts")
+    return errors, warnings
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Validação de sincronização de tipos")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Ignora o cache de parse em .cache/type-audit")
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help="Processos para o parse de arquivos (0 = todos os núcleos)")
+    add_profiling_args(parser)
+    return parser.parse_args(argv)
+
+def main(args, loaded=None):
+    """Função principal; `loaded`: modelos dos arquivos de tipos já carregados (audit-all-types)"""
+    profiler = current()
+    cache = open_cache(enabled=not args.no_cache)
+
     print("\n" + "="*60)
     print("🔍 Validação de Sincronização de Tipos")
     print("="*60 + "\n")
@@ -101,33 +133,45 @@ def main():
     errors = []
     warnings = []
 
-    # 1. Verificar se database.types.ts existe e tem tamanho mínimo
+    # 1. Carregar o modelo de database.types.ts (leitura em streaming)
     print("📋 Validações Básicas:")
+    generated = None
     if not DATABASE_TYPES_FILE.exists():
         errors.append("❌ database.types.ts não encontrado!")
     else:
         size = os.path.getsize(DATABASE_TYPES_FILE)
-        if size < 5000:
-            warnings.append(f"⚠️  database.types.ts muito pequeno ({size} bytes) - verificar se foi regenerado")
-        else:
-            print(f"✅ database.types.ts encontrado ({size} bytes)")
+        try:
+            with profiler.phase('load database.types'):
+                generated = load_database_types(DATABASE_TYPES_FILE)
+        except Exception as e:
+            errors.append(f"❌ Erro ao ler database.types.ts: {e}")
+        if generated is not None and not generated.tables:
+            warnings.append(f"⚠️  database.types.ts sem tabelas em Database['public'] ({size} bytes) - verificar se foi regenerado")
+        elif generated is not None:
+            print(f"✅ database.types.ts encontrado ({size} bytes): {len(generated.tables)} tabelas, "
+                  f"{len(generated.views)} views, {len(generated.enums)} enums, {len(generated.functions)} funções")
 
     # 2. Verificar tipos customizados
+    custom_refs = []
     if CUSTOM_TYPES_DIR.exists():
         print(f"\n📂 Analisando tipos customizados em {CUSTOM_TYPES_DIR}:")
 
-        for type_file in sorted(CUSTOM_TYPES_DIR.glob("*.ts")):
-            if type_file.name.startswith("_"):
-                continue
+        type_files = [f for f in sorted(CUSTOM_TYPES_DIR.glob("*.ts")) if not f.name.startswith("_")]
+        try:
+            analyses = [analyze_type_file(type_file) for type_file in load_type_files(type_files, cache, args.jobs, loaded)]
+        except Exception as e:
+            errors.append(f"❌ Erro ao ler tipos customizados: {e}")
+            analyses = []
 
+        for type_file, analysis in zip(type_files, analyses):
             print(f"\n  📄 {type_file.name}:")
 
             # Verificar imports
-            has_import, status = check_imports_database_types(type_file)
+            has_import, status = analysis['imports']
             print(f"     {status} Imports database.types")
 
             # Analisar definições
-            definitions = extract_interface_definitions(type_file)
+            definitions = analysis['definitions']
             if definitions:
                 print(f"     Encontradas {len(definitions)} definições")
                 for name, extends in definitions[:3]:  # Mostrar primeiras 3
@@ -135,13 +179,28 @@ def main():
                     print(f"       - {name} {extends_text}")
 
             # Validar extensões
-            validation_issues = validate_type_extension(type_file)
+            validation_issues = analysis['issues']
             for issue in validation_issues[:2]:
                 print(f"     {issue}")
                 warnings.append(issue)
+
+            custom_refs.extend((type_file.name, kind, name) for kind, name in analysis['references'])
     else:
         errors.append(f"❌ Diretório de tipos não encontrado: {CUSTOM_TYPES_DIR}")
 
+    # 3. Comparação em três vias: migrations × database.types.ts × tipos customizados
+    if generated is not None and MIGRATIONS_DIR.exists():
+        print(f"\n🔀 Comparando migrations, database.types.ts e tipos customizados:")
+        with profiler.phase('replay migrations'):
+            replay = MigrationReplay.from_directory(MIGRATIONS_DIR, cache, args.jobs)
+        with profiler.phase('compare'):
+            drift = compare_three_way(replay.final.tables, generated, custom_refs)
+        profiler.count('issues', len(drift))
+        with profiler.phase('report'):
+            drift_errors, drift_warnings = report_drift(drift)
+        errors.extend(drift_errors)
+        warnings.extend(drift_warnings)
+
     # Resultado final
     print("\n" + "="*60)
     print("📊 Resumo:")
@@ -169,4 +228,7 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
+    args = parse_args()
+    with profiling(args, 'validate-type-sync'):
+        status = main(args)
+    sys.exit(status)